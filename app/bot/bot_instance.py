@@ -1,26 +1,126 @@
 """
 Создание экземпляра Telegram бота
 """
-from aiogram import Bot
+import asyncio
+import ssl
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import certifi
+from aiohttp import ClientSession, TCPConnector
+from aiohttp.hdrs import USER_AGENT
+from aiohttp.http import SERVER_SOFTWARE
+from aiogram import Bot, __version__ as aiogram_version
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 from aiogram.enums import ParseMode
 
+from app.bot.middlewares.bot_api_counter_middleware import BotApiCounterMiddleware
 from config import config
 
 
-def create_bot() -> Bot:
+@dataclass(frozen=True)
+class BotSessionConfig:
+    """Настройки пула HTTP-соединений с Bot API"""
+    
+    limit: int = 100  # Максимум одновременных соединений
+    keepalive_timeout: float = 60.0  # Сколько держать простаивающее соединение, секунды
+    dns_cache_ttl: int = 3600  # Время жизни кеша DNS, секунды
+    request_timeout: float = 30.0  # Общий таймаут запроса к Bot API, секунды
+    api_url: Optional[str] = None  # Альтернативный сервер Bot API
+    
+    @classmethod
+    def from_config(cls) -> "BotSessionConfig":
+        """Настройки из переменных окружения"""
+        return cls(
+            limit=config.BOT_SESSION_LIMIT,
+            keepalive_timeout=config.BOT_SESSION_KEEPALIVE,
+            dns_cache_ttl=config.BOT_SESSION_DNS_TTL,
+            request_timeout=config.BOT_SESSION_TIMEOUT,
+            api_url=config.TELEGRAM_API_URL
+        )
+
+
+class PooledAiohttpSession(AiohttpSession):
+    """
+    Сессия Bot API с собственным TCPConnector
+    
+    AiohttpSession принимает только limit; keepalive и кеш DNS задаются
+    здесь, при создании коннектора, без внутренних полей aiogram.
+    Прокси не поддерживается: бот ходит в Bot API напрямую.
+    """
+    
+    def __init__(self, limit: int, keepalive_timeout: float, dns_cache_ttl: int, **kwargs: Any):
+        super().__init__(limit=limit, **kwargs)
+        self.limit = limit
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self._client_session: Optional[ClientSession] = None
+    
+    async def create_session(self) -> ClientSession:
+        if self._client_session is None or self._client_session.closed:
+            self._client_session = ClientSession(
+                connector=TCPConnector(
+                    ssl=ssl.create_default_context(cafile=certifi.where()),
+                    limit=self.limit,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=self.dns_cache_ttl
+                ),
+                headers={USER_AGENT: f"{SERVER_SOFTWARE} aiogram/{aiogram_version}"}
+            )
+        return self._client_session
+    
+    async def close(self) -> None:
+        if self._client_session is not None and not self._client_session.closed:
+            await self._client_session.close()
+            # Даем SSL-соединениям закрыться, как AiohttpSession.close
+            await asyncio.sleep(0.25)
+
+
+def create_session(session_config: BotSessionConfig) -> AiohttpSession:
+    """
+    Создает HTTP-сессию бота с настроенным пулом соединений
+    
+    Сессия создает соединения лениво и переиспользует их между update,
+    пока живет процесс (см. app/bot/runtime.py); закрывается в shutdown_application.
+    """
+    kwargs = {}
+    if session_config.api_url:
+        # Альтернативный сервер Bot API (локальный сервер или заглушка для нагрузочных тестов)
+        kwargs['api'] = TelegramAPIServer.from_base(session_config.api_url)
+    
+    return PooledAiohttpSession(
+        limit=session_config.limit,
+        keepalive_timeout=session_config.keepalive_timeout,
+        dns_cache_ttl=session_config.dns_cache_ttl,
+        timeout=session_config.request_timeout,
+        **kwargs
+    )
+
+
+def create_bot(session_config: Optional[BotSessionConfig] = None) -> Bot:
     """
     Создает и настраивает экземпляр Telegram бота
     
+    Args:
+        session_config: Настройки HTTP-сессии (по умолчанию из config)
+    
     Returns:
         Bot: Настроенный экземпляр бота
     """
+    session = create_session(session_config or BotSessionConfig.from_config())
+    
     bot = Bot(
         token=config.BOT_TOKEN,
+        session=session,
         default=DefaultBotProperties(
             parse_mode=ParseMode.HTML,
             link_preview_is_disabled=True
         )
     )
     
-    return bot
\ No newline at end of file
+    # Считаем исходящие вызовы Bot API
+    bot.session.middleware(BotApiCounterMiddleware())
+    
+    return bot
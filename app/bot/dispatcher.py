@@ -6,22 +6,27 @@ from aiogram import Dispatcher
 from aiogram.fsm.storage.memory import MemoryStorage
 
 from app.bot.middlewares.auth_middleware import AuthMiddleware
+from app.bot.middlewares.loader_middleware import LoaderMiddleware
 from app.bot.middlewares.role_middleware import RoleMiddleware
+from app.bot.middlewares.query_budget_middleware import QueryBudgetMiddleware
+from app.bot.middlewares.throttling_middleware import ThrottlingMiddleware
 
 # Импорт существующих обработчиков
 from app.handlers.common import start_handler, help_handler, error_handler, menu_handler
 from app.handlers.auth import registration_handler, role_assignment_handler
-from app.handlers.company import create_company_handler, list_companies_handler
+from app.handlers.company import create_company_handler, list_companies_handler, export_tasks_handler
+from app.handlers.task import list_tasks_handler
+from app.handlers.comment import add_comment_handler
+from app.handlers.file import upload_file_handler
+from app.handlers.analytics import dashboard_handler, sla_handler
 # Остальные обработчики импортируем по мере создания
 # from app.handlers.task import (
 #     create_task_handler, 
-#     list_tasks_handler, 
 #     update_task_handler,
 #     task_status_handler
 # )
-# from app.handlers.comment import add_comment_handler
-# from app.handlers.file import upload_file_handler
-# from app.handlers.analytics import dashboard_handler
+
+from config import config
 
 logger = logging.getLogger(__name__)
 
@@ -36,17 +41,42 @@ async def setup_dispatcher() -> Dispatcher:
     # Создаем диспетчер с хранилищем состояний в памяти
     dp = Dispatcher(storage=MemoryStorage())
     
+    # Загрузчики сущностей на время обработки update (пакетные запросы и кеш)
+    dp.update.outer_middleware(LoaderMiddleware())
+    
+    # Ограничение частоты: до авторизации, чтобы лишние события не шли в БД
+    if config.THROTTLE_ENABLED:
+        throttling = ThrottlingMiddleware()
+        dp.message.outer_middleware(throttling)
+        dp.callback_query.outer_middleware(throttling)
+    
     # Подключаем middleware
     dp.message.middleware(AuthMiddleware())
     dp.callback_query.middleware(AuthMiddleware())
     dp.message.middleware(RoleMiddleware())
     dp.callback_query.middleware(RoleMiddleware())
     
+    # Учет запросов к БД по обработчикам (подключается последним)
+    dp.message.middleware(QueryBudgetMiddleware())
+    dp.callback_query.middleware(QueryBudgetMiddleware())
+    
+    include_routers(dp)
+    
+    logger.info("Диспетчер успешно настроен")
+    return dp
+
+
+def include_routers(dp: Dispatcher) -> None:
+    """
+    Подключает роутеры обработчиков в порядке проверки
+    
+    Args:
+        dp: Диспетчер
+    """
     # Общие обработчики
     dp.include_router(start_handler.router)
     dp.include_router(help_handler.router)
     dp.include_router(menu_handler.router)
-    dp.include_router(error_handler.router)
     
     # Авторизация
     dp.include_router(registration_handler.router)
@@ -55,15 +85,26 @@ async def setup_dispatcher() -> Dispatcher:
     # Компании
     dp.include_router(create_company_handler.router)
     dp.include_router(list_companies_handler.router)
+    dp.include_router(export_tasks_handler.router)
+    
+    # Задачи
+    dp.include_router(list_tasks_handler.router)
+    
+    # Комментарии
+    dp.include_router(add_comment_handler.router)
+    
+    # Файлы
+    dp.include_router(upload_file_handler.router)
+    
+    # Аналитика
+    dp.include_router(dashboard_handler.router)
+    dp.include_router(sla_handler.router)
     
     # Остальные обработчики добавим по мере создания
     # dp.include_router(create_task_handler.router)
-    # dp.include_router(list_tasks_handler.router)
     # dp.include_router(update_task_handler.router)
     # dp.include_router(task_status_handler.router)
-    # dp.include_router(add_comment_handler.router)
-    # dp.include_router(upload_file_handler.router)
-    # dp.include_router(dashboard_handler.router)
     
-    logger.info("Диспетчер успешно настроен")
-    return dp
\ No newline at end of file
+    # Последним: handle_unknown_message принимает любое сообщение, поэтому
+    # обработчики состояний FSM (комментарий, файл, регистрация) должны идти раньше
+    dp.include_router(error_handler.router)
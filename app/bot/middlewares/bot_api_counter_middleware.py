@@ -0,0 +1,23 @@
+"""
+Middleware сессии бота для подсчета исходящих вызовов Bot API
+"""
+from typing import Any
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import TelegramMethod
+
+from app.utils.request_stats import record_bot_api_call
+
+
+class BotApiCounterMiddleware(BaseRequestMiddleware):
+    """Учитывает каждый вызов Bot API в статистике текущего update"""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType,
+        bot: Bot,
+        method: TelegramMethod[Any]
+    ) -> Any:
+        record_bot_api_call(type(method).__name__, getattr(method, 'chat_id', None))
+        return await make_request(bot, method)
@@ -0,0 +1,33 @@
+"""
+Middleware для создания загрузчиков сущностей на время обработки update
+"""
+from typing import Callable, Dict, Any, Awaitable
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from app.database.loaders import start_request_loaders, finish_request_loaders, get_request_loaders
+
+
+class LoaderMiddleware(BaseMiddleware):
+    """Создает набор DataLoader для каждого update"""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        """
+        Делает загрузчики доступными сервисам на время обработки update
+
+        Args:
+            handler: Следующий обработчик в цепочке
+            event: Update от Telegram
+            data: Данные для обработчика
+        """
+        token = start_request_loaders()
+        try:
+            data['loaders'] = get_request_loaders()
+            return await handler(event, data)
+        finally:
+            finish_request_loaders(token)
@@ -0,0 +1,46 @@
+"""
+Middleware для учета запросов к БД по обработчикам
+"""
+from typing import Callable, Dict, Any, Awaitable
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from app.utils.request_stats import begin_handler_stats, end_handler_stats
+from app.utils.query_budget import get_handler_budget, enforce_budget
+
+
+class QueryBudgetMiddleware(BaseMiddleware):
+    """Считает запросы обработчика к БД и сверяет их с объявленным бюджетом"""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        """
+        Оборачивает обработчик учетом запросов к БД
+
+        Args:
+            handler: Следующий обработчик в цепочке
+            event: Событие от Telegram
+            data: Данные для обработчика
+        """
+        handler_object = data.get('handler')
+        callback = getattr(handler_object, 'callback', None)
+
+        if callback is not None:
+            handler_name = f"{callback.__module__}.{callback.__qualname__}"
+        else:
+            handler_name = type(event).__name__
+
+        token = begin_handler_stats(handler_name)
+        try:
+            result = await handler(event, data)
+        except Exception:
+            # Исходная ошибка важнее нарушения бюджета
+            enforce_budget(end_handler_stats(token), get_handler_budget(callback), strict=False)
+            raise
+
+        enforce_budget(end_handler_stats(token), get_handler_budget(callback))
+        return result
@@ -0,0 +1,164 @@
+"""
+Middleware для ограничения частоты запросов пользователей
+
+Подключается как outer middleware, поэтому отброшенные события не доходят
+до AuthMiddleware (запрос к БД) и обработчиков (вызовы Bot API).
+"""
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Any, Awaitable, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import Message, CallbackQuery, TelegramObject
+
+from app.database.repositories.rate_limit_repository import RateLimitRepository
+from app.utils import metrics
+from app.utils.token_bucket import KeyedTokenBuckets, TokenBucket
+from config import config
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_MODES = ('drop', 'delay', 'notice')
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """Token bucket на пользователя и общий на процесс"""
+
+    def __init__(self, mode: Optional[str] = None):
+        """
+        Args:
+            mode: Реакция на превышение: drop (игнорировать), delay (подождать
+                  не дольше THROTTLE_MAX_DELAY), notice (сообщить "слишком часто")
+        """
+        self.mode = mode or config.THROTTLE_MODE
+        if self.mode not in THROTTLE_MODES:
+            raise ValueError(f"Неизвестный режим ограничения частоты: {self.mode}")
+
+        self.user_buckets: KeyedTokenBuckets[int] = KeyedTokenBuckets(
+            config.THROTTLE_USER_RATE, config.THROTTLE_USER_BURST
+        )
+        self.global_bucket = TokenBucket(config.THROTTLE_GLOBAL_RATE, config.THROTTLE_GLOBAL_BURST)
+        self.rate_limit_repo = RateLimitRepository() if config.THROTTLE_SHARED else None
+        self._last_notice: Dict[int, float] = {}
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        """
+        Пропускает событие, если у пользователя и у процесса есть запас токенов
+
+        Args:
+            handler: Следующий обработчик в цепочке
+            event: Событие от Telegram
+            data: Данные для обработчика
+        """
+        user = event.from_user if isinstance(event, (Message, CallbackQuery)) else None
+        if user is None:
+            return await handler(event, data)
+
+        wait = await self._acquire(user.id)
+        if wait is None:
+            metrics.increment('throttling.allowed')
+            return await handler(event, data)
+
+        if self.mode == 'delay' and wait <= config.THROTTLE_MAX_DELAY:
+            metrics.increment('throttling.delayed')
+            await asyncio.sleep(wait)
+            return await handler(event, data)
+
+        if self.mode == 'notice':
+            await self._notify(event, user.id, wait)
+        else:
+            metrics.increment('throttling.dropped')
+
+        logger.info(f"Событие пользователя {user.id} отброшено: слишком часто")
+        return None
+
+    async def _acquire(self, user_id: int) -> Optional[float]:
+        """
+        Забирает токены пользователя и процесса
+
+        Returns:
+            None, если событие разрешено; иначе через сколько секунд появится запас
+        """
+        user_bucket = self.user_buckets.get(user_id)
+        metrics.set_gauge('throttling.tracked_users', len(self.user_buckets))
+
+        if self.mode == 'delay':
+            # В режиме delay токены резервируются, а событие ждет своей очереди
+            user_wait = user_bucket.time_until()
+            global_wait = self.global_bucket.time_until()
+            wait = max(user_wait, global_wait)
+            if wait > config.THROTTLE_MAX_DELAY:
+                metrics.increment('throttling.rejected.user' if user_wait >= global_wait else 'throttling.rejected.global')
+                return wait
+            user_bucket.reserve()
+            self.global_bucket.reserve()
+            if not await self._check_shared(user_id):
+                return float(config.THROTTLE_SHARED_WINDOW)
+            return wait or None
+
+        if not user_bucket.try_consume():
+            metrics.increment('throttling.rejected.user')
+            return user_bucket.time_until()
+
+        if not self.global_bucket.try_consume():
+            metrics.increment('throttling.rejected.global')
+            return self.global_bucket.time_until()
+
+        if not await self._check_shared(user_id):
+            return float(config.THROTTLE_SHARED_WINDOW)
+
+        return None
+
+    async def _check_shared(self, user_id: int) -> bool:
+        """Проверяет общий для всех экземпляров лимит пользователя (если включен)"""
+        if self.rate_limit_repo is None:
+            return True
+
+        window = config.THROTTLE_SHARED_WINDOW
+        window_start = int(time.time()) // window * window
+        expires_at = datetime.utcfromtimestamp(window_start) + timedelta(seconds=window * 2)
+
+        try:
+            hits = await self.rate_limit_repo.hit(f"user:{user_id}", window_start, expires_at)
+        except Exception as e:
+            # Недоступность счетчика не должна блокировать пользователей
+            logger.warning(f"Не удалось проверить общий лимит пользователя {user_id}: {e}")
+            return True
+
+        if hits > config.THROTTLE_SHARED_LIMIT:
+            metrics.increment('throttling.rejected.shared')
+            return False
+        return True
+
+    async def _notify(self, event: TelegramObject, user_id: int, wait: float) -> None:
+        """Сообщает пользователю, что он отправляет запросы слишком часто"""
+        text = f"⏳ Слишком часто. Попробуйте через {max(1, math.ceil(wait))} сек."
+
+        try:
+            if isinstance(event, CallbackQuery):
+                # Ответ на callback нужен в любом случае, чтобы убрать индикатор загрузки
+                await event.answer(text)
+                metrics.increment('throttling.noticed')
+                return
+
+            now = time.monotonic()
+            if now - self._last_notice.get(user_id, 0.0) < config.THROTTLE_NOTICE_COOLDOWN:
+                metrics.increment('throttling.dropped')
+                return
+
+            if len(self._last_notice) >= self.user_buckets.max_keys:
+                self._last_notice.clear()
+            self._last_notice[user_id] = now
+
+            await event.answer(text)
+            metrics.increment('throttling.noticed')
+        except Exception as e:
+            logger.error(f"Ошибка отправки уведомления об ограничении пользователю {user_id}: {e}")
@@ -0,0 +1,79 @@
+"""
+Общий цикл событий процесса
+
+Cloud Function может вызывать handler одновременно из нескольких потоков.
+Все корутины выполняются в одном цикле событий, работающем в фоновом потоке:
+бот, его HTTP-сессия и диспетчер создаются один раз и используются всеми вызовами.
+Каждый вызов выполняется в отдельной задаче со своей копией contextvars,
+поэтому статистика и загрузчики одного update не видны другим.
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Coroutine, Optional, TypeVar
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Возвращает общий цикл событий, запуская его при первом обращении"""
+    global _loop, _thread
+
+    if _loop is not None:
+        return _loop
+
+    with _lock:
+        if _loop is not None:
+            return _loop
+
+        loop = asyncio.new_event_loop()
+        # Потоки для синхронных вызовов YDB SDK (asyncio.to_thread)
+        loop.set_default_executor(
+            ThreadPoolExecutor(max_workers=config.RUNTIME_MAX_THREADS, thread_name_prefix='ydb')
+        )
+        started = threading.Event()
+
+        def run() -> None:
+            asyncio.set_event_loop(loop)
+            loop.call_soon(started.set)
+            loop.run_forever()
+
+        _thread = threading.Thread(target=run, name='bot-event-loop', daemon=True)
+        _thread.start()
+        started.wait()
+
+        _loop = loop
+        logger.info("Запущен общий цикл событий")
+        return _loop
+
+
+def run_coroutine(coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+    """
+    Выполняет корутину в общем цикле событий и ждет результат
+
+    Args:
+        coro: Корутина
+        timeout: Максимальное время ожидания в секундах
+
+    Returns:
+        Результат корутины
+    """
+    loop = get_loop()
+    if threading.current_thread() is _thread:
+        raise RuntimeError("run_coroutine нельзя вызывать из потока общего цикла событий")
+
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result(timeout)
+    except FutureTimeoutError:
+        future.cancel()
+        raise
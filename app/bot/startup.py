@@ -0,0 +1,146 @@
+"""
+Инициализация приложения при холодном старте
+
+Подключение к YDB (получение токена, discovery, создание сессий, подготовка
+частых запросов) выполняется в отдельном потоке одновременно с созданием бота
+и диспетчера. Длительность каждого этапа пишется в лог.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from aiogram import Bot, Dispatcher
+
+from app.bot.bot_instance import create_bot
+from app.bot.dispatcher import setup_dispatcher
+from app.database.connection import ydb_connection
+from app.database.query_registry import get_registered_query
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Запросы, выполняемые почти на каждый update (AuthMiddleware)
+HOT_QUERIES = ('users.get_by_ids', 'users.get_by_id')
+
+
+@dataclass
+class StartupReport:
+    """Длительность этапов холодного старта в секундах"""
+
+    phases: Dict[str, float] = field(default_factory=dict)
+    total: float = 0.0
+
+    def format(self) -> str:
+        phases = ', '.join(f"{name}={duration * 1000:.0f}мс" for name, duration in self.phases.items())
+        return f"{phases}; всего {self.total * 1000:.0f}мс"
+
+
+_bot: Optional[Bot] = None
+_dp: Optional[Dispatcher] = None
+_report: Optional[StartupReport] = None
+_init_lock: Optional[asyncio.Lock] = None
+
+
+def _get_hot_queries() -> List[str]:
+    """Возвращает тексты частых запросов для подготовки в сессиях"""
+    texts = []
+    for name in HOT_QUERIES:
+        try:
+            texts.append(get_registered_query(name).text)
+        except KeyError as e:
+            logger.warning(str(e))
+    return texts
+
+
+async def _connect_ydb(report: StartupReport) -> None:
+    """Подключается к YDB; ошибка не прерывает старт — запросы подключатся сами"""
+    try:
+        timings = await ydb_connection.connect(_get_hot_queries())
+        report.phases.update(timings)
+    except Exception as e:
+        logger.warning(f"YDB не подключена при старте, подключение будет при первом запросе: {e}")
+
+
+async def _create_bot(report: StartupReport) -> Bot:
+    started = time.perf_counter()
+    bot = create_bot()
+    report.phases['bot'] = time.perf_counter() - started
+
+    if config.BOT_SESSION_PREWARM:
+        # Открываем соединение с Bot API заранее (DNS, TCP, TLS), чтобы первый ответ не ждал
+        started = time.perf_counter()
+        try:
+            await bot.get_me()
+            report.phases['bot_api_connect'] = time.perf_counter() - started
+        except Exception as e:
+            logger.warning(f"Не удалось заранее подключиться к Bot API: {e}")
+    return bot
+
+
+async def _create_dispatcher(report: StartupReport) -> Dispatcher:
+    started = time.perf_counter()
+    dp = await setup_dispatcher()
+    report.phases['dispatcher'] = time.perf_counter() - started
+    return dp
+
+
+async def init_application() -> Tuple[Bot, Dispatcher]:
+    """
+    Инициализирует бота, диспетчер и подключение к YDB
+
+    Повторные и одновременные вызовы безопасны: инициализация выполняется один раз.
+
+    Returns:
+        Бот и диспетчер
+    """
+    global _bot, _dp, _report, _init_lock
+
+    if _bot is not None and _dp is not None:
+        return _bot, _dp
+
+    # Создаем в цикле событий, где выполняется инициализация (app/bot/runtime.py)
+    if _init_lock is None:
+        _init_lock = asyncio.Lock()
+
+    async with _init_lock:
+        if _bot is not None and _dp is not None:
+            return _bot, _dp
+
+        config.validate_required()
+
+        report = StartupReport()
+        started = time.perf_counter()
+
+        # Подключение к YDB идет в потоке, пока в цикле событий собираются бот и диспетчер
+        ydb_task = asyncio.ensure_future(_connect_ydb(report))
+        try:
+            bot, dp = await asyncio.gather(_create_bot(report), _create_dispatcher(report))
+        finally:
+            await ydb_task
+
+        report.total = time.perf_counter() - started
+        _bot, _dp, _report = bot, dp, report
+
+        logger.info(f"Холодный старт: {report.format()}")
+        return bot, dp
+
+
+def get_startup_report() -> Optional[StartupReport]:
+    """Возвращает отчет о холодном старте (None, если инициализации не было)"""
+    return _report
+
+
+async def shutdown_application() -> None:
+    """Останавливает отправку сообщений, закрывает HTTP-сессию бота и подключение к YDB"""
+    global _bot, _dp
+
+    from app.services.sender_service import stop_sender_service
+    await stop_sender_service()
+
+    if _bot is not None:
+        await _bot.session.close()
+    _bot, _dp = None, None
+
+    await ydb_connection.disconnect()
@@ -0,0 +1,87 @@
+"""
+Задания по таймеру в режиме долгоживущего сервера (server.py)
+
+В Cloud Functions задания запускаются триггерами-таймерами
+(sweeper_handler, reminder_handler и reconcile_handler в index.py);
+здесь те же задания выполняются циклом в каждом процессе-воркере.
+Задания безопасны при одновременном запуске на нескольких экземплярах.
+Обновление снимка аналитики касается только памяти процесса, поэтому
+триггера у него нет: в функции снимок дочитывается при открытии отчета.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, List
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+
+async def run_reminders() -> None:
+    from app.services.reminder_service import ReminderScheduler
+
+    await ReminderScheduler().tick()
+
+
+async def run_overdue_sweep() -> None:
+    from app.services.overdue_service import OverdueSweeper
+
+    await OverdueSweeper().sweep()
+
+
+async def run_counter_reconcile() -> None:
+    from app.services.counter_service import CounterService
+
+    await CounterService().reconcile()
+
+
+async def run_analytics_refresh() -> None:
+    from app.services.analytics_service import AnalyticsService
+
+    await AnalyticsService().refresh()
+
+
+async def run_periodically(name: str, interval: float, job: Callable[[], Awaitable[None]]) -> None:
+    """
+    Выполняет задание каждые interval секунд до отмены
+
+    Ошибка запуска логируется и не останавливает цикл.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        try:
+            await job()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Ошибка задания {name}: {e}")
+        await asyncio.sleep(max(0.0, interval - (loop.time() - started)))
+
+
+def start_timer_jobs() -> List[asyncio.Task]:
+    """Запускает циклы заданий в текущем цикле событий"""
+    jobs = []
+    if config.REMINDER_TICK_SECONDS > 0:
+        jobs.append(asyncio.ensure_future(run_periodically('reminders', config.REMINDER_TICK_SECONDS, run_reminders)))
+    if config.OVERDUE_SWEEP_INTERVAL > 0:
+        jobs.append(asyncio.ensure_future(
+            run_periodically('overdue_sweeper', config.OVERDUE_SWEEP_INTERVAL, run_overdue_sweep)
+        ))
+    if config.COUNTER_RECONCILE_INTERVAL > 0:
+        jobs.append(asyncio.ensure_future(
+            run_periodically('counter_reconcile', config.COUNTER_RECONCILE_INTERVAL, run_counter_reconcile)
+        ))
+    if config.ANALYTICS_REFRESH_INTERVAL > 0:
+        jobs.append(asyncio.ensure_future(
+            run_periodically('analytics_refresh', config.ANALYTICS_REFRESH_INTERVAL, run_analytics_refresh)
+        ))
+    logger.info(f"Запущено заданий по таймеру: {len(jobs)}")
+    return jobs
+
+
+async def stop_timer_jobs(jobs: List[asyncio.Task]) -> None:
+    """Останавливает циклы заданий (текущий запуск прерывается)"""
+    for job in jobs:
+        job.cancel()
+    await asyncio.gather(*jobs, return_exceptions=True)
@@ -0,0 +1,156 @@
+"""
+Обработка одного update от Telegram
+
+Общая часть для всех способов доставки update: Cloud Function (index.py)
+и долгоживущего webhook сервера (server.py).
+"""
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from aiogram.types import Update
+
+from app.bot.startup import init_application
+from app.bot.update_scheduler import get_update_key, get_update_scheduler
+from app.services.idempotency_service import get_idempotency_service
+from app.utils.traffic_capture import capture_update
+from app.utils import metrics
+from app.utils.request_stats import UpdateStats, start_update_stats, finish_update_stats
+from config import config
+
+logger = logging.getLogger(__name__)
+
+
+async def process_update(update_data: Dict[str, Any], raise_in_progress: bool = False) -> Optional[UpdateStats]:
+    """
+    Передает update в диспетчер
+    
+    Исключения обработчиков перехватывает error_handler (пользователь
+    получает сообщение об ошибке), сюда они не доходят — они отмечены
+    в UpdateStats.handler_error.
+    
+    Args:
+        update_data: Тело webhook запроса от Telegram
+        raise_in_progress: Повтор update, который еще обрабатывает другой
+            экземпляр, — ошибка, а не подтверждение (см. IdempotencyService.run_once)
+        
+    Returns:
+        Статистика обработки update
+    """
+    # Инициализируем бота если не инициализирован (один раз на процесс)
+    bot, dp = await init_application()
+    
+    # Записываем трафик для нагрузочного тестирования (если включено)
+    capture_update(update_data)
+    
+    update = Update(**update_data)
+    
+    stats_token = start_update_stats(update.update_id)
+    try:
+        if config.IDEMPOTENCY_ENABLED:
+            # Повторная доставка подтверждается без повторного запуска обработчиков
+            await get_idempotency_service().run_once(
+                update.update_id, lambda: dp.feed_update(bot, update), raise_in_progress=raise_in_progress
+            )
+        else:
+            await dp.feed_update(bot, update)
+    finally:
+        stats = finish_update_stats(stats_token)
+    return stats
+
+
+async def dispatch_update(update_data: Dict[str, Any]) -> None:
+    """
+    Обрабатывает update через планировщик: параллельно с другими чатами,
+    но после всех ранее поступивших update этого же чата
+    
+    Args:
+        update_data: Тело webhook запроса от Telegram
+    """
+    await get_update_scheduler().run(get_update_key(update_data), lambda: process_update(update_data))
+
+
+@dataclass
+class BatchItemResult:
+    """Результат обработки одного сообщения из пакета"""
+    
+    message_id: str
+    update_id: Optional[int]
+    ok: bool
+    error: Optional[str] = None
+    handler_error: Optional[str] = None  # Ошибка обработчика, уже показанная пользователю
+
+
+class BatchFailed(Exception):
+    """Часть сообщений пакета не обработана; пакет нужно доставить повторно"""
+    
+    def __init__(self, results: List[BatchItemResult]):
+        self.results = results
+        failed = [result for result in results if not result.ok]
+        super().__init__(
+            f"{len(failed)} из {len(results)} сообщений с ошибкой: "
+            + "; ".join(f"{result.message_id}: {result.error}" for result in failed[:5])
+        )
+
+
+async def process_batch(messages: List[Tuple[str, str]]) -> List[BatchItemResult]:
+    """
+    Обрабатывает пакет update из очереди
+    
+    Update разных чатов обрабатываются параллельно, одного чата — по порядку.
+    Если update чата завершился ошибкой, следующие update этого чата в пакете
+    не обрабатываются и тоже считаются неуспешными: при повторной доставке
+    они придут после него и порядок сохранится.
+    
+    Ошибкой считается только исключение вне обработчиков (инициализация,
+    некорректный update, защита от повторов). Update, который захвачен
+    другим вызовом и еще обрабатывается, тоже ошибка: сообщение вернется
+    в очередь и будет пропущено как обработанное или обработано заново,
+    если тот вызов завершился ошибкой. Исключение обработчика
+    перехватывает error_handler и отвечает пользователю; такое сообщение
+    считается обработанным (повтор выполнил бы обработчик еще раз), ошибка
+    передается в handler_error и метрику queue.handler_errors.
+    
+    Args:
+        messages: Пары (ID сообщения очереди, тело сообщения с update в JSON)
+        
+    Returns:
+        Результаты в порядке сообщений
+    """
+    scheduler = get_update_scheduler()
+    failed_keys: Set[str] = set()
+    
+    async def process_message(message_id: str, body: str) -> BatchItemResult:
+        try:
+            update_data = json.loads(body)
+        except ValueError as e:
+            return BatchItemResult(message_id, None, False, f"Некорректный JSON: {e}")
+        
+        update_id = update_data.get('update_id')
+        key = get_update_key(update_data)
+        handler_error: Optional[str] = None
+        
+        async def run() -> None:
+            nonlocal handler_error
+            if key in failed_keys:
+                raise RuntimeError("Пропущен после ошибки предыдущего update этого чата")
+            try:
+                stats = await process_update(update_data, raise_in_progress=True)
+            except Exception:
+                failed_keys.add(key)
+                raise
+            if stats is not None and stats.handler_error:
+                handler_error = stats.handler_error
+                metrics.increment('queue.handler_errors')
+        
+        try:
+            await scheduler.run(key, run)
+            return BatchItemResult(message_id, update_id, True, handler_error=handler_error)
+        except Exception as e:
+            logger.error(f"Ошибка обработки сообщения {message_id} (update {update_id}): {e}")
+            return BatchItemResult(message_id, update_id, False, str(e))
+    
+    # Задачи создаются в порядке сообщений, поэтому очередь каждого чата сохраняет этот порядок
+    return list(await asyncio.gather(*(process_message(message_id, body) for message_id, body in messages)))
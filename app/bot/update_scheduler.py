@@ -0,0 +1,147 @@
+"""
+Планировщик обработки update
+
+Update из разных чатов обрабатываются параллельно (не больше
+UPDATE_MAX_CONCURRENCY одновременно), а update одного чата — строго по
+очереди в порядке поступления. Так сценарии FSM (например, создание
+компании) не ломаются, когда два сообщения пользователя приходят почти
+одновременно.
+
+Метрики:
+    updates.queued        — update, ожидающие своей очереди или свободного слота
+    updates.in_flight     — update в обработке
+    updates.active_chats  — чаты, у которых есть update в очереди или в обработке
+    updates.wait          — время от поступления до начала обработки
+    updates.processing    — время обработки
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from app.utils import metrics
+from config import config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+def get_update_key(update_data: Dict[str, Any]) -> str:
+    """
+    Возвращает ключ очереди для update: чат, а если его нет — пользователь
+
+    Args:
+        update_data: Update от Telegram в виде словаря
+
+    Returns:
+        Ключ вида "chat:<id>", "user:<id>" или "update:<id>"
+    """
+    for value in update_data.values():
+        if not isinstance(value, dict):
+            continue
+
+        chat = value.get('chat') or (value.get('message') or {}).get('chat') or {}
+        if chat.get('id') is not None:
+            return f"chat:{chat['id']}"
+
+        sender = value.get('from') or {}
+        if sender.get('id') is not None:
+            return f"user:{sender['id']}"
+
+    return f"update:{update_data.get('update_id')}"
+
+
+class UpdateScheduler:
+    """Параллельная обработка с сохранением порядка внутри ключа"""
+
+    def __init__(self, max_concurrency: int):
+        """
+        Args:
+            max_concurrency: Максимум одновременно обрабатываемых update
+        """
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Последний поставленный в очередь update каждого ключа
+        self._tails: Dict[str, asyncio.Future] = {}
+        self._pending: Dict[str, int] = {}
+
+    async def run(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Выполняет func после всех ранее поставленных задач с тем же ключом
+
+        Args:
+            key: Ключ очереди (см. get_update_key)
+            func: Функция, возвращающая корутину обработки
+
+        Returns:
+            Результат func
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        loop = asyncio.get_running_loop()
+        enqueued_at = time.perf_counter()
+
+        previous = self._tails.get(key)
+        done = loop.create_future()
+        self._tails[key] = done
+
+        if key not in self._pending:
+            metrics.add_gauge('updates.active_chats', 1)
+        self._pending[key] = self._pending.get(key, 0) + 1
+        metrics.add_gauge('updates.queued', 1)
+
+        started = False
+        try:
+            if previous is not None:
+                # Ошибка предыдущего update не мешает обработке следующего
+                await asyncio.wait([previous])
+
+            async with self._semaphore:
+                started = True
+                metrics.add_gauge('updates.queued', -1)
+                metrics.add_gauge('updates.in_flight', 1)
+                metrics.observe('updates.wait', time.perf_counter() - enqueued_at)
+
+                processing_started = time.perf_counter()
+                try:
+                    return await func()
+                finally:
+                    metrics.observe('updates.processing', time.perf_counter() - processing_started)
+                    metrics.add_gauge('updates.in_flight', -1)
+                    metrics.increment('updates.processed')
+        finally:
+            if not started:
+                metrics.add_gauge('updates.queued', -1)
+            self._release(key, previous, done)
+
+    def _release(self, key: str, previous: Optional[asyncio.Future], done: asyncio.Future) -> None:
+        """Пропускает следующий update ключа"""
+        def finish(_: Any = None) -> None:
+            if not done.done():
+                done.set_result(None)
+            if self._tails.get(key) is done:
+                del self._tails[key]
+
+        if previous is not None and not previous.done():
+            # Задачу отменили до начала обработки: очередь идет дальше после предыдущей
+            previous.add_done_callback(finish)
+        else:
+            finish()
+
+        self._pending[key] -= 1
+        if not self._pending[key]:
+            del self._pending[key]
+            metrics.add_gauge('updates.active_chats', -1)
+
+
+_scheduler: Optional[UpdateScheduler] = None
+
+
+def get_update_scheduler() -> UpdateScheduler:
+    """Возвращает планировщик процесса"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = UpdateScheduler(config.UPDATE_MAX_CONCURRENCY)
+    return _scheduler
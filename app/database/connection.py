@@ -3,7 +3,9 @@
 """
 import asyncio
 import logging
-from typing import Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
 import ydb
 import threading
 
@@ -20,88 +22,122 @@ class YDBConnection:
         self._pool: Optional[ydb.SessionPool] = None
         self._lock = threading.Lock()
     
-    async def connect(self) -> None:
-        """Создает подключение к YDB"""
+    async def connect(self, warmup_queries: Sequence[str] = ()) -> Dict[str, float]:
+        """Создает подключение к YDB, не блокируя цикл событий"""
+        return await asyncio.to_thread(self.connect_sync, warmup_queries)
+    
+    def connect_sync(self, warmup_queries: Sequence[str] = ()) -> Dict[str, float]:
+        """
+        Создает подключение к YDB
+        
+        Args:
+            warmup_queries: Запросы, которые нужно подготовить в заранее созданных сессиях
+            
+        Returns:
+            Длительность этапов подключения в секундах (пусто, если подключение уже было)
+        """
         if self._pool is not None:
-            return
+            return {}
             
         with self._lock:
             if self._pool is not None:
-                return
-                
+                return {}
+            
+            timings: Dict[str, float] = {}
             try:
-                # Настройка credentials
-                if config.YDB_CREDENTIALS_TYPE == "metadata":
-                    credentials = ydb.iam.MetadataUrlCredentials()
-                elif config.YDB_CREDENTIALS_TYPE == "sa_key":
-                    credentials = ydb.iam.ServiceAccountCredentials.from_file(
-                        config.YDB_SERVICE_ACCOUNT_KEY
-                    )
-                elif config.YDB_CREDENTIALS_TYPE == "token":
-                    credentials = ydb.AccessTokenCredentials(config.YDB_TOKEN)
-                else:
-                    raise ValueError(f"Неподдерживаемый тип credentials: {config.YDB_CREDENTIALS_TYPE}")
+                started = time.perf_counter()
+                credentials = self._create_credentials()
+                # Получаем токен заранее: иначе его будет ждать первый запрос discovery
+                credentials.auth_metadata()
+                timings['ydb_credentials'] = time.perf_counter() - started
                 
-                # Создаем driver
+                started = time.perf_counter()
                 driver_config = ydb.DriverConfig(
                     endpoint=config.YDB_ENDPOINT,
                     database=config.YDB_DATABASE,
                     credentials=credentials
                 )
-                
                 self._driver = ydb.Driver(driver_config)
-                self._driver.wait(timeout=10)
-                self._pool = ydb.SessionPool(self._driver)
+                self._driver.wait(timeout=config.YDB_DISCOVERY_TIMEOUT, fail_fast=True)
+                timings['ydb_discovery'] = time.perf_counter() - started
+                
+                pool = ydb.SessionPool(self._driver, size=config.YDB_POOL_SIZE)
+                self._prewarm_sessions(pool, warmup_queries, timings)
                 
+                # Пул публикуем последним, чтобы другие потоки не увидели его до прогрева
+                self._pool = pool
                 logger.info("Успешно подключились к YDB")
+                return timings
                 
             except Exception as e:
                 logger.error(f"Ошибка подключения к YDB: {e}")
                 self._cleanup()
                 raise
     
-    def connect_sync(self) -> None:
-        """Синхронная версия подключения к YDB"""
-        if self._pool is not None:
+    def _create_credentials(self) -> ydb.Credentials:
+        """Создает credentials в зависимости от настроек"""
+        if config.YDB_CREDENTIALS_TYPE == "metadata":
+            return ydb.iam.MetadataUrlCredentials()
+        elif config.YDB_CREDENTIALS_TYPE == "sa_key":
+            return ydb.iam.ServiceAccountCredentials.from_file(
+                config.YDB_SERVICE_ACCOUNT_KEY
+            )
+        elif config.YDB_CREDENTIALS_TYPE == "token":
+            return ydb.AccessTokenCredentials(config.YDB_TOKEN)
+        else:
+            raise ValueError(f"Неподдерживаемый тип credentials: {config.YDB_CREDENTIALS_TYPE}")
+    
+    def _prewarm_sessions(self, pool: ydb.SessionPool, warmup_queries: Sequence[str],
+                          timings: Dict[str, float]) -> None:
+        """
+        Параллельно создает сессии и подготавливает в них частые запросы
+        
+        Ошибки прогрева не критичны: сессии будут созданы при первых запросах.
+        """
+        count = min(config.YDB_PREWARM_SESSIONS, config.YDB_POOL_SIZE)
+        if count <= 0:
             return
+        
+        sessions: List[ydb.Session] = []
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=count) as executor:
+                futures = [
+                    executor.submit(pool.acquire, timeout=config.YDB_DISCOVERY_TIMEOUT)
+                    for _ in range(count)
+                ]
+                for future in futures:
+                    try:
+                        sessions.append(future.result())
+                    except Exception as e:
+                        logger.warning(f"Не удалось заранее создать сессию YDB: {e}")
+            timings['ydb_sessions'] = time.perf_counter() - started
             
-        with self._lock:
-            if self._pool is not None:
-                return
-                
-            try:
-                # Настройка credentials
-                if config.YDB_CREDENTIALS_TYPE == "metadata":
-                    credentials = ydb.iam.MetadataUrlCredentials()
-                elif config.YDB_CREDENTIALS_TYPE == "sa_key":
-                    credentials = ydb.iam.ServiceAccountCredentials.from_file(
-                        config.YDB_SERVICE_ACCOUNT_KEY
-                    )
-                elif config.YDB_CREDENTIALS_TYPE == "token":
-                    credentials = ydb.AccessTokenCredentials(config.YDB_TOKEN)
-                else:
-                    raise ValueError(f"Неподдерживаемый тип credentials: {config.YDB_CREDENTIALS_TYPE}")
-                
-                # Создаем driver
-                driver_config = ydb.DriverConfig(
-                    endpoint=config.YDB_ENDPOINT,
-                    database=config.YDB_DATABASE,
-                    credentials=credentials
-                )
+            if warmup_queries and sessions:
+                started = time.perf_counter()
                 
-                self._driver = ydb.Driver(driver_config)
-                self._driver.wait(timeout=10)
-                self._pool = ydb.SessionPool(self._driver)
+                def prepare_all(session: ydb.Session) -> None:
+                    # Подготовленный запрос кешируется в сессии и используется при execute
+                    for query in warmup_queries:
+                        session.prepare(query)
                 
-                logger.info("Успешно подключились к YDB (sync)")
+                with ThreadPoolExecutor(max_workers=len(sessions)) as executor:
+                    list(executor.map(prepare_all, sessions))
+                timings['ydb_warmup'] = time.perf_counter() - started
                 
-            except Exception as e:
-                logger.error(f"Ошибка подключения к YDB: {e}")
-                self._cleanup()
-                raise
+        except Exception as e:
+            logger.warning(f"Не удалось прогреть запросы YDB: {e}")
+        finally:
+            for session in sessions:
+                pool.release(session)
     
     def _cleanup(self):
         """Очищает ресурсы"""
+        if self._pool:
+            try:
+                self._pool.stop()
+            except:
+                pass
         if self._driver:
             try:
                 self._driver.stop()
@@ -113,9 +149,6 @@ class YDBConnection:
     async def disconnect(self) -> None:
         """Закрывает подключение к YDB"""
         try:
-            if self._driver:
-                self._driver.stop()
-                
             self._cleanup()
             logger.info("Отключились от YDB")
         except Exception as e:
@@ -170,7 +203,8 @@ class YDBConnection:
         except Exception as e:
             print(f"[DEBUG CONNECTION] ОШИБКА YDB: {e}")
             logger.error(f"Ошибка выполнения запроса: {e}")
-            self._cleanup()
+            # Пул не сбрасываем: он общий для одновременных запросов,
+            # а сломанные сессии retry_operation_sync заменяет сам
             raise
 
 
@@ -179,17 +213,12 @@ ydb_connection = YDBConnection()
 
 
 def get_ydb_connection() -> YDBConnection:
-    """Возвращает подключение к YDB"""
+    """
+    Возвращает подключение к YDB
+    
+    Обычно подключение уже установлено при старте (app/bot/startup.py);
+    иначе подключаемся синхронно при первом обращении.
+    """
     if not ydb_connection._pool:
-        import asyncio
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        
-        if loop.is_running():
-            ydb_connection.connect_sync()
-        else:
-            loop.run_until_complete(ydb_connection.connect())
-    return ydb_connection
\ No newline at end of file
+        ydb_connection.connect_sync()
+    return ydb_connection
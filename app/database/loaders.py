@@ -0,0 +1,140 @@
+"""
+Загрузчики сущностей в рамках одного update
+
+DataLoader собирает ключи, запрошенные в одном проходе цикла событий, и
+загружает их одним запросом вида WHERE id IN $ids. Результаты запоминаются
+до конца обработки update, поэтому повторное обращение к тому же пользователю
+(AuthMiddleware, обработчик, отображение создателя) не идет в БД.
+"""
+import asyncio
+from contextvars import ContextVar, Token
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Optional, Set, Tuple, TypeVar
+
+from app.database.repositories.user_repository import UserRepository
+from app.database.repositories.company_repository import CompanyRepository
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+class DataLoader(Generic[K, V]):
+    """Пакетная загрузка с дедупликацией и кешированием по ключу"""
+
+    def __init__(self, batch_load_fn: Callable[[List[K]], Awaitable[Dict[K, V]]]):
+        """
+        Args:
+            batch_load_fn: Функция, загружающая словарь {ключ: значение} для списка ключей
+        """
+        self._batch_load_fn = batch_load_fn
+        self._cache: Dict[K, asyncio.Future] = {}
+        # Ключи и их future: clear может убрать future из кеша до ответа,
+        # а ожидающие его должны получить результат
+        self._pending: List[Tuple[K, asyncio.Future]] = []
+        self._dispatch_scheduled = False
+        # Ссылки на запущенные загрузки, чтобы задачи не собрал сборщик мусора
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def load(self, key: K) -> Optional[V]:
+        """Загружает значение по ключу (None, если не найдено)"""
+        future = self._cache.get(key)
+
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._cache[key] = future
+            self._pending.append((key, future))
+
+            # Откладываем запрос до конца текущего прохода цикла, чтобы собрать все ключи
+            if not self._dispatch_scheduled:
+                self._dispatch_scheduled = True
+                loop.call_soon(self._dispatch)
+
+        # Future общий для всех, кто ждет ключ: отмена одного из них
+        # (например, по таймауту обработчика) не должна отменять остальных
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[K]) -> List[Optional[V]]:
+        """Загружает значения для нескольких ключей одним запросом"""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: K, value: Optional[V]) -> None:
+        """Кладет известное значение в кеш (например, после создания сущности)"""
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(value)
+        self._cache[key] = future
+
+    def clear(self, key: K) -> None:
+        """
+        Удаляет значение из кеша (после изменения сущности)
+
+        Незавершенная загрузка тоже забывается: ее получат те, кто уже ждет,
+        а следующий load запросит сущность заново.
+        """
+        self._cache.pop(key, None)
+
+    def _dispatch(self) -> None:
+        pending, self._pending = self._pending, []
+        self._dispatch_scheduled = False
+        task = asyncio.ensure_future(self._load_batch(pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _load_batch(self, pending: List[Tuple[K, asyncio.Future]]) -> None:
+        try:
+            values = await self._batch_load_fn([key for key, _ in pending])
+        except asyncio.CancelledError:
+            # Отмененную загрузку не кешируем, иначе следующие load получат CancelledError
+            for key, future in pending:
+                if self._cache.get(key) is future:
+                    del self._cache[key]
+                future.cancel()
+            raise
+        except Exception as e:
+            for key, future in pending:
+                # Ошибку не кешируем: следующий load повторит запрос
+                if self._cache.get(key) is future:
+                    del self._cache[key]
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for key, future in pending:
+            if not future.done():
+                future.set_result(values.get(key))
+
+
+class RequestLoaders:
+    """Набор загрузчиков для одного update"""
+
+    def __init__(self):
+        self._user_repo = UserRepository()
+        self._company_repo = CompanyRepository()
+
+        self.users: DataLoader[int, Any] = DataLoader(self._load_users)
+        self.companies: DataLoader[int, Any] = DataLoader(self._load_companies)
+
+    async def _load_users(self, user_ids: List[int]) -> Dict[int, Any]:
+        users = await self._user_repo.get_users_by_ids(user_ids)
+        return {user.user_id: user for user in users}
+
+    async def _load_companies(self, company_ids: List[int]) -> Dict[int, Any]:
+        companies = await self._company_repo.get_companies_by_ids(company_ids)
+        return {company.company_id: company for company in companies}
+
+
+_current_loaders: ContextVar[Optional[RequestLoaders]] = ContextVar('request_loaders', default=None)
+
+
+def start_request_loaders() -> Token:
+    """Создает загрузчики для текущего update"""
+    return _current_loaders.set(RequestLoaders())
+
+
+def finish_request_loaders(token: Token) -> None:
+    """Сбрасывает загрузчики после обработки update"""
+    _current_loaders.reset(token)
+
+
+def get_request_loaders() -> Optional[RequestLoaders]:
+    """Возвращает загрузчики текущего update или None вне обработки update"""
+    return _current_loaders.get()
@@ -0,0 +1,199 @@
+"""
+Применение декларативной схемы (app/database/schema.py) к базе YDB
+
+Раннер сравнивает схему с фактическим состоянием базы и идемпотентно:
+- создает отсутствующие таблицы вместе с индексами и настройками;
+- добавляет недостающие колонки и вторичные индексы;
+- применяет настройки партиционирования, реплик чтения и TTL.
+Удаление колонок и индексов не выполняется автоматически — о расхождениях
+выводится предупреждение.
+
+Запуск:
+    python -m app.database.migrations [--dry-run]
+"""
+import argparse
+import logging
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, List, Optional
+
+import ydb
+
+from app.database.schema import SCHEMA_VERSION, TABLES, SCHEMA_MIGRATIONS, Table
+from config import config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MigrationPlan:
+    """Список изменений, необходимых для приведения базы к схеме"""
+
+    statements: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+
+
+def describe_table(pool: ydb.SessionPool, database: str, table_name: str) -> Optional[Any]:
+    """Возвращает описание таблицы или None, если таблица не существует"""
+    path = f"{database}/{table_name}"
+    try:
+        return pool.retry_operation_sync(lambda session: session.describe_table(path))
+    except ydb.SchemeError:
+        return None
+
+
+def plan_table(table: Table, description: Optional[Any]) -> MigrationPlan:
+    """
+    Формирует изменения для одной таблицы
+
+    Args:
+        table: Описание таблицы из схемы
+        description: Фактическое описание таблицы (None, если ее нет)
+
+    Returns:
+        План изменений
+    """
+    plan = MigrationPlan()
+
+    if description is None:
+        plan.statements.append(table.create_ddl())
+        return plan
+
+    existing_columns = {column.name for column in description.columns}
+    declared_columns = {column.name for column in table.columns}
+
+    for column in table.columns:
+        if column.name not in existing_columns:
+            plan.statements.append(f"ALTER TABLE {table.name} ADD COLUMN {column.ddl()};")
+
+    for column_name in sorted(existing_columns - declared_columns):
+        plan.warnings.append(f"{table.name}: колонка {column_name} отсутствует в схеме")
+
+    existing_indexes = {index.name: tuple(index.index_columns) for index in description.indexes}
+    existing_covers = {
+        index.name: tuple(getattr(index, 'data_columns', None) or ()) for index in description.indexes
+    }
+    declared_indexes = {index.name for index in table.indexes}
+
+    for index in table.indexes:
+        if index.name not in existing_indexes:
+            plan.statements.append(f"ALTER TABLE {table.name} ADD {index.ddl()};")
+        elif existing_indexes[index.name] != index.columns:
+            plan.warnings.append(
+                f"{table.name}: индекс {index.name} построен по {existing_indexes[index.name]}, "
+                f"в схеме {index.columns} — требуется пересоздание под новым именем"
+            )
+        elif set(existing_covers[index.name]) != set(index.cover):
+            # Без COVER запросы работают, но дочитывают строки из основной таблицы
+            plan.warnings.append(
+                f"{table.name}: индекс {index.name} покрывает {existing_covers[index.name]}, "
+                f"в схеме {index.cover} — требуется пересоздание под новым именем"
+            )
+
+    for index_name in sorted(set(existing_indexes) - declared_indexes):
+        plan.warnings.append(f"{table.name}: индекс {index_name} отсутствует в схеме")
+
+    # Настройки хранения применяются каждый раз: ALTER TABLE SET идемпотентен
+    plan.statements.append(f"ALTER TABLE {table.name} SET ({', '.join(table.settings())});")
+
+    return plan
+
+
+def build_plan(pool: ydb.SessionPool, database: str) -> MigrationPlan:
+    """Формирует план изменений для всех таблиц схемы"""
+    plan = MigrationPlan()
+    for table in TABLES:
+        table_plan = plan_table(table, describe_table(pool, database, table.name))
+        plan.statements.extend(table_plan.statements)
+        plan.warnings.extend(table_plan.warnings)
+    return plan
+
+
+def get_applied_version(pool: ydb.SessionPool) -> int:
+    """Возвращает последнюю примененную версию схемы (0, если миграций не было)"""
+    query = f"SELECT MAX(version) AS version FROM {SCHEMA_MIGRATIONS.name};"
+    try:
+        result = pool.retry_operation_sync(
+            lambda session: session.transaction(ydb.SerializableReadWrite()).execute(query, commit_tx=True)
+        )
+    except ydb.SchemeError:
+        return 0
+    rows = result[0].rows if result else []
+    return (rows[0].version or 0) if rows else 0
+
+
+def record_version(pool: ydb.SessionPool, statements: int) -> None:
+    """Записывает примененную версию схемы"""
+    query = f"""
+    DECLARE $version AS Uint32;
+    DECLARE $applied_at AS Datetime;
+    DECLARE $statements AS Uint32;
+
+    UPSERT INTO {SCHEMA_MIGRATIONS.name} (version, applied_at, statements)
+    VALUES ($version, $applied_at, $statements);
+    """
+    parameters = {
+        '$version': SCHEMA_VERSION,
+        '$applied_at': datetime.utcnow(),
+        '$statements': statements
+    }
+    pool.retry_operation_sync(
+        lambda session: session.transaction().execute(query, parameters, commit_tx=True)
+    )
+
+
+def apply_schema(pool: ydb.SessionPool, database: str, dry_run: bool = False) -> MigrationPlan:
+    """
+    Приводит базу к декларативной схеме
+
+    Args:
+        pool: Пул сессий YDB
+        database: Путь к базе данных
+        dry_run: Только сформировать план, не применяя его
+
+    Returns:
+        Выполненный (или запланированный) план
+    """
+    plan = build_plan(pool, database)
+
+    for warning in plan.warnings:
+        logger.warning(warning)
+
+    if dry_run:
+        return plan
+
+    for statement in plan.statements:
+        logger.info(f"Применяем: {statement}")
+        pool.retry_operation_sync(lambda session: session.execute_scheme(statement))
+
+    if get_applied_version(pool) < SCHEMA_VERSION:
+        record_version(pool, len(plan.statements))
+        logger.info(f"Схема обновлена до версии {SCHEMA_VERSION}")
+
+    return plan
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Применение схемы YDB")
+    parser.add_argument('--dry-run', action='store_true', help="Показать изменения без применения")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+
+    from app.database.connection import ydb_connection
+    ydb_connection.connect_sync()
+
+    try:
+        plan = apply_schema(ydb_connection.get_pool(), config.YDB_DATABASE, dry_run=args.dry_run)
+    finally:
+        ydb_connection._cleanup()
+
+    for statement in plan.statements:
+        print(statement)
+    print(f"\nИзменений: {len(plan.statements)}, предупреждений: {len(plan.warnings)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
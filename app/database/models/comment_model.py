@@ -3,6 +3,10 @@
 """
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional
+
+# Длина короткого текста комментария (символов)
+SHORT_TEXT_LENGTH = 100
 
 
 @dataclass
@@ -14,6 +18,7 @@ class Comment:
     user_id: int
     comment_text: str
     created_at: datetime
+    author_name: Optional[str] = None  # Заполняется при чтении страницы комментариев
     
     def __post_init__(self):
         if not hasattr(self, 'created_at') or self.created_at is None:
@@ -22,9 +27,9 @@ class Comment:
     @property
     def short_text(self) -> str:
         """Возвращает короткий текст комментария"""
-        if len(self.comment_text) <= 100:
+        if len(self.comment_text) <= SHORT_TEXT_LENGTH:
             return self.comment_text
-        return self.comment_text[:97] + "..."
+        return self.comment_text[:SHORT_TEXT_LENGTH - 3] + "..."
     
     def __str__(self) -> str:
         return f"Comment(id={self.comment_id}, task_id={self.task_id})"
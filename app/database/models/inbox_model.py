@@ -0,0 +1,26 @@
+"""
+Модель счетчиков открытых задач исполнителя (главное меню)
+"""
+from dataclasses import dataclass
+from typing import Dict
+
+# Статусы открытых задач исполнителя
+INBOX_STATUSES = ('new', 'in_progress', 'overdue')
+
+
+@dataclass(frozen=True)
+class InboxCounts:
+    """Открытые задачи исполнителя (неизменяемый: входит в ключ кеша клавиатур)"""
+
+    open: int = 0
+    new: int = 0
+    overdue: int = 0
+
+    @classmethod
+    def from_counts(cls, counts: Dict[str, int]) -> 'InboxCounts':
+        """Собирает из {статус: количество}"""
+        return cls(
+            open=sum(max(counts.get(status, 0), 0) for status in INBOX_STATUSES),
+            new=max(counts.get('new', 0), 0),
+            overdue=max(counts.get('overdue', 0), 0)
+        )
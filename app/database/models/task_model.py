@@ -8,6 +8,20 @@ from datetime import datetime
 from .base_model import BaseModel
 from config import config
 
+PRIORITY_EMOJIS = {
+    'urgent': '🔴',
+    'normal': '🟡',
+    'low': '🟢'
+}
+
+STATUS_EMOJIS = {
+    'new': '🆕',
+    'in_progress': '⏳',
+    'completed': '✅',
+    'not_completed': '❌',
+    'overdue': '🔴'
+}
+
 
 @dataclass
 class Task(BaseModel):
@@ -25,6 +39,8 @@ class Task(BaseModel):
     status: str
     deadline: Optional[datetime]
     completed_at: Optional[datetime] = None
+    comment_count: int = 0
+    last_comment_at: Optional[datetime] = None
     
     def __post_init__(self):
         if not hasattr(self, 'created_at') or self.created_at is None:
@@ -44,14 +60,12 @@ class Task(BaseModel):
     
     @property
     def is_overdue(self) -> bool:
-        """Проверяет, просрочена ли задача"""
-        if not self.deadline:
-            return False
+        """
+        Проверяет, просрочена ли задача
         
-        if self.status in ['completed', 'not_completed']:
-            return False
-            
-        return datetime.utcnow() > self.deadline
+        Статус overdue проставляет задание по таймеру (app/services/overdue_service.py)
+        """
+        return self.status == 'overdue'
     
     @property
     def is_completed(self) -> bool:
@@ -61,29 +75,12 @@ class Task(BaseModel):
     @property
     def priority_emoji(self) -> str:
         """Возвращает эмодзи для приоритета"""
-        priority_emojis = {
-            'urgent': '🔴',
-            'normal': '🟡', 
-            'low': '🟢'
-        }
-        return priority_emojis.get(self.priority, '⚪')
+        return PRIORITY_EMOJIS.get(self.priority, '⚪')
     
     @property
     def status_emoji(self) -> str:
         """Возвращает эмодзи для статуса"""
-        status_emojis = {
-            'new': '🆕',
-            'in_progress': '⏳',
-            'completed': '✅',
-            'not_completed': '❌',
-            'overdue': '🔴'
-        }
-        
-        # Если задача просрочена, показываем это
-        if self.is_overdue:
-            return status_emojis['overdue']
-            
-        return status_emojis.get(self.status, '⚪')
+        return STATUS_EMOJIS.get(self.status, '⚪')
     
     def set_status(self, new_status: str):
         """Устанавливает новый статус задачи"""
@@ -101,3 +98,37 @@ class Task(BaseModel):
     
     def __str__(self) -> str:
         return f"Task(id={self.task_id}, title='{self.title}', status='{self.status}')"
+
+
+@dataclass
+class TaskListItem:
+    """
+    Задача в списке: колонки из индексов задач (COVER), название компании
+    и имя исполнителя присоединяются в том же запросе по первичным ключам
+    """
+    
+    task_id: int
+    title: str
+    company_id: int
+    assignee_id: Optional[int]
+    priority: str
+    status: str
+    deadline: Optional[datetime]
+    created_at: datetime
+    company_name: Optional[str] = None
+    assignee_name: Optional[str] = None
+    
+    @property
+    def is_overdue(self) -> bool:
+        """Проверяет, просрочена ли задача"""
+        return self.status == 'overdue'
+    
+    @property
+    def priority_emoji(self) -> str:
+        """Возвращает эмодзи для приоритета"""
+        return PRIORITY_EMOJIS.get(self.priority, '⚪')
+    
+    @property
+    def status_emoji(self) -> str:
+        """Возвращает эмодзи для статуса"""
+        return STATUS_EMOJIS.get(self.status, '⚪')
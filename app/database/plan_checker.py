@@ -0,0 +1,177 @@
+"""
+Проверка планов выполнения запросов репозиториев
+
+Собирает все запросы из реестра (app/database/query_registry.py), применяет
+схему (app/database/schema.py) к временной базе и выполняет EXPLAIN для каждого запроса.
+Полные сканы, фильтры без индекса и сортировки данных с нескольких шардов
+считаются ошибкой, если они не перечислены в allow при регистрации запроса.
+
+Запуск (только против отдельной тестовой базы):
+    python -m app.database.plan_checker --endpoint grpc://localhost:2136 --database /local
+"""
+import argparse
+import importlib
+import json
+import logging
+import pkgutil
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import ydb
+
+from app.database.query_registry import (
+    RegisteredQuery, get_registered_queries, FULL_SCAN, MISSING_INDEX, CROSS_SHARD_SORT
+)
+from app.database.migrations import apply_schema
+from config import config
+
+logger = logging.getLogger(__name__)
+
+REPOSITORIES_PATH = Path(__file__).parent / 'repositories'
+
+# Операторы плана, означающие сортировку
+SORT_OPERATORS = {'Sort', 'TopSort', 'Top'}
+# Узлы плана, объединяющие данные нескольких шардов
+MERGE_NODES = {'UnionAll', 'Merge'}
+
+
+@dataclass
+class PlanCheckResult:
+    """Результат проверки плана одного запроса"""
+
+    query: RegisteredQuery
+    findings: Set[str] = field(default_factory=set)
+    details: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def violations(self) -> Set[str]:
+        """Проблемы плана, не разрешенные для запроса"""
+        return self.findings - self.query.allow
+
+    @property
+    def stale_allowances(self) -> Set[str]:
+        """Разрешения, которые больше не нужны (план стал лучше)"""
+        return self.query.allow - self.findings if not self.error else set()
+
+
+def import_repositories() -> None:
+    """Импортирует все модули репозиториев, чтобы их запросы попали в реестр"""
+    for module in pkgutil.iter_modules([str(REPOSITORIES_PATH)]):
+        if module.name.endswith('_repository'):
+            importlib.import_module(f"app.database.repositories.{module.name}")
+
+
+def _walk(node: Any) -> Iterator[Dict[str, Any]]:
+    """Обходит все узлы плана"""
+    if isinstance(node, dict):
+        if 'Node Type' in node or 'Operators' in node:
+            yield node
+        for child in node.get('Plans', []):
+            yield from _walk(child)
+        if 'Plan' in node:
+            yield from _walk(node['Plan'])
+
+
+def _node_operators(node: Dict[str, Any]) -> Set[str]:
+    """Возвращает имена операторов узла (из Operators и Node Type)"""
+    names = {operator.get('Name') for operator in node.get('Operators', [])}
+    names.update(node.get('Node Type', '').split('-'))
+    names.discard(None)
+    names.discard('')
+    return names
+
+
+def analyze_plan(plan: Dict[str, Any]) -> Tuple[Set[str], List[str]]:
+    """
+    Ищет проблемы в плане запроса
+
+    Args:
+        plan: Разобранный JSON плана из EXPLAIN
+
+    Returns:
+        Множество найденных проблем и их описания
+    """
+    findings: Set[str] = set()
+    details: List[str] = []
+
+    for node in _walk(plan):
+        operators = _node_operators(node)
+        tables = {operator.get('Table') for operator in node.get('Operators', []) if operator.get('Table')}
+        subtree = [_node_operators(child) for child in _walk(node)]
+
+        if 'TableFullScan' in operators:
+            findings.add(FULL_SCAN)
+            details.append(f"полное сканирование: {', '.join(sorted(tables)) or node.get('Node Type')}")
+
+        if 'Filter' in operators and any('TableFullScan' in child for child in subtree):
+            findings.add(MISSING_INDEX)
+            details.append(f"фильтр без индекса: {', '.join(sorted(tables)) or node.get('Node Type')}")
+
+        if operators & SORT_OPERATORS and any(child & MERGE_NODES for child in subtree[1:]):
+            findings.add(CROSS_SHARD_SORT)
+            details.append(f"сортировка после объединения шардов: {node.get('Node Type')}")
+
+    return findings, details
+
+
+def check_query(pool: ydb.SessionPool, query: RegisteredQuery) -> PlanCheckResult:
+    """Выполняет EXPLAIN для запроса и анализирует план"""
+    result = PlanCheckResult(query=query)
+    try:
+        explained = pool.retry_operation_sync(lambda session: session.explain(query.text))
+        result.findings, result.details = analyze_plan(json.loads(explained.query_plan))
+    except Exception as e:
+        result.error = str(e)
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Проверка планов выполнения запросов репозиториев")
+    parser.add_argument('--endpoint', default=config.YDB_ENDPOINT, help="Endpoint тестовой YDB")
+    parser.add_argument('--database', default=config.YDB_DATABASE, help="Тестовая база данных")
+    parser.add_argument('--skip-create', action='store_true', help="Не применять схему к тестовой базе")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+
+    import_repositories()
+    queries = get_registered_queries()
+
+    driver = ydb.Driver(endpoint=args.endpoint, database=args.database, credentials=ydb.credentials_from_env_variables())
+    driver.wait(timeout=10, fail_fast=True)
+    pool = ydb.SessionPool(driver)
+
+    try:
+        if not args.skip_create:
+            apply_schema(pool, args.database)
+
+        results = [check_query(pool, query) for query in queries]
+    finally:
+        pool.stop()
+        driver.stop()
+
+    failed = 0
+    for result in results:
+        if result.error:
+            failed += 1
+            print(f"ERROR {result.query.name}: {result.error}")
+        elif result.violations:
+            failed += 1
+            print(f"FAIL  {result.query.name}: {', '.join(sorted(result.violations))}")
+            for detail in result.details:
+                print(f"      {detail}")
+        else:
+            print(f"OK    {result.query.name}")
+
+        if result.stale_allowances:
+            print(f"      лишние разрешения, можно убрать: {', '.join(sorted(result.stale_allowances))}")
+
+    print(f"\nПроверено запросов: {len(results)}, с ошибками: {failed}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Реестр YQL запросов репозиториев
+
+Запросы регистрируются при импорте модулей репозиториев, что позволяет
+проверять их планы выполнения до деплоя (см. app/database/plan_checker.py).
+"""
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List
+
+# Виды проблем в плане запроса
+FULL_SCAN = 'full_scan'
+MISSING_INDEX = 'missing_index'
+CROSS_SHARD_SORT = 'cross_shard_sort'
+
+PLAN_FINDINGS = (FULL_SCAN, MISSING_INDEX, CROSS_SHARD_SORT)
+
+
+@dataclass(frozen=True)
+class RegisteredQuery:
+    """Зарегистрированный запрос репозитория"""
+
+    name: str
+    text: str
+    allow: FrozenSet[str]
+
+
+_registry: Dict[str, RegisteredQuery] = {}
+
+
+def register_query(name: str, text: str, allow: Iterable[str] = ()) -> str:
+    """
+    Регистрирует запрос и возвращает его текст
+
+    Args:
+        name: Уникальное имя запроса (таблица.операция)
+        text: Текст YQL запроса
+        allow: Допустимые проблемы плана (FULL_SCAN, MISSING_INDEX, CROSS_SHARD_SORT)
+
+    Returns:
+        Текст запроса без изменений
+    """
+    allow = frozenset(allow)
+    unknown = allow - set(PLAN_FINDINGS)
+    if unknown:
+        raise ValueError(f"Неизвестные проблемы плана для запроса {name}: {', '.join(sorted(unknown))}")
+
+    existing = _registry.get(name)
+    if existing and existing.text != text:
+        raise ValueError(f"Запрос {name} уже зарегистрирован с другим текстом")
+
+    _registry[name] = RegisteredQuery(name=name, text=text, allow=allow)
+    return text
+
+
+def get_registered_queries() -> List[RegisteredQuery]:
+    """Возвращает все зарегистрированные запросы, отсортированные по имени"""
+    return [_registry[name] for name in sorted(_registry)]
+
+
+def get_registered_query(name: str) -> RegisteredQuery:
+    """Возвращает зарегистрированный запрос по имени"""
+    try:
+        return _registry[name]
+    except KeyError:
+        raise KeyError(f"Запрос {name} не зарегистрирован") from None
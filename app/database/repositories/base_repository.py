@@ -1,11 +1,13 @@
 """
 Базовый репозиторий для работы с данными
 """
+import asyncio
 import logging
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
 from app.database.connection import get_ydb_connection
+from app.utils.request_stats import record_db_query
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +21,8 @@ class BaseRepository:
     async def _get_connection(self):
         """Получает подключение к базе данных"""
         if not self.connection:
-            self.connection = get_ydb_connection()
+            # Подключение может блокировать, если не было установлено при старте
+            self.connection = await asyncio.to_thread(get_ydb_connection)
         return self.connection
     
     async def _execute_query(self, query: str, parameters: Dict[str, Any] = None) -> Any:
@@ -43,7 +46,14 @@ class BaseRepository:
             print(f"[DEBUG BASE_REPO] Передаем в connection: {ydb_params}")
             logger.info(f"Передаем параметры в YDB: {ydb_params}")
             
-            result = conn.execute_query(query, ydb_params)
+            # SDK синхронный: выполняем в потоке, чтобы не блокировать общий цикл событий
+            result = await asyncio.to_thread(conn.execute_query, query, ydb_params)
+            
+            # Учитываем запрос в статистике текущего update
+            record_db_query(
+                sum(len(result_set.rows) for result_set in result) if result else 0,
+                query
+            )
             
             print(f"[DEBUG BASE_REPO] Запрос выполнен успешно")
             return result
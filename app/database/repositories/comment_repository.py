@@ -0,0 +1,233 @@
+"""
+Репозиторий комментариев к задачам
+
+Первичный ключ comments — (task_id, created_at, comment_id): комментарии
+задачи лежат подряд в порядке создания, и страница "старее"/"новее" —
+одно чтение диапазона ключа с LIMIT от курсора (created_at, comment_id).
+В списках читается только начало текста (на символ длиннее
+Comment.short_text), полный текст комментариев не передается; имя автора
+присоединяется в том же запросе.
+
+Количество комментариев и время последнего хранятся в строке задачи
+(comment_count, last_comment_at) и изменяются в транзакции добавления.
+comment_id — номер комментария в задаче (comment_count + 1): транзакция
+читает строку задачи, поэтому одновременные добавления не получат один номер.
+"""
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+from .base_repository import BaseRepository
+from app.database.models.comment_model import Comment, SHORT_TEXT_LENGTH
+from app.database.query_registry import register_query
+
+logger = logging.getLogger(__name__)
+
+# Символов текста в списке: на один больше короткого текста, чтобы short_text добавил "..."
+COMMENT_PREVIEW_CHARS = SHORT_TEXT_LENGTH + 1
+
+# Начало текста без чтения полного комментария на стороне клиента
+COMMENT_PREVIEW_COLUMN = "Unicode::Substring(CAST(comment_text AS Utf8), 0, $preview_chars) AS comment_text"
+
+
+CREATE_COMMENT_QUERY = register_query(
+    "comments.create",
+    """
+    DECLARE $task_id AS Uint64;
+    DECLARE $user_id AS Uint64;
+    DECLARE $comment_text AS String;
+    DECLARE $created_at AS Datetime;
+
+    $comment = (
+        SELECT task_id, COALESCE(comment_count, 0ul) + 1ul AS comment_id,
+               MAX_OF(COALESCE(last_comment_at, $created_at), $created_at) AS last_comment_at
+        FROM tasks
+        WHERE task_id = $task_id
+    );
+
+    SELECT comment_id FROM $comment;
+
+    INSERT INTO comments (task_id, created_at, comment_id, user_id, comment_text)
+    SELECT task_id, $created_at AS created_at, comment_id, $user_id AS user_id, $comment_text AS comment_text
+    FROM $comment;
+
+    UPDATE tasks ON
+    SELECT task_id, comment_id AS comment_count, last_comment_at
+    FROM $comment;
+    """
+)
+
+# Страница комментариев с именем автора (по первичному ключу users)
+COMMENT_PAGE_SELECT = """
+    SELECT p.task_id AS task_id, p.created_at AS created_at, p.comment_id AS comment_id,
+           p.user_id AS user_id, p.comment_text AS comment_text,
+           u.first_name AS author_first_name, u.last_name AS author_last_name
+    FROM $page AS p
+    LEFT JOIN users AS u ON u.user_id = p.user_id"""
+
+# От новых к старым, раньше курсора ($before_comment_id IS NULL — с самого нового)
+LIST_OLDER_QUERY = register_query(
+    "comments.list_older",
+    f"""
+    DECLARE $task_id AS Uint64;
+    DECLARE $before_created_at AS Optional<Datetime>;
+    DECLARE $before_comment_id AS Optional<Uint64>;
+    DECLARE $preview_chars AS Uint64;
+    DECLARE $limit AS Uint64;
+
+    $page = (
+        SELECT task_id, created_at, comment_id, user_id, {COMMENT_PREVIEW_COLUMN}
+        FROM comments
+        WHERE task_id = $task_id
+          AND (
+            $before_comment_id IS NULL
+            OR created_at < $before_created_at
+            OR (created_at = $before_created_at AND comment_id < $before_comment_id)
+          )
+        ORDER BY task_id DESC, created_at DESC, comment_id DESC
+        LIMIT $limit
+    );
+    {COMMENT_PAGE_SELECT}
+    ORDER BY created_at DESC, comment_id DESC;
+    """
+)
+
+# От старых к новым, позже курсора
+LIST_NEWER_QUERY = register_query(
+    "comments.list_newer",
+    f"""
+    DECLARE $task_id AS Uint64;
+    DECLARE $after_created_at AS Datetime;
+    DECLARE $after_comment_id AS Uint64;
+    DECLARE $preview_chars AS Uint64;
+    DECLARE $limit AS Uint64;
+
+    $page = (
+        SELECT task_id, created_at, comment_id, user_id, {COMMENT_PREVIEW_COLUMN}
+        FROM comments
+        WHERE task_id = $task_id
+          AND created_at >= $after_created_at
+          AND (created_at > $after_created_at OR comment_id > $after_comment_id)
+        ORDER BY task_id, created_at, comment_id
+        LIMIT $limit
+    );
+    {COMMENT_PAGE_SELECT}
+    ORDER BY created_at, comment_id;
+    """
+)
+
+
+class CommentRepository(BaseRepository):
+    """Репозиторий для работы с комментариями"""
+
+    async def create_comment(self, task_id: int, user_id: int, comment_text: str) -> Optional[Comment]:
+        """
+        Добавляет комментарий и обновляет счетчик комментариев задачи
+
+        Args:
+            task_id: ID задачи
+            user_id: ID автора
+            comment_text: Текст комментария
+
+        Returns:
+            Комментарий или None, если задачи нет
+        """
+        query = CREATE_COMMENT_QUERY
+
+        created_at = datetime.utcnow().replace(microsecond=0)
+        parameters = {
+            '$task_id': task_id,
+            '$user_id': user_id,
+            '$comment_text': comment_text,
+            '$created_at': created_at
+        }
+        row = await self._fetch_one(query, parameters)
+
+        if not row:
+            return None
+
+        return Comment(
+            comment_id=row['comment_id'],
+            task_id=task_id,
+            user_id=user_id,
+            comment_text=comment_text,
+            created_at=created_at
+        )
+
+    async def list_older(
+        self,
+        task_id: int,
+        limit: int,
+        before_created_at: Optional[datetime] = None,
+        before_comment_id: Optional[int] = None
+    ) -> List[Comment]:
+        """
+        Комментарии задачи старее курсора, от новых к старым
+
+        Args:
+            task_id: ID задачи
+            limit: Максимум комментариев
+            before_created_at: Время первого показанного комментария
+            before_comment_id: ID первого показанного комментария (None — с самого нового)
+
+        Returns:
+            Комментарии с началом текста (достаточно для short_text) и именем автора
+        """
+        query = LIST_OLDER_QUERY
+
+        parameters = {
+            '$task_id': task_id,
+            '$before_created_at': before_created_at,
+            '$before_comment_id': before_comment_id,
+            '$preview_chars': COMMENT_PREVIEW_CHARS,
+            '$limit': limit
+        }
+        rows = await self._fetch_all(query, parameters)
+
+        return [self._row_to_comment(row) for row in rows]
+
+    async def list_newer(
+        self,
+        task_id: int,
+        limit: int,
+        after_created_at: datetime,
+        after_comment_id: int
+    ) -> List[Comment]:
+        """
+        Комментарии задачи новее курсора, от старых к новым
+
+        Args:
+            task_id: ID задачи
+            limit: Максимум комментариев
+            after_created_at: Время последнего показанного комментария
+            after_comment_id: ID последнего показанного комментария
+
+        Returns:
+            Комментарии с началом текста (достаточно для short_text) и именем автора
+        """
+        query = LIST_NEWER_QUERY
+
+        parameters = {
+            '$task_id': task_id,
+            '$after_created_at': after_created_at,
+            '$after_comment_id': after_comment_id,
+            '$preview_chars': COMMENT_PREVIEW_CHARS,
+            '$limit': limit
+        }
+        rows = await self._fetch_all(query, parameters)
+
+        return [self._row_to_comment(row) for row in rows]
+
+    def _row_to_comment(self, row: dict) -> Comment:
+        """Создает комментарий из строки страницы с присоединенным автором"""
+        author_name = " ".join(
+            part for part in (row['author_first_name'], row['author_last_name']) if part
+        )
+        return Comment(
+            comment_id=row['comment_id'],
+            task_id=row['task_id'],
+            user_id=row['user_id'],
+            comment_text=row['comment_text'] or "",
+            created_at=self._parse_datetime(row['created_at']),
+            author_name=author_name or None
+        )
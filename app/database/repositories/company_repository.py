@@ -6,11 +6,114 @@ from typing import Optional, List
 from datetime import datetime
 
 from .base_repository import BaseRepository
+from app.database.query_registry import register_query, FULL_SCAN, MISSING_INDEX, CROSS_SHARD_SORT
 from app.database.models.company_model import Company
 
 logger = logging.getLogger(__name__)
 
 
+CREATE_COMPANY_QUERY = register_query(
+    "companies.create",
+    """
+    DECLARE $company_id AS Uint64;
+    DECLARE $name AS String;
+    DECLARE $description AS Optional<String>;
+    DECLARE $created_by AS Uint64;
+    DECLARE $is_active AS Bool;
+    DECLARE $created_at AS Datetime;
+    DECLARE $updated_at AS Datetime;
+
+    INSERT INTO companies (
+        company_id, name, description, created_by, is_active, created_at, updated_at
+    ) VALUES (
+        $company_id, $name, $description, $created_by, $is_active, $created_at, $updated_at
+    );
+    """
+)
+
+GET_COMPANY_BY_ID_QUERY = register_query(
+    "companies.get_by_id",
+    """
+    DECLARE $company_id AS Uint64;
+
+    SELECT company_id, name, description, created_by, is_active, created_at, updated_at
+    FROM companies
+    WHERE company_id = $company_id AND is_active = true;
+    """
+)
+
+GET_COMPANIES_BY_IDS_QUERY = register_query(
+    "companies.get_by_ids",
+    """
+    DECLARE $company_ids AS List<Uint64>;
+
+    SELECT company_id, name, description, created_by, is_active, created_at, updated_at
+    FROM companies
+    WHERE company_id IN $company_ids AND is_active = true;
+    """
+)
+
+GET_ALL_COMPANIES_QUERY = register_query(
+    "companies.get_all",
+    """
+    SELECT company_id, name, description, created_by, is_active, created_at, updated_at
+    FROM companies VIEW idx_name
+    WHERE is_active = true
+    ORDER BY name;
+    """,
+    allow=(FULL_SCAN, CROSS_SHARD_SORT)
+)
+
+# Страница компаний по названию после компании $after_company_id (NULL — с начала);
+# курсор — только ID, позиция в индексе находится по названию этой компании.
+# Первая страница читается с начала индекса, но не дальше LIMIT
+LIST_COMPANIES_PAGE_QUERY = register_query(
+    "companies.list_page",
+    """
+    DECLARE $after_company_id AS Optional<Uint64>;
+    DECLARE $limit AS Uint64;
+
+    $after_name = (SELECT name FROM companies WHERE company_id = $after_company_id);
+
+    SELECT company_id, name, description, created_by, is_active, created_at, updated_at
+    FROM companies VIEW idx_name
+    WHERE is_active = true
+      AND (
+        $after_company_id IS NULL
+        OR name > $after_name
+        OR (name = $after_name AND company_id > $after_company_id)
+      )
+    ORDER BY name, company_id
+    LIMIT $limit;
+    """,
+    allow=(FULL_SCAN, CROSS_SHARD_SORT)
+)
+
+SEARCH_COMPANIES_QUERY = register_query(
+    "companies.search",
+    """
+    DECLARE $search_term AS String;
+
+    SELECT company_id, name, description, created_by, is_active, created_at, updated_at
+    FROM companies
+    WHERE is_active = true AND (
+        String::Contains(LOWER(name), LOWER($search_term)) OR
+        String::Contains(LOWER(description), LOWER($search_term))
+    )
+    ORDER BY name;
+    """,
+    allow=(FULL_SCAN, MISSING_INDEX, CROSS_SHARD_SORT)
+)
+
+GET_MAX_COMPANY_ID_QUERY = register_query(
+    "companies.get_max_id",
+    """
+    SELECT MAX(company_id) AS max_id FROM companies;
+    """,
+    allow=(FULL_SCAN,)
+)
+
+
 class CompanyRepository(BaseRepository):
     """Репозиторий для работы с компаниями"""
     
@@ -29,21 +132,7 @@ class CompanyRepository(BaseRepository):
         # Получаем следующий ID для компании
         company_id = await self._get_next_company_id()
         
-        query = """
-        DECLARE $company_id AS Uint64;
-        DECLARE $name AS String;
-        DECLARE $description AS Optional<String>;
-        DECLARE $created_by AS Uint64;
-        DECLARE $is_active AS Bool;
-        DECLARE $created_at AS Datetime;
-        DECLARE $updated_at AS Datetime;
-        
-        INSERT INTO companies (
-            company_id, name, description, created_by, is_active, created_at, updated_at
-        ) VALUES (
-            $company_id, $name, $description, $created_by, $is_active, $created_at, $updated_at
-        );
-        """
+        query = CREATE_COMPANY_QUERY
         
         parameters = {
             '$company_id': company_id,
@@ -77,13 +166,7 @@ class CompanyRepository(BaseRepository):
         Returns:
             Компания или None
         """
-        query = """
-        DECLARE $company_id AS Uint64;
-        
-        SELECT company_id, name, description, created_by, is_active, created_at, updated_at
-        FROM companies
-        WHERE company_id = $company_id AND is_active = true;
-        """
+        query = GET_COMPANY_BY_ID_QUERY
         
         parameters = {'$company_id': company_id}
         row = await self._fetch_one(query, parameters)
@@ -101,6 +184,38 @@ class CompanyRepository(BaseRepository):
         
         return None
     
+    async def get_companies_by_ids(self, company_ids: List[int]) -> List[Company]:
+        """
+        Получает компании по списку ID одним запросом
+        
+        Args:
+            company_ids: ID компаний
+            
+        Returns:
+            Найденные активные компании
+        """
+        if not company_ids:
+            return []
+        
+        query = GET_COMPANIES_BY_IDS_QUERY
+        
+        parameters = {'$company_ids': list(company_ids)}
+        rows = await self._fetch_all(query, parameters)
+        
+        companies = []
+        for row in rows:
+            companies.append(Company(
+                company_id=row['company_id'],
+                name=row['name'],
+                description=row['description'],
+                created_by=row['created_by'],
+                is_active=row['is_active'],
+                created_at=self._parse_datetime(row['created_at']),
+                updated_at=self._parse_datetime(row['updated_at'])
+            ))
+        
+        return companies
+    
     async def get_all_companies(self) -> List[Company]:
         """
         Получает все активные компании
@@ -108,12 +223,7 @@ class CompanyRepository(BaseRepository):
         Returns:
             Список компаний
         """
-        query = """
-        SELECT company_id, name, description, created_by, is_active, created_at, updated_at
-        FROM companies
-        WHERE is_active = true
-        ORDER BY name;
-        """
+        query = GET_ALL_COMPANIES_QUERY
         
         rows = await self._fetch_all(query)
         
@@ -131,6 +241,36 @@ class CompanyRepository(BaseRepository):
         
         return companies
     
+    async def list_page(self, after_company_id: Optional[int], limit: int) -> List[Company]:
+        """
+        Получает страницу активных компаний в порядке названия
+        
+        Args:
+            after_company_id: ID последней показанной компании (None — первая страница)
+            limit: Максимум компаний
+            
+        Returns:
+            Список компаний
+        """
+        query = LIST_COMPANIES_PAGE_QUERY
+        
+        parameters = {'$after_company_id': after_company_id, '$limit': limit}
+        rows = await self._fetch_all(query, parameters)
+        
+        companies = []
+        for row in rows:
+            companies.append(Company(
+                company_id=row['company_id'],
+                name=row['name'],
+                description=row['description'],
+                created_by=row['created_by'],
+                is_active=row['is_active'],
+                created_at=self._parse_datetime(row['created_at']),
+                updated_at=self._parse_datetime(row['updated_at'])
+            ))
+        
+        return companies
+    
     async def update_company(self, company_id: int, updates: dict) -> bool:
         """
         Обновляет компанию
@@ -183,17 +323,7 @@ class CompanyRepository(BaseRepository):
         Returns:
             Список найденных компаний
         """
-        query = """
-        DECLARE $search_term AS String;
-        
-        SELECT company_id, name, description, created_by, is_active, created_at, updated_at
-        FROM companies
-        WHERE is_active = true AND (
-            String::Contains(LOWER(name), LOWER($search_term)) OR
-            String::Contains(LOWER(description), LOWER($search_term))
-        )
-        ORDER BY name;
-        """
+        query = SEARCH_COMPANIES_QUERY
         
         parameters = {'$search_term': search_term}
         rows = await self._fetch_all(query, parameters)
@@ -214,9 +344,7 @@ class CompanyRepository(BaseRepository):
     
     async def _get_next_company_id(self) -> int:
         """Получает следующий ID для новой компании"""
-        query = """
-        SELECT MAX(company_id) AS max_id FROM companies;
-        """
+        query = GET_MAX_COMPANY_ID_QUERY
         
         row = await self._fetch_one(query)
         
@@ -0,0 +1,317 @@
+"""
+Репозиторий счетчиков задач по статусам
+
+Счетчики изменяются в той же транзакции, что и задача: запросы
+TaskRepository включают фрагменты counter_upsert с изменениями,
+собранными build_counter_deltas (или вычисленными в самом запросе).
+Панель директора читает только строки показываемых компаний и
+исполнителей, сверка с полным пересчетом выполняется заданием по таймеру.
+"""
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from .base_repository import BaseRepository
+from app.database.query_registry import register_query, FULL_SCAN
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# company_id строк итога по всем компаниям (ID компаний начинаются с 1)
+TOTAL_COMPANY_ID = 0
+
+# Типы списков изменений для AS_TABLE
+COMPANY_DELTAS_TYPE = "List<Struct<company_id: Uint64, status: String, shard: Uint32, delta: Int64>>"
+ASSIGNEE_DELTAS_TYPE = "List<Struct<assignee_id: Uint64, status: String, shard: Uint32, delta: Int64>>"
+
+
+def counter_upsert(table: str, owner_column: str, source: str, condition: str = "true") -> str:
+    """
+    Фрагмент YQL, прибавляющий изменения к строкам счетчиков
+
+    Args:
+        table: Таблица счетчиков
+        owner_column: company_id или assignee_id
+        source: Источник изменений с колонками owner_column, status, shard, delta
+                (по одной строке на ключ)
+        condition: Условие применения (например, что задача действительно изменена)
+
+    Returns:
+        Текст UPSERT
+    """
+    return f"""
+    UPSERT INTO {table} ({owner_column}, status, shard, value)
+    SELECT d.{owner_column} AS {owner_column}, d.status AS status, d.shard AS shard,
+           COALESCE(c.value, 0) + d.delta AS value
+    FROM {source} AS d
+    LEFT JOIN {table} AS c
+    ON c.{owner_column} = d.{owner_column} AND c.status = d.status AND c.shard = d.shard
+    WHERE {condition};
+    """
+
+
+def build_counter_deltas(
+    task_id: int,
+    company_id: int,
+    assignee_id: Optional[int],
+    changes: Dict[str, int]
+) -> Tuple[List[dict], List[dict]]:
+    """
+    Изменения счетчиков для одной задачи
+
+    Args:
+        task_id: ID задачи (определяет shard)
+        company_id: ID компании
+        assignee_id: ID исполнителя (None — счетчики исполнителя не меняются)
+        changes: Изменение по статусам, например {'new': -1, 'in_progress': 1}
+
+    Returns:
+        Изменения для company_task_counters (с итогом) и assignee_task_counters
+    """
+    shard = task_id % config.COUNTER_SHARDS
+    changes = {status: delta for status, delta in changes.items() if delta}
+
+    company_deltas = [
+        {'company_id': owner_id, 'status': status, 'shard': shard, 'delta': delta}
+        for owner_id in (company_id, TOTAL_COMPANY_ID)
+        for status, delta in changes.items()
+    ]
+    assignee_deltas = [
+        {'assignee_id': assignee_id, 'status': status, 'shard': shard, 'delta': delta}
+        for status, delta in changes.items()
+    ] if assignee_id else []
+
+    return company_deltas, assignee_deltas
+
+
+def status_change(old_status: Optional[str], new_status: Optional[str]) -> Dict[str, int]:
+    """Изменение счетчиков при переходе задачи между статусами"""
+    changes: Dict[str, int] = defaultdict(int)
+    if old_status:
+        changes[old_status] -= 1
+    if new_status:
+        changes[new_status] += 1
+    return dict(changes)
+
+
+GET_COMPANY_COUNTS_QUERY = register_query(
+    "counters.get_company_counts",
+    """
+    DECLARE $company_ids AS List<Uint64>;
+
+    SELECT company_id, status, SUM(value) AS value
+    FROM company_task_counters
+    WHERE company_id IN $company_ids
+    GROUP BY company_id, status;
+    """
+)
+
+GET_ASSIGNEE_COUNTS_QUERY = register_query(
+    "counters.get_assignee_counts",
+    """
+    DECLARE $assignee_ids AS List<Uint64>;
+
+    SELECT assignee_id, status, SUM(value) AS value
+    FROM assignee_task_counters
+    WHERE assignee_id IN $assignee_ids
+    GROUP BY assignee_id, status;
+    """
+)
+
+# Сверка: пересчет по индексу и сумма счетчиков читаются в одной транзакции,
+# расхождение прибавляется к shard 0 в ней же, поэтому параллельные изменения
+# задач не искажают поправку
+RECONCILE_COMPANIES_QUERY = register_query(
+    "counters.reconcile_companies",
+    f"""
+    DECLARE $company_ids AS List<Uint64>;
+
+    $recount = (
+        SELECT company_id, status, CAST(COUNT(*) AS Int64) AS value
+        FROM tasks VIEW idx_company_status_created
+        WHERE company_id IN $company_ids
+        GROUP BY company_id, status
+    );
+
+    $stored = (
+        SELECT company_id, status, SUM(value) AS value
+        FROM company_task_counters
+        WHERE company_id IN $company_ids
+        GROUP BY company_id, status
+    );
+
+    $diff = (
+        SELECT COALESCE(r.company_id, s.company_id) AS company_id,
+               COALESCE(r.status, s.status) AS status,
+               0u AS shard,
+               COALESCE(r.value, 0) - COALESCE(s.value, 0) AS delta
+        FROM $recount AS r
+        FULL JOIN $stored AS s
+        ON r.company_id = s.company_id AND r.status = s.status
+        WHERE COALESCE(r.value, 0) != COALESCE(s.value, 0)
+    );
+
+    SELECT company_id, status, delta FROM $diff;
+    {counter_upsert('company_task_counters', 'company_id', '$diff')}
+    """
+)
+
+RECONCILE_ASSIGNEES_QUERY = register_query(
+    "counters.reconcile_assignees",
+    f"""
+    DECLARE $assignee_ids AS List<Uint64>;
+
+    $recount = (
+        SELECT assignee_id, status, CAST(COUNT(*) AS Int64) AS value
+        FROM tasks VIEW idx_assignee_status_deadline
+        WHERE assignee_id IN $assignee_ids
+        GROUP BY assignee_id, status
+    );
+
+    $stored = (
+        SELECT assignee_id, status, SUM(value) AS value
+        FROM assignee_task_counters
+        WHERE assignee_id IN $assignee_ids
+        GROUP BY assignee_id, status
+    );
+
+    $diff = (
+        SELECT COALESCE(r.assignee_id, s.assignee_id) AS assignee_id,
+               COALESCE(r.status, s.status) AS status,
+               0u AS shard,
+               COALESCE(r.value, 0) - COALESCE(s.value, 0) AS delta
+        FROM $recount AS r
+        FULL JOIN $stored AS s
+        ON r.assignee_id = s.assignee_id AND r.status = s.status
+        WHERE COALESCE(r.value, 0) != COALESCE(s.value, 0)
+    );
+
+    SELECT assignee_id, status, delta FROM $diff;
+    {counter_upsert('assignee_task_counters', 'assignee_id', '$diff')}
+    """
+)
+
+# Итог пересчитывается по всему индексу статусов — только для задания сверки
+RECONCILE_TOTALS_QUERY = register_query(
+    "counters.reconcile_totals",
+    f"""
+    $recount = (
+        SELECT status, CAST(COUNT(*) AS Int64) AS value
+        FROM tasks VIEW idx_status_deadline
+        GROUP BY status
+    );
+
+    $stored = (
+        SELECT status, SUM(value) AS value
+        FROM company_task_counters
+        WHERE company_id = {TOTAL_COMPANY_ID}ul
+        GROUP BY status
+    );
+
+    $diff = (
+        SELECT {TOTAL_COMPANY_ID}ul AS company_id,
+               COALESCE(r.status, s.status) AS status,
+               0u AS shard,
+               COALESCE(r.value, 0) - COALESCE(s.value, 0) AS delta
+        FROM $recount AS r
+        FULL JOIN $stored AS s
+        ON r.status = s.status
+        WHERE COALESCE(r.value, 0) != COALESCE(s.value, 0)
+    );
+
+    SELECT company_id, status, delta FROM $diff;
+    {counter_upsert('company_task_counters', 'company_id', '$diff')}
+    """,
+    allow=(FULL_SCAN,)
+)
+
+
+class CounterRepository(BaseRepository):
+    """Репозиторий счетчиков задач"""
+
+    async def get_company_counts(self, company_ids: List[int]) -> Dict[int, Dict[str, int]]:
+        """
+        Количество задач компаний по статусам
+
+        Args:
+            company_ids: ID компаний (TOTAL_COMPANY_ID — итог)
+
+        Returns:
+            {ID компании: {статус: количество}}
+        """
+        if not company_ids:
+            return {}
+
+        query = GET_COMPANY_COUNTS_QUERY
+
+        parameters = {'$company_ids': list(company_ids)}
+        rows = await self._fetch_all(query, parameters)
+
+        return self._group(rows, 'company_id')
+
+    async def get_assignee_counts(self, assignee_ids: List[int]) -> Dict[int, Dict[str, int]]:
+        """
+        Количество задач исполнителей по статусам
+
+        Args:
+            assignee_ids: ID исполнителей
+
+        Returns:
+            {ID исполнителя: {статус: количество}}
+        """
+        if not assignee_ids:
+            return {}
+
+        query = GET_ASSIGNEE_COUNTS_QUERY
+
+        parameters = {'$assignee_ids': list(assignee_ids)}
+        rows = await self._fetch_all(query, parameters)
+
+        return self._group(rows, 'assignee_id')
+
+    async def reconcile_companies(self, company_ids: List[int]) -> List[dict]:
+        """
+        Сверяет и исправляет счетчики компаний
+
+        Returns:
+            Исправленные расхождения (company_id, status, delta)
+        """
+        if not company_ids:
+            return []
+
+        query = RECONCILE_COMPANIES_QUERY
+
+        parameters = {'$company_ids': list(company_ids)}
+        return await self._fetch_all(query, parameters)
+
+    async def reconcile_assignees(self, assignee_ids: List[int]) -> List[dict]:
+        """
+        Сверяет и исправляет счетчики исполнителей
+
+        Returns:
+            Исправленные расхождения (assignee_id, status, delta)
+        """
+        if not assignee_ids:
+            return []
+
+        query = RECONCILE_ASSIGNEES_QUERY
+
+        parameters = {'$assignee_ids': list(assignee_ids)}
+        return await self._fetch_all(query, parameters)
+
+    async def reconcile_totals(self) -> List[dict]:
+        """
+        Сверяет и исправляет итог по всем компаниям
+
+        Returns:
+            Исправленные расхождения (company_id, status, delta)
+        """
+        query = RECONCILE_TOTALS_QUERY
+
+        return await self._fetch_all(query)
+
+    def _group(self, rows: List[dict], owner_column: str) -> Dict[int, Dict[str, int]]:
+        result: Dict[int, Dict[str, int]] = defaultdict(dict)
+        for row in rows:
+            result[row[owner_column]][row['status']] = row['value'] or 0
+        return dict(result)
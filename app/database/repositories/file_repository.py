@@ -0,0 +1,135 @@
+"""
+Репозиторий файлов, прикрепленных к задачам
+
+Сами файлы лежат в Object Storage (app/services/file_service.py), в таблице
+files — ключ объекта и метаданные. Файлы задачи читаются по индексу idx_task.
+"""
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+from .base_repository import BaseRepository
+from app.database.models.file_model import TaskFile
+from app.database.query_registry import register_query, CROSS_SHARD_SORT
+
+logger = logging.getLogger(__name__)
+
+
+# Следующий ID — с конца первичного ключа в той же транзакции, что и вставка:
+# одновременные вставки конфликтуют и повторяются, а не получают один ID
+CREATE_FILE_QUERY = register_query(
+    "files.create",
+    """
+    DECLARE $task_id AS Uint64;
+    DECLARE $user_id AS Uint64;
+    DECLARE $file_name AS String;
+    DECLARE $file_path AS String;
+    DECLARE $file_size AS Uint64;
+    DECLARE $mime_type AS Optional<String>;
+    DECLARE $created_at AS Datetime;
+
+    $file_id = COALESCE((SELECT file_id FROM files ORDER BY file_id DESC LIMIT 1), 0ul) + 1ul;
+
+    SELECT $file_id AS file_id;
+
+    INSERT INTO files (file_id, task_id, user_id, file_name, file_path, file_size, mime_type, created_at)
+    VALUES ($file_id, $task_id, $user_id, $file_name, $file_path, $file_size, $mime_type, $created_at);
+    """,
+    allow=(CROSS_SHARD_SORT,)
+)
+
+LIST_FILES_BY_TASK_QUERY = register_query(
+    "files.list_by_task",
+    """
+    DECLARE $task_id AS Uint64;
+    DECLARE $limit AS Uint64;
+
+    SELECT file_id, task_id, user_id, file_name, file_path, file_size, mime_type, created_at
+    FROM files VIEW idx_task
+    WHERE task_id = $task_id
+    ORDER BY created_at DESC
+    LIMIT $limit;
+    """
+)
+
+
+class FileRepository(BaseRepository):
+    """Репозиторий для работы с файлами задач"""
+
+    async def create_file(
+        self,
+        task_id: int,
+        user_id: int,
+        file_name: str,
+        file_path: str,
+        file_size: int,
+        mime_type: Optional[str] = None
+    ) -> TaskFile:
+        """
+        Сохраняет запись о загруженном файле
+
+        Args:
+            task_id: ID задачи
+            user_id: ID пользователя, загрузившего файл
+            file_name: Имя файла
+            file_path: Ключ объекта в Object Storage
+            file_size: Размер, байт
+            mime_type: MIME-тип
+
+        Returns:
+            Запись о файле
+        """
+        query = CREATE_FILE_QUERY
+
+        created_at = datetime.utcnow()
+        parameters = {
+            '$task_id': task_id,
+            '$user_id': user_id,
+            '$file_name': file_name,
+            '$file_path': file_path,
+            '$file_size': file_size,
+            '$mime_type': mime_type,
+            '$created_at': created_at
+        }
+        row = await self._fetch_one(query, parameters)
+
+        return TaskFile(
+            file_id=row['file_id'],
+            task_id=task_id,
+            user_id=user_id,
+            file_name=file_name,
+            file_path=file_path,
+            file_size=file_size,
+            mime_type=mime_type,
+            created_at=created_at
+        )
+
+    async def list_by_task(self, task_id: int, limit: int) -> List[TaskFile]:
+        """
+        Файлы задачи, сначала новые
+
+        Args:
+            task_id: ID задачи
+            limit: Максимум файлов
+
+        Returns:
+            Записи о файлах
+        """
+        query = LIST_FILES_BY_TASK_QUERY
+
+        parameters = {'$task_id': task_id, '$limit': limit}
+        rows = await self._fetch_all(query, parameters)
+
+        return [
+            TaskFile(
+                file_id=row['file_id'],
+                task_id=row['task_id'],
+                user_id=row['user_id'],
+                file_name=row['file_name'],
+                file_path=row['file_path'],
+                file_size=row['file_size'],
+                mime_type=row['mime_type'],
+                created_at=self._parse_datetime(row['created_at'])
+            )
+            for row in rows
+        ]
@@ -0,0 +1,139 @@
+"""
+Репозиторий состояния фоновых заданий
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from .base_repository import BaseRepository
+from app.database.query_registry import register_query
+
+logger = logging.getLogger(__name__)
+
+
+GET_JOB_STATE_QUERY = register_query(
+    "job_state.get",
+    """
+    DECLARE $job AS String;
+
+    SELECT job, watermark, processed, updated_at
+    FROM job_state
+    WHERE job = $job;
+    """
+)
+
+SAVE_JOB_STATE_QUERY = register_query(
+    "job_state.save",
+    """
+    DECLARE $job AS String;
+    DECLARE $watermark AS Optional<Datetime>;
+    DECLARE $processed AS Uint64;
+    DECLARE $updated_at AS Datetime;
+
+    UPSERT INTO job_state (job, watermark, processed, updated_at)
+    VALUES ($job, $watermark, $processed, $updated_at);
+    """
+)
+
+# Watermark только растет: более медленный одновременный запуск с ранней
+# границей не сдвигает его назад (NULL не затирает сохраненное значение)
+ADVANCE_JOB_STATE_QUERY = register_query(
+    "job_state.advance",
+    """
+    DECLARE $job AS String;
+    DECLARE $watermark AS Optional<Datetime>;
+    DECLARE $processed AS Uint64;
+    DECLARE $updated_at AS Datetime;
+
+    UPSERT INTO job_state (job, watermark, processed, updated_at)
+    SELECT
+        n.job AS job,
+        MAX_OF(COALESCE(s.watermark, n.watermark), COALESCE(n.watermark, s.watermark)) AS watermark,
+        n.processed AS processed,
+        n.updated_at AS updated_at
+    FROM AS_TABLE(AsList(AsStruct(
+        $job AS job, $watermark AS watermark, $processed AS processed, $updated_at AS updated_at
+    ))) AS n
+    LEFT JOIN job_state AS s ON s.job = n.job;
+    """
+)
+
+
+@dataclass
+class JobState:
+    """Состояние фонового задания"""
+
+    job: str
+    watermark: Optional[datetime]
+    processed: int
+    updated_at: datetime
+
+
+class JobStateRepository(BaseRepository):
+    """Репозиторий состояния фоновых заданий"""
+
+    async def get_state(self, job: str) -> Optional[JobState]:
+        """
+        Получает состояние задания
+
+        Args:
+            job: Имя задания
+
+        Returns:
+            Состояние или None, если задание еще не запускалось
+        """
+        query = GET_JOB_STATE_QUERY
+
+        parameters = {'$job': job}
+        row = await self._fetch_one(query, parameters)
+
+        if row:
+            return JobState(
+                job=row['job'],
+                watermark=self._parse_datetime(row['watermark']),
+                processed=row['processed'] or 0,
+                updated_at=self._parse_datetime(row['updated_at'])
+            )
+
+        return None
+
+    async def save_state(self, job: str, watermark: Optional[datetime], processed: int) -> None:
+        """
+        Сохраняет состояние задания
+
+        Args:
+            job: Имя задания
+            watermark: До какого момента данные обработаны
+            processed: Обработано записей за последний запуск
+        """
+        query = SAVE_JOB_STATE_QUERY
+
+        parameters = {
+            '$job': job,
+            '$watermark': watermark,
+            '$processed': processed,
+            '$updated_at': datetime.utcnow()
+        }
+
+        await self._execute_query(query, parameters)
+
+    async def advance_state(self, job: str, watermark: Optional[datetime], processed: int) -> None:
+        """
+        Сохраняет состояние задания, не сдвигая watermark назад
+
+        Args:
+            job: Имя задания
+            watermark: До какого момента данные обработаны (сохраняется, если позже текущего)
+            processed: Обработано записей за последний запуск
+        """
+        query = ADVANCE_JOB_STATE_QUERY
+
+        parameters = {
+            '$job': job,
+            '$watermark': watermark,
+            '$processed': processed,
+            '$updated_at': datetime.utcnow()
+        }
+
+        await self._execute_query(query, parameters)
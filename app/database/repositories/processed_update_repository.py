@@ -0,0 +1,187 @@
+"""
+Репозиторий обработанных update (защита от повторной доставки)
+
+Строка update создается INSERT до обработки (захват с арендой до
+lease_until) и отмечается done после нее. INSERT завершается ошибкой
+PRECONDITION_FAILED, если строка уже есть, поэтому из одновременных
+доставок одного update захват получает только одна.
+"""
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import ydb
+
+from .base_repository import BaseRepository
+from app.database.query_registry import register_query
+
+logger = logging.getLogger(__name__)
+
+STATE_IN_PROGRESS = 'in_progress'
+STATE_DONE = 'done'
+
+
+GET_CLAIM_QUERY = register_query(
+    "processed_updates.get",
+    """
+    DECLARE $update_id AS Uint64;
+
+    SELECT update_id, state, owner
+    FROM processed_updates
+    WHERE update_id = $update_id;
+    """
+)
+
+CLAIM_QUERY = register_query(
+    "processed_updates.claim",
+    """
+    DECLARE $update_id AS Uint64;
+    DECLARE $processed_at AS Datetime;
+    DECLARE $lease_until AS Datetime;
+    DECLARE $owner AS Utf8;
+
+    INSERT INTO processed_updates (update_id, processed_at, state, lease_until, owner)
+    VALUES ($update_id, $processed_at, "in_progress"u, $lease_until, $owner);
+    """
+)
+
+DELETE_EXPIRED_CLAIM_QUERY = register_query(
+    "processed_updates.delete_expired",
+    """
+    DECLARE $update_id AS Uint64;
+    DECLARE $now AS Datetime;
+
+    DELETE FROM processed_updates
+    WHERE update_id = $update_id AND state = "in_progress"u AND lease_until < $now;
+    """
+)
+
+MARK_DONE_QUERY = register_query(
+    "processed_updates.mark_done",
+    """
+    DECLARE $update_id AS Uint64;
+    DECLARE $processed_at AS Datetime;
+    DECLARE $owner AS Utf8;
+
+    UPSERT INTO processed_updates (update_id, processed_at, state, lease_until, owner)
+    VALUES ($update_id, $processed_at, "done"u, NULL, $owner);
+    """
+)
+
+RELEASE_CLAIM_QUERY = register_query(
+    "processed_updates.release",
+    """
+    DECLARE $update_id AS Uint64;
+    DECLARE $owner AS Utf8;
+
+    DELETE FROM processed_updates
+    WHERE update_id = $update_id AND owner = $owner AND state = "in_progress"u;
+    """
+)
+
+
+class ProcessedUpdateRepository(BaseRepository):
+    """Репозиторий обработанных update"""
+    
+    async def get_claim(self, update_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Читает строку update
+        
+        Args:
+            update_id: ID update от Telegram
+            
+        Returns:
+            Словарь state (NULL в старых строках — done) и owner или None, если строки нет
+        """
+        query = GET_CLAIM_QUERY
+        
+        parameters = {
+            '$update_id': update_id
+        }
+        
+        row = await self._fetch_one(query, parameters)
+        if row is None:
+            return None
+        return {
+            'state': row.get('state') or STATE_DONE,
+            'owner': row.get('owner')
+        }
+    
+    async def claim(self, update_id: int, owner: str, lease_until: datetime) -> bool:
+        """
+        Захватывает update для обработки
+        
+        Args:
+            update_id: ID update от Telegram
+            owner: Идентификатор захвата (уникален для каждой обработки)
+            lease_until: До какого момента захват действует
+            
+        Returns:
+            True, если строка создана; False, если update уже захвачен или обработан
+        """
+        query = CLAIM_QUERY
+        
+        parameters = {
+            '$update_id': update_id,
+            '$processed_at': datetime.utcnow(),
+            '$lease_until': lease_until,
+            '$owner': owner
+        }
+        
+        try:
+            await self._execute_query(query, parameters)
+        except ydb.issues.PreconditionFailed:
+            return False
+        return True
+    
+    async def delete_expired_claim(self, update_id: int, now: datetime) -> None:
+        """
+        Удаляет захват, срок которого истек (обработчик упал, не освободив его)
+        
+        Args:
+            update_id: ID update от Telegram
+            now: Текущее время UTC
+        """
+        query = DELETE_EXPIRED_CLAIM_QUERY
+        
+        parameters = {
+            '$update_id': update_id,
+            '$now': now
+        }
+        
+        await self._execute_query(query, parameters)
+    
+    async def mark_done(self, update_id: int, owner: str) -> None:
+        """
+        Отмечает update как обработанный (запись удаляется по TTL)
+        
+        Args:
+            update_id: ID update от Telegram
+            owner: Идентификатор захвата
+        """
+        query = MARK_DONE_QUERY
+        
+        parameters = {
+            '$update_id': update_id,
+            '$processed_at': datetime.utcnow(),
+            '$owner': owner
+        }
+        
+        await self._execute_query(query, parameters)
+    
+    async def release(self, update_id: int, owner: str) -> None:
+        """
+        Снимает свой захват после ошибки, чтобы повторная доставка обработала update
+        
+        Args:
+            update_id: ID update от Telegram
+            owner: Идентификатор захвата
+        """
+        query = RELEASE_CLAIM_QUERY
+        
+        parameters = {
+            '$update_id': update_id,
+            '$owner': owner
+        }
+        
+        await self._execute_query(query, parameters)
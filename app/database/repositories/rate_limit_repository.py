@@ -0,0 +1,57 @@
+"""
+Репозиторий общих для всех экземпляров счетчиков частоты запросов
+"""
+import logging
+from datetime import datetime
+
+from .base_repository import BaseRepository
+from app.database.query_registry import register_query
+
+logger = logging.getLogger(__name__)
+
+
+HIT_QUERY = register_query(
+    "rate_limits.hit",
+    """
+    DECLARE $key AS String;
+    DECLARE $window_start AS Uint64;
+    DECLARE $expires_at AS Datetime;
+
+    $hits = (
+        SELECT hits FROM rate_limits
+        WHERE key = $key AND window_start = $window_start
+    );
+
+    UPSERT INTO rate_limits (key, window_start, hits, expires_at)
+    VALUES ($key, $window_start, COALESCE($hits, 0u) + 1u, $expires_at);
+
+    SELECT COALESCE($hits, 0u) + 1u AS hits;
+    """
+)
+
+
+class RateLimitRepository(BaseRepository):
+    """Счетчики событий по ключу в фиксированных окнах времени"""
+    
+    async def hit(self, key: str, window_start: int, expires_at: datetime) -> int:
+        """
+        Учитывает событие и возвращает количество событий ключа в окне
+        
+        Args:
+            key: Ключ счетчика (например, user:<id>)
+            window_start: Начало окна (unix time в секундах)
+            expires_at: Когда строку можно удалить по TTL
+            
+        Returns:
+            Количество событий в окне с учетом текущего
+        """
+        query = HIT_QUERY
+        
+        parameters = {
+            '$key': key,
+            '$window_start': window_start,
+            '$expires_at': expires_at
+        }
+        
+        row = await self._fetch_one(query, parameters)
+        return row['hits'] if row else 1
@@ -0,0 +1,137 @@
+"""
+Репозиторий напоминаний о сроках задач
+
+Строки напоминаний создаются вместе с задачей (TaskRepository.create_task,
+reschedule_task) и лежат по интервалам времени (bucket — первая часть
+первичного ключа), поэтому запуск читает только наступившие интервалы.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List
+
+from .base_repository import BaseRepository
+from app.database.query_registry import register_query
+
+logger = logging.getLogger(__name__)
+
+
+# Захват в одной сериализуемой транзакции: одновременные запуски на разных
+# экземплярах не получат одно напоминание, пока не истекла аренда захвата
+CLAIM_DUE_REMINDERS_QUERY = register_query(
+    "reminders.claim_due",
+    """
+    DECLARE $buckets AS List<Uint64>;
+    DECLARE $now AS Datetime;
+    DECLARE $lease_expired AS Datetime;
+    DECLARE $limit AS Uint64;
+
+    $due = (
+        SELECT bucket, task_id, remind_at, assignee_id, deadline
+        FROM reminders
+        WHERE bucket IN $buckets AND remind_at <= $now AND sent_at IS NULL
+          AND (claimed_at IS NULL OR claimed_at < $lease_expired)
+        LIMIT $limit
+    );
+
+    SELECT bucket, task_id, remind_at, assignee_id, deadline FROM $due;
+
+    UPDATE reminders ON
+    SELECT bucket, task_id, remind_at, $now AS claimed_at
+    FROM $due;
+    """
+)
+
+MARK_REMINDERS_SENT_QUERY = register_query(
+    "reminders.mark_sent",
+    """
+    DECLARE $keys AS List<Struct<bucket: Uint64, task_id: Uint64, remind_at: Datetime>>;
+    DECLARE $sent_at AS Datetime;
+
+    UPDATE reminders ON
+    SELECT bucket, task_id, remind_at, $sent_at AS sent_at
+    FROM AS_TABLE($keys);
+    """
+)
+
+
+@dataclass
+class Reminder:
+    """Напоминание о сроке задачи"""
+
+    bucket: int
+    task_id: int
+    remind_at: datetime
+    assignee_id: int
+    deadline: datetime
+
+    @property
+    def key(self) -> dict:
+        """Первичный ключ строки"""
+        return {'bucket': self.bucket, 'task_id': self.task_id, 'remind_at': self.remind_at}
+
+
+class ReminderRepository(BaseRepository):
+    """Репозиторий напоминаний"""
+
+    async def claim_due(
+        self,
+        buckets: List[int],
+        now: datetime,
+        lease_expired: datetime,
+        limit: int
+    ) -> List[Reminder]:
+        """
+        Захватывает наступившие неотправленные напоминания
+
+        Args:
+            buckets: Интервалы для чтения
+            now: Текущее время
+            lease_expired: Захваченные раньше этого момента и не отправленные захватываются повторно
+            limit: Максимум напоминаний
+
+        Returns:
+            Захваченные напоминания
+        """
+        if not buckets:
+            return []
+
+        query = CLAIM_DUE_REMINDERS_QUERY
+
+        parameters = {
+            '$buckets': list(buckets),
+            '$now': now,
+            '$lease_expired': lease_expired,
+            '$limit': limit
+        }
+        rows = await self._fetch_all(query, parameters)
+
+        return [
+            Reminder(
+                bucket=row['bucket'],
+                task_id=row['task_id'],
+                remind_at=self._parse_datetime(row['remind_at']),
+                assignee_id=row['assignee_id'],
+                deadline=self._parse_datetime(row['deadline'])
+            )
+            for row in rows
+        ]
+
+    async def mark_sent(self, reminders: List[Reminder]) -> None:
+        """
+        Отмечает напоминания отправленными (или не требующими отправки)
+
+        Args:
+            reminders: Напоминания
+        """
+        if not reminders:
+            return
+
+        query = MARK_REMINDERS_SENT_QUERY
+
+        parameters = {
+            '$keys': [reminder.key for reminder in reminders],
+            '$sent_at': datetime.utcnow()
+        }
+
+        await self._execute_query(query, parameters)
@@ -0,0 +1,811 @@
+"""
+Репозиторий для работы с задачами
+
+Списки задач читаются из вторичных индексов с keyset-пагинацией: условие
+"после последней показанной задачи" продолжает чтение диапазона индекса с
+нужного места, поэтому страница — это одно ограниченное LIMIT чтение,
+а не OFFSET по всем задачам исполнителя или компании. Каждый статус —
+отдельный диапазон индекса (префикс), но все статусы страницы читаются
+одним запросом вместе с названием компании и именем исполнителя.
+"""
+import logging
+from typing import Optional, List, Sequence, Tuple
+from datetime import datetime
+
+from .base_repository import BaseRepository
+from app.database.query_registry import register_query, CROSS_SHARD_SORT
+from app.database.models.task_model import Task, TaskListItem
+from .counter_repository import (
+    COMPANY_DELTAS_TYPE, ASSIGNEE_DELTAS_TYPE, TOTAL_COMPANY_ID,
+    counter_upsert, build_counter_deltas, status_change
+)
+from config import config
+
+logger = logging.getLogger(__name__)
+
+
+# Колонки списка задач: есть в COVER всех индексов задач
+TASK_LIST_COLUMNS = ("task_id", "title", "company_id", "assignee_id", "priority", "status", "deadline", "created_at")
+
+# Статусов в одном запросе списка (все статусы задачи)
+LIST_STATUS_SLOTS = 5
+
+# Продолжение после ($after_deadline, $after_task_id) при сортировке по deadline, task_id.
+# deadline может быть NULL: такие задачи идут первыми (как в индексе).
+DEADLINE_KEYSET_CONDITION = """(
+        $after_task_id IS NULL
+        OR ($after_deadline IS NULL AND deadline IS NULL AND task_id > $after_task_id)
+        OR ($after_deadline IS NULL AND deadline IS NOT NULL)
+        OR deadline > $after_deadline
+        OR (deadline = $after_deadline AND task_id > $after_task_id)
+    )"""
+
+# Продолжение после ($after_created_at, $after_task_id) при сортировке по created_at DESC, task_id DESC
+CREATED_DESC_KEYSET_CONDITION = """(
+        $after_task_id IS NULL
+        OR created_at < $after_created_at
+        OR (created_at = $after_created_at AND task_id < $after_task_id)
+    )"""
+
+
+def list_page_query(view: str, owner_condition: str, order: Tuple[str, ...], keyset_condition: str) -> str:
+    """
+    Запрос страницы списка задач за одно обращение к БД
+
+    Статусы списка (от статуса курсора) читаются отдельными диапазонами
+    индекса, каждый не больше $limit строк: продолжение после курсора только
+    в первом статусе ($status_0), следующие — с начала. Пустой $status_N
+    ничего не читает. Из объединения берутся первые $limit задач в порядке
+    статусов, и к ним присоединяются название компании и имя исполнителя
+    по первичным ключам.
+
+    Args:
+        view: Индекс задач
+        owner_condition: Условие на префикс индекса перед статусом (или пустая строка)
+        order: Колонки сортировки внутри статуса (с DESC при необходимости)
+        keyset_condition: Условие продолжения после курсора
+
+    Returns:
+        Текст запроса
+    """
+    columns = ", ".join(TASK_LIST_COLUMNS)
+    declares = "\n    ".join(f"DECLARE $status_{slot} AS Optional<String>;" for slot in range(LIST_STATUS_SLOTS))
+    slots = "".join(f"""
+    $slot_{slot} = (
+        SELECT {columns}, {slot}u AS slot
+        FROM tasks VIEW {view}
+        WHERE {owner_condition}status = $status_{slot}{f" AND {keyset_condition}" if slot == 0 else ""}
+        ORDER BY {", ".join(order)}
+        LIMIT $limit
+    );
+""" for slot in range(LIST_STATUS_SLOTS))
+    union = "\n        UNION ALL ".join(f"SELECT * FROM $slot_{slot}" for slot in range(LIST_STATUS_SLOTS))
+    page_columns = ", ".join(f"p.{column} AS {column}" for column in TASK_LIST_COLUMNS)
+
+    return f"""
+    {declares}
+    DECLARE $limit AS Uint64;
+    {slots}
+    $page = (
+        SELECT * FROM (
+            {union}
+        )
+        ORDER BY slot, {", ".join(order)}
+        LIMIT $limit
+    );
+
+    SELECT {page_columns}, c.name AS company_name,
+           u.first_name AS assignee_first_name, u.last_name AS assignee_last_name
+    FROM $page AS p
+    LEFT JOIN companies AS c ON c.company_id = p.company_id
+    LEFT JOIN users AS u ON u.user_id = p.assignee_id
+    ORDER BY p.slot, {", ".join(f"p.{column}" for column in order)};
+    """
+
+
+GET_TASK_BY_ID_QUERY = register_query(
+    "tasks.get_by_id",
+    """
+    DECLARE $task_id AS Uint64;
+
+    SELECT task_id, title, description, company_id, creator_id, assignee_id,
+           initiator_name, initiator_phone, priority, status, deadline,
+           completed_at, created_at, updated_at, comment_count, last_comment_at
+    FROM tasks
+    WHERE task_id = $task_id;
+    """
+)
+
+GET_TASKS_BY_IDS_QUERY = register_query(
+    "tasks.get_by_ids",
+    """
+    DECLARE $task_ids AS List<Uint64>;
+
+    SELECT task_id, title, description, company_id, creator_id, assignee_id,
+           initiator_name, initiator_phone, priority, status, deadline,
+           completed_at, created_at, updated_at, comment_count, last_comment_at
+    FROM tasks
+    WHERE task_id IN $task_ids;
+    """
+)
+
+# Последний ID читается с конца первичного ключа, без агрегации по таблице
+GET_LAST_TASK_ID_QUERY = register_query(
+    "tasks.get_last_id",
+    """
+    SELECT task_id FROM tasks
+    ORDER BY task_id DESC
+    LIMIT 1;
+    """,
+    allow=(CROSS_SHARD_SORT,)
+)
+
+# Строки напоминаний (app/services/reminder_service.py) и изменения счетчиков
+# (app/database/repositories/counter_repository.py) пишутся в той же транзакции, что и задача
+REMINDER_ROWS_TYPE = (
+    "List<Struct<bucket: Uint64, remind_at: Datetime, assignee_id: Uint64, deadline: Datetime, expires_at: Datetime>>"
+)
+
+CREATE_TASK_QUERY = register_query(
+    "tasks.create",
+    f"""
+    DECLARE $task_id AS Uint64;
+    DECLARE $title AS String;
+    DECLARE $description AS Optional<String>;
+    DECLARE $company_id AS Uint64;
+    DECLARE $creator_id AS Uint64;
+    DECLARE $assignee_id AS Optional<Uint64>;
+    DECLARE $initiator_name AS String;
+    DECLARE $initiator_phone AS String;
+    DECLARE $priority AS String;
+    DECLARE $status AS String;
+    DECLARE $deadline AS Optional<Datetime>;
+    DECLARE $created_at AS Datetime;
+    DECLARE $updated_at AS Datetime;
+    DECLARE $reminders AS {REMINDER_ROWS_TYPE};
+    DECLARE $company_deltas AS {COMPANY_DELTAS_TYPE};
+    DECLARE $assignee_deltas AS {ASSIGNEE_DELTAS_TYPE};
+    {counter_upsert('company_task_counters', 'company_id', 'AS_TABLE($company_deltas)')}
+    {counter_upsert('assignee_task_counters', 'assignee_id', 'AS_TABLE($assignee_deltas)')}
+    INSERT INTO tasks (
+        task_id, title, description, company_id, creator_id, assignee_id,
+        initiator_name, initiator_phone, priority, status, deadline, created_at, updated_at
+    ) VALUES (
+        $task_id, $title, $description, $company_id, $creator_id, $assignee_id,
+        $initiator_name, $initiator_phone, $priority, $status, $deadline, $created_at, $updated_at
+    );
+
+    UPSERT INTO reminders (bucket, task_id, remind_at, assignee_id, deadline, expires_at)
+    SELECT bucket, $task_id AS task_id, remind_at, assignee_id, deadline, expires_at
+    FROM AS_TABLE($reminders);
+    """
+)
+
+# Изменения применяются, только если статус задачи в базе тот, от которого
+# посчитаны изменения счетчиков (иначе задачу уже изменил другой запрос)
+RESCHEDULE_TASK_QUERY = register_query(
+    "tasks.reschedule",
+    f"""
+    DECLARE $task_id AS Uint64;
+    DECLARE $old_status AS String;
+    DECLARE $deadline AS Datetime;
+    DECLARE $status AS String;
+    DECLARE $updated_at AS Datetime;
+    DECLARE $old_reminders AS List<Struct<bucket: Uint64, remind_at: Datetime>>;
+    DECLARE $reminders AS {REMINDER_ROWS_TYPE};
+    DECLARE $company_deltas AS {COMPANY_DELTAS_TYPE};
+    DECLARE $assignee_deltas AS {ASSIGNEE_DELTAS_TYPE};
+
+    $current = (
+        SELECT task_id FROM tasks
+        WHERE task_id = $task_id AND status = $old_status
+    );
+    $matched = (SELECT COUNT(*) FROM $current) > 0;
+
+    SELECT COUNT(*) AS updated FROM $current;
+    {counter_upsert('company_task_counters', 'company_id', 'AS_TABLE($company_deltas)', '$matched')}
+    {counter_upsert('assignee_task_counters', 'assignee_id', 'AS_TABLE($assignee_deltas)', '$matched')}
+    DELETE FROM reminders ON
+    SELECT bucket, $task_id AS task_id, remind_at
+    FROM AS_TABLE($old_reminders)
+    WHERE $matched;
+
+    UPSERT INTO reminders (bucket, task_id, remind_at, assignee_id, deadline, expires_at)
+    SELECT bucket, $task_id AS task_id, remind_at, assignee_id, deadline, expires_at
+    FROM AS_TABLE($reminders)
+    WHERE $matched;
+
+    UPDATE tasks ON
+    SELECT task_id, $deadline AS deadline, $status AS status, $updated_at AS updated_at
+    FROM $current;
+    """
+)
+
+SET_TASK_STATUS_QUERY = register_query(
+    "tasks.set_status",
+    f"""
+    DECLARE $task_id AS Uint64;
+    DECLARE $old_status AS String;
+    DECLARE $status AS String;
+    DECLARE $completed_at AS Optional<Datetime>;
+    DECLARE $updated_at AS Datetime;
+    DECLARE $company_deltas AS {COMPANY_DELTAS_TYPE};
+    DECLARE $assignee_deltas AS {ASSIGNEE_DELTAS_TYPE};
+
+    $current = (
+        SELECT task_id FROM tasks
+        WHERE task_id = $task_id AND status = $old_status
+    );
+    $matched = (SELECT COUNT(*) FROM $current) > 0;
+
+    SELECT COUNT(*) AS updated FROM $current;
+    {counter_upsert('company_task_counters', 'company_id', 'AS_TABLE($company_deltas)', '$matched')}
+    {counter_upsert('assignee_task_counters', 'assignee_id', 'AS_TABLE($assignee_deltas)', '$matched')}
+    UPDATE tasks ON
+    SELECT task_id, $status AS status, $completed_at AS completed_at, $updated_at AS updated_at
+    FROM $current;
+    """
+)
+
+LIST_BY_ASSIGNEE_QUERY = register_query(
+    "tasks.list_by_assignee",
+    """
+    DECLARE $assignee_id AS Uint64;
+    DECLARE $after_deadline AS Optional<Datetime>;
+    DECLARE $after_task_id AS Optional<Uint64>;
+    """ + list_page_query(
+        "idx_assignee_status_deadline",
+        "assignee_id = $assignee_id AND ",
+        ("deadline", "task_id"),
+        DEADLINE_KEYSET_CONDITION
+    )
+)
+
+LIST_BY_COMPANY_QUERY = register_query(
+    "tasks.list_by_company",
+    """
+    DECLARE $company_id AS Uint64;
+    DECLARE $after_created_at AS Optional<Datetime>;
+    DECLARE $after_task_id AS Optional<Uint64>;
+    """ + list_page_query(
+        "idx_company_status_created",
+        "company_id = $company_id AND ",
+        ("created_at DESC", "task_id DESC"),
+        CREATED_DESC_KEYSET_CONDITION
+    )
+)
+
+LIST_BY_STATUS_QUERY = register_query(
+    "tasks.list_by_status",
+    """
+    DECLARE $after_deadline AS Optional<Datetime>;
+    DECLARE $after_task_id AS Optional<Uint64>;
+    """ + list_page_query(
+        "idx_status_deadline",
+        "",
+        ("deadline", "task_id"),
+        DEADLINE_KEYSET_CONDITION
+    )
+)
+
+# Пакет задач статуса с истекшим сроком переводится в overdue в одной транзакции
+# вместе со счетчиками. Переведенные задачи уходят из диапазона (status, deadline)
+# индекса, поэтому следующий пакет снова читается с начала диапазона.
+MARK_OVERDUE_BATCH_QUERY = register_query(
+    "tasks.mark_overdue_batch",
+    f"""
+    DECLARE $status AS String;
+    DECLARE $overdue_status AS String;
+    DECLARE $cutoff AS Datetime;
+    DECLARE $now AS Datetime;
+    DECLARE $limit AS Uint64;
+    DECLARE $shards AS Uint32;
+
+    $batch = (
+        SELECT task_id, company_id, assignee_id
+        FROM tasks VIEW idx_status_deadline
+        WHERE status = $status AND deadline <= $cutoff
+        ORDER BY deadline, task_id
+        LIMIT $limit
+    );
+
+    $moved = (
+        SELECT company_id, assignee_id, CAST(task_id % $shards AS Uint32) AS shard
+        FROM $batch
+    );
+
+    $company_deltas = (
+        SELECT company_id, status, shard, SUM(delta) AS delta
+        FROM (
+            SELECT company_id, $status AS status, shard, -1l AS delta FROM $moved
+            UNION ALL
+            SELECT company_id, $overdue_status AS status, shard, 1l AS delta FROM $moved
+            UNION ALL
+            SELECT {TOTAL_COMPANY_ID}ul AS company_id, $status AS status, shard, -1l AS delta FROM $moved
+            UNION ALL
+            SELECT {TOTAL_COMPANY_ID}ul AS company_id, $overdue_status AS status, shard, 1l AS delta FROM $moved
+        )
+        GROUP BY company_id, status, shard
+    );
+
+    $assignee_deltas = (
+        SELECT assignee_id, status, shard, SUM(delta) AS delta
+        FROM (
+            SELECT assignee_id, $status AS status, shard, -1l AS delta FROM $moved
+            WHERE assignee_id IS NOT NULL
+            UNION ALL
+            SELECT assignee_id, $overdue_status AS status, shard, 1l AS delta FROM $moved
+            WHERE assignee_id IS NOT NULL
+        )
+        GROUP BY Unwrap(assignee_id) AS assignee_id, status, shard
+    );
+
+    SELECT COUNT(*) AS marked FROM $batch;
+    {counter_upsert('company_task_counters', 'company_id', '$company_deltas')}
+    {counter_upsert('assignee_task_counters', 'assignee_id', '$assignee_deltas')}
+    UPDATE tasks ON
+    SELECT task_id, $overdue_status AS status, $now AS updated_at
+    FROM $batch;
+    """
+)
+
+# Задачи компании в статусе за период по возрастанию (created_at, task_id) для выгрузки;
+# колонки вне COVER индекса читаются из основной таблицы для строк страницы
+EXPORT_BY_COMPANY_QUERY = register_query(
+    "tasks.export_by_company",
+    """
+    DECLARE $company_id AS Uint64;
+    DECLARE $status AS String;
+    DECLARE $created_to AS Datetime;
+    DECLARE $after_created_at AS Datetime;
+    DECLARE $after_task_id AS Uint64;
+    DECLARE $limit AS Uint64;
+
+    SELECT task_id, title, description, company_id, creator_id, assignee_id, initiator_name,
+           initiator_phone, priority, status, deadline, completed_at, created_at, updated_at,
+           comment_count, last_comment_at
+    FROM tasks VIEW idx_company_status_created
+    WHERE company_id = $company_id AND status = $status
+      AND created_at >= $after_created_at AND created_at < $created_to
+      AND (created_at > $after_created_at OR task_id > $after_task_id)
+    ORDER BY created_at, task_id
+    LIMIT $limit;
+    """
+)
+
+# Изменения задач по возрастанию (updated_at, task_id) для снимка аналитики
+SCAN_UPDATED_QUERY = register_query(
+    "tasks.scan_updated",
+    """
+    DECLARE $after_updated_at AS Datetime;
+    DECLARE $after_task_id AS Uint64;
+    DECLARE $limit AS Uint64;
+
+    SELECT task_id, company_id, assignee_id, status, priority,
+           deadline, completed_at, created_at, updated_at
+    FROM tasks VIEW idx_updated_at
+    WHERE updated_at >= $after_updated_at
+      AND (updated_at > $after_updated_at OR task_id > $after_task_id)
+    ORDER BY updated_at, task_id
+    LIMIT $limit;
+    """
+)
+
+
+class TaskRepository(BaseRepository):
+    """Репозиторий для работы с задачами"""
+
+    async def get_task_by_id(self, task_id: int) -> Optional[Task]:
+        """
+        Получает задачу по ID
+
+        Args:
+            task_id: ID задачи
+
+        Returns:
+            Задача или None
+        """
+        query = GET_TASK_BY_ID_QUERY
+
+        parameters = {'$task_id': task_id}
+        row = await self._fetch_one(query, parameters)
+
+        if row:
+            return self._row_to_task(row)
+
+        return None
+
+    async def get_tasks_by_ids(self, task_ids: List[int]) -> List[Task]:
+        """
+        Получает задачи по списку ID одним запросом
+
+        Args:
+            task_ids: ID задач
+
+        Returns:
+            Найденные задачи
+        """
+        if not task_ids:
+            return []
+
+        query = GET_TASKS_BY_IDS_QUERY
+
+        parameters = {'$task_ids': list(task_ids)}
+        rows = await self._fetch_all(query, parameters)
+
+        return [self._row_to_task(row) for row in rows]
+
+    async def create_task(self, task_data: dict, reminders: List[dict]) -> Task:
+        """
+        Создает задачу вместе с ее напоминаниями
+
+        Args:
+            task_data: Данные задачи
+            reminders: Строки напоминаний без task_id
+
+        Returns:
+            Созданная задача
+        """
+        now = datetime.utcnow()
+        status = task_data.get('status', 'new')
+
+        task_id = await self._get_next_task_id()
+        company_deltas, assignee_deltas = build_counter_deltas(
+            task_id, task_data['company_id'], task_data.get('assignee_id'), status_change(None, status)
+        )
+
+        query = CREATE_TASK_QUERY
+
+        parameters = {
+            '$task_id': task_id,
+            '$title': task_data['title'],
+            '$description': task_data.get('description'),
+            '$company_id': task_data['company_id'],
+            '$creator_id': task_data['creator_id'],
+            '$assignee_id': task_data.get('assignee_id'),
+            '$initiator_name': task_data['initiator_name'],
+            '$initiator_phone': task_data['initiator_phone'],
+            '$priority': task_data.get('priority', 'normal'),
+            '$status': status,
+            '$deadline': task_data.get('deadline'),
+            '$created_at': now,
+            '$updated_at': now,
+            '$reminders': reminders,
+            '$company_deltas': company_deltas,
+            '$assignee_deltas': assignee_deltas
+        }
+
+        await self._execute_query(query, parameters)
+
+        return Task(
+            task_id=task_id,
+            title=task_data['title'],
+            description=task_data.get('description'),
+            company_id=task_data['company_id'],
+            creator_id=task_data['creator_id'],
+            assignee_id=task_data.get('assignee_id'),
+            initiator_name=task_data['initiator_name'],
+            initiator_phone=task_data['initiator_phone'],
+            priority=task_data.get('priority', 'normal'),
+            status=status,
+            deadline=task_data.get('deadline'),
+            created_at=now,
+            updated_at=now
+        )
+
+    async def reschedule_task(
+        self,
+        task: Task,
+        deadline: datetime,
+        status: str,
+        old_reminders: List[dict],
+        reminders: List[dict]
+    ) -> bool:
+        """
+        Переносит срок задачи, заменяет ее напоминания и обновляет счетчики
+        в одной транзакции
+
+        Args:
+            task: Задача (статус — прочитанный до переноса)
+            deadline: Новый срок
+            status: Статус после переноса
+            old_reminders: Ключи (bucket, remind_at) напоминаний прежнего срока
+            reminders: Строки напоминаний нового срока без task_id
+
+        Returns:
+            False, если статус задачи в базе уже изменен и перенос не выполнен
+        """
+        company_deltas, assignee_deltas = build_counter_deltas(
+            task.task_id, task.company_id, task.assignee_id, status_change(task.status, status)
+        )
+
+        query = RESCHEDULE_TASK_QUERY
+
+        parameters = {
+            '$task_id': task.task_id,
+            '$old_status': task.status,
+            '$deadline': deadline,
+            '$status': status,
+            '$updated_at': datetime.utcnow(),
+            '$old_reminders': old_reminders,
+            '$reminders': reminders,
+            '$company_deltas': company_deltas,
+            '$assignee_deltas': assignee_deltas
+        }
+        row = await self._fetch_one(query, parameters)
+
+        return bool(row and row['updated'])
+
+    async def set_status(self, task: Task, status: str, completed_at: Optional[datetime] = None) -> bool:
+        """
+        Меняет статус задачи и счетчики в одной транзакции
+
+        Args:
+            task: Задача (статус — прочитанный до изменения)
+            status: Новый статус
+            completed_at: Время завершения (для completed)
+
+        Returns:
+            False, если статус задачи в базе уже изменен и изменение не выполнено
+        """
+        company_deltas, assignee_deltas = build_counter_deltas(
+            task.task_id, task.company_id, task.assignee_id, status_change(task.status, status)
+        )
+
+        query = SET_TASK_STATUS_QUERY
+
+        parameters = {
+            '$task_id': task.task_id,
+            '$old_status': task.status,
+            '$status': status,
+            '$completed_at': completed_at,
+            '$updated_at': datetime.utcnow(),
+            '$company_deltas': company_deltas,
+            '$assignee_deltas': assignee_deltas
+        }
+        row = await self._fetch_one(query, parameters)
+
+        return bool(row and row['updated'])
+
+    async def list_by_assignee(
+        self,
+        assignee_id: int,
+        statuses: Sequence[str],
+        limit: int,
+        after_deadline: Optional[datetime] = None,
+        after_task_id: Optional[int] = None
+    ) -> List[TaskListItem]:
+        """
+        Задачи исполнителя по статусам, внутри статуса по возрастанию срока
+
+        Args:
+            assignee_id: ID исполнителя
+            statuses: Статусы задач по порядку (курсор относится к первому)
+            limit: Максимум задач
+            after_deadline: Срок последней показанной задачи
+            after_task_id: ID последней показанной задачи (None — с начала)
+
+        Returns:
+            Задачи списка с названием компании и именем исполнителя
+        """
+        query = LIST_BY_ASSIGNEE_QUERY
+
+        parameters = {
+            '$assignee_id': assignee_id,
+            **self._status_slots(statuses),
+            '$after_deadline': after_deadline,
+            '$after_task_id': after_task_id,
+            '$limit': limit
+        }
+        rows = await self._fetch_all(query, parameters)
+
+        return [self._row_to_list_item(row) for row in rows]
+
+    async def list_by_company(
+        self,
+        company_id: int,
+        statuses: Sequence[str],
+        limit: int,
+        after_created_at: Optional[datetime] = None,
+        after_task_id: Optional[int] = None
+    ) -> List[TaskListItem]:
+        """
+        Задачи компании по статусам, внутри статуса сначала новые
+
+        Args:
+            company_id: ID компании
+            statuses: Статусы задач по порядку (курсор относится к первому)
+            limit: Максимум задач
+            after_created_at: Дата создания последней показанной задачи
+            after_task_id: ID последней показанной задачи (None — с начала)
+
+        Returns:
+            Задачи списка с названием компании и именем исполнителя
+        """
+        query = LIST_BY_COMPANY_QUERY
+
+        parameters = {
+            '$company_id': company_id,
+            **self._status_slots(statuses),
+            '$after_created_at': after_created_at,
+            '$after_task_id': after_task_id,
+            '$limit': limit
+        }
+        rows = await self._fetch_all(query, parameters)
+
+        return [self._row_to_list_item(row) for row in rows]
+
+    async def list_by_status(
+        self,
+        statuses: Sequence[str],
+        limit: int,
+        after_deadline: Optional[datetime] = None,
+        after_task_id: Optional[int] = None
+    ) -> List[TaskListItem]:
+        """
+        Задачи по статусам, внутри статуса по возрастанию срока
+
+        Args:
+            statuses: Статусы задач по порядку (курсор относится к первому)
+            limit: Максимум задач
+            after_deadline: Срок последней показанной задачи
+            after_task_id: ID последней показанной задачи (None — с начала)
+
+        Returns:
+            Задачи списка с названием компании и именем исполнителя
+        """
+        query = LIST_BY_STATUS_QUERY
+
+        parameters = {
+            **self._status_slots(statuses),
+            '$after_deadline': after_deadline,
+            '$after_task_id': after_task_id,
+            '$limit': limit
+        }
+        rows = await self._fetch_all(query, parameters)
+
+        return [self._row_to_list_item(row) for row in rows]
+
+    def _status_slots(self, statuses: Sequence[str]) -> dict:
+        """Параметры $status_N запроса списка; незанятые слоты пустые"""
+        if len(statuses) > LIST_STATUS_SLOTS:
+            raise ValueError(f"Список задач читает не больше {LIST_STATUS_SLOTS} статусов за запрос")
+        return {
+            f'$status_{slot}': statuses[slot] if slot < len(statuses) else None
+            for slot in range(LIST_STATUS_SLOTS)
+        }
+
+    async def mark_overdue_batch(self, status: str, cutoff: datetime, limit: int) -> int:
+        """
+        Переводит в overdue пакет задач статуса со сроком не позже cutoff
+        и обновляет счетчики в той же транзакции
+
+        Args:
+            status: Открытый статус (new, in_progress)
+            cutoff: Граница срока
+            limit: Размер пакета
+
+        Returns:
+            Количество переведенных задач
+        """
+        query = MARK_OVERDUE_BATCH_QUERY
+
+        parameters = {
+            '$status': status,
+            '$overdue_status': 'overdue',
+            '$cutoff': cutoff,
+            '$now': datetime.utcnow(),
+            '$limit': limit,
+            '$shards': config.COUNTER_SHARDS
+        }
+        row = await self._fetch_one(query, parameters)
+
+        return row['marked'] if row else 0
+
+    async def export_by_company(
+        self,
+        company_id: int,
+        status: str,
+        created_to: datetime,
+        after_created_at: datetime,
+        after_task_id: int,
+        limit: int
+    ) -> List[Task]:
+        """
+        Страница задач компании в статусе, созданных до created_to
+
+        Args:
+            company_id: ID компании
+            status: Статус задач
+            created_to: Граница периода (не включается)
+            after_created_at: created_at последней прочитанной задачи (или начало периода)
+            after_task_id: ID последней прочитанной задачи (0 — с начала периода)
+            limit: Максимум задач
+
+        Returns:
+            Задачи по возрастанию (created_at, task_id)
+        """
+        query = EXPORT_BY_COMPANY_QUERY
+
+        parameters = {
+            '$company_id': company_id,
+            '$status': status,
+            '$created_to': created_to,
+            '$after_created_at': after_created_at,
+            '$after_task_id': after_task_id,
+            '$limit': limit
+        }
+        rows = await self._fetch_all(query, parameters)
+
+        return [self._row_to_task(row) for row in rows]
+
+    async def scan_updated(self, after_updated_at: datetime, after_task_id: int, limit: int) -> List[dict]:
+        """
+        Задачи, измененные после позиции (updated_at, task_id)
+
+        Args:
+            after_updated_at: updated_at последней прочитанной задачи
+            after_task_id: ID последней прочитанной задачи (0 — с начала секунды)
+            limit: Максимум задач
+
+        Returns:
+            Строки с колонками снимка аналитики по возрастанию (updated_at, task_id)
+        """
+        query = SCAN_UPDATED_QUERY
+
+        parameters = {
+            '$after_updated_at': after_updated_at,
+            '$after_task_id': after_task_id,
+            '$limit': limit
+        }
+        return await self._fetch_all(query, parameters)
+
+    async def _get_next_task_id(self) -> int:
+        """Получает следующий ID для новой задачи"""
+        query = GET_LAST_TASK_ID_QUERY
+
+        row = await self._fetch_one(query)
+
+        if row and row['task_id'] is not None:
+            return row['task_id'] + 1
+        else:
+            return 1
+
+    def _row_to_task(self, row: dict) -> Task:
+        """Создает задачу из строки таблицы tasks"""
+        return Task(
+            task_id=row['task_id'],
+            title=row['title'],
+            description=row['description'],
+            company_id=row['company_id'],
+            creator_id=row['creator_id'],
+            assignee_id=row['assignee_id'],
+            initiator_name=row['initiator_name'],
+            initiator_phone=row['initiator_phone'],
+            priority=row['priority'],
+            status=row['status'],
+            deadline=self._parse_datetime(row['deadline']),
+            completed_at=self._parse_datetime(row['completed_at']),
+            created_at=self._parse_datetime(row['created_at']),
+            updated_at=self._parse_datetime(row['updated_at']),
+            comment_count=row['comment_count'] or 0,
+            last_comment_at=self._parse_datetime(row['last_comment_at'])
+        )
+
+    def _row_to_list_item(self, row: dict) -> TaskListItem:
+        """Создает элемент списка из строки индекса и присоединенных компании и исполнителя"""
+        assignee_name = " ".join(
+            part for part in (row['assignee_first_name'], row['assignee_last_name']) if part
+        )
+        return TaskListItem(
+            task_id=row['task_id'],
+            title=row['title'],
+            company_id=row['company_id'],
+            assignee_id=row['assignee_id'],
+            priority=row['priority'],
+            status=row['status'],
+            deadline=self._parse_datetime(row['deadline']),
+            created_at=self._parse_datetime(row['created_at']),
+            company_name=row['company_name'],
+            assignee_name=assignee_name or None
+        )
@@ -6,11 +6,113 @@ from typing import Optional, List
 from datetime import datetime
 
 from .base_repository import BaseRepository
+from app.database.query_registry import register_query, FULL_SCAN, CROSS_SHARD_SORT
 from app.database.models.user_model import User
 
 logger = logging.getLogger(__name__)
 
 
+CREATE_USER_QUERY = register_query(
+    "users.create",
+    """
+    DECLARE $user_id AS Uint64;
+    DECLARE $username AS Optional<String>;
+    DECLARE $first_name AS String;
+    DECLARE $last_name AS Optional<String>;
+    DECLARE $role AS String;
+    DECLARE $phone AS Optional<String>;
+    DECLARE $is_active AS Bool;
+    DECLARE $created_at AS Datetime;
+    DECLARE $updated_at AS Datetime;
+
+    INSERT INTO users (
+        user_id, username, first_name, last_name, role, phone, 
+        is_active, created_at, updated_at
+    ) VALUES (
+        $user_id, $username, $first_name, $last_name, $role, $phone,
+        $is_active, $created_at, $updated_at
+    );
+    """
+)
+
+GET_USER_BY_ID_QUERY = register_query(
+    "users.get_by_id",
+    """
+    DECLARE $user_id AS Uint64;
+
+    SELECT user_id, username, first_name, last_name, role, phone,
+           is_active, created_at, updated_at
+    FROM users
+    WHERE user_id = $user_id AND is_active = true;
+    """
+)
+
+GET_USERS_BY_IDS_QUERY = register_query(
+    "users.get_by_ids",
+    """
+    DECLARE $user_ids AS List<Uint64>;
+
+    SELECT user_id, username, first_name, last_name, role, phone,
+           is_active, created_at, updated_at
+    FROM users
+    WHERE user_id IN $user_ids AND is_active = true;
+    """
+)
+
+GET_USERS_BY_ROLE_QUERY = register_query(
+    "users.get_by_role",
+    """
+    DECLARE $role AS String;
+
+    SELECT user_id, username, first_name, last_name, role, phone,
+           is_active, created_at, updated_at
+    FROM users VIEW idx_role
+    WHERE role = $role AND is_active = true
+    ORDER BY first_name;
+    """
+)
+
+# Страница пользователей с ролями из $roles в порядке индекса (роль, имя, ID)
+# после пользователя $after_user_id (NULL — с начала); курсор — только ID
+LIST_USERS_BY_ROLES_PAGE_QUERY = register_query(
+    "users.list_by_roles_page",
+    """
+    DECLARE $roles AS List<String>;
+    DECLARE $after_user_id AS Optional<Uint64>;
+    DECLARE $limit AS Uint64;
+
+    $after_role = (SELECT role FROM users WHERE user_id = $after_user_id);
+    $after_name = (SELECT first_name FROM users WHERE user_id = $after_user_id);
+
+    SELECT user_id, username, first_name, last_name, role, phone,
+           is_active, created_at, updated_at
+    FROM users VIEW idx_role
+    WHERE role IN $roles AND is_active = true
+      AND (
+        $after_user_id IS NULL
+        OR role > $after_role
+        OR (role = $after_role AND first_name > $after_name)
+        OR (role = $after_role AND first_name = $after_name AND user_id > $after_user_id)
+      )
+    ORDER BY role, first_name, user_id
+    LIMIT $limit;
+    """,
+    allow=(CROSS_SHARD_SORT,)
+)
+
+GET_ALL_USERS_QUERY = register_query(
+    "users.get_all",
+    """
+    SELECT user_id, username, first_name, last_name, role, phone,
+           is_active, created_at, updated_at
+    FROM users VIEW idx_role
+    WHERE is_active = true
+    ORDER BY role, first_name;
+    """,
+    allow=(FULL_SCAN, CROSS_SHARD_SORT)
+)
+
+
 class UserRepository(BaseRepository):
     """Репозиторий для работы с пользователями"""
     
@@ -26,25 +128,7 @@ class UserRepository(BaseRepository):
         """
         now = datetime.utcnow()
         
-        query = """
-        DECLARE $user_id AS Uint64;
-        DECLARE $username AS Optional<String>;
-        DECLARE $first_name AS String;
-        DECLARE $last_name AS Optional<String>;
-        DECLARE $role AS String;
-        DECLARE $phone AS Optional<String>;
-        DECLARE $is_active AS Bool;
-        DECLARE $created_at AS Datetime;
-        DECLARE $updated_at AS Datetime;
-        
-        INSERT INTO users (
-            user_id, username, first_name, last_name, role, phone, 
-            is_active, created_at, updated_at
-        ) VALUES (
-            $user_id, $username, $first_name, $last_name, $role, $phone,
-            $is_active, $created_at, $updated_at
-        );
-        """
+        query = CREATE_USER_QUERY
         
         parameters = {
             '$user_id': user_data['user_id'],
@@ -83,14 +167,7 @@ class UserRepository(BaseRepository):
         Returns:
             Пользователь или None
         """
-        query = """
-        DECLARE $user_id AS Uint64;
-        
-        SELECT user_id, username, first_name, last_name, role, phone,
-               is_active, created_at, updated_at
-        FROM users
-        WHERE user_id = $user_id AND is_active = true;
-        """
+        query = GET_USER_BY_ID_QUERY
         
         parameters = {'$user_id': user_id}
         row = await self._fetch_one(query, parameters)
@@ -110,6 +187,40 @@ class UserRepository(BaseRepository):
         
         return None
     
+    async def get_users_by_ids(self, user_ids: List[int]) -> List[User]:
+        """
+        Получает пользователей по списку Telegram ID одним запросом
+        
+        Args:
+            user_ids: Telegram ID пользователей
+            
+        Returns:
+            Найденные активные пользователи
+        """
+        if not user_ids:
+            return []
+        
+        query = GET_USERS_BY_IDS_QUERY
+        
+        parameters = {'$user_ids': list(user_ids)}
+        rows = await self._fetch_all(query, parameters)
+        
+        users = []
+        for row in rows:
+            users.append(User(
+                user_id=row['user_id'],
+                username=row['username'],
+                first_name=row['first_name'],
+                last_name=row['last_name'],
+                role=row['role'],
+                phone=row['phone'],
+                is_active=row['is_active'],
+                created_at=self._parse_datetime(row['created_at']),
+                updated_at=self._parse_datetime(row['updated_at'])
+            ))
+        
+        return users
+    
     async def update_user(self, user_id: int, updates: dict) -> bool:
         """
         Обновляет данные пользователя
@@ -163,15 +274,7 @@ class UserRepository(BaseRepository):
         Returns:
             Список пользователей
         """
-        query = """
-        DECLARE $role AS String;
-        
-        SELECT user_id, username, first_name, last_name, role, phone,
-               is_active, created_at, updated_at
-        FROM users
-        WHERE role = $role AND is_active = true
-        ORDER BY first_name;
-        """
+        query = GET_USERS_BY_ROLE_QUERY
         
         parameters = {'$role': role}
         rows = await self._fetch_all(query, parameters)
@@ -192,6 +295,39 @@ class UserRepository(BaseRepository):
         
         return users
     
+    async def list_page_by_roles(self, roles: List[str], after_user_id: Optional[int], limit: int) -> List[User]:
+        """
+        Получает страницу активных пользователей с указанными ролями
+        
+        Args:
+            roles: Роли пользователей
+            after_user_id: ID последнего показанного пользователя (None — первая страница)
+            limit: Максимум пользователей
+            
+        Returns:
+            Пользователи в порядке роли и имени
+        """
+        query = LIST_USERS_BY_ROLES_PAGE_QUERY
+        
+        parameters = {'$roles': list(roles), '$after_user_id': after_user_id, '$limit': limit}
+        rows = await self._fetch_all(query, parameters)
+        
+        users = []
+        for row in rows:
+            users.append(User(
+                user_id=row['user_id'],
+                username=row['username'],
+                first_name=row['first_name'],
+                last_name=row['last_name'],
+                role=row['role'],
+                phone=row['phone'],
+                is_active=row['is_active'],
+                created_at=self._parse_datetime(row['created_at']),
+                updated_at=self._parse_datetime(row['updated_at'])
+            ))
+        
+        return users
+    
     async def get_all_users(self) -> List[User]:
         """
         Получает всех активных пользователей
@@ -199,13 +335,7 @@ class UserRepository(BaseRepository):
         Returns:
             Список всех пользователей
         """
-        query = """
-        SELECT user_id, username, first_name, last_name, role, phone,
-               is_active, created_at, updated_at
-        FROM users
-        WHERE is_active = true
-        ORDER BY role, first_name;
-        """
+        query = GET_ALL_USERS_QUERY
         
         rows = await self._fetch_all(query)
         
@@ -0,0 +1,327 @@
+"""
+Декларативная схема таблиц YDB
+
+Схема описывает таблицы, вторичные индексы, автопартиционирование,
+реплики чтения и TTL. Применяется идемпотентно через app/database/migrations.py.
+При изменении схемы увеличивайте SCHEMA_VERSION.
+"""
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+SCHEMA_VERSION = 10
+
+
+@dataclass(frozen=True)
+class Column:
+    """Колонка таблицы"""
+
+    name: str
+    type: str
+
+    def ddl(self) -> str:
+        return f"{self.name} {self.type}"
+
+
+@dataclass(frozen=True)
+class Index:
+    """Глобальный вторичный индекс"""
+
+    name: str
+    columns: Tuple[str, ...]
+    cover: Tuple[str, ...] = ()
+    is_async: bool = False
+
+    def ddl(self) -> str:
+        result = f"INDEX {self.name} GLOBAL {'ASYNC ' if self.is_async else ''}ON ({', '.join(self.columns)})"
+        if self.cover:
+            result += f" COVER ({', '.join(self.cover)})"
+        return result
+
+
+@dataclass(frozen=True)
+class Partitioning:
+    """Настройки автопартиционирования"""
+
+    by_size: bool = True
+    by_load: bool = False
+    partition_size_mb: int = 2048
+    min_partitions: int = 1
+    max_partitions: int = 50
+
+    def settings(self) -> List[str]:
+        return [
+            f"AUTO_PARTITIONING_BY_SIZE = {'ENABLED' if self.by_size else 'DISABLED'}",
+            f"AUTO_PARTITIONING_PARTITION_SIZE_MB = {self.partition_size_mb}",
+            f"AUTO_PARTITIONING_BY_LOAD = {'ENABLED' if self.by_load else 'DISABLED'}",
+            f"AUTO_PARTITIONING_MIN_PARTITIONS_COUNT = {self.min_partitions}",
+            f"AUTO_PARTITIONING_MAX_PARTITIONS_COUNT = {self.max_partitions}",
+        ]
+
+
+@dataclass(frozen=True)
+class Ttl:
+    """Автоматическое удаление строк по колонке времени"""
+
+    column: str
+    interval: str  # ISO 8601, например "P7D"
+
+    def setting(self) -> str:
+        return f'TTL = Interval("{self.interval}") ON {self.column}'
+
+
+@dataclass(frozen=True)
+class Table:
+    """Таблица с индексами и настройками хранения"""
+
+    name: str
+    columns: Tuple[Column, ...]
+    primary_key: Tuple[str, ...]
+    indexes: Tuple[Index, ...] = ()
+    partitioning: Partitioning = field(default_factory=Partitioning)
+    read_replicas: Optional[str] = None  # Например "PER_AZ:1"
+    ttl: Optional[Ttl] = None
+
+    def settings(self) -> List[str]:
+        """Настройки таблицы для секции WITH / ALTER TABLE SET"""
+        result = self.partitioning.settings()
+        if self.read_replicas:
+            result.append(f'READ_REPLICAS_SETTINGS = "{self.read_replicas}"')
+        if self.ttl:
+            result.append(self.ttl.setting())
+        return result
+
+    def create_ddl(self) -> str:
+        """Возвращает CREATE TABLE для таблицы"""
+        parts = [column.ddl() for column in self.columns]
+        parts.extend(index.ddl() for index in self.indexes)
+        parts.append(f"PRIMARY KEY ({', '.join(self.primary_key)})")
+
+        body = ",\n    ".join(parts)
+        settings = ",\n    ".join(self.settings())
+        return f"CREATE TABLE {self.name} (\n    {body}\n)\nWITH (\n    {settings}\n);"
+
+
+USERS = Table(
+    name='users',
+    columns=(
+        Column('user_id', 'Uint64'),
+        Column('username', 'String'),
+        Column('first_name', 'String'),
+        Column('last_name', 'String'),
+        Column('role', 'String'),
+        Column('phone', 'String'),
+        Column('is_active', 'Bool'),
+        Column('created_at', 'Datetime'),
+        Column('updated_at', 'Datetime'),
+    ),
+    primary_key=('user_id',),
+    indexes=(
+        # Выборка пользователей по роли с сортировкой по имени читается только из индекса
+        Index('idx_role', ('role', 'first_name'),
+              cover=('username', 'last_name', 'phone', 'is_active', 'created_at', 'updated_at')),
+    ),
+    # Таблица читается на каждый update (AuthMiddleware)
+    partitioning=Partitioning(by_load=True, min_partitions=2),
+    read_replicas='PER_AZ:1',
+)
+
+COMPANIES = Table(
+    name='companies',
+    columns=(
+        Column('company_id', 'Uint64'),
+        Column('name', 'String'),
+        Column('description', 'String'),
+        Column('created_by', 'Uint64'),
+        Column('is_active', 'Bool'),
+        Column('created_at', 'Datetime'),
+        Column('updated_at', 'Datetime'),
+    ),
+    primary_key=('company_id',),
+    indexes=(
+        Index('idx_name', ('name',), cover=('description', 'created_by', 'is_active', 'created_at', 'updated_at')),
+    ),
+)
+
+TASKS = Table(
+    name='tasks',
+    columns=(
+        Column('task_id', 'Uint64'),
+        Column('title', 'String'),
+        Column('description', 'String'),
+        Column('company_id', 'Uint64'),
+        Column('creator_id', 'Uint64'),
+        Column('assignee_id', 'Uint64'),
+        Column('initiator_name', 'String'),
+        Column('initiator_phone', 'String'),
+        Column('priority', 'String'),
+        Column('status', 'String'),
+        Column('deadline', 'Datetime'),
+        Column('completed_at', 'Datetime'),
+        Column('created_at', 'Datetime'),
+        Column('updated_at', 'Datetime'),
+        # Комментарии задачи (пишутся в транзакции добавления комментария)
+        Column('comment_count', 'Uint64'),
+        Column('last_comment_at', 'Datetime'),
+    ),
+    primary_key=('task_id',),
+    # COVER индексов задач — колонки TaskListItem: списки читают задачи только из индекса
+    indexes=(
+        # "Мои задачи" исполнителя по статусу и сроку
+        Index('idx_assignee_status_deadline', ('assignee_id', 'status', 'deadline'),
+              cover=('title', 'company_id', 'priority', 'created_at')),
+        # Задачи компании по статусу и дате создания
+        Index('idx_company_status_created', ('company_id', 'status', 'created_at'),
+              cover=('title', 'assignee_id', 'priority', 'deadline')),
+        # Открытые задачи по сроку (просрочка, напоминания)
+        Index('idx_status_deadline', ('status', 'deadline'),
+              cover=('title', 'company_id', 'assignee_id', 'priority', 'created_at')),
+        # Изменения задач для снимка аналитики (app/services/analytics_service.py);
+        # асинхронный: не удлиняет запись задачи, отставание покрывает перекрытие чтения
+        Index('idx_updated_at', ('updated_at',),
+              cover=('company_id', 'assignee_id', 'status', 'priority', 'deadline', 'completed_at', 'created_at'),
+              is_async=True),
+    ),
+    partitioning=Partitioning(by_load=True, min_partitions=2, max_partitions=100),
+)
+
+COMMENTS = Table(
+    name='comments',
+    columns=(
+        Column('task_id', 'Uint64'),
+        Column('created_at', 'Datetime'),
+        Column('comment_id', 'Uint64'),
+        Column('user_id', 'Uint64'),
+        Column('comment_text', 'String'),
+    ),
+    # Комментарии задачи лежат рядом и читаются диапазоном в порядке создания
+    primary_key=('task_id', 'created_at', 'comment_id'),
+    partitioning=Partitioning(by_load=True),
+)
+
+FILES = Table(
+    name='files',
+    columns=(
+        Column('file_id', 'Uint64'),
+        Column('task_id', 'Uint64'),
+        Column('user_id', 'Uint64'),
+        Column('file_name', 'String'),
+        Column('file_path', 'String'),
+        Column('file_size', 'Uint64'),
+        Column('mime_type', 'String'),
+        Column('created_at', 'Datetime'),
+    ),
+    primary_key=('file_id',),
+    indexes=(
+        Index('idx_task', ('task_id', 'created_at')),
+    ),
+)
+
+# Счетчики задач по статусам. Значение разнесено по COUNTER_SHARDS строкам
+# (shard = task_id % COUNTER_SHARDS), чтобы одновременные изменения задач одной
+# компании или исполнителя не конфликтовали на одной строке; итог — сумма по shard.
+COMPANY_TASK_COUNTERS = Table(
+    name='company_task_counters',
+    columns=(
+        Column('company_id', 'Uint64'),  # 0 — итог по всем компаниям
+        Column('status', 'String'),
+        Column('shard', 'Uint32'),
+        Column('value', 'Int64'),
+    ),
+    primary_key=('company_id', 'status', 'shard'),
+    partitioning=Partitioning(by_load=True),
+)
+
+ASSIGNEE_TASK_COUNTERS = Table(
+    name='assignee_task_counters',
+    columns=(
+        Column('assignee_id', 'Uint64'),
+        Column('status', 'String'),
+        Column('shard', 'Uint32'),
+        Column('value', 'Int64'),
+    ),
+    primary_key=('assignee_id', 'status', 'shard'),
+    partitioning=Partitioning(by_load=True),
+)
+
+REMINDERS = Table(
+    name='reminders',
+    columns=(
+        Column('bucket', 'Uint64'),
+        Column('task_id', 'Uint64'),
+        Column('remind_at', 'Datetime'),
+        Column('assignee_id', 'Uint64'),
+        Column('deadline', 'Datetime'),
+        Column('claimed_at', 'Datetime'),
+        Column('sent_at', 'Datetime'),
+        Column('expires_at', 'Datetime'),
+    ),
+    # bucket — начало интервала REMINDER_BUCKET_SECONDS (секунды UTC): запуск
+    # читает только наступившие интервалы по префиксу ключа
+    primary_key=('bucket', 'task_id', 'remind_at'),
+    partitioning=Partitioning(by_load=True),
+    ttl=Ttl('expires_at', 'PT0S'),
+)
+
+PROCESSED_UPDATES = Table(
+    name='processed_updates',
+    columns=(
+        Column('update_id', 'Uint64'),
+        Column('processed_at', 'Datetime'),
+        # in_progress — update захвачен экземпляром до lease_until; done (или NULL) — обработан
+        Column('state', 'Utf8'),
+        Column('lease_until', 'Datetime'),
+        Column('owner', 'Utf8'),
+    ),
+    primary_key=('update_id',),
+    # Telegram повторяет доставку не дольше суток
+    ttl=Ttl('processed_at', 'P2D'),
+)
+
+RATE_LIMITS = Table(
+    name='rate_limits',
+    columns=(
+        Column('key', 'String'),
+        Column('window_start', 'Uint64'),
+        Column('hits', 'Uint32'),
+        Column('expires_at', 'Datetime'),
+    ),
+    # Счетчики окна одного ключа лежат рядом; каждое окно — отдельная строка
+    primary_key=('key', 'window_start'),
+    partitioning=Partitioning(by_load=True),
+    ttl=Ttl('expires_at', 'PT0S'),
+)
+
+JOB_STATE = Table(
+    name='job_state',
+    columns=(
+        Column('job', 'String'),
+        Column('watermark', 'Datetime'),
+        Column('processed', 'Uint64'),
+        Column('updated_at', 'Datetime'),
+    ),
+    # Состояние фоновых заданий по таймеру (докуда обработано, итог последнего запуска)
+    primary_key=('job',),
+)
+
+SCHEMA_MIGRATIONS = Table(
+    name='schema_migrations',
+    columns=(
+        Column('version', 'Uint32'),
+        Column('applied_at', 'Datetime'),
+        Column('statements', 'Uint32'),
+    ),
+    primary_key=('version',),
+)
+
+TABLES: Tuple[Table, ...] = (
+    USERS, COMPANIES, TASKS, COMMENTS, FILES, COMPANY_TASK_COUNTERS, ASSIGNEE_TASK_COUNTERS, REMINDERS,
+    PROCESSED_UPDATES, RATE_LIMITS, JOB_STATE, SCHEMA_MIGRATIONS
+)
+
+
+def get_table(name: str) -> Table:
+    """Возвращает описание таблицы по имени"""
+    for table in TABLES:
+        if table.name == name:
+            return table
+    raise KeyError(f"Таблица {name} не описана в схеме")
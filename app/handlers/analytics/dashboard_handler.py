@@ -0,0 +1,147 @@
+"""
+Обработчик панели статистики директора
+
+Количество задач читается из счетчиков (CounterService), поэтому каждый
+экран — ограниченное число точечных запросов независимо от числа задач.
+Компании и исполнители показываются keyset-страницами: читается только
+страница и счетчики ее строк, независимо от числа компаний и пользователей.
+"""
+import logging
+from typing import Dict, Optional
+
+from aiogram import Router, F, html
+from aiogram.types import CallbackQuery
+
+from app.services.counter_service import CounterService
+from app.services.task_service import ALL_STATUSES
+from app.database.models.task_model import STATUS_EMOJIS
+from app.keyboards.main_menu import get_analytics_page_keyboard, get_analytics_keyset_keyboard
+from app.utils.query_budget import query_budget
+from config import config
+
+logger = logging.getLogger(__name__)
+router = Router()
+
+ITEMS_PER_PAGE = 10
+
+
+@router.callback_query(F.data == "analytics:general")
+@query_budget(max_queries=1)
+async def show_general_stats(callback: CallbackQuery, can_view_analytics=None):
+    """
+    Показывает количество задач по статусам во всех компаниях
+    """
+    try:
+        if not can_view_analytics:
+            await callback.answer("❌ Недостаточно прав", show_alert=True)
+            return
+
+        counts = await CounterService().get_totals()
+
+        text = f"📊 Общая статистика\n\nВсего задач: {sum(counts.values())}\n\n"
+        text += "\n".join(
+            f"{STATUS_EMOJIS.get(status, '⚪')} {config.TASK_STATUSES[status]}: {counts.get(status, 0)}"
+            for status in ALL_STATUSES
+        )
+
+        await callback.message.edit_text(text, reply_markup=get_analytics_page_keyboard("analytics:general", 0, 1))
+        await callback.answer()
+
+    except Exception as e:
+        logger.error(f"Ошибка показа общей статистики: {e}")
+        await callback.answer("❌ Произошла ошибка", show_alert=True)
+
+
+@router.callback_query(F.data.startswith("analytics:companies"))
+@query_budget(max_queries=2)
+async def show_companies_stats(callback: CallbackQuery, can_view_analytics=None):
+    """
+    Показывает количество задач по статусам для страницы компаний
+
+    Формат callback: analytics:companies[:<ID последней показанной компании>]
+    """
+    try:
+        if not can_view_analytics:
+            await callback.answer("❌ Недостаточно прав", show_alert=True)
+            return
+
+        after_id = _parse_cursor(callback.data)
+        page = await CounterService().get_company_stats_page(after_id, ITEMS_PER_PAGE)
+
+        text = "🏢 Статистика по компаниям\n"
+        if not page.items:
+            text += "\n📭 Компаний пока нет"
+        for company, counts in page.items:
+            text += f"\n{html.quote(company.name)}\n{_format_counts(counts)}\n"
+
+        await callback.message.edit_text(
+            text,
+            reply_markup=get_analytics_keyset_keyboard(
+                "analytics:companies", _encode_cursor(page.next_after_id), after_id is None
+            )
+        )
+        await callback.answer()
+
+    except ValueError:
+        await callback.answer("❌ Некорректная страница", show_alert=True)
+    except Exception as e:
+        logger.error(f"Ошибка показа статистики компаний: {e}")
+        await callback.answer("❌ Произошла ошибка", show_alert=True)
+
+
+@router.callback_query(F.data.startswith("analytics:executors"))
+@query_budget(max_queries=2)
+async def show_executors_stats(callback: CallbackQuery, can_view_analytics=None):
+    """
+    Показывает количество задач по статусам для страницы исполнителей
+
+    Формат callback: analytics:executors[:<ID последнего показанного исполнителя>]
+    """
+    try:
+        if not can_view_analytics:
+            await callback.answer("❌ Недостаточно прав", show_alert=True)
+            return
+
+        after_id = _parse_cursor(callback.data)
+        page = await CounterService().get_executor_stats_page(after_id, ITEMS_PER_PAGE)
+
+        text = "👥 Статистика по исполнителям\n"
+        if not page.items:
+            text += "\n📭 Исполнителей пока нет"
+        for user, counts in page.items:
+            text += f"\n{html.quote(user.display_name)}\n{_format_counts(counts)}\n"
+
+        await callback.message.edit_text(
+            text,
+            reply_markup=get_analytics_keyset_keyboard(
+                "analytics:executors", _encode_cursor(page.next_after_id), after_id is None
+            )
+        )
+        await callback.answer()
+
+    except ValueError:
+        await callback.answer("❌ Некорректная страница", show_alert=True)
+    except Exception as e:
+        logger.error(f"Ошибка показа статистики исполнителей: {e}")
+        await callback.answer("❌ Произошла ошибка", show_alert=True)
+
+
+def _parse_cursor(data: str) -> Optional[int]:
+    """ID последней показанной строки из callback (без курсора — первая страница)"""
+    parts = data.split(":")
+    return int(parts[2]) if len(parts) > 2 else None
+
+
+def _encode_cursor(after_id: Optional[int]) -> Optional[str]:
+    return str(after_id) if after_id is not None else None
+
+
+def _format_counts(counts: Dict[str, int]) -> str:
+    """Строка количества задач по статусам"""
+    if not any(counts.values()):
+        return "   задач нет"
+    return "   " + "  ".join(
+        f"{STATUS_EMOJIS.get(status, '⚪')} {counts[status]}"
+        for status in ALL_STATUSES
+        if counts.get(status)
+    )
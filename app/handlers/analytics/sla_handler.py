@@ -0,0 +1,116 @@
+"""
+Обработчик отчета о сроках выполнения задач
+
+Отчет считается по снимку задач процесса (AnalyticsService): перед
+показом снимок дочитывает изменения — не больше
+ANALYTICS_REFRESH_MAX_PAGES запросов, остальное дочитает следующий показ
+или задание по таймеру.
+"""
+import logging
+from typing import List, Optional, Tuple
+
+from aiogram import Router, F
+from aiogram.types import CallbackQuery, InlineKeyboardButton
+
+from app.services.analytics_service import AnalyticsService, SlaStats, WeekStats
+from app.keyboards.main_menu import get_analytics_page_keyboard
+from app.utils.query_budget import query_budget
+from config import config
+
+logger = logging.getLogger(__name__)
+router = Router()
+
+TOP_GROUPS = 10
+TREND_WEEKS = 4
+
+# Обновление снимка и один запрос названий компаний (имен исполнителей)
+SLA_BUDGET = dict(
+    max_queries=config.ANALYTICS_REFRESH_MAX_PAGES + 1,
+    max_repeats=config.ANALYTICS_REFRESH_MAX_PAGES
+)
+
+
+@router.callback_query(F.data.in_({"analytics:sla", "analytics:sla:executors"}))
+@query_budget(**SLA_BUDGET)
+async def show_sla_report(callback: CallbackQuery, can_view_analytics=None):
+    """
+    Показывает сроки выполнения: общие, по неделям и по компаниям или исполнителям
+    """
+    try:
+        if not can_view_analytics:
+            await callback.answer("❌ Недостаточно прав", show_alert=True)
+            return
+
+        by_executors = callback.data == "analytics:sla:executors"
+
+        analytics_service = AnalyticsService()
+        await analytics_service.refresh(max_pages=config.ANALYTICS_REFRESH_MAX_PAGES)
+
+        overall = analytics_service.get_sla()
+        trend = analytics_service.get_weekly_trend(TREND_WEEKS)
+        if by_executors:
+            groups = await analytics_service.get_executor_sla(TOP_GROUPS)
+        else:
+            groups = await analytics_service.get_company_sla(TOP_GROUPS)
+
+        text = _format_report(overall[0] if overall else None, trend, groups, by_executors)
+        actual_at = analytics_service.actual_at
+        if actual_at:
+            text += f"\n\nДанные на {actual_at.strftime('%d.%m.%Y %H:%M')} UTC"
+
+        keyboard = get_analytics_page_keyboard("analytics:sla", 0, 1)
+        keyboard.inline_keyboard.insert(0, [
+            InlineKeyboardButton(text="🏢 По компаниям", callback_data="analytics:sla")
+            if by_executors else
+            InlineKeyboardButton(text="👥 По исполнителям", callback_data="analytics:sla:executors")
+        ])
+
+        await callback.message.edit_text(text, reply_markup=keyboard)
+        await callback.answer()
+
+    except Exception as e:
+        logger.error(f"Ошибка показа сроков выполнения: {e}")
+        await callback.answer("❌ Произошла ошибка", show_alert=True)
+
+
+def _format_report(
+    overall: Optional[SlaStats],
+    trend: List[WeekStats],
+    groups: List[Tuple[str, SlaStats]],
+    by_executors: bool
+) -> str:
+    """Текст отчета"""
+    text = "⏱ Сроки выполнения\n\n"
+    if overall is None:
+        return text + "📭 Задач пока нет"
+
+    text += f"Всего задач: {overall.total}, выполнено: {overall.completed}\n{_format_stats(overall)}\n"
+
+    text += "\n📅 По неделям (создано / выполнено / после срока, медиана):\n"
+    for week in trend:
+        text += (
+            f"{week.week_start.strftime('%d.%m')}: {week.created} / {week.completed} / {week.late}, "
+            f"{_format_hours(week.median_hours)}\n"
+        )
+
+    text += f"\n{'👥 Исполнители' if by_executors else '🏢 Компании'} с наибольшим числом задач:\n"
+    for name, stats in groups:
+        text += f"\n{name} — {stats.total} задач\n{_format_stats(stats)}\n"
+    return text.rstrip()
+
+
+def _format_stats(stats: SlaStats) -> str:
+    """Медиана, 95-й перцентиль и доля просрочки"""
+    overdue = f"{stats.overdue_ratio:.0%}" if stats.overdue_ratio is not None else "—"
+    return (
+        f"   медиана {_format_hours(stats.median_hours)}, 95% {_format_hours(stats.p95_hours)}, "
+        f"просрочено {overdue}"
+    )
+
+
+def _format_hours(hours: Optional[float]) -> str:
+    if hours is None:
+        return "—"
+    if hours >= 48:
+        return f"{hours / 24:.1f} дн"
+    return f"{hours:.1f} ч"
@@ -10,6 +10,7 @@ from aiogram.fsm.state import State, StatesGroup
 from app.services.auth_service import AuthService
 from app.keyboards.common_keyboards import get_pagination_keyboard, get_confirmation_keyboard, get_cancel_keyboard
 from app.keyboards.main_menu import get_main_menu_keyboard
+from app.utils.query_budget import query_budget
 from config import config
 
 logger = logging.getLogger(__name__)
@@ -24,6 +25,7 @@ class RoleAssignmentStates(StatesGroup):
 
 
 @router.callback_query(F.data == "roles:list_users")
+@query_budget(max_queries=1)
 async def show_users_list(callback: CallbackQuery, current_user=None, user_role=None):
     """
     Показывает список всех пользователей (только для директора)
@@ -87,6 +89,7 @@ async def show_users_list(callback: CallbackQuery, current_user=None, user_role=
 
 
 @router.callback_query(F.data == "roles:assign")
+@query_budget(max_queries=1)
 async def start_role_assignment(callback: CallbackQuery, state: FSMContext, current_user=None, user_role=None):
     """
     Начинает процесс назначения роли
@@ -122,6 +125,7 @@ async def start_role_assignment(callback: CallbackQuery, state: FSMContext, curr
 
 
 @router.callback_query(F.data.startswith("assign_role_user:"))
+@query_budget(max_queries=1)
 async def select_user_for_role_assignment(callback: CallbackQuery, state: FSMContext):
     """
     Выбирает пользователя для назначения роли
@@ -207,6 +211,7 @@ async def select_new_role(callback: CallbackQuery, state: FSMContext):
 
 
 @router.callback_query(F.data == "confirm_role_assignment")
+@query_budget(max_queries=2)
 async def confirm_role_assignment(callback: CallbackQuery, state: FSMContext, current_user=None):
     """
     Подтверждает назначение роли
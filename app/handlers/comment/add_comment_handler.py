@@ -0,0 +1,220 @@
+"""
+Обработчик комментариев к задачам: просмотр страницами и добавление
+"""
+import logging
+from typing import Optional
+
+from aiogram import Router, F, html
+from aiogram.fsm.context import FSMContext
+from aiogram.types import CallbackQuery, Message, InlineKeyboardMarkup, InlineKeyboardButton
+
+from app.database.models.task_model import Task
+from app.services.comment_service import CommentService, CommentCursor, CommentPage
+from app.services.task_service import TaskService
+from app.states.comment_states import CommentStates
+from app.keyboards.task_keyboards import get_comments_keyboard
+from app.utils.query_budget import query_budget
+from config import config
+
+logger = logging.getLogger(__name__)
+router = Router()
+
+# Задача (проверка доступа) и страница комментариев с авторами; если новее
+# курсора ничего нет, дочитывается страница самых новых
+COMMENTS_BUDGET = dict(max_queries=3, max_rows=2 * config.COMMENTS_PAGE_SIZE + 3)
+
+
+@router.callback_query(F.data.startswith("comments:"))
+@query_budget(**COMMENTS_BUDGET)
+async def show_comments(callback: CallbackQuery, current_user=None, can_create_tasks=None):
+    """
+    Показывает страницу комментариев задачи
+
+    Формат callback: comments:<ID задачи>[:older|newer:<курсор>]
+    """
+    try:
+        if not current_user:
+            await callback.answer("❌ Пользователь не авторизован", show_alert=True)
+            return
+
+        parts = callback.data.split(":", 3)
+        task_id = int(parts[1])
+        older_than = newer_than = None
+        if len(parts) == 4:
+            cursor = CommentCursor.decode(parts[3])
+            if parts[2] == "older":
+                older_than = cursor
+            elif parts[2] == "newer":
+                newer_than = cursor
+            else:
+                raise ValueError(f"Неизвестное направление: {parts[2]}")
+
+        await show_comments_page(callback, task_id, older_than, newer_than, current_user, can_create_tasks)
+
+    except ValueError:
+        await callback.answer("❌ Некорректная страница комментариев", show_alert=True)
+    except Exception as e:
+        logger.error(f"Ошибка показа комментариев: {e}")
+        await callback.answer("❌ Произошла ошибка", show_alert=True)
+
+
+@router.callback_query(F.data.startswith("comment_add:"))
+@query_budget(max_queries=1)
+async def start_comment(callback: CallbackQuery, state: FSMContext, current_user=None, can_create_tasks=None):
+    """
+    Запрашивает текст комментария
+    """
+    try:
+        if not current_user:
+            await callback.answer("❌ Пользователь не авторизован", show_alert=True)
+            return
+
+        task_id = int(callback.data.split(":")[1])
+        task = await _get_accessible_task(task_id, current_user, can_create_tasks)
+        if not task:
+            await callback.answer("❌ Задача не найдена", show_alert=True)
+            return
+
+        await state.set_state(CommentStates.waiting_for_text)
+        await state.update_data(comment_task_id=task_id)
+
+        await callback.message.edit_text(
+            f"✍️ Комментарий к задаче #{task.task_id}\n"
+            f"📝 {html.quote(task.title)}\n\n"
+            f"Отправьте текст комментария (до {config.COMMENT_MAX_LENGTH} символов):",
+            reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text="❌ Отменить", callback_data=f"comment_cancel:{task_id}")]
+            ])
+        )
+        await callback.answer()
+
+    except ValueError:
+        await callback.answer("❌ Некорректный ID задачи", show_alert=True)
+    except Exception as e:
+        logger.error(f"Ошибка начала добавления комментария: {e}")
+        await callback.answer("❌ Произошла ошибка", show_alert=True)
+
+
+@router.message(CommentStates.waiting_for_text)
+@query_budget(max_queries=3, max_rows=config.COMMENTS_PAGE_SIZE + 3)
+async def process_comment_text(message: Message, state: FSMContext, current_user=None, can_create_tasks=None):
+    """
+    Сохраняет комментарий и показывает самые новые комментарии задачи
+    """
+    try:
+        if not current_user:
+            await state.clear()
+            return
+
+        comment_service = CommentService()
+        if not comment_service.validate_comment_text(message.text):
+            await message.answer(
+                f"❌ Отправьте текст комментария до {config.COMMENT_MAX_LENGTH} символов:"
+            )
+            return
+
+        task_id = (await state.get_data()).get('comment_task_id')
+        task = await _get_accessible_task(task_id, current_user, can_create_tasks) if task_id else None
+        await state.clear()
+        if not task:
+            await message.answer("❌ Задача не найдена")
+            return
+
+        comment = await comment_service.add_comment(task_id, current_user.user_id, message.text)
+        if not comment:
+            await message.answer("❌ Задача не найдена")
+            return
+
+        task.comment_count += 1
+        task.last_comment_at = comment.created_at
+        page = await comment_service.get_page(task_id)
+        text, keyboard = _render_page(task, page)
+
+        await message.answer(f"✅ Комментарий добавлен\n\n{text}", reply_markup=keyboard)
+
+    except Exception as e:
+        logger.error(f"Ошибка добавления комментария: {e}")
+        await message.answer("❌ Не удалось добавить комментарий, попробуйте позже")
+
+
+@router.callback_query(F.data.startswith("comment_cancel:"))
+@query_budget(max_queries=2, max_rows=config.COMMENTS_PAGE_SIZE + 2)
+async def cancel_comment(callback: CallbackQuery, state: FSMContext, current_user=None, can_create_tasks=None):
+    """
+    Отменяет добавление комментария и возвращает к комментариям задачи
+    """
+    try:
+        await state.clear()
+        if not current_user:
+            await callback.answer("Операция отменена")
+            return
+
+        task_id = int(callback.data.split(":")[1])
+        await show_comments_page(callback, task_id, None, None, current_user, can_create_tasks)
+
+    except ValueError:
+        await callback.answer("❌ Некорректный ID задачи", show_alert=True)
+    except Exception as e:
+        logger.error(f"Ошибка отмены комментария: {e}")
+        await callback.answer("❌ Произошла ошибка", show_alert=True)
+
+
+async def show_comments_page(
+    callback: CallbackQuery,
+    task_id: int,
+    older_than: Optional[CommentCursor],
+    newer_than: Optional[CommentCursor],
+    current_user,
+    can_create_tasks: Optional[bool]
+):
+    """
+    Показывает страницу комментариев задачи в сообщении callback
+
+    Args:
+        callback: Callback query
+        task_id: ID задачи
+        older_than: Показать комментарии старее курсора
+        newer_than: Показать комментарии новее курсора
+        current_user: Текущий пользователь
+        can_create_tasks: Пользователь видит все задачи
+    """
+    task = await _get_accessible_task(task_id, current_user, can_create_tasks)
+    if not task:
+        await callback.answer("❌ Задача не найдена", show_alert=True)
+        return
+
+    page = await CommentService().get_page(task_id, older_than, newer_than)
+    text, keyboard = _render_page(task, page)
+
+    await callback.message.edit_text(text, reply_markup=keyboard)
+    await callback.answer()
+
+
+async def _get_accessible_task(task_id: int, current_user, can_create_tasks: Optional[bool]) -> Optional[Task]:
+    """Задача, если пользователь может ее видеть: руководители — любые, исполнители — свои"""
+    task = await TaskService().get_task_by_id(task_id)
+    if not task or (not can_create_tasks and task.assignee_id != current_user.user_id):
+        return None
+    return task
+
+
+def _render_page(task: Task, page: CommentPage):
+    """Текст и клавиатура страницы комментариев"""
+    text = f"💬 Комментарии к задаче #{task.task_id}: {task.comment_count}\n📝 {html.quote(task.title)}\n"
+
+    if not page.items:
+        text += "\n📭 Комментариев пока нет"
+    for comment in page.items:
+        author = comment.author_name or str(comment.user_id)
+        text += (
+            f"\n👤 {html.quote(author)} · {comment.created_at.strftime('%d.%m.%Y %H:%M')}\n"
+            f"{html.quote(comment.short_text)}\n"
+        )
+
+    prefix = f"comments:{task.task_id}"
+    keyboard = get_comments_keyboard(
+        task.task_id,
+        f"{prefix}:older:{page.older_cursor.encode()}" if page.older_cursor else None,
+        f"{prefix}:newer:{page.newer_cursor.encode()}" if page.newer_cursor else None
+    )
+    return text.rstrip(), keyboard
@@ -6,6 +6,9 @@ from aiogram import Router
 from aiogram.types import ErrorEvent, Message
 from aiogram.filters import ExceptionTypeFilter
 
+from app.utils.query_budget import QueryBudgetExceeded
+from app.utils.request_stats import record_handler_error
+
 logger = logging.getLogger(__name__)
 router = Router()
 
@@ -21,6 +24,13 @@ async def handle_error(error_event: ErrorEvent):
     exception = error_event.exception
     update = error_event.update
     
+    # В строгом режиме превышение бюджета запросов должно дойти до теста
+    if isinstance(exception, QueryBudgetExceeded):
+        raise exception
+    
+    # Исключение не дойдет до вызывающего кода: отмечаем его в статистике update
+    record_handler_error(exception)
+    
     # Логируем ошибку
     logger.error(
         f"Произошла ошибка: {type(exception).__name__}: {exception}",
@@ -7,6 +7,7 @@ from aiogram.types import Message
 from aiogram.filters import Command
 
 from app.keyboards.main_menu import get_main_menu_keyboard
+from app.services.inbox_service import InboxService
 
 logger = logging.getLogger(__name__)
 router = Router()
@@ -32,9 +33,10 @@ async def help_command(message: Message, current_user=None, user_role=None):
         
         help_text = get_help_text_for_role(user_role)
         
+        # Счетчики задач — только уже известные процессу, без запроса к БД
         await message.answer(
             help_text,
-            reply_markup=get_main_menu_keyboard(user_role)
+            reply_markup=get_main_menu_keyboard(user_role, InboxService().peek(current_user.user_id))
         )
         
     except Exception as e:
@@ -2,21 +2,23 @@
 Обработчик главного меню
 """
 import logging
+from typing import Optional
+
 from aiogram import Router, F
 from aiogram.types import CallbackQuery
 
-from app.keyboards.main_menu import (
-    get_main_menu_keyboard,
-    get_companies_menu_keyboard,
-    get_tasks_menu_keyboard,
-    get_analytics_menu_keyboard
-)
+from app.database.models.inbox_model import InboxCounts
+from app.services.inbox_service import InboxService
+from app.utils.query_budget import query_budget
+from app.utils.render_cache import render_screen
 
 logger = logging.getLogger(__name__)
 router = Router()
 
 
+# Счетчики задач исполнителя читаются, только если их нет в кеше процесса
 @router.callback_query(F.data.startswith("menu:"))
+@query_budget(max_queries=1)
 async def handle_menu_navigation(callback: CallbackQuery, current_user=None, user_role=None):
     """
     Обработчик навигации по меню
@@ -32,14 +34,18 @@ async def handle_menu_navigation(callback: CallbackQuery, current_user=None, use
             return
         
         action = callback.data.split(":")[1]
+        inbox_service = InboxService()
+        is_executor = user_role in ['chief_admin', 'sysadmin']
         
         if action == "main":
             # Главное меню
-            await callback.message.edit_text(
+            inbox = await inbox_service.get_counts(current_user.user_id) if is_executor else None
+            await render_screen(
+                callback,
                 f"🏠 Главное меню\n\n"
                 f"Добро пожаловать, {current_user.first_name}!\n"
                 f"Выберите нужное действие:",
-                reply_markup=get_main_menu_keyboard(user_role)
+                'main', user_role, inbox
             )
         
         elif action == "companies":
@@ -48,10 +54,11 @@ async def handle_menu_navigation(callback: CallbackQuery, current_user=None, use
                 await callback.answer("❌ Недостаточно прав", show_alert=True)
                 return
             
-            await callback.message.edit_text(
+            await render_screen(
+                callback,
                 "🏢 Управление компаниями\n\n"
                 "Выберите действие:",
-                reply_markup=get_companies_menu_keyboard()
+                'companies', user_role
             )
         
         elif action == "tasks":
@@ -60,22 +67,29 @@ async def handle_menu_navigation(callback: CallbackQuery, current_user=None, use
                 await callback.answer("❌ Недостаточно прав", show_alert=True)
                 return
             
-            await callback.message.edit_text(
+            await render_screen(
+                callback,
                 "📋 Управление задачами\n\n"
                 "Выберите действие:",
-                reply_markup=get_tasks_menu_keyboard(user_role)
+                'tasks', user_role
             )
         
         elif action == "my_tasks":
             # Мои задачи (для исполнителей)
-            if user_role not in ['chief_admin', 'sysadmin']:
+            if not is_executor:
                 await callback.answer("❌ Недостаточно прав", show_alert=True)
                 return
             
-            await callback.message.edit_text(
-                "📋 Мои задачи\n\n"
-                "Выберите действие:",
-                reply_markup=get_tasks_menu_keyboard(user_role)
+            inbox = await inbox_service.get_counts(current_user.user_id)
+            summary = (
+                f"Открыто: {inbox.open}, новых: {inbox.new}, просрочено: {inbox.overdue}\n\n" if inbox else ""
+            )
+            await render_screen(
+                callback,
+                f"📋 Мои задачи\n\n"
+                f"{summary}"
+                f"Выберите действие:",
+                'tasks', user_role
             )
         
         elif action == "analytics":
@@ -84,10 +98,11 @@ async def handle_menu_navigation(callback: CallbackQuery, current_user=None, use
                 await callback.answer("❌ Недостаточно прав", show_alert=True)
                 return
             
-            await callback.message.edit_text(
+            await render_screen(
+                callback,
                 "📊 Аналитика и отчеты\n\n"
                 "Выберите тип отчета:",
-                reply_markup=get_analytics_menu_keyboard()
+                'analytics', user_role
             )
         
         elif action == "roles":
@@ -100,19 +115,22 @@ async def handle_menu_navigation(callback: CallbackQuery, current_user=None, use
         
         elif action == "comments":
             # Комментарии (для исполнителей)
-            if user_role not in ['chief_admin', 'sysadmin']:
+            if not is_executor:
                 await callback.answer("❌ Недостаточно прав", show_alert=True)
                 return
             
-            await callback.message.edit_text(
+            await render_screen(
+                callback,
                 "📝 Работа с комментариями\n\n"
-                "Здесь вы можете добавлять комментарии к задачам.",
-                reply_markup=get_main_menu_keyboard(user_role)
+                "Откройте задачу в «📋 Мои задачи» и нажмите «💬 Комментарии», "
+                "чтобы прочитать или добавить комментарий.",
+                'main', user_role, inbox_service.peek(current_user.user_id)
             )
         
         elif action == "help":
             # Помощь
-            await show_help_menu(callback, user_role)
+            inbox = inbox_service.peek(current_user.user_id) if is_executor else None
+            await show_help_menu(callback, user_role, inbox)
         
         else:
             await callback.answer("❌ Неизвестное действие", show_alert=True)
@@ -127,30 +145,20 @@ async def handle_menu_navigation(callback: CallbackQuery, current_user=None, use
 
 async def show_roles_menu(callback: CallbackQuery):
     """Показывает меню управления ролями"""
-    from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-    
-    keyboard = [
-        [InlineKeyboardButton(text="👥 Список пользователей", callback_data="roles:list_users")],
-        [InlineKeyboardButton(text="🎭 Назначить роль", callback_data="roles:assign")],
-        [InlineKeyboardButton(text="🔙 Главное меню", callback_data="menu:main")]
-    ]
-    
-    await callback.message.edit_text(
+    await render_screen(
+        callback,
         "👥 Управление ролями\n\n"
         "Здесь вы можете управлять ролями пользователей.\n"
         "Выберите действие:",
-        reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
+        'roles', 'director'
     )
 
 
-async def show_help_menu(callback: CallbackQuery, user_role: str):
-    """Показывает меню помощи"""
+async def show_help_menu(callback: CallbackQuery, user_role: str, inbox: Optional[InboxCounts] = None):
+    """Показывает меню помощи (счетчики задач — только уже известные, без запроса)"""
     help_text = get_help_text(user_role)
     
-    await callback.message.edit_text(
-        help_text,
-        reply_markup=get_main_menu_keyboard(user_role)
-    )
+    await render_screen(callback, help_text, 'main', user_role, inbox)
 
 
 def get_help_text(user_role: str) -> str:
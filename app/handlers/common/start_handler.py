@@ -7,6 +7,7 @@ from aiogram.types import Message
 from aiogram.filters import CommandStart
 
 from app.services.auth_service import AuthService
+from app.services.inbox_service import InboxService
 from app.keyboards.main_menu import get_main_menu_keyboard
 from config import config
 
@@ -27,11 +28,15 @@ async def start_command(message: Message, current_user=None, telegram_user=None)
     try:
         if current_user:
             # Пользователь уже зарегистрирован
+            inbox = None
+            if current_user.role in ['chief_admin', 'sysadmin']:
+                inbox = await InboxService().get_counts(current_user.user_id)
+            
             await message.answer(
                 f"🎉 Добро пожаловать, {current_user.first_name}!\n\n"
                 f"👤 Ваша роль: {config.ROLES.get(current_user.role, current_user.role)}\n\n"
                 f"Выберите действие:",
-                reply_markup=get_main_menu_keyboard(current_user.role)
+                reply_markup=get_main_menu_keyboard(current_user.role, inbox)
             )
         else:
             # Новый пользователь - начинаем регистрацию
@@ -10,6 +10,7 @@ from app.services.company_service import CompanyService
 from app.states.company_states import CompanyCreationStates
 from app.keyboards.main_menu import get_companies_menu_keyboard, get_back_to_main_keyboard
 from app.keyboards.common_keyboards import get_confirmation_keyboard, get_cancel_keyboard
+from app.utils.query_budget import query_budget
 
 logger = logging.getLogger(__name__)
 router = Router()
@@ -42,6 +43,7 @@ async def start_company_creation(callback: CallbackQuery, state: FSMContext, cur
 
 
 @router.message(CompanyCreationStates.waiting_for_name)
+@query_budget(max_queries=1)
 async def process_company_name(message: Message, state: FSMContext, current_user=None):
     """
     Обрабатывает ввод названия компании
@@ -148,6 +150,7 @@ async def process_company_description(message: Message, state: FSMContext, curre
 
 
 @router.callback_query(F.data == "confirm_company_creation")
+@query_budget(max_queries=3)
 async def confirm_company_creation(callback: CallbackQuery, state: FSMContext, current_user=None):
     """
     Подтверждает создание компании
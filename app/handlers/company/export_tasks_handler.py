@@ -0,0 +1,128 @@
+"""
+Обработчик выгрузки задач компании в CSV/XLSX
+"""
+import logging
+import time
+from datetime import datetime, timedelta
+
+from aiogram import Router, F
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import CallbackQuery
+
+from app.services.company_service import CompanyService
+from app.services.export_service import ExportService, ENCODERS
+from app.services.task_service import ALL_STATUSES
+from app.keyboards.main_menu import get_export_keyboard
+from app.utils.query_budget import query_budget
+from config import config
+
+logger = logging.getLogger(__name__)
+router = Router()
+
+# Компания, по странице задач на статус до EXPORT_MAX_ROWS и по запросу имен исполнителей на страницу
+EXPORT_PAGES = config.EXPORT_MAX_ROWS // config.EXPORT_CHUNK_SIZE + len(ALL_STATUSES)
+EXPORT_BUDGET = dict(max_queries=2 * EXPORT_PAGES + 1, max_repeats=EXPORT_PAGES)
+
+
+@router.callback_query(F.data.startswith("export:"))
+@query_budget(max_queries=1)
+async def choose_export(callback: CallbackQuery, can_create_companies=None):
+    """
+    Показывает выбор периода и формата выгрузки
+    """
+    try:
+        if not can_create_companies:
+            await callback.answer("❌ Недостаточно прав", show_alert=True)
+            return
+
+        company_id = int(callback.data.split(":")[1])
+        company = await CompanyService().get_company_by_id(company_id)
+        if not company:
+            await callback.answer("❌ Компания не найдена", show_alert=True)
+            return
+
+        await callback.message.edit_text(
+            f"📥 Выгрузка задач компании «{company.name}»\n\n"
+            f"Выберите период (по дате создания задачи) и формат:",
+            reply_markup=get_export_keyboard(company_id)
+        )
+        await callback.answer()
+
+    except ValueError:
+        await callback.answer("❌ Некорректный ID компании", show_alert=True)
+    except Exception as e:
+        logger.error(f"Ошибка выбора выгрузки: {e}")
+        await callback.answer("❌ Произошла ошибка", show_alert=True)
+
+
+@router.callback_query(F.data.startswith("export_run:"))
+@query_budget(**EXPORT_BUDGET)
+async def run_export(callback: CallbackQuery, can_create_companies=None):
+    """
+    Выгружает задачи компании и отправляет файл документом
+
+    Формат callback: export_run:<ID компании>:<дней, 0 — все время>:<csv|xlsx>
+    """
+    try:
+        if not can_create_companies:
+            await callback.answer("❌ Недостаточно прав", show_alert=True)
+            return
+
+        _, company_id, days, file_format = callback.data.split(":")
+        company_id, days = int(company_id), int(days)
+        if file_format not in ENCODERS:
+            raise ValueError(f"Неизвестный формат выгрузки: {file_format}")
+
+        company = await CompanyService().get_company_by_id(company_id)
+        if not company:
+            await callback.answer("❌ Компания не найдена", show_alert=True)
+            return
+
+    except ValueError:
+        await callback.answer("❌ Некорректный запрос выгрузки", show_alert=True)
+        return
+    except Exception as e:
+        logger.error(f"Ошибка запуска выгрузки: {e}")
+        await callback.answer("❌ Произошла ошибка", show_alert=True)
+        return
+
+    await callback.answer("⏳ Готовлю выгрузку")
+    status_message = await callback.message.answer(f"⏳ Выгрузка задач «{company.name}»…")
+    last_edit = time.monotonic()
+
+    async def report_progress(rows: int) -> None:
+        nonlocal last_edit
+        if time.monotonic() - last_edit < config.EXPORT_PROGRESS_INTERVAL:
+            return
+        last_edit = time.monotonic()
+        try:
+            await status_message.edit_text(f"⏳ Выгрузка задач «{company.name}»: {rows}…")
+        except TelegramBadRequest:
+            pass
+
+    now = datetime.utcnow()
+    created_from = now - timedelta(days=days) if days else None
+
+    try:
+        result = await ExportService().export_company_tasks(
+            company_id, created_from, now, file_format, report_progress
+        )
+    except Exception as e:
+        logger.error(f"Ошибка выгрузки задач компании {company_id}: {e}")
+        await status_message.edit_text("❌ Не удалось подготовить выгрузку, попробуйте позже")
+        return
+
+    try:
+        period = f"за {days} дн." if days else "за все время"
+        caption = f"📥 Задачи «{company.name}» {period}: {result.rows}"
+        if result.truncated:
+            caption += f"\n⚠️ Выгружены первые {config.EXPORT_MAX_ROWS} задач, выберите период короче"
+
+        await callback.message.answer_document(result.document, caption=caption)
+        await status_message.edit_text(f"✅ Выгрузка готова: {result.rows} задач")
+
+    except Exception as e:
+        logger.error(f"Ошибка отправки выгрузки компании {company_id}: {e}")
+        await status_message.edit_text("❌ Не удалось отправить файл выгрузки")
+    finally:
+        await result.close()
@@ -8,12 +8,14 @@ from aiogram.types import CallbackQuery
 from app.services.company_service import CompanyService
 from app.keyboards.common_keyboards import get_pagination_keyboard
 from app.keyboards.main_menu import get_companies_menu_keyboard, get_back_to_main_keyboard
+from app.utils.query_budget import query_budget
 
 logger = logging.getLogger(__name__)
 router = Router()
 
 
 @router.callback_query(F.data == "company:list")
+@query_budget(max_queries=1)
 async def show_companies_list(callback: CallbackQuery, current_user=None, can_create_companies=None):
     """
     Показывает список всех компаний
@@ -31,6 +33,7 @@ async def show_companies_list(callback: CallbackQuery, current_user=None, can_cr
 
 
 @router.callback_query(F.data.startswith("page:company_list:"))
+@query_budget(max_queries=1)
 async def handle_companies_pagination(callback: CallbackQuery):
     """
     Обрабатывает пагинацию списка компаний
@@ -45,6 +48,7 @@ async def handle_companies_pagination(callback: CallbackQuery):
 
 
 @router.callback_query(F.data.startswith("company_details:"))
+@query_budget(max_queries=2)
 async def show_company_details(callback: CallbackQuery, current_user=None):
     """
     Показывает детали компании
@@ -87,6 +91,7 @@ async def show_company_details(callback: CallbackQuery, current_user=None):
         
         keyboard = [
             [InlineKeyboardButton(text="📋 Задачи компании", callback_data=f"company_tasks:{company_id}")],
+            [InlineKeyboardButton(text="📥 Выгрузка задач", callback_data=f"export:{company_id}")],
             [InlineKeyboardButton(text="📝 Редактировать", callback_data=f"company_edit:{company_id}")],
             [InlineKeyboardButton(text="🔙 К списку", callback_data="company:list")]
         ]
@@ -0,0 +1,211 @@
+"""
+Обработчик файлов задач: список и прикрепление
+"""
+import asyncio
+import logging
+from typing import Optional
+
+from aiogram import Router, F, html
+from aiogram.fsm.context import FSMContext
+from aiogram.types import CallbackQuery, Message, InlineKeyboardMarkup, InlineKeyboardButton
+
+from app.database.models.task_model import Task
+from app.services.file_service import FileService, FileRejected, Attachment, FILES_LIST_LIMIT, max_upload_size
+from app.services.task_service import TaskService
+from app.states.file_states import FileStates
+from app.utils.query_budget import query_budget
+from config import config
+
+logger = logging.getLogger(__name__)
+router = Router()
+
+# Задача (проверка доступа) и файлы задачи
+FILES_BUDGET = dict(max_queries=2, max_rows=FILES_LIST_LIMIT + 1)
+
+
+@router.callback_query(F.data.startswith("files:"))
+@query_budget(**FILES_BUDGET)
+async def show_files(callback: CallbackQuery, current_user=None, can_create_tasks=None):
+    """
+    Показывает файлы задачи со ссылками на скачивание
+
+    Формат callback: files:<ID задачи>
+    """
+    try:
+        if not current_user:
+            await callback.answer("❌ Пользователь не авторизован", show_alert=True)
+            return
+
+        task_id = int(callback.data.split(":")[1])
+        await show_files_page(callback, task_id, current_user, can_create_tasks)
+
+    except ValueError:
+        await callback.answer("❌ Некорректный ID задачи", show_alert=True)
+    except Exception as e:
+        logger.error(f"Ошибка показа файлов: {e}")
+        await callback.answer("❌ Произошла ошибка", show_alert=True)
+
+
+@router.callback_query(F.data.startswith("file_upload:"))
+@query_budget(max_queries=1)
+async def start_upload(callback: CallbackQuery, state: FSMContext, current_user=None, can_create_tasks=None):
+    """
+    Запрашивает файл для прикрепления к задаче
+    """
+    try:
+        if not current_user:
+            await callback.answer("❌ Пользователь не авторизован", show_alert=True)
+            return
+
+        task_id = int(callback.data.split(":")[1])
+        task = await _get_accessible_task(task_id, current_user, can_create_tasks)
+        if not task:
+            await callback.answer("❌ Задача не найдена", show_alert=True)
+            return
+
+        await state.set_state(FileStates.waiting_for_file)
+        await state.update_data(file_task_id=task_id)
+
+        await callback.message.edit_text(
+            f"📎 Файл к задаче #{task.task_id}\n"
+            f"📝 {html.quote(task.title)}\n\n"
+            f"Отправьте документ или фото до {max_upload_size() // (1024 * 1024)} МБ.\n"
+            f"Допустимые типы: {', '.join(config.ALLOWED_FILE_TYPES)}",
+            reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text="❌ Отменить", callback_data=f"file_cancel:{task_id}")]
+            ])
+        )
+        await callback.answer()
+
+    except ValueError:
+        await callback.answer("❌ Некорректный ID задачи", show_alert=True)
+    except Exception as e:
+        logger.error(f"Ошибка начала загрузки файла: {e}")
+        await callback.answer("❌ Произошла ошибка", show_alert=True)
+
+
+@router.message(FileStates.waiting_for_file)
+@query_budget(max_queries=2)
+async def process_file(message: Message, state: FSMContext, current_user=None, can_create_tasks=None):
+    """
+    Проверяет файл по метаданным и загружает его в хранилище
+    """
+    try:
+        if not current_user:
+            await state.clear()
+            return
+
+        attachment = Attachment.from_message(message)
+        if not attachment:
+            await message.answer("❌ Отправьте документ или фото:")
+            return
+
+        file_service = FileService()
+        try:
+            file_service.check_attachment(attachment)
+        except FileRejected as e:
+            await message.answer(f"❌ {e}\n\nОтправьте другой файл:")
+            return
+
+        task_id = (await state.get_data()).get('file_task_id')
+        task = await _get_accessible_task(task_id, current_user, can_create_tasks) if task_id else None
+        await state.clear()
+        if not task:
+            await message.answer("❌ Задача не найдена")
+            return
+
+        status_message = await message.answer(f"⏳ Загружаю {html.quote(attachment.file_name)}...")
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="📎 Файлы задачи", callback_data=f"files:{task_id}")],
+            [InlineKeyboardButton(text="🔙 К задаче", callback_data=f"task_details:{task_id}")]
+        ])
+
+        try:
+            task_file = await file_service.upload(message.bot, task_id, current_user.user_id, attachment)
+        except FileRejected as e:
+            await status_message.edit_text(f"❌ {e}", reply_markup=keyboard)
+            return
+        except Exception as e:
+            logger.error(f"Ошибка загрузки файла к задаче {task_id}: {e}")
+            await status_message.edit_text("❌ Не удалось загрузить файл, попробуйте позже", reply_markup=keyboard)
+            return
+
+        await status_message.edit_text(
+            f"✅ Файл {html.quote(task_file.file_name)} ({task_file.size_human_readable}) "
+            f"прикреплен к задаче #{task_id}",
+            reply_markup=keyboard
+        )
+
+    except Exception as e:
+        logger.error(f"Ошибка обработки файла: {e}")
+        await message.answer("❌ Произошла ошибка")
+
+
+@router.callback_query(F.data.startswith("file_cancel:"))
+@query_budget(**FILES_BUDGET)
+async def cancel_upload(callback: CallbackQuery, state: FSMContext, current_user=None, can_create_tasks=None):
+    """
+    Отменяет прикрепление файла и возвращает к файлам задачи
+    """
+    try:
+        await state.clear()
+        if not current_user:
+            await callback.answer("Операция отменена")
+            return
+
+        task_id = int(callback.data.split(":")[1])
+        await show_files_page(callback, task_id, current_user, can_create_tasks)
+
+    except ValueError:
+        await callback.answer("❌ Некорректный ID задачи", show_alert=True)
+    except Exception as e:
+        logger.error(f"Ошибка отмены загрузки файла: {e}")
+        await callback.answer("❌ Произошла ошибка", show_alert=True)
+
+
+async def show_files_page(callback: CallbackQuery, task_id: int, current_user, can_create_tasks: Optional[bool]):
+    """
+    Показывает файлы задачи в сообщении callback
+
+    Args:
+        callback: Callback query
+        task_id: ID задачи
+        current_user: Текущий пользователь
+        can_create_tasks: Пользователь видит все задачи
+    """
+    task = await _get_accessible_task(task_id, current_user, can_create_tasks)
+    if not task:
+        await callback.answer("❌ Задача не найдена", show_alert=True)
+        return
+
+    file_service = FileService()
+    files = await file_service.list_files(task_id)
+    urls = await asyncio.gather(*(file_service.get_download_url(task_file) for task_file in files))
+
+    text = f"📎 Файлы задачи #{task.task_id}\n📝 {html.quote(task.title)}\n"
+    if not files:
+        text += "\n📭 Файлов пока нет"
+    for task_file, url in zip(files, urls):
+        name = html.quote(task_file.file_name)
+        link = f'<a href="{html.quote(url)}">{name}</a>' if url else name
+        text += f"\n📄 {link} · {task_file.size_human_readable} · {task_file.created_at.strftime('%d.%m.%Y %H:%M')}"
+    if files:
+        text += f"\n\n🔗 Ссылки действуют {config.S3_LINK_TTL // 60} мин."
+
+    await callback.message.edit_text(
+        text,
+        reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="➕ Прикрепить файл", callback_data=f"file_upload:{task_id}")],
+            [InlineKeyboardButton(text="🔙 К задаче", callback_data=f"task_details:{task_id}")]
+        ]),
+        disable_web_page_preview=True
+    )
+    await callback.answer()
+
+
+async def _get_accessible_task(task_id: int, current_user, can_create_tasks: Optional[bool]) -> Optional[Task]:
+    """Задача, если пользователь может ее видеть: руководители — любые, исполнители — свои"""
+    task = await TaskService().get_task_by_id(task_id)
+    if not task or (not can_create_tasks and task.assignee_id != current_user.user_id):
+        return None
+    return task
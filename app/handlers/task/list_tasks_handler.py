@@ -0,0 +1,312 @@
+"""
+Обработчик просмотра списков задач
+"""
+import logging
+from typing import Optional
+
+from aiogram import Router, F, html
+from aiogram.types import CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
+
+from app.services.task_service import (
+    TaskService, TaskCursor, PAGE_SIZE,
+    SCOPE_MY, SCOPE_ACTIVE, SCOPE_ALL, SCOPE_COMPANY, SCOPE_OVERDUE
+)
+from app.services.overdue_service import OverdueSweeper
+from app.database.models.task_model import TaskListItem
+from app.keyboards.task_keyboards import get_task_list_keyboard
+from app.utils.query_budget import query_budget
+
+logger = logging.getLogger(__name__)
+router = Router()
+
+# Заголовки списков
+SCOPE_TITLES = {
+    SCOPE_MY: "📋 Мои задачи",
+    SCOPE_ACTIVE: "⏳ Активные задачи",
+    SCOPE_ALL: "📋 Все задачи",
+    SCOPE_COMPANY: "📋 Задачи компании",
+    SCOPE_OVERDUE: "⏰ Просроченные задачи",
+}
+
+# Области, доступные по кнопкам меню задач
+MENU_SCOPES = {
+    "task:list_my": SCOPE_MY,
+    "task:list_active": SCOPE_ACTIVE,
+    "task:list_all": SCOPE_ALL,
+}
+
+# Страница со статусами, компаниями и исполнителями — один запрос на PAGE_SIZE + 1 задачу
+LIST_BUDGET = dict(max_queries=1, max_rows=PAGE_SIZE + 1)
+
+# Просроченные задачи дополнительно читают отметку времени последнего перевода в overdue
+OVERDUE_LIST_BUDGET = dict(max_queries=2, max_rows=PAGE_SIZE + 2)
+
+
+@router.callback_query(F.data.in_(set(MENU_SCOPES)))
+@query_budget(**LIST_BUDGET)
+async def show_tasks_list(
+    callback: CallbackQuery,
+    current_user=None,
+    can_create_tasks=None,
+    can_execute_tasks=None
+):
+    """
+    Показывает первую страницу списка задач из меню задач
+    """
+    try:
+        if not current_user:
+            await callback.answer("❌ Пользователь не авторизован", show_alert=True)
+            return
+
+        scope = MENU_SCOPES[callback.data]
+        if not _can_view_scope(scope, can_create_tasks, can_execute_tasks):
+            await callback.answer("❌ Недостаточно прав", show_alert=True)
+            return
+
+        await show_tasks_page(callback, scope, _owner_id(scope, current_user), None)
+
+    except Exception as e:
+        logger.error(f"Ошибка показа списка задач: {e}")
+        await callback.answer("❌ Произошла ошибка", show_alert=True)
+
+
+@router.callback_query(F.data.startswith("company_tasks:"))
+@query_budget(**LIST_BUDGET)
+async def show_company_tasks(callback: CallbackQuery, current_user=None, can_create_companies=None):
+    """
+    Показывает задачи компании
+    """
+    try:
+        if not can_create_companies:
+            await callback.answer("❌ Недостаточно прав для просмотра задач компании", show_alert=True)
+            return
+
+        company_id = int(callback.data.split(":")[1])
+        await show_tasks_page(callback, SCOPE_COMPANY, company_id, None)
+
+    except ValueError:
+        await callback.answer("❌ Некорректный ID компании", show_alert=True)
+    except Exception as e:
+        logger.error(f"Ошибка показа задач компании: {e}")
+        await callback.answer("❌ Произошла ошибка", show_alert=True)
+
+
+@router.callback_query(F.data == "analytics:overdue")
+@query_budget(**OVERDUE_LIST_BUDGET)
+async def show_overdue_tasks(callback: CallbackQuery, can_view_analytics=None):
+    """
+    Показывает просроченные задачи (статус проставляет задание по таймеру)
+    """
+    try:
+        if not can_view_analytics:
+            await callback.answer("❌ Недостаточно прав", show_alert=True)
+            return
+
+        await show_tasks_page(callback, SCOPE_OVERDUE, None, None)
+
+    except Exception as e:
+        logger.error(f"Ошибка показа просроченных задач: {e}")
+        await callback.answer("❌ Произошла ошибка", show_alert=True)
+
+
+@router.callback_query(F.data.startswith("tlist:"))
+@query_budget(**OVERDUE_LIST_BUDGET)
+async def handle_tasks_pagination(
+    callback: CallbackQuery,
+    current_user=None,
+    can_create_tasks=None,
+    can_execute_tasks=None,
+    can_create_companies=None,
+    can_view_analytics=None
+):
+    """
+    Обрабатывает пагинацию списков задач
+
+    Формат callback: tlist:<область>:<ID компании или 0>:<курсор>
+    """
+    try:
+        if not current_user:
+            await callback.answer("❌ Пользователь не авторизован", show_alert=True)
+            return
+
+        _, scope, owner, cursor = callback.data.split(":", 3)
+        if scope not in SCOPE_TITLES:
+            raise ValueError(f"Неизвестная область списка задач: {scope}")
+
+        if scope == SCOPE_COMPANY:
+            allowed = can_create_companies
+            owner_id = int(owner)
+        elif scope == SCOPE_OVERDUE:
+            allowed = can_view_analytics
+            owner_id = None
+        else:
+            allowed = _can_view_scope(scope, can_create_tasks, can_execute_tasks)
+            owner_id = _owner_id(scope, current_user)
+
+        if not allowed:
+            await callback.answer("❌ Недостаточно прав", show_alert=True)
+            return
+
+        await show_tasks_page(callback, scope, owner_id, TaskCursor.decode(cursor))
+
+    except ValueError:
+        await callback.answer("❌ Некорректная страница списка", show_alert=True)
+    except Exception as e:
+        logger.error(f"Ошибка пагинации задач: {e}")
+        await callback.answer("❌ Произошла ошибка", show_alert=True)
+
+
+@router.callback_query(F.data.startswith("task_details:"))
+@query_budget(max_queries=3)
+async def show_task_details(callback: CallbackQuery, current_user=None, can_create_tasks=None):
+    """
+    Показывает детали задачи
+    """
+    try:
+        if not current_user:
+            await callback.answer("❌ Пользователь не авторизован", show_alert=True)
+            return
+
+        task_id = int(callback.data.split(":")[1])
+
+        task_service = TaskService()
+        task = await task_service.get_task_by_id(task_id)
+
+        # Исполнитель видит только свои задачи
+        if not task or (not can_create_tasks and task.assignee_id != current_user.user_id):
+            await callback.answer("❌ Задача не найдена", show_alert=True)
+            return
+
+        details_text = f"{task.status_emoji} Задача #{task.task_id}\n\n"
+        details_text += f"📝 {html.quote(task.title)}\n"
+        details_text += f"📊 Статус: {task.status_display}\n"
+        details_text += f"{task.priority_emoji} Приоритет: {task.priority_display}\n"
+
+        if task.deadline:
+            details_text += f"⏰ Срок: {task.deadline.strftime('%d.%m.%Y в %H:%M')}\n"
+
+        # Компания и исполнитель загружаются пакетно в рамках update
+        from app.services.company_service import CompanyService
+        from app.services.auth_service import AuthService
+        company = await CompanyService().get_company_by_id(task.company_id)
+        if company:
+            details_text += f"🏢 Компания: {html.quote(company.name)}\n"
+
+        if task.assignee_id:
+            assignee = await AuthService().get_user_by_telegram_id(task.assignee_id)
+            if assignee:
+                details_text += f"👤 Исполнитель: {html.quote(assignee.display_name)}\n"
+
+        details_text += f"📞 Инициатор: {html.quote(task.initiator_name)}, {html.quote(task.initiator_phone)}\n"
+
+        if task.comment_count:
+            details_text += (
+                f"💬 Комментариев: {task.comment_count}, последний "
+                f"{task.last_comment_at.strftime('%d.%m.%Y %H:%M')}\n" if task.last_comment_at else
+                f"💬 Комментариев: {task.comment_count}\n"
+            )
+
+        if task.description:
+            details_text += f"\n📄 {html.quote(task.description)}\n"
+
+        keyboard = [
+            [InlineKeyboardButton(text=f"💬 Комментарии ({task.comment_count})", callback_data=f"comments:{task.task_id}")],
+            [InlineKeyboardButton(text="📎 Файлы", callback_data=f"files:{task.task_id}")],
+            [InlineKeyboardButton(text="🔙 Меню задач", callback_data="menu:tasks" if can_create_tasks else "menu:my_tasks")]
+        ]
+
+        await callback.message.edit_text(
+            details_text,
+            reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
+        )
+
+        await callback.answer()
+
+    except ValueError:
+        await callback.answer("❌ Некорректный ID задачи", show_alert=True)
+    except Exception as e:
+        logger.error(f"Ошибка показа деталей задачи: {e}")
+        await callback.answer("❌ Произошла ошибка", show_alert=True)
+
+
+async def show_tasks_page(callback: CallbackQuery, scope: str, owner_id: Optional[int], cursor: Optional[TaskCursor]):
+    """
+    Показывает страницу списка задач
+
+    Args:
+        callback: Callback query
+        scope: Область списка
+        owner_id: ID исполнителя или компании
+        cursor: Позиция страницы (None — первая страница)
+    """
+    task_service = TaskService()
+    page = await task_service.get_task_page(scope, owner_id, cursor)
+
+    if scope == SCOPE_COMPANY:
+        back_callback = f"company_details:{owner_id}"
+    elif scope == SCOPE_OVERDUE:
+        back_callback = "menu:analytics"
+    elif scope == SCOPE_ALL:
+        back_callback = "menu:tasks"
+    else:
+        back_callback = "menu:my_tasks"
+
+    title = SCOPE_TITLES[scope]
+    if scope == SCOPE_OVERDUE:
+        watermark = await OverdueSweeper().get_watermark()
+        if watermark:
+            title += f"\nАктуально на {watermark.strftime('%d.%m.%Y %H:%M')} UTC"
+    is_first_page = cursor is None or cursor == TaskCursor()
+
+    if not page.items and is_first_page:
+        await callback.message.edit_text(
+            f"{title}\n\n📭 Задач нет",
+            reply_markup=get_task_list_keyboard([], "", None, back_callback, True)
+        )
+        await callback.answer()
+        return
+
+    # В callback храним ID компании; исполнитель берется из текущего пользователя
+    prefix = f"tlist:{scope}:{owner_id if scope == SCOPE_COMPANY else 0}"
+    first_page_callback = f"{prefix}:{TaskCursor().encode()}"
+    next_page_callback = f"{prefix}:{page.next_cursor.encode()}" if page.next_cursor else None
+
+    keyboard = get_task_list_keyboard(
+        page.items, first_page_callback, next_page_callback, back_callback, is_first_page
+    )
+
+    rows = "\n\n".join(_format_item(number, item, scope) for number, item in enumerate(page.items, 1))
+    await callback.message.edit_text(
+        f"{title}\n\n{rows}\n\nВыберите задачу для просмотра деталей:",
+        reply_markup=keyboard
+    )
+
+    await callback.answer()
+
+
+def _format_item(number: int, item: TaskListItem, scope: str) -> str:
+    """Строка задачи в тексте списка; компания и исполнитель области не повторяются"""
+    details = []
+    if scope != SCOPE_COMPANY:
+        details.append(f"🏢 {item.company_name or '—'}")
+    if scope not in (SCOPE_MY, SCOPE_ACTIVE):
+        details.append(f"👤 {item.assignee_name or 'не назначен'}")
+    if item.deadline:
+        details.append(f"⏰ {item.deadline.strftime('%d.%m %H:%M')}")
+
+    text = f"{number}. {item.status_emoji}{item.priority_emoji} {html.quote(item.title)}"
+    if details:
+        text += "\n    " + " · ".join(html.quote(detail) for detail in details)
+    return text
+
+
+def _can_view_scope(scope: str, can_create_tasks: Optional[bool], can_execute_tasks: Optional[bool]) -> bool:
+    """Все задачи видят руководители, свои — исполнители"""
+    if scope == SCOPE_ALL:
+        return bool(can_create_tasks)
+    return bool(can_execute_tasks)
+
+
+def _owner_id(scope: str, current_user) -> Optional[int]:
+    """ID исполнителя для личных списков"""
+    return current_user.user_id if scope in (SCOPE_MY, SCOPE_ACTIVE) else None
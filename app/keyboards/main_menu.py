@@ -1,15 +1,43 @@
 """
 Главное меню бота
 """
+from typing import Optional, Tuple
+
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
+from app.database.models.inbox_model import InboxCounts
+
+
+def plural(count: int, forms: Tuple[str, str, str]) -> str:
+    """Число со словом в нужной форме: (1 задача, 2 задачи, 5 задач)"""
+    if count % 10 == 1 and count % 100 != 11:
+        form = forms[0]
+    elif 2 <= count % 10 <= 4 and not 12 <= count % 100 <= 14:
+        form = forms[1]
+    else:
+        form = forms[2]
+    return f"{count} {form}"
+
+
+def format_inbox_badge(inbox: Optional[InboxCounts]) -> str:
+    """Счетчики для кнопки "Мои задачи": " (3 новых, 1 просрочена)" или пустая строка"""
+    if not inbox:
+        return ""
+    parts = []
+    if inbox.new:
+        parts.append(plural(inbox.new, ("новая", "новых", "новых")))
+    if inbox.overdue:
+        parts.append(plural(inbox.overdue, ("просрочена", "просрочены", "просрочено")))
+    return f" ({', '.join(parts)})" if parts else ""
+
 
-def get_main_menu_keyboard(user_role: str) -> InlineKeyboardMarkup:
+def get_main_menu_keyboard(user_role: str, inbox: Optional[InboxCounts] = None) -> InlineKeyboardMarkup:
     """
     Возвращает клавиатуру главного меню в зависимости от роли пользователя
     
     Args:
         user_role: Роль пользователя
+        inbox: Счетчики задач исполнителя для кнопки "Мои задачи" (None — без счетчиков)
         
     Returns:
         Клавиатура главного меню
@@ -37,7 +65,7 @@ def get_main_menu_keyboard(user_role: str) -> InlineKeyboardMarkup:
     # Кнопки для главного админа и сис-админов
     elif user_role in ['chief_admin', 'sysadmin']:
         keyboard.extend([
-            [InlineKeyboardButton(text="📋 Мои задачи", callback_data="menu:my_tasks")],
+            [InlineKeyboardButton(text=f"📋 Мои задачи{format_inbox_badge(inbox)}", callback_data="menu:my_tasks")],
             [InlineKeyboardButton(text="📝 Комментарии", callback_data="menu:comments")]
         ])
     
@@ -58,6 +86,24 @@ def get_companies_menu_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
+# Периоды выгрузки задач: (текст, дней; 0 — за все время)
+EXPORT_PERIODS = (("7 дней", 7), ("30 дней", 30), ("90 дней", 90), ("Все время", 0))
+
+
+def get_export_keyboard(company_id: int) -> InlineKeyboardMarkup:
+    """Выбор периода и формата выгрузки задач компании"""
+    keyboard = [
+        [
+            InlineKeyboardButton(text=f"{text} · CSV", callback_data=f"export_run:{company_id}:{days}:csv"),
+            InlineKeyboardButton(text=f"{text} · XLSX", callback_data=f"export_run:{company_id}:{days}:xlsx")
+        ]
+        for text, days in EXPORT_PERIODS
+    ]
+    keyboard.append([InlineKeyboardButton(text="🔙 К компании", callback_data=f"company_details:{company_id}")])
+    
+    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+
 def get_tasks_menu_keyboard(user_role: str) -> InlineKeyboardMarkup:
     """Меню для работы с задачами"""
     keyboard = []
@@ -87,6 +133,66 @@ def get_analytics_menu_keyboard() -> InlineKeyboardMarkup:
         [InlineKeyboardButton(text="🏢 По компаниям", callback_data="analytics:companies")],
         [InlineKeyboardButton(text="👥 По исполнителям", callback_data="analytics:executors")],
         [InlineKeyboardButton(text="⏰ Просроченные", callback_data="analytics:overdue")],
+        [InlineKeyboardButton(text="⏱ Сроки выполнения", callback_data="analytics:sla")],
+        [InlineKeyboardButton(text="🔙 Главное меню", callback_data="menu:main")]
+    ]
+    
+    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+
+def get_analytics_page_keyboard(callback_prefix: str, page: int, total_pages: int) -> InlineKeyboardMarkup:
+    """
+    Навигация по страницам раздела аналитики
+
+    Args:
+        callback_prefix: Префикс callback раздела (страница добавляется через ':')
+        page: Текущая страница (начиная с 0)
+        total_pages: Количество страниц
+    """
+    keyboard = []
+
+    nav_buttons = []
+    if page > 0:
+        nav_buttons.append(InlineKeyboardButton(text="◀️ Назад", callback_data=f"{callback_prefix}:{page - 1}"))
+    if total_pages > 1:
+        nav_buttons.append(InlineKeyboardButton(text=f"{page + 1}/{total_pages}", callback_data="noop"))
+    if page < total_pages - 1:
+        nav_buttons.append(InlineKeyboardButton(text="Вперед ▶️", callback_data=f"{callback_prefix}:{page + 1}"))
+    if nav_buttons:
+        keyboard.append(nav_buttons)
+
+    keyboard.append([InlineKeyboardButton(text="🔙 Аналитика", callback_data="menu:analytics")])
+    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+
+def get_analytics_keyset_keyboard(callback_prefix: str, next_cursor: Optional[str], is_first_page: bool) -> InlineKeyboardMarkup:
+    """
+    Навигация по keyset-страницам раздела аналитики: только вперед и к началу
+
+    Args:
+        callback_prefix: Callback первой страницы (курсор добавляется через ':')
+        next_cursor: Курсор следующей страницы (None — страница последняя)
+        is_first_page: Показывается первая страница
+    """
+    keyboard = []
+
+    nav_buttons = []
+    if not is_first_page:
+        nav_buttons.append(InlineKeyboardButton(text="⏮ В начало", callback_data=callback_prefix))
+    if next_cursor:
+        nav_buttons.append(InlineKeyboardButton(text="Далее ▶️", callback_data=f"{callback_prefix}:{next_cursor}"))
+    if nav_buttons:
+        keyboard.append(nav_buttons)
+
+    keyboard.append([InlineKeyboardButton(text="🔙 Аналитика", callback_data="menu:analytics")])
+    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+
+def get_roles_menu_keyboard() -> InlineKeyboardMarkup:
+    """Меню управления ролями (только для директора)"""
+    keyboard = [
+        [InlineKeyboardButton(text="👥 Список пользователей", callback_data="roles:list_users")],
+        [InlineKeyboardButton(text="🎭 Назначить роль", callback_data="roles:assign")],
         [InlineKeyboardButton(text="🔙 Главное меню", callback_data="menu:main")]
     ]
     
@@ -0,0 +1,82 @@
+"""
+Клавиатуры для работы с задачами
+"""
+from typing import List, Optional
+
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+from app.database.models.task_model import TaskListItem
+
+
+def get_task_list_keyboard(
+    items: List[TaskListItem],
+    first_page_callback: str,
+    next_page_callback: Optional[str],
+    back_callback: str,
+    is_first_page: bool
+) -> InlineKeyboardMarkup:
+    """
+    Возвращает клавиатуру страницы списка задач
+
+    Args:
+        items: Задачи страницы
+        first_page_callback: Callback первой страницы
+        next_page_callback: Callback следующей страницы (None — страница последняя)
+        back_callback: Callback кнопки возврата
+        is_first_page: Показывается первая страница
+
+    Returns:
+        Клавиатура со списком задач и навигацией
+    """
+    keyboard = []
+
+    for item in items:
+        text = f"{item.status_emoji}{item.priority_emoji} {item.title}"
+        if len(text) > 40:
+            text = text[:37] + "..."
+        keyboard.append([InlineKeyboardButton(text=text, callback_data=f"task_details:{item.task_id}")])
+
+    # Keyset-пагинация идет только вперед; назад — к началу списка
+    nav_buttons = []
+    if not is_first_page:
+        nav_buttons.append(InlineKeyboardButton(text="⏮ В начало", callback_data=first_page_callback))
+    if next_page_callback:
+        nav_buttons.append(InlineKeyboardButton(text="Далее ▶️", callback_data=next_page_callback))
+    if nav_buttons:
+        keyboard.append(nav_buttons)
+
+    keyboard.append([InlineKeyboardButton(text="🔙 Назад", callback_data=back_callback)])
+
+    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+
+def get_comments_keyboard(
+    task_id: int,
+    older_callback: Optional[str],
+    newer_callback: Optional[str]
+) -> InlineKeyboardMarkup:
+    """
+    Возвращает клавиатуру страницы комментариев задачи
+
+    Args:
+        task_id: ID задачи
+        older_callback: Callback более старых комментариев (None — старее нет)
+        newer_callback: Callback более новых комментариев (None — показаны самые новые)
+
+    Returns:
+        Клавиатура с навигацией, добавлением комментария и возвратом к задаче
+    """
+    keyboard = []
+
+    nav_buttons = []
+    if older_callback:
+        nav_buttons.append(InlineKeyboardButton(text="◀️ Старее", callback_data=older_callback))
+    if newer_callback:
+        nav_buttons.append(InlineKeyboardButton(text="Новее ▶️", callback_data=newer_callback))
+    if nav_buttons:
+        keyboard.append(nav_buttons)
+
+    keyboard.append([InlineKeyboardButton(text="✍️ Добавить комментарий", callback_data=f"comment_add:{task_id}")])
+    keyboard.append([InlineKeyboardButton(text="🔙 К задаче", callback_data=f"task_details:{task_id}")])
+
+    return InlineKeyboardMarkup(inline_keyboard=keyboard)
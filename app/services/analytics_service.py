@@ -0,0 +1,500 @@
+"""
+Аналитика сроков выполнения по колоночному снимку задач
+
+Счетчики (counter_service) дают количество задач по статусам, но не
+распределения: медиану и 95-й перцентиль времени от создания до
+выполнения, долю просрочки, недельные тренды. Для них процесс держит
+снимок задач в массивах NumPy — по массиву на колонку (ID — int64,
+статус и приоритет — коды int8, время — секунды UTC int64; пустые
+значения — 0), отсортированных по task_id. Миллион задач занимает
+около 60 МБ, группировки и перцентили считаются векторно за миллисекунды.
+
+Снимок обновляется инкрементально: изменения читаются из индекса
+idx_updated_at страницами по возрастанию (updated_at, task_id) от
+позиции предыдущего чтения. Индекс асинхронный, поэтому после полного
+прочтения следующее обновление перечитывает последние
+ANALYTICS_REFRESH_OVERLAP секунд — повторное применение строки ничего
+не меняет. Первое заполнение читает всю таблицу: в server.py его
+выполняет задание по таймеру, в Cloud Functions снимок дочитывается
+порциями по ANALYTICS_REFRESH_MAX_PAGES страниц при открытии отчета.
+"""
+import asyncio
+import calendar
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.database.repositories.company_repository import CompanyRepository
+from app.database.repositories.task_repository import TaskRepository
+from app.database.repositories.user_repository import UserRepository
+from app.utils import metrics
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Коды статусов и приоритетов в снимке
+STATUS_CODES = {status: code for code, status in enumerate(config.TASK_STATUSES)}
+PRIORITY_CODES = {priority: code for code, priority in enumerate(config.TASK_PRIORITIES)}
+UNKNOWN_CODE = -1
+
+COMPLETED = STATUS_CODES['completed']
+OVERDUE = STATUS_CODES['overdue']
+
+# Колонки снимка и их типы
+COLUMN_TYPES = {
+    'task_id': np.int64,
+    'company_id': np.int64,
+    'assignee_id': np.int64,
+    'status': np.int8,
+    'priority': np.int8,
+    'deadline': np.int64,
+    'completed_at': np.int64,
+    'created_at': np.int64,
+    'updated_at': np.int64,
+}
+
+# Группировки отчетов
+GROUP_COMPANY = 'company'
+GROUP_ASSIGNEE = 'assignee'
+GROUP_COLUMNS = {GROUP_COMPANY: 'company_id', GROUP_ASSIGNEE: 'assignee_id'}
+
+# Упаковка (группа, значение) для group_quantiles: значения — секунды, меньше 2**40
+VALUE_BITS = 40
+VALUE_MASK = (1 << VALUE_BITS) - 1
+
+HOUR = 3600
+WEEK = 7 * 24 * HOUR
+# 1970-01-01 — четверг: недели начинаются с понедельника через 4 дня после эпохи
+WEEK_OFFSET = 4 * 24 * HOUR
+
+
+def to_epoch(value) -> int:
+    """Время из строки YDB в секунды UTC (пустое — 0)"""
+    if not value:
+        return 0
+    if isinstance(value, datetime):
+        return calendar.timegm(value.utctimetuple())
+    if isinstance(value, str):
+        return calendar.timegm(datetime.fromisoformat(value.replace('Z', '+00:00')).utctimetuple())
+    return int(value)
+
+
+def rows_to_columns(rows: List[dict]) -> Dict[str, np.ndarray]:
+    """Переводит страницу строк в массивы колонок снимка"""
+    count = len(rows)
+    columns = {}
+    for name in ('task_id', 'company_id', 'assignee_id'):
+        columns[name] = np.fromiter((row[name] or 0 for row in rows), dtype=np.int64, count=count)
+    columns['status'] = np.fromiter(
+        (STATUS_CODES.get(row['status'], UNKNOWN_CODE) for row in rows), dtype=np.int8, count=count
+    )
+    columns['priority'] = np.fromiter(
+        (PRIORITY_CODES.get(row['priority'], UNKNOWN_CODE) for row in rows), dtype=np.int8, count=count
+    )
+    for name in ('deadline', 'completed_at', 'created_at', 'updated_at'):
+        columns[name] = np.fromiter((to_epoch(row[name]) for row in rows), dtype=np.int64, count=count)
+    return columns
+
+
+def group_quantiles(
+    codes: np.ndarray,
+    values: np.ndarray,
+    groups: int,
+    quantiles: Sequence[float]
+) -> Tuple[np.ndarray, List[np.ndarray]]:
+    """
+    Перцентили значений внутри групп одной сортировкой
+
+    Номер группы и значение упаковываются в один int64 (группа в старших
+    битах), поэтому одна сортировка упорядочивает значения внутри групп.
+    Перцентиль группы — линейная интерполяция между соседними позициями
+    ее отрезка, как в np.percentile.
+
+    Args:
+        codes: Номера групп 0..groups-1
+        values: Неотрицательные целые значения меньше 2**VALUE_BITS
+        groups: Количество групп
+        quantiles: Доли (0.5 — медиана)
+
+    Returns:
+        Размеры групп и массив значений для каждой доли (NaN для пустых групп)
+    """
+    packed = (codes.astype(np.int64) << VALUE_BITS) | values.astype(np.int64)
+    packed.sort()
+    values = (packed & VALUE_MASK).astype(np.float64)
+    counts = np.bincount(packed >> VALUE_BITS, minlength=groups)
+    starts = np.cumsum(counts) - counts
+
+    present = counts > 0
+    result = []
+    for quantile in quantiles:
+        position = starts[present] + quantile * (counts[present] - 1)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        column = np.full(groups, np.nan)
+        column[present] = values[lower] + (values[upper] - values[lower]) * (position - lower)
+        result.append(column)
+    return counts, result
+
+
+def week_start(moment: int) -> int:
+    """Начало недели (понедельник 00:00 UTC), содержащей момент"""
+    return moment - (moment - WEEK_OFFSET) % WEEK
+
+
+@dataclass
+class SlaStats:
+    """Сроки выполнения группы задач"""
+
+    key: int  # ID компании или исполнителя (0 — все задачи)
+    total: int
+    completed: int
+    median_hours: Optional[float]
+    p95_hours: Optional[float]
+    overdue_ratio: Optional[float]  # Доля просроченных среди задач со сроком
+
+
+@dataclass
+class WeekStats:
+    """Задачи за неделю"""
+
+    week_start: datetime
+    created: int
+    completed: int
+    late: int  # Выполнены после срока
+    median_hours: Optional[float]
+
+
+@dataclass
+class RefreshReport:
+    """Итоги обновления снимка"""
+
+    pages: int = 0
+    rows: int = 0
+    tasks: int = 0
+    complete: bool = False
+    duration: float = 0.0
+
+
+class TaskSnapshot:
+    """Колоночный снимок задач, отсортированный по task_id"""
+
+    def __init__(self):
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.empty(0, dtype=dtype) for name, dtype in COLUMN_TYPES.items()
+        }
+        # Позиция (updated_at, task_id) последней прочитанной задачи
+        self.cursor: Tuple[int, int] = (0, 0)
+        # Изменения дочитаны до конца при последнем обновлении
+        self.complete = False
+        self.refreshed_at: Optional[datetime] = None
+        self.lock = asyncio.Lock()
+        # Номера групп по колонке: (ID групп, номер группы каждой задачи); сбрасываются при merge
+        self._group_codes: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self.columns['task_id'])
+
+    def merge(self, changes: Dict[str, np.ndarray]) -> None:
+        """
+        Применяет изменения: известные задачи заменяются, новые добавляются
+
+        Args:
+            changes: Колонки измененных задач по возрастанию updated_at
+        """
+        task_ids = changes['task_id']
+        if not len(task_ids):
+            return
+        self._group_codes.clear()
+
+        # Последняя версия каждой задачи; np.unique заодно сортирует по task_id
+        _, last = np.unique(task_ids[::-1], return_index=True)
+        keep = len(task_ids) - 1 - last
+        changes = {name: column[keep] for name, column in changes.items()}
+        task_ids = changes['task_id']
+
+        current = self.columns['task_id']
+        positions = np.searchsorted(current, task_ids)
+        found = positions < len(current)
+        found[found] = current[positions[found]] == task_ids[found]
+
+        for name, column in self.columns.items():
+            column[positions[found]] = changes[name][found]
+
+        added = ~found
+        if not added.any():
+            return
+
+        merged = {name: np.concatenate((column, changes[name][added])) for name, column in self.columns.items()}
+        # Новые задачи обычно получают ID больше существующих — тогда порядок уже верный
+        if len(current) and task_ids[added][0] < current[-1]:
+            order = np.argsort(merged['task_id'], kind='stable')
+            merged = {name: column[order] for name, column in merged.items()}
+        self.columns = merged
+
+    def sla(
+        self,
+        group: Optional[str] = None,
+        since: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> List[SlaStats]:
+        """
+        Сроки выполнения по группам
+
+        Args:
+            group: GROUP_COMPANY, GROUP_ASSIGNEE или None (все задачи одной группой)
+            since: Только задачи, созданные не раньше
+            limit: Максимум групп (по убыванию количества задач)
+
+        Returns:
+            Статистика групп по убыванию количества задач
+        """
+        columns = self.columns
+        if group is None:
+            groups = np.zeros(1, dtype=np.int64)
+            codes = np.zeros(len(self), dtype=np.int64)
+            selected = np.ones(len(self), dtype=bool)
+        else:
+            groups, codes = self._get_group_codes(GROUP_COLUMNS[group])
+            # Задачи без исполнителя (ID 0) не составляют группу
+            selected = groups[codes] > 0
+        if since is not None:
+            selected &= columns['created_at'] >= to_epoch(since)
+
+        codes = codes[selected]
+        status = columns['status'][selected]
+        created_at = columns['created_at'][selected]
+        completed_at = columns['completed_at'][selected]
+        deadline = columns['deadline'][selected]
+
+        total = np.bincount(codes, minlength=len(groups))
+        done = (status == COMPLETED) & (completed_at >= created_at) & (created_at > 0)
+        late = (status == OVERDUE) | (done & (deadline > 0) & (completed_at > deadline))
+        late_count = np.bincount(codes, weights=late, minlength=len(groups))
+        deadline_count = np.bincount(codes, weights=deadline > 0, minlength=len(groups))
+
+        completed, (median, p95) = group_quantiles(
+            codes[done], completed_at[done] - created_at[done], len(groups), (0.5, 0.95)
+        )
+        median_hours = median / HOUR
+        p95_hours = p95 / HOUR
+        with np.errstate(invalid='ignore', divide='ignore'):
+            overdue_ratio = late_count / deadline_count
+
+        # Группы без выбранных задач не показываются
+        order = np.argsort(-total, kind='stable')
+        order = order[total[order] > 0][:limit]
+        return [
+            SlaStats(
+                key=int(groups[i]),
+                total=int(total[i]),
+                completed=int(completed[i]),
+                median_hours=_optional(median_hours[i]),
+                p95_hours=_optional(p95_hours[i]),
+                overdue_ratio=_optional(overdue_ratio[i])
+            )
+            for i in order
+        ]
+
+    def _get_group_codes(self, column: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Номера групп по колонке (сортировка всего снимка — один раз до следующего merge)"""
+        if column not in self._group_codes:
+            groups, codes = np.unique(self.columns[column], return_inverse=True)
+            self._group_codes[column] = (groups, codes.astype(np.int64))
+        return self._group_codes[column]
+
+    def weekly_trend(self, weeks: int, now: Optional[datetime] = None) -> List[WeekStats]:
+        """
+        Созданные и выполненные задачи по неделям
+
+        Args:
+            weeks: Количество недель, включая текущую
+            now: Текущее время (по умолчанию utcnow)
+
+        Returns:
+            Недели по возрастанию
+        """
+        columns = self.columns
+        first = week_start(to_epoch(now or datetime.utcnow())) - (weeks - 1) * WEEK
+
+        def week_index(moments: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+            index = (moments - first) // WEEK
+            inside = (moments > 0) & (index >= 0) & (index < weeks)
+            return index[inside], inside
+
+        created_index, _ = week_index(columns['created_at'])
+        created = np.bincount(created_index, minlength=weeks)
+
+        done = (columns['status'] == COMPLETED) & (columns['completed_at'] >= columns['created_at'])
+        completed_at = np.where(done, columns['completed_at'], 0)
+        done_index, inside = week_index(completed_at)
+        completed = np.bincount(done_index, minlength=weeks)
+
+        deadline = columns['deadline'][inside]
+        late = np.bincount(done_index, weights=(deadline > 0) & (completed_at[inside] > deadline), minlength=weeks)
+
+        lead_time = completed_at[inside] - columns['created_at'][inside]
+        _, (median,) = group_quantiles(done_index, lead_time, weeks, (0.5,))
+        median_hours = median / HOUR
+
+        return [
+            WeekStats(
+                week_start=datetime.utcfromtimestamp(first + i * WEEK),
+                created=int(created[i]),
+                completed=int(completed[i]),
+                late=int(late[i]),
+                median_hours=_optional(median_hours[i])
+            )
+            for i in range(weeks)
+        ]
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+# Снимок процесса: переживает вызовы функции на том же экземпляре
+_snapshot = TaskSnapshot()
+
+
+class AnalyticsService:
+    """Сервис аналитики сроков выполнения"""
+
+    def __init__(self, snapshot: Optional[TaskSnapshot] = None):
+        self.snapshot = snapshot or _snapshot
+        self.task_repo = TaskRepository()
+        self.company_repo = CompanyRepository()
+        self.user_repo = UserRepository()
+
+    async def refresh(self, max_pages: Optional[int] = None) -> RefreshReport:
+        """
+        Дочитывает изменения задач в снимок
+
+        Args:
+            max_pages: Максимум страниц (None — до конца); остаток дочитает следующее обновление
+
+        Returns:
+            Итоги обновления
+        """
+        snapshot = self.snapshot
+        report = RefreshReport()
+        started = time.perf_counter()
+
+        async with snapshot.lock:
+            updated_at, task_id = snapshot.cursor
+            if snapshot.complete:
+                # Асинхронный индекс может отставать: перечитываем последние секунды
+                updated_at, task_id = max(0, updated_at - config.ANALYTICS_REFRESH_OVERLAP), 0
+
+            chunks = []
+            try:
+                while max_pages is None or report.pages < max_pages:
+                    rows = await self.task_repo.scan_updated(
+                        datetime.utcfromtimestamp(updated_at), task_id, config.ANALYTICS_PAGE_SIZE
+                    )
+                    report.pages += 1
+                    report.rows += len(rows)
+                    if rows:
+                        chunk = rows_to_columns(rows)
+                        chunks.append(chunk)
+                        updated_at, task_id = int(chunk['updated_at'][-1]), int(chunk['task_id'][-1])
+                    if len(rows) < config.ANALYTICS_PAGE_SIZE:
+                        report.complete = True
+                        break
+            except Exception as e:
+                logger.error(f"Ошибка обновления снимка задач: {e}")
+
+            if chunks:
+                snapshot.merge({
+                    name: np.concatenate([chunk[name] for chunk in chunks]) for name in COLUMN_TYPES
+                })
+            snapshot.cursor = max(snapshot.cursor, (updated_at, task_id))
+            snapshot.complete = report.complete
+            if report.complete:
+                snapshot.refreshed_at = datetime.utcnow()
+
+        report.tasks = len(snapshot)
+        report.duration = time.perf_counter() - started
+        metrics.increment('analytics.refresh_pages', report.pages)
+        metrics.increment('analytics.refresh_rows', report.rows)
+        metrics.set_gauge('analytics.snapshot_tasks', report.tasks)
+        metrics.observe('analytics.refresh', report.duration)
+
+        logger.info(
+            f"Снимок задач: прочитано {report.rows} изменений за {report.pages} страниц, "
+            f"задач {report.tasks}, {report.duration:.2f} с"
+            f"{'' if report.complete else ', продолжится при следующем обновлении'}"
+        )
+        return report
+
+    def get_sla(
+        self,
+        group: Optional[str] = None,
+        since: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> List[SlaStats]:
+        """Сроки выполнения по группам (см. TaskSnapshot.sla)"""
+        started = time.perf_counter()
+        result = self.snapshot.sla(group, since, limit)
+        metrics.observe('analytics.compute', time.perf_counter() - started)
+        return result
+
+    async def get_company_sla(self, limit: int) -> List[Tuple[str, SlaStats]]:
+        """
+        Сроки выполнения компаний с наибольшим количеством задач
+
+        Args:
+            limit: Максимум компаний
+
+        Returns:
+            Пары (название компании, статистика)
+        """
+        stats = self.get_sla(GROUP_COMPANY, limit=limit)
+        try:
+            companies = await self.company_repo.get_companies_by_ids([row.key for row in stats])
+            names = {company.company_id: company.name for company in companies}
+        except Exception as e:
+            logger.error(f"Ошибка получения компаний для отчета сроков: {e}")
+            names = {}
+        return [(names.get(row.key, f"Компания {row.key}"), row) for row in stats]
+
+    async def get_executor_sla(self, limit: int) -> List[Tuple[str, SlaStats]]:
+        """
+        Сроки выполнения исполнителей с наибольшим количеством задач
+
+        Args:
+            limit: Максимум исполнителей
+
+        Returns:
+            Пары (имя исполнителя, статистика)
+        """
+        stats = self.get_sla(GROUP_ASSIGNEE, limit=limit)
+        try:
+            users = await self.user_repo.get_users_by_ids([row.key for row in stats])
+            names = {user.user_id: user.display_name for user in users}
+        except Exception as e:
+            logger.error(f"Ошибка получения исполнителей для отчета сроков: {e}")
+            names = {}
+        return [(names.get(row.key, f"Пользователь {row.key}"), row) for row in stats]
+
+    def get_weekly_trend(self, weeks: int) -> List[WeekStats]:
+        """Задачи по неделям (см. TaskSnapshot.weekly_trend)"""
+        started = time.perf_counter()
+        result = self.snapshot.weekly_trend(weeks)
+        metrics.observe('analytics.compute', time.perf_counter() - started)
+        return result
+
+    @property
+    def actual_at(self) -> Optional[datetime]:
+        """
+        Момент, на который снимок актуален: время полного обновления или,
+        если изменения еще дочитываются, updated_at последней прочитанной задачи
+        """
+        if self.snapshot.complete:
+            return self.snapshot.refreshed_at
+        updated_at = self.snapshot.cursor[0]
+        return datetime.utcfromtimestamp(updated_at) if updated_at else None
@@ -6,6 +6,7 @@ from typing import Optional, List
 
 from app.database.repositories.user_repository import UserRepository
 from app.database.models.user_model import User
+from app.database.loaders import get_request_loaders
 from config import config
 
 logger = logging.getLogger(__name__)
@@ -28,6 +29,11 @@ class AuthService:
             Пользователь или None если не найден
         """
         try:
+            # В рамках update пользователь загружается один раз и пакетно
+            loaders = get_request_loaders()
+            if loaders is not None:
+                return await loaders.users.load(telegram_id)
+            
             return await self.user_repo.get_user_by_id(telegram_id)
         except Exception as e:
             logger.error(f"Ошибка получения пользователя {telegram_id}: {e}")
@@ -68,6 +74,7 @@ class AuthService:
             }
             
             user = await self.user_repo.create_user(user_data)
+            self._prime_user(user.user_id, user)
             logger.info(f"Зарегистрирован новый пользователь: {user.user_id} ({user.role})")
             
             return user
@@ -88,7 +95,9 @@ class AuthService:
             True если успешно
         """
         try:
-            return await self.user_repo.update_user(user_id, updates)
+            result = await self.user_repo.update_user(user_id, updates)
+            self._prime_user(user_id, None)
+            return result
         except Exception as e:
             logger.error(f"Ошибка обновления пользователя {user_id}: {e}")
             return False
@@ -117,6 +126,7 @@ class AuthService:
             
             # Обновляем роль
             success = await self.user_repo.update_user(user_id, {'role': new_role})
+            self._prime_user(user_id, None)
             
             if success:
                 logger.info(f"Пользователю {user_id} назначена роль {new_role} директором {assigner_id}")
@@ -156,6 +166,17 @@ class AuthService:
             logger.error(f"Ошибка получения всех пользователей: {e}")
             return []
     
+    def _prime_user(self, user_id: int, user: Optional[User]) -> None:
+        """Обновляет кеш загрузчика пользователей (None - сбросить запись)"""
+        loaders = get_request_loaders()
+        if loaders is None:
+            return
+        
+        if user is None:
+            loaders.users.clear(user_id)
+        else:
+            loaders.users.prime(user_id, user)
+    
     def can_assign_roles(self, user: User) -> bool:
         """Проверяет, может ли пользователь назначать роли"""
         return user.role == 'director'
@@ -0,0 +1,146 @@
+"""
+Сервис комментариев к задачам
+
+Комментарии показываются страницами по COMMENTS_PAGE_SIZE: первая —
+самые новые, дальше "старее"/"новее" от курсора (created_at, comment_id)
+первого или последнего комментария страницы. Внутри страницы комментарии
+идут от старых к новым, как в переписке.
+"""
+import calendar
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from app.database.models.comment_model import Comment
+from app.database.repositories.comment_repository import CommentRepository
+from app.utils import metrics
+from config import config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CommentCursor:
+    """Позиция в комментариях задачи: ключ комментария на краю страницы"""
+
+    created_at: datetime
+    comment_id: int
+
+    def encode(self) -> str:
+        """Кодирует курсор для callback_data (секунды UTC)"""
+        return f"{calendar.timegm(self.created_at.utctimetuple())}:{self.comment_id}"
+
+    @classmethod
+    def decode(cls, value: str) -> 'CommentCursor':
+        """
+        Восстанавливает курсор из callback_data
+
+        Raises:
+            ValueError: Некорректный курсор
+        """
+        created_at, comment_id = value.split(":")
+        return cls(created_at=datetime.utcfromtimestamp(int(created_at)), comment_id=int(comment_id))
+
+    @classmethod
+    def of(cls, comment: Comment) -> 'CommentCursor':
+        return cls(created_at=comment.created_at, comment_id=comment.comment_id)
+
+
+@dataclass
+class CommentPage:
+    """Страница комментариев (от старых к новым)"""
+
+    items: List[Comment]
+    older_cursor: Optional[CommentCursor] = None  # None — старее комментариев нет
+    newer_cursor: Optional[CommentCursor] = None  # None — страница с самыми новыми
+
+
+class CommentService:
+    """Сервис для работы с комментариями"""
+
+    def __init__(self):
+        self.comment_repo = CommentRepository()
+
+    def validate_comment_text(self, text: Optional[str]) -> bool:
+        """Проверяет текст комментария"""
+        return bool(text and text.strip()) and len(text) <= config.COMMENT_MAX_LENGTH
+
+    async def add_comment(self, task_id: int, user_id: int, text: str) -> Optional[Comment]:
+        """
+        Добавляет комментарий к задаче
+
+        Args:
+            task_id: ID задачи
+            user_id: ID автора
+            text: Текст комментария
+
+        Returns:
+            Комментарий или None, если задачи нет
+        """
+        try:
+            comment = await self.comment_repo.create_comment(task_id, user_id, text.strip())
+            if comment:
+                metrics.increment('comments.created')
+                logger.info(f"Комментарий {comment.comment_id} к задаче {task_id} от {user_id}")
+            return comment
+
+        except Exception as e:
+            logger.error(f"Ошибка добавления комментария к задаче {task_id}: {e}")
+            raise
+
+    async def get_page(
+        self,
+        task_id: int,
+        older_than: Optional[CommentCursor] = None,
+        newer_than: Optional[CommentCursor] = None,
+        page_size: Optional[int] = None
+    ) -> CommentPage:
+        """
+        Получает страницу комментариев задачи одним запросом
+
+        Читается на один комментарий больше страницы, чтобы узнать, есть ли
+        продолжение в направлении чтения; в обратном направлении продолжение
+        есть всегда, если страница открыта по курсору.
+
+        Args:
+            task_id: ID задачи
+            older_than: Показать комментарии старее курсора
+            newer_than: Показать комментарии новее курсора
+            page_size: Комментариев на странице (по умолчанию COMMENTS_PAGE_SIZE)
+
+        Returns:
+            Страница комментариев (без курсоров — самые новые, если ничего нет)
+        """
+        page_size = page_size or config.COMMENTS_PAGE_SIZE
+
+        if newer_than:
+            comments = await self.comment_repo.list_newer(
+                task_id, page_size + 1, newer_than.created_at, newer_than.comment_id
+            )
+            items = comments[:page_size]
+            if not items:
+                # Новее ничего нет: показываем самые новые
+                return await self.get_page(task_id, page_size=page_size)
+
+            return CommentPage(
+                items=items,
+                older_cursor=CommentCursor.of(items[0]),
+                newer_cursor=CommentCursor.of(items[-1]) if len(comments) > page_size else None
+            )
+
+        comments = await self.comment_repo.list_older(
+            task_id,
+            page_size + 1,
+            older_than.created_at if older_than else None,
+            older_than.comment_id if older_than else None
+        )
+        items = list(reversed(comments[:page_size]))
+        if not items:
+            return CommentPage(items=[], newer_cursor=older_than)
+
+        return CommentPage(
+            items=items,
+            older_cursor=CommentCursor.of(items[0]) if len(comments) > page_size else None,
+            newer_cursor=CommentCursor.of(items[-1]) if older_than else None
+        )
@@ -6,6 +6,7 @@ from typing import Optional, List
 
 from app.database.repositories.company_repository import CompanyRepository
 from app.database.models.company_model import Company
+from app.database.loaders import get_request_loaders
 
 logger = logging.getLogger(__name__)
 
@@ -61,6 +62,11 @@ class CompanyService:
             Компания или None
         """
         try:
+            # В рамках update компания загружается один раз и пакетно
+            loaders = get_request_loaders()
+            if loaders is not None:
+                return await loaders.companies.load(company_id)
+            
             return await self.company_repo.get_company_by_id(company_id)
         except Exception as e:
             logger.error(f"Ошибка получения компании {company_id}: {e}")
@@ -126,6 +132,10 @@ class CompanyService:
             
             success = await self.company_repo.update_company(company_id, updates)
             
+            loaders = get_request_loaders()
+            if loaders is not None:
+                loaders.companies.clear(company_id)
+            
             if success:
                 logger.info(f"Обновлена компания {company_id}")
             
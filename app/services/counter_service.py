@@ -0,0 +1,187 @@
+"""
+Сервис статистики задач по счетчикам
+
+Панель директора не пересчитывает задачи: количество по статусам
+читается из таблиц счетчиков, которые изменяются в транзакциях задач
+(app/database/repositories/counter_repository.py). Сверка с пересчетом
+по индексам задач выполняется по таймеру (reconcile_handler в index.py,
+в server.py — app/bot/timer_jobs.py) и исправляет расхождения, например
+после ручных изменений в базе; первый запуск заполняет счетчики для
+уже существующих задач.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.database.models.company_model import Company
+from app.database.models.user_model import User
+from app.database.repositories.company_repository import CompanyRepository
+from app.database.repositories.counter_repository import CounterRepository, TOTAL_COMPANY_ID
+from app.database.repositories.user_repository import UserRepository
+from app.services.inbox_service import invalidate_all_inboxes
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+# Роли, задачи которых показываются в статистике исполнителей
+EXECUTOR_ROLES = ('chief_admin', 'sysadmin')
+
+# ID компаний и исполнителей в одном запросе сверки
+RECONCILE_CHUNK_SIZE = 100
+
+
+@dataclass
+class StatsPage:
+    """Страница статистики панели директора"""
+
+    items: List[Tuple[Any, Dict[str, int]]]  # (компания или исполнитель, {статус: количество})
+    next_after_id: Optional[int] = None  # ID последней строки, если есть следующая страница
+
+
+@dataclass
+class ReconcileReport:
+    """Итоги сверки"""
+
+    companies: int = 0
+    assignees: int = 0
+    fixed: int = 0
+    duration: float = 0.0
+
+
+class CounterService:
+    """Сервис статистики задач"""
+
+    def __init__(self):
+        self.counter_repo = CounterRepository()
+        self.company_repo = CompanyRepository()
+        self.user_repo = UserRepository()
+
+    async def get_totals(self) -> Dict[str, int]:
+        """
+        Количество задач по статусам во всех компаниях
+
+        Returns:
+            {статус: количество}
+        """
+        try:
+            counts = await self.counter_repo.get_company_counts([TOTAL_COMPANY_ID])
+            return counts.get(TOTAL_COMPANY_ID, {})
+        except Exception as e:
+            logger.error(f"Ошибка получения общей статистики задач: {e}")
+            return {}
+
+    async def get_company_stats_page(self, after_company_id: Optional[int], page_size: int) -> StatsPage:
+        """
+        Страница компаний (по названию) с количеством задач по статусам
+
+        Читается на одну компанию больше страницы, чтобы узнать, есть ли
+        следующая; счетчики — только для показываемых компаний.
+
+        Args:
+            after_company_id: ID последней показанной компании (None — первая страница)
+            page_size: Компаний на странице
+
+        Returns:
+            Страница статистики
+        """
+        companies = await self.company_repo.list_page(after_company_id, page_size + 1)
+        page = companies[:page_size]
+        return StatsPage(
+            items=await self.get_company_stats(page),
+            next_after_id=page[-1].company_id if len(companies) > page_size else None
+        )
+
+    async def get_executor_stats_page(self, after_user_id: Optional[int], page_size: int) -> StatsPage:
+        """
+        Страница исполнителей (по роли и имени) с количеством задач по статусам
+
+        Args:
+            after_user_id: ID последнего показанного исполнителя (None — первая страница)
+            page_size: Исполнителей на странице
+
+        Returns:
+            Страница статистики
+        """
+        executors = await self.user_repo.list_page_by_roles(list(EXECUTOR_ROLES), after_user_id, page_size + 1)
+        page = executors[:page_size]
+        return StatsPage(
+            items=await self.get_executor_stats(page),
+            next_after_id=page[-1].user_id if len(executors) > page_size else None
+        )
+
+    async def get_company_stats(self, companies: List[Company]) -> List[Tuple[Company, Dict[str, int]]]:
+        """
+        Количество задач по статусам для показываемых компаний
+
+        Args:
+            companies: Компании (страница списка)
+
+        Returns:
+            Пары (компания, {статус: количество})
+        """
+        if not companies:
+            return []
+        try:
+            counts = await self.counter_repo.get_company_counts([company.company_id for company in companies])
+            return [(company, counts.get(company.company_id, {})) for company in companies]
+        except Exception as e:
+            logger.error(f"Ошибка получения статистики компаний: {e}")
+            return [(company, {}) for company in companies]
+
+    async def get_executor_stats(self, executors: List[User]) -> List[Tuple[User, Dict[str, int]]]:
+        """
+        Количество задач по статусам для показываемых исполнителей
+
+        Args:
+            executors: Исполнители (страница списка)
+
+        Returns:
+            Пары (исполнитель, {статус: количество})
+        """
+        if not executors:
+            return []
+        try:
+            counts = await self.counter_repo.get_assignee_counts([user.user_id for user in executors])
+            return [(user, counts.get(user.user_id, {})) for user in executors]
+        except Exception as e:
+            logger.error(f"Ошибка получения статистики исполнителей: {e}")
+            return [(user, {}) for user in executors]
+
+    async def reconcile(self) -> ReconcileReport:
+        """
+        Сверяет счетчики с пересчетом по индексам задач и исправляет расхождения
+
+        Returns:
+            Итоги сверки
+        """
+        started = time.perf_counter()
+        report = ReconcileReport()
+
+        company_ids = [company.company_id for company in await self.company_repo.get_all_companies()]
+        assignee_ids = [user.user_id for user in await self.user_repo.get_all_users()]
+        report.companies = len(company_ids)
+        report.assignees = len(assignee_ids)
+
+        for chunk in self._chunks(company_ids):
+            report.fixed += len(await self.counter_repo.reconcile_companies(chunk))
+        for chunk in self._chunks(assignee_ids):
+            report.fixed += len(await self.counter_repo.reconcile_assignees(chunk))
+        report.fixed += len(await self.counter_repo.reconcile_totals())
+        if report.fixed:
+            invalidate_all_inboxes()
+
+        report.duration = time.perf_counter() - started
+        metrics.increment('counters.reconcile_runs')
+        metrics.increment('counters.reconcile_fixed', report.fixed)
+        metrics.observe('counters.reconcile_duration', report.duration)
+
+        log = logger.warning if report.fixed else logger.info
+        log(
+            f"Сверка счетчиков: компаний {report.companies}, пользователей {report.assignees}, "
+            f"исправлено {report.fixed} за {report.duration:.1f} с"
+        )
+        return report
+
+    def _chunks(self, ids: List[int]) -> List[List[int]]:
+        return [ids[i:i + RECONCILE_CHUNK_SIZE] for i in range(0, len(ids), RECONCILE_CHUNK_SIZE)]
@@ -0,0 +1,327 @@
+"""
+Выгрузка задач компании за период в CSV или XLSX
+
+Задачи читаются страницами по EXPORT_CHUNK_SIZE (keyset по индексу
+idx_company_status_created, по очереди для каждого статуса), имена
+исполнителей — одним запросом на страницу только для еще не встречавшихся.
+Каждая страница сразу кодируется и дописывается во временный файл,
+который до EXPORT_SPOOL_SIZE байт держится в памяти, а дальше уходит на
+диск. Файл отправляется в Telegram потоком (SpooledInputFile), поэтому
+память не зависит от количества задач.
+
+XLSX пишется потоково без сторонних библиотек: книга — zip-архив
+из нескольких XML, лист дописывается построчно в открытую запись архива.
+"""
+import csv
+import io
+import logging
+import re
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncGenerator, Awaitable, Callable, Dict, List, Optional
+from xml.sax.saxutils import escape
+
+import aiofiles.tempfile
+from aiogram.types.input_file import InputFile, DEFAULT_CHUNK_SIZE
+
+from app.database.models.task_model import Task
+from app.database.repositories.task_repository import TaskRepository
+from app.database.repositories.user_repository import UserRepository
+from app.services.task_service import ALL_STATUSES
+from app.utils import metrics
+from config import config
+
+logger = logging.getLogger(__name__)
+
+EXPORT_HEADERS = (
+    "ID", "Название", "Статус", "Приоритет", "Исполнитель", "Срок",
+    "Создана", "Выполнена", "Инициатор", "Телефон инициатора", "Описание"
+)
+
+# Начало периода "за все время"
+EPOCH = datetime(1970, 1, 1)
+
+DATE_FORMAT = '%d.%m.%Y %H:%M'
+
+# С этих символов Excel начинает формулу (CSV/formula injection)
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def neutralize_formula(value):
+    """Текст, который Excel принял бы за формулу, предваряется апострофом"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class CsvEncoder:
+    """CSV для Excel: UTF-8 с BOM и разделителем ';' (русская локаль)"""
+
+    extension = 'csv'
+
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, delimiter=';')
+
+    def begin(self, headers: List[str]) -> bytes:
+        return '\ufeff'.encode('utf-8') + self.rows([headers])
+
+    def rows(self, rows: List[list]) -> bytes:
+        self._writer.writerows(
+            ['' if value is None else neutralize_formula(value) for value in row] for row in rows
+        )
+        data = self._buffer.getvalue().encode('utf-8')
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def finish(self) -> bytes:
+        return b''
+
+
+class _DrainBuffer:
+    """
+    Приемник zip-архива: накапливает сжатые байты до следующего drain
+
+    Метода tell нет, поэтому zipfile пишет архив как в поток без
+    перемотки (размеры записей — в дескрипторах после данных).
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+XLSX_NAMESPACE = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+XLSX_RELATIONSHIPS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+XLSX_PACKAGE = "http://schemas.openxmlformats.org/package/2006"
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+XLSX_STATIC_PARTS = {
+    '[Content_Types].xml': (
+        f'<Types xmlns="{XLSX_PACKAGE}/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        f'<Relationships xmlns="{XLSX_PACKAGE}/relationships">'
+        f'<Relationship Id="rId1" Type="{XLSX_RELATIONSHIPS}/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        f'<workbook xmlns="{XLSX_NAMESPACE}" xmlns:r="{XLSX_RELATIONSHIPS}">'
+        '<sheets><sheet name="Задачи" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        f'<Relationships xmlns="{XLSX_PACKAGE}/relationships">'
+        f'<Relationship Id="rId1" Type="{XLSX_RELATIONSHIPS}/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+# Управляющие символы, недопустимые в XML
+XML_ILLEGAL_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+class XlsxEncoder:
+    """Книга XLSX с одним листом; строки — встроенные строки и числа, без стилей"""
+
+    extension = 'xlsx'
+
+    def __init__(self):
+        self._output = _DrainBuffer()
+        self._archive = zipfile.ZipFile(self._output, 'w', compression=zipfile.ZIP_DEFLATED)
+        self._sheet = None
+
+    def begin(self, headers: List[str]) -> bytes:
+        for name, content in XLSX_STATIC_PARTS.items():
+            self._archive.writestr(name, XML_DECLARATION + content)
+        self._sheet = self._archive.open('xl/worksheets/sheet1.xml', 'w')
+        self._sheet.write(f'{XML_DECLARATION}<worksheet xmlns="{XLSX_NAMESPACE}"><sheetData>'.encode('utf-8'))
+        return self.rows([headers])
+
+    def rows(self, rows: List[list]) -> bytes:
+        self._sheet.write(''.join(
+            '<row>' + ''.join(self._cell(value) for value in row) + '</row>' for row in rows
+        ).encode('utf-8'))
+        return self._output.drain()
+
+    def finish(self) -> bytes:
+        self._sheet.write(b'</sheetData></worksheet>')
+        self._sheet.close()
+        self._archive.close()
+        return self._output.drain()
+
+    def _cell(self, value) -> str:
+        if value is None:
+            return '<c/>'
+        if isinstance(value, int):
+            return f'<c t="n"><v>{value}</v></c>'
+        text = escape(XML_ILLEGAL_CHARS.sub('', neutralize_formula(str(value))))
+        return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+ENCODERS = {
+    CsvEncoder.extension: CsvEncoder,
+    XlsxEncoder.extension: XlsxEncoder,
+}
+
+
+class SpooledInputFile(InputFile):
+    """Отправка временного файла aiofiles в Telegram частями"""
+
+    def __init__(self, file, filename: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        super().__init__(filename=filename, chunk_size=chunk_size)
+        self.file = file
+
+    async def read(self, bot) -> AsyncGenerator[bytes, None]:
+        await self.file.seek(0)
+        while chunk := await self.file.read(self.chunk_size):
+            yield chunk
+
+
+@dataclass
+class ExportResult:
+    """Готовая выгрузка (файл нужно закрыть после отправки)"""
+
+    file: object
+    filename: str
+    rows: int
+    size: int
+    truncated: bool  # Достигнут EXPORT_MAX_ROWS
+
+    @property
+    def document(self) -> SpooledInputFile:
+        return SpooledInputFile(self.file, self.filename)
+
+    async def close(self) -> None:
+        await self.file.close()
+
+
+class ExportService:
+    """Сервис выгрузки задач"""
+
+    def __init__(self):
+        self.task_repo = TaskRepository()
+        self.user_repo = UserRepository()
+
+    async def export_company_tasks(
+        self,
+        company_id: int,
+        created_from: Optional[datetime],
+        created_to: datetime,
+        file_format: str,
+        progress: Optional[Callable[[int], Awaitable[None]]] = None
+    ) -> ExportResult:
+        """
+        Выгружает задачи компании, созданные за период
+
+        Args:
+            company_id: ID компании
+            created_from: Начало периода (None — за все время)
+            created_to: Конец периода (не включается)
+            file_format: csv или xlsx
+            progress: Вызывается после каждой страницы с количеством выгруженных задач
+
+        Returns:
+            Выгрузка во временном файле
+
+        Raises:
+            ValueError: Неизвестный формат
+        """
+        if file_format not in ENCODERS:
+            raise ValueError(f"Неизвестный формат выгрузки: {file_format}")
+
+        encoder = ENCODERS[file_format]()
+        user_names: Dict[int, str] = {}
+        rows = 0
+        size = 0
+        truncated = False
+
+        file = await aiofiles.tempfile.SpooledTemporaryFile(max_size=config.EXPORT_SPOOL_SIZE, mode='w+b')
+        try:
+            size += await self._write(file, encoder.begin(list(EXPORT_HEADERS)))
+
+            for status in ALL_STATUSES:
+                after = (created_from or EPOCH, 0)
+                while not truncated:
+                    limit = min(config.EXPORT_CHUNK_SIZE, config.EXPORT_MAX_ROWS - rows)
+                    tasks = await self.task_repo.export_by_company(company_id, status, created_to, *after, limit)
+                    if tasks:
+                        await self._load_user_names(tasks, user_names)
+                        size += await self._write(file, encoder.rows([self._to_row(task, user_names) for task in tasks]))
+                        rows += len(tasks)
+                        after = (tasks[-1].created_at, tasks[-1].task_id)
+                        if progress:
+                            await progress(rows)
+
+                    if rows >= config.EXPORT_MAX_ROWS:
+                        truncated = True
+                    if len(tasks) < limit:
+                        break
+
+            size += await self._write(file, encoder.finish())
+
+        except Exception:
+            await file.close()
+            raise
+
+        metrics.increment('export.files')
+        metrics.increment('export.rows', rows)
+        logger.info(f"Выгрузка задач компании {company_id}: {rows} задач, {size} байт, {file_format}")
+
+        return ExportResult(
+            file=file,
+            filename=f"tasks_{company_id}_{created_to.strftime('%Y%m%d')}.{encoder.extension}",
+            rows=rows,
+            size=size,
+            truncated=truncated
+        )
+
+    async def _write(self, file, data: bytes) -> int:
+        if data:
+            await file.write(data)
+        return len(data)
+
+    async def _load_user_names(self, tasks: List[Task], user_names: Dict[int, str]) -> None:
+        """Дочитывает имена исполнителей страницы, которых еще нет в user_names"""
+        missing = {task.assignee_id for task in tasks if task.assignee_id and task.assignee_id not in user_names}
+        if not missing:
+            return
+        for user in await self.user_repo.get_users_by_ids(list(missing)):
+            user_names[user.user_id] = user.full_name
+        for user_id in missing:
+            user_names.setdefault(user_id, str(user_id))
+
+    def _to_row(self, task: Task, user_names: Dict[int, str]) -> list:
+        return [
+            task.task_id,
+            task.title,
+            config.TASK_STATUSES.get(task.status, task.status),
+            config.TASK_PRIORITIES.get(task.priority, task.priority),
+            user_names.get(task.assignee_id) if task.assignee_id else None,
+            task.deadline.strftime(DATE_FORMAT) if task.deadline else None,
+            task.created_at.strftime(DATE_FORMAT) if task.created_at else None,
+            task.completed_at.strftime(DATE_FORMAT) if task.completed_at else None,
+            task.initiator_name,
+            task.initiator_phone,
+            task.description,
+        ]
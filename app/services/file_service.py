@@ -0,0 +1,346 @@
+"""
+Файлы, прикрепленные к задачам: загрузка из Telegram в Object Storage
+
+Размер и тип файла проверяются по метаданным сообщения до скачивания.
+Файл не сохраняется ни в память целиком, ни на диск: куски ответа Bot API
+(как в bot.download, но без приемника) собираются в части по S3_PART_SIZE
+и отправляются multipart-загрузкой, одновременно не больше
+S3_UPLOAD_CONCURRENCY частей. Пока все части в работе, чтение из Telegram
+ждет, поэтому в памяти не больше (S3_UPLOAD_CONCURRENCY + 1) частей.
+Файл меньше одной части отправляется одним put_object.
+
+boto3 синхронный, его вызовы идут в потоках (asyncio.to_thread), как и
+вызовы YDB SDK. S3_ENDPOINT может указывать на любое S3-совместимое
+хранилище (например, локальный MinIO для проверки).
+"""
+import asyncio
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from typing import AsyncGenerator, AsyncIterator, List, Optional
+
+import aiofiles
+import boto3
+from aiogram import Bot
+from aiogram.types import Message
+from botocore.config import Config as BotoConfig
+
+from app.database.models.file_model import TaskFile
+from app.database.repositories.file_repository import FileRepository
+from app.utils import metrics
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Облачный Bot API отдает ботам файлы не больше 20 МБ; больше — только локальный сервер
+TELEGRAM_CLOUD_DOWNLOAD_LIMIT = 20 * 1024 * 1024
+
+# Минимальная часть multipart-загрузки S3 (кроме последней)
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+
+DOWNLOAD_CHUNK_SIZE = 65536
+
+# Файлов задачи в списке
+FILES_LIST_LIMIT = 20
+
+
+class FileRejected(Exception):
+    """Файл нельзя прикрепить; текст исключения показывается пользователю"""
+
+
+@dataclass(frozen=True)
+class Attachment:
+    """Файл из сообщения Telegram (метаданные, без содержимого)"""
+
+    file_id: str
+    file_name: str
+    file_size: Optional[int]
+    mime_type: Optional[str]
+
+    @property
+    def extension(self) -> str:
+        """Расширение файла в нижнем регистре"""
+        return os.path.splitext(self.file_name)[1].lstrip('.').lower()
+
+    @classmethod
+    def from_message(cls, message: Message) -> Optional['Attachment']:
+        """
+        Файл из сообщения: документ или фото (самый крупный размер)
+
+        Returns:
+            Файл или None, если в сообщении его нет
+        """
+        if message.document:
+            document = message.document
+            return cls(
+                file_id=document.file_id,
+                file_name=os.path.basename(document.file_name or f"file_{document.file_unique_id}"),
+                file_size=document.file_size,
+                mime_type=document.mime_type
+            )
+        if message.photo:
+            photo = max(message.photo, key=lambda size: size.width * size.height)
+            return cls(
+                file_id=photo.file_id,
+                file_name=f"photo_{photo.file_unique_id}.jpg",
+                file_size=photo.file_size,
+                mime_type="image/jpeg"
+            )
+        return None
+
+
+def max_upload_size() -> int:
+    """Максимальный размер файла с учетом ограничения облачного Bot API"""
+    if config.TELEGRAM_API_URL:
+        return config.MAX_FILE_SIZE
+    return min(config.MAX_FILE_SIZE, TELEGRAM_CLOUD_DOWNLOAD_LIMIT)
+
+
+_s3_client = None
+
+
+def _get_s3_client():
+    """Клиент Object Storage (создается при первой загрузке, потокобезопасен)"""
+    global _s3_client
+    if _s3_client is None:
+        _s3_client = boto3.client(
+            's3',
+            endpoint_url=config.S3_ENDPOINT,
+            region_name=config.S3_REGION,
+            aws_access_key_id=config.S3_ACCESS_KEY,
+            aws_secret_access_key=config.S3_SECRET_KEY,
+            config=BotoConfig(max_pool_connections=max(config.S3_UPLOAD_CONCURRENCY, 10))
+        )
+    return _s3_client
+
+
+def set_s3_client(client) -> None:
+    """Подменяет клиент Object Storage (app/utils/fake_s3.py для проверок без сети)"""
+    global _s3_client
+    _s3_client = client
+
+
+class FileService:
+    """Сервис для работы с файлами задач"""
+
+    def __init__(self):
+        self.file_repo = FileRepository()
+
+    def check_attachment(self, attachment: Attachment) -> None:
+        """
+        Проверяет тип и размер файла по метаданным, до скачивания
+
+        Raises:
+            FileRejected: Файл нельзя прикрепить
+        """
+        if attachment.extension not in config.ALLOWED_FILE_TYPES:
+            raise FileRejected(
+                f"Тип файла не поддерживается. Допустимые: {', '.join(config.ALLOWED_FILE_TYPES)}"
+            )
+        if attachment.file_size is not None and attachment.file_size > max_upload_size():
+            raise FileRejected(f"Файл больше {max_upload_size() // (1024 * 1024)} МБ")
+
+    async def upload(self, bot: Bot, task_id: int, user_id: int, attachment: Attachment) -> TaskFile:
+        """
+        Загружает файл из Telegram в Object Storage и прикрепляет к задаче
+
+        Args:
+            bot: Экземпляр бота (скачивание через его сессию)
+            task_id: ID задачи
+            user_id: ID пользователя, загрузившего файл
+            attachment: Файл из сообщения
+
+        Returns:
+            Запись о файле
+
+        Raises:
+            FileRejected: Файл нельзя прикрепить (проверка метаданных или фактического размера)
+        """
+        self.check_attachment(attachment)
+        started = time.perf_counter()
+
+        telegram_file = await bot.get_file(attachment.file_id)
+        key = f"tasks/{task_id}/{uuid.uuid4().hex}/{attachment.file_name}"
+
+        file_size = await self._stream_to_s3(
+            self._read_telegram_file(bot, telegram_file.file_path), key, attachment.mime_type
+        )
+
+        try:
+            task_file = await self.file_repo.create_file(
+                task_id, user_id, attachment.file_name, key, file_size, attachment.mime_type
+            )
+        except Exception:
+            await self._delete_object(key)
+            raise
+
+        metrics.increment('files.uploaded')
+        metrics.increment('files.uploaded_bytes', file_size)
+        metrics.observe('files.upload', time.perf_counter() - started)
+        logger.info(f"Файл {task_file.file_id} ({file_size} байт) прикреплен к задаче {task_id} пользователем {user_id}")
+        return task_file
+
+    async def list_files(self, task_id: int, limit: int = FILES_LIST_LIMIT) -> List[TaskFile]:
+        """
+        Файлы задачи, сначала новые
+
+        Args:
+            task_id: ID задачи
+            limit: Максимум файлов
+
+        Returns:
+            Записи о файлах (пустой список при ошибке)
+        """
+        try:
+            return await self.file_repo.list_by_task(task_id, limit)
+        except Exception as e:
+            logger.error(f"Ошибка получения файлов задачи {task_id}: {e}")
+            return []
+
+    async def get_download_url(self, task_file: TaskFile) -> Optional[str]:
+        """
+        Временная ссылка на файл (S3_LINK_TTL секунд)
+
+        Returns:
+            Ссылка или None при ошибке
+        """
+        try:
+            return await asyncio.to_thread(
+                _get_s3_client().generate_presigned_url,
+                'get_object',
+                Params={'Bucket': config.S3_BUCKET, 'Key': task_file.file_path},
+                ExpiresIn=config.S3_LINK_TTL
+            )
+        except Exception as e:
+            logger.error(f"Ошибка создания ссылки на файл {task_file.file_id}: {e}")
+            return None
+
+    async def _read_telegram_file(self, bot: Bot, file_path: str) -> AsyncGenerator[bytes, None]:
+        """Содержимое файла из Bot API кусками по DOWNLOAD_CHUNK_SIZE (источник bot.download)"""
+        api = bot.session.api
+        if api.is_local:
+            async with aiofiles.open(api.wrap_local_file.to_local(file_path), 'rb') as f:
+                while chunk := await f.read(DOWNLOAD_CHUNK_SIZE):
+                    yield chunk
+            return
+
+        async for chunk in bot.session.stream_content(
+            url=api.file_url(bot.token, file_path),
+            timeout=config.FILE_DOWNLOAD_TIMEOUT,
+            chunk_size=DOWNLOAD_CHUNK_SIZE,
+            raise_for_status=True
+        ):
+            yield chunk
+
+    async def _stream_to_s3(self, chunks: AsyncIterator[bytes], key: str, mime_type: Optional[str]) -> int:
+        """
+        Записывает поток в Object Storage частями по S3_PART_SIZE
+
+        Args:
+            chunks: Куски содержимого
+            key: Ключ объекта
+            mime_type: MIME-тип объекта
+
+        Returns:
+            Размер объекта, байт
+
+        Raises:
+            FileRejected: Поток больше допустимого размера (незавершенная загрузка удаляется)
+        """
+        client = _get_s3_client()
+        limit = max_upload_size()
+        part_size = max(config.S3_PART_SIZE, S3_MIN_PART_SIZE)
+        concurrency = max(config.S3_UPLOAD_CONCURRENCY, 1)
+        extra = {'ContentType': mime_type} if mime_type else {}
+
+        buffer = bytearray()
+        total = 0
+        upload_id = None
+        part_number = 0
+        parts = []
+        pending = set()
+
+        async def start_part(data: bytes):
+            nonlocal part_number
+            if len(pending) >= concurrency:
+                done, still_pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending.intersection_update(still_pending)
+                parts.extend(task.result() for task in done)
+            part_number += 1
+            pending.add(asyncio.create_task(
+                self._upload_part(client, key, upload_id, part_number, data)
+            ))
+
+        try:
+            async for chunk in chunks:
+                total += len(chunk)
+                if total > limit:
+                    raise FileRejected(f"Файл больше {limit // (1024 * 1024)} МБ")
+                buffer += chunk
+
+                while len(buffer) >= part_size:
+                    if upload_id is None:
+                        response = await asyncio.to_thread(
+                            client.create_multipart_upload, Bucket=config.S3_BUCKET, Key=key, **extra
+                        )
+                        upload_id = response['UploadId']
+                    data = bytes(buffer[:part_size])
+                    del buffer[:part_size]
+                    await start_part(data)
+
+            if upload_id is None:
+                await asyncio.to_thread(
+                    client.put_object, Bucket=config.S3_BUCKET, Key=key, Body=bytes(buffer), **extra
+                )
+                return total
+
+            if buffer:
+                await start_part(bytes(buffer))
+                buffer.clear()
+            parts.extend(await asyncio.gather(*pending))
+            pending.clear()
+
+            parts.sort(key=lambda part: part['PartNumber'])
+            await asyncio.to_thread(
+                client.complete_multipart_upload,
+                Bucket=config.S3_BUCKET,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': parts}
+            )
+            return total
+
+        except BaseException:
+            # Включая отмену: незавершенная загрузка занимает место в бакете
+            for task in pending:
+                task.cancel()
+            if upload_id is not None:
+                try:
+                    await asyncio.to_thread(
+                        client.abort_multipart_upload, Bucket=config.S3_BUCKET, Key=key, UploadId=upload_id
+                    )
+                except Exception as e:
+                    logger.error(f"Ошибка отмены multipart-загрузки {key}: {e}")
+            raise
+
+    @staticmethod
+    async def _upload_part(client, key: str, upload_id: str, part_number: int, data: bytes) -> dict:
+        """Загружает одну часть и возвращает ее описание для complete_multipart_upload"""
+        response = await asyncio.to_thread(
+            client.upload_part,
+            Bucket=config.S3_BUCKET,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=data
+        )
+        return {'PartNumber': part_number, 'ETag': response['ETag']}
+
+    async def _delete_object(self, key: str) -> None:
+        """Удаляет объект без записи в БД (ошибки только логируются)"""
+        try:
+            await asyncio.to_thread(_get_s3_client().delete_object, Bucket=config.S3_BUCKET, Key=key)
+        except Exception as e:
+            logger.error(f"Ошибка удаления объекта {key}: {e}")
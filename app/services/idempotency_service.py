@@ -0,0 +1,172 @@
+"""
+Сервис защиты от повторной обработки update
+
+Telegram повторно доставляет update, если функция ответила ошибкой или не
+успела ответить. Повторная обработка создает дубликаты (компании, назначения
+ролей), поэтому update_id захватывается до передачи update в диспетчер:
+- LRU кеш недавно обработанных update процесса отсекает повтор без запроса;
+- в таблице processed_updates (общей для всех экземпляров, с TTL) создается
+  строка in_progress с арендой на IDEMPOTENCY_LEASE_SECONDS. INSERT атомарен:
+  повторная доставка, пришедшая в другой экземпляр, пока оригинал еще
+  обрабатывается, захват не получает и подтверждается без обработки;
+- после обработки строка отмечается done, после ошибки удаляется, чтобы
+  следующая доставка обработала update. Если экземпляр завис или упал, не
+  сняв захват, update можно обработать снова после истечения аренды.
+"""
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+from app.database.repositories.processed_update_repository import (
+    ProcessedUpdateRepository, STATE_DONE
+)
+from app.utils import metrics
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Результаты захвата update
+CLAIMED = 'claimed'
+PROCESSED = 'processed'
+IN_PROGRESS = 'in_progress'
+UNAVAILABLE = 'unavailable'
+
+
+class UpdateInProgress(Exception):
+    """Update захвачен другим экземпляром и еще обрабатывается"""
+
+
+class IdempotencyService:
+    """Однократная обработка update по update_id"""
+
+    def __init__(self, lru_size: int, lease_seconds: int):
+        """
+        Args:
+            lru_size: Сколько последних обработанных update_id помнить в процессе
+            lease_seconds: Срок захвата update (дольше самой долгой обработки)
+        """
+        self.lru_size = lru_size
+        self.lease_seconds = lease_seconds
+        self.processed_repo = ProcessedUpdateRepository()
+        self._recent: "OrderedDict[int, None]" = OrderedDict()
+
+    async def run_once(
+        self,
+        update_id: int,
+        process: Callable[[], Awaitable[object]],
+        raise_in_progress: bool = False
+    ) -> bool:
+        """
+        Выполняет обработку update, если его не обработали и не обрабатывают сейчас
+
+        Args:
+            update_id: ID update от Telegram
+            process: Функция, возвращающая корутину обработки
+            raise_in_progress: Не подтверждать update, который обрабатывает другой
+                экземпляр (очередь доставит его снова, когда захват завершится)
+
+        Returns:
+            True, если update обработан сейчас; False, если это повторная доставка
+
+        Raises:
+            UpdateInProgress: Update обрабатывается другим экземпляром (при raise_in_progress)
+        """
+        if update_id in self._recent:
+            self._recent.move_to_end(update_id)
+            metrics.increment('updates.duplicates')
+            logger.info(f"Update {update_id} уже обработан, пропускаем")
+            return False
+
+        owner = uuid.uuid4().hex
+        claim = await self._claim(update_id, owner)
+
+        if claim == PROCESSED:
+            self._remember(update_id)
+            metrics.increment('updates.duplicates')
+            logger.info(f"Update {update_id} уже обработан другим экземпляром, пропускаем")
+            return False
+        if claim == IN_PROGRESS:
+            # Оригинал обрабатывается другим экземпляром; при его ошибке захват
+            # снимается и следующая доставка обработает update
+            metrics.increment('updates.in_progress_duplicates')
+            if raise_in_progress:
+                raise UpdateInProgress(f"Update {update_id} обрабатывается другим экземпляром")
+            logger.info(f"Update {update_id} уже обрабатывается, пропускаем")
+            return False
+
+        try:
+            await process()
+        except BaseException:
+            # Включая отмену: повторная доставка должна обработать update
+            if claim == CLAIMED:
+                await self._release(update_id, owner)
+            raise
+
+        self._remember(update_id)
+        await self._mark_done(update_id, owner)
+        return True
+
+    def _remember(self, update_id: int) -> None:
+        self._recent[update_id] = None
+        self._recent.move_to_end(update_id)
+        while len(self._recent) > self.lru_size:
+            self._recent.popitem(last=False)
+
+    async def _claim(self, update_id: int, owner: str) -> str:
+        """
+        Захватывает update в таблице
+
+        Returns:
+            CLAIMED, PROCESSED, IN_PROGRESS или UNAVAILABLE (БД недоступна —
+            update обрабатывается без захвата)
+        """
+        try:
+            for _ in range(2):
+                lease_until = datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+                if await self.processed_repo.claim(update_id, owner, lease_until):
+                    return CLAIMED
+
+                row = await self.processed_repo.get_claim(update_id)
+                if row is None:
+                    # Захват сняли после ошибки между запросами
+                    continue
+                if row['state'] == STATE_DONE:
+                    return PROCESSED
+                if row['owner'] == owner:
+                    # INSERT выполнился, но SDK повторил запрос после потери ответа
+                    return CLAIMED
+
+                # Захват с истекшей арендой удаляется, с действующей остается
+                await self.processed_repo.delete_expired_claim(update_id, datetime.utcnow())
+            return IN_PROGRESS
+        except Exception as e:
+            logger.warning(f"Не удалось захватить update {update_id}: {e}")
+            return UNAVAILABLE
+
+    async def _mark_done(self, update_id: int, owner: str) -> None:
+        """Сохраняет отметку; ошибка не должна приводить к повторной доставке"""
+        try:
+            await self.processed_repo.mark_done(update_id, owner)
+        except Exception as e:
+            logger.warning(f"Не удалось отметить update {update_id} как обработанный: {e}")
+
+    async def _release(self, update_id: int, owner: str) -> None:
+        """Снимает захват; при ошибке повтор возможен после истечения аренды"""
+        try:
+            await asyncio.shield(self.processed_repo.release(update_id, owner))
+        except (Exception, asyncio.CancelledError) as e:
+            logger.warning(f"Не удалось снять захват update {update_id}: {e}")
+
+
+_service: Optional[IdempotencyService] = None
+
+
+def get_idempotency_service() -> IdempotencyService:
+    """Возвращает сервис процесса"""
+    global _service
+    if _service is None:
+        _service = IdempotencyService(config.IDEMPOTENCY_LRU_SIZE, config.IDEMPOTENCY_LEASE_SECONDS)
+    return _service
@@ -0,0 +1,89 @@
+"""
+Счетчики задач исполнителя для главного меню ("Мои задачи (3 новых, 1 просрочена)")
+
+Количество задач по статусам берется из assignee_task_counters — их
+изменяют транзакции создания задачи, смены статуса и срока и перевода в
+overdue (app/database/repositories/counter_repository.py). Главное меню
+открывается чаще всего, поэтому счетчики кешируются в процессе на
+INBOX_CACHE_TTL секунд: повторный показ меню не обращается к БД.
+
+Изменения задач в этом процессе сбрасывают кеш исполнителя сразу
+(TaskService, OverdueSweeper, сверка счетчиков); изменения в других
+экземплярах функции видны после истечения INBOX_CACHE_TTL.
+"""
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from app.database.models.inbox_model import InboxCounts
+from app.database.repositories.counter_repository import CounterRepository
+from app.utils import metrics
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# ID исполнителя -> (счетчики, момент истечения по time.monotonic)
+_cache: "OrderedDict[int, Tuple[InboxCounts, float]]" = OrderedDict()
+
+
+def invalidate_inbox(assignee_id: Optional[int]) -> None:
+    """Сбрасывает кеш исполнителя после изменения его задачи"""
+    if assignee_id is not None:
+        _cache.pop(assignee_id, None)
+
+
+def invalidate_all_inboxes() -> None:
+    """Сбрасывает кеш всех исполнителей (массовые изменения задач)"""
+    _cache.clear()
+
+
+class InboxService:
+    """Сервис счетчиков задач исполнителя"""
+
+    def __init__(self):
+        self.counter_repo = CounterRepository()
+
+    def peek(self, assignee_id: int) -> Optional[InboxCounts]:
+        """
+        Счетчики из кеша без обращения к БД
+
+        Args:
+            assignee_id: ID исполнителя
+
+        Returns:
+            Счетчики или None, если их нет в кеше или они устарели
+        """
+        entry = _cache.get(assignee_id)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return entry[0]
+
+    async def get_counts(self, assignee_id: int) -> Optional[InboxCounts]:
+        """
+        Счетчики исполнителя: из кеша или одним чтением assignee_task_counters
+
+        Args:
+            assignee_id: ID исполнителя
+
+        Returns:
+            Счетчики или None при ошибке чтения (меню показывается без них)
+        """
+        counts = self.peek(assignee_id)
+        if counts is not None:
+            metrics.increment('inbox.cache_hits')
+            return counts
+
+        metrics.increment('inbox.cache_misses')
+        try:
+            rows = await self.counter_repo.get_assignee_counts([assignee_id])
+        except Exception as e:
+            logger.error(f"Ошибка получения счетчиков задач исполнителя {assignee_id}: {e}")
+            return None
+
+        counts = InboxCounts.from_counts(rows.get(assignee_id, {}))
+        _cache[assignee_id] = (counts, time.monotonic() + config.INBOX_CACHE_TTL)
+        _cache.move_to_end(assignee_id)
+        while len(_cache) > config.INBOX_CACHE_SIZE:
+            _cache.popitem(last=False)
+        return counts
@@ -0,0 +1,129 @@
+"""
+Перевод задач с истекшим сроком в статус overdue
+
+Статус overdue хранится в таблице, а не вычисляется при каждой отрисовке:
+его проставляет задание по таймеру (sweeper_handler в index.py), поэтому
+просроченные задачи читаются из индекса по статусу без сканирования
+открытых. Запуск читает диапазон индекса idx_status_deadline
+(status, deadline <= cutoff) для открытых статусов и переводит задачи
+пакетами, каждый пакет — одна транзакция.
+
+Переведенные задачи уходят из диапазона открытого статуса, поэтому ниже
+сохраненного watermark в нем задач нет: каждый запуск фактически читает
+только задачи, срок которых истек после предыдущего запуска (и задачи,
+созданные сразу с прошедшим сроком). Прерванный запуск (лимит пакетов,
+таймаут функции) продолжается следующим с того же места, повторный
+запуск ничего не меняет. Одновременные запуски на нескольких экземплярах
+безопасны: пересекающиеся пакеты сериализуются транзакциями YDB.
+"""
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Optional
+
+from app.database.repositories.job_state_repository import JobStateRepository
+from app.database.repositories.task_repository import TaskRepository
+from app.services.inbox_service import invalidate_all_inboxes
+from app.utils import metrics
+from config import config
+
+logger = logging.getLogger(__name__)
+
+SWEEPER_JOB = 'overdue_sweeper'
+
+# Статусы, задачи в которых становятся просроченными
+OPEN_STATUSES = ('new', 'in_progress')
+
+
+@dataclass
+class SweepReport:
+    """Итоги запуска"""
+
+    cutoff: datetime
+    marked: int = 0
+    batches: int = 0
+    by_status: Dict[str, int] = field(default_factory=dict)
+    complete: bool = False
+    watermark: Optional[datetime] = None
+    duration: float = 0.0
+
+
+class OverdueSweeper:
+    """Пакетный перевод задач с истекшим сроком в overdue"""
+
+    def __init__(self, batch_size: int = None, max_batches: int = None):
+        """
+        Args:
+            batch_size: Задач в одной транзакции
+            max_batches: Максимум пакетов за запуск (остаток обработает следующий запуск)
+        """
+        self.batch_size = batch_size or config.OVERDUE_SWEEP_BATCH_SIZE
+        self.max_batches = max_batches or config.OVERDUE_SWEEP_MAX_BATCHES
+        self.task_repo = TaskRepository()
+        self.job_state_repo = JobStateRepository()
+
+    async def sweep(self, now: Optional[datetime] = None) -> SweepReport:
+        """
+        Переводит в overdue задачи открытых статусов со сроком не позже now
+
+        Args:
+            now: Граница срока (по умолчанию текущее время UTC)
+
+        Returns:
+            Итоги запуска
+        """
+        started = time.perf_counter()
+        report = SweepReport(cutoff=now or datetime.utcnow())
+
+        state = await self.job_state_repo.get_state(SWEEPER_JOB)
+        report.watermark = state.watermark if state else None
+
+        report.complete = True
+        for status in OPEN_STATUSES:
+            report.by_status[status] = 0
+            while True:
+                if report.batches >= self.max_batches:
+                    report.complete = False
+                    break
+
+                marked = await self.task_repo.mark_overdue_batch(status, report.cutoff, self.batch_size)
+                report.batches += 1
+                report.marked += marked
+                report.by_status[status] += marked
+
+                if marked < self.batch_size:
+                    break
+
+            if not report.complete:
+                break
+
+        # Watermark сдвигается только после полного прохода и только вперед:
+        # одновременный запуск с более поздней границей мог уже сохранить свой
+        if report.complete:
+            report.watermark = report.cutoff
+        await self.job_state_repo.advance_state(SWEEPER_JOB, report.watermark, report.marked)
+        if report.marked:
+            invalidate_all_inboxes()
+
+        report.duration = time.perf_counter() - started
+        metrics.increment('sweeper.runs')
+        metrics.increment('sweeper.batches', report.batches)
+        metrics.increment('sweeper.marked', report.marked)
+        metrics.observe('sweeper.duration', report.duration)
+
+        by_status = ", ".join(f"{status}: {count}" for status, count in report.by_status.items())
+        logger.info(
+            f"Просрочка: переведено {report.marked} задач ({by_status}) за {report.batches} пакетов, "
+            f"{report.duration:.1f} с, {'завершено' if report.complete else 'продолжится в следующем запуске'}"
+        )
+        return report
+
+    async def get_watermark(self) -> Optional[datetime]:
+        """Момент, до которого просрочка гарантированно проставлена (None — задание не запускалось)"""
+        try:
+            state = await self.job_state_repo.get_state(SWEEPER_JOB)
+        except Exception as e:
+            logger.error(f"Ошибка получения состояния проверки просрочки: {e}")
+            return None
+        return state.watermark if state else None
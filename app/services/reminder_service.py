@@ -0,0 +1,301 @@
+"""
+Напоминания исполнителям о приближении срока задачи
+
+При создании задачи и переносе срока для каждого смещения из
+REMINDER_OFFSETS записывается строка в таблицу reminders с ключом
+(интервал REMINDER_BUCKET_SECONDS, task_id, remind_at). Запуск по таймеру
+(reminder_handler в index.py, в server.py — app/bot/timer_jobs.py) читает
+только интервалы от watermark до текущего, захватывает наступившие
+напоминания транзакцией и отправляет их через SenderService с
+ограничением одновременных отправок.
+
+Запуски на нескольких экземплярах безопасны: напоминание захватывается
+одним из них. Неотправленное из-за временной ошибки (или упавшего
+экземпляра) захватывается повторно после REMINDER_LEASE_SECONDS, поэтому
+последние интервалы в пределах аренды перечитываются каждым запуском.
+Отправка пакета ограничена REMINDER_SEND_TIMEOUT (меньше аренды): если
+очередь SenderService занята паузами RetryAfter и повторами, неотправленные
+напоминания откладываются на повтор, а не ждут, пока их захватит другой
+экземпляр.
+
+Доставка — не менее одного раза: если сообщение ушло, но отметка sent_at
+не записалась (ошибка БД, падение экземпляра, ответ Telegram пришел уже
+после таймаута), напоминание будет отправлено повторно.
+"""
+import asyncio
+import calendar
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from aiogram import html
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+from app.database.models.task_model import Task
+from app.database.repositories.job_state_repository import JobStateRepository
+from app.database.repositories.reminder_repository import Reminder, ReminderRepository
+from app.database.repositories.task_repository import TaskRepository
+from app.utils import metrics
+from config import config
+
+logger = logging.getLogger(__name__)
+
+REMINDER_JOB = 'reminders'
+
+# Строки напоминаний хранятся сутки после срока и удаляются по TTL
+REMINDER_RETENTION = timedelta(days=1)
+
+# Статусы, в которых напоминание уже не нужно
+CLOSED_STATUSES = ('completed', 'not_completed')
+
+# Ответы Bot API 400, после которых доставка невозможна (остальные повторяются)
+UNDELIVERABLE_ERRORS = ('chat not found', 'user not found')
+
+
+def get_bucket(moment: datetime) -> int:
+    """Начало интервала напоминаний, содержащего moment (секунды UTC)"""
+    seconds = calendar.timegm(moment.utctimetuple())
+    return seconds - seconds % config.REMINDER_BUCKET_SECONDS
+
+
+def build_reminder_rows(assignee_id: Optional[int], deadline: Optional[datetime], now: datetime) -> List[dict]:
+    """
+    Строки напоминаний для срока задачи (без task_id)
+
+    Args:
+        assignee_id: ID исполнителя
+        deadline: Срок задачи
+        now: Текущее время: напоминания в прошлом не создаются
+
+    Returns:
+        Строки для таблицы reminders
+    """
+    if not assignee_id or not deadline:
+        return []
+
+    rows = []
+    for minutes in config.REMINDER_OFFSETS:
+        remind_at = deadline - timedelta(minutes=minutes)
+        if remind_at <= now:
+            continue
+        rows.append({
+            'bucket': get_bucket(remind_at),
+            'remind_at': remind_at,
+            'assignee_id': assignee_id,
+            'deadline': deadline,
+            'expires_at': deadline + REMINDER_RETENTION
+        })
+    return rows
+
+
+def build_reminder_keys(deadline: Optional[datetime]) -> List[dict]:
+    """Ключи (bucket, remind_at) всех возможных напоминаний срока — для удаления при переносе"""
+    if not deadline:
+        return []
+
+    keys = []
+    for minutes in config.REMINDER_OFFSETS:
+        remind_at = deadline - timedelta(minutes=minutes)
+        keys.append({'bucket': get_bucket(remind_at), 'remind_at': remind_at})
+    return keys
+
+
+def _is_undeliverable(error: Exception) -> bool:
+    """Бот заблокирован пользователем или чата нет — повтор не поможет"""
+    if isinstance(error, TelegramForbiddenError):
+        return True
+    return isinstance(error, TelegramBadRequest) and any(
+        text in str(error).lower() for text in UNDELIVERABLE_ERRORS
+    )
+
+
+@dataclass
+class ReminderReport:
+    """Итоги запуска"""
+
+    buckets: int = 0
+    claimed: int = 0
+    sent: int = 0
+    skipped: int = 0
+    failed: int = 0
+    retry: int = 0
+    watermark: Optional[datetime] = None
+    duration: float = 0.0
+    errors: Dict[int, str] = field(default_factory=dict)
+
+
+class ReminderScheduler:
+    """Отправка наступивших напоминаний"""
+
+    def __init__(self, batch_size: int = None, concurrency: int = None, max_batches: int = 10):
+        """
+        Args:
+            batch_size: Напоминаний в одном захвате
+            concurrency: Одновременных отправок
+            max_batches: Максимум захватов за запуск (остаток обработает следующий)
+        """
+        self.batch_size = batch_size or config.REMINDER_BATCH_SIZE
+        self.concurrency = concurrency or config.REMINDER_CONCURRENCY
+        self.max_batches = max_batches
+        self.reminder_repo = ReminderRepository()
+        self.task_repo = TaskRepository()
+        self.job_state_repo = JobStateRepository()
+
+    def due_buckets(self, watermark: Optional[datetime], now: datetime) -> List[int]:
+        """
+        Интервалы, которые нужно прочитать: от watermark (но не раньше
+        REMINDER_MAX_LAG и не позже начала аренды) до текущего
+        """
+        step = config.REMINDER_BUCKET_SECONDS
+        current = get_bucket(now)
+        oldest = get_bucket(now - timedelta(seconds=config.REMINDER_MAX_LAG))
+        lease_start = get_bucket(now - timedelta(seconds=config.REMINDER_LEASE_SECONDS))
+
+        start = get_bucket(watermark) if watermark else oldest
+        start = max(oldest, min(start, lease_start))
+        return list(range(start, current + step, step))
+
+    async def tick(self, now: Optional[datetime] = None) -> ReminderReport:
+        """
+        Отправляет наступившие напоминания
+
+        Args:
+            now: Текущее время (по умолчанию utcnow)
+
+        Returns:
+            Итоги запуска
+        """
+        started = time.perf_counter()
+        now = now or datetime.utcnow()
+        report = ReminderReport()
+
+        state = await self.job_state_repo.get_state(REMINDER_JOB)
+        buckets = self.due_buckets(state.watermark if state else None, now)
+        report.buckets = len(buckets)
+
+        lease_expired = now - timedelta(seconds=config.REMINDER_LEASE_SECONDS)
+        drained = False
+        retry_buckets: List[int] = []
+
+        for _ in range(self.max_batches):
+            reminders = await self.reminder_repo.claim_due(buckets, now, lease_expired, self.batch_size)
+            report.claimed += len(reminders)
+            if reminders:
+                retry_buckets.extend(await self._deliver(reminders, report))
+            if len(reminders) < self.batch_size:
+                drained = True
+                break
+
+        # Watermark не обгоняет интервалы с напоминаниями, которые нужно повторить
+        if drained:
+            report.watermark = datetime.utcfromtimestamp(min(retry_buckets + [get_bucket(now)]))
+        else:
+            report.watermark = datetime.utcfromtimestamp(buckets[0])
+        await self.job_state_repo.save_state(REMINDER_JOB, report.watermark, report.sent)
+
+        report.duration = time.perf_counter() - started
+        metrics.increment('reminders.claimed', report.claimed)
+        metrics.increment('reminders.sent', report.sent)
+        metrics.increment('reminders.skipped', report.skipped)
+        metrics.increment('reminders.failed', report.failed)
+        metrics.increment('reminders.retry', report.retry)
+        metrics.observe('reminders.tick', report.duration)
+
+        logger.info(
+            f"Напоминания: интервалов {report.buckets}, захвачено {report.claimed}, отправлено {report.sent}, "
+            f"пропущено {report.skipped}, ошибок {report.failed}, на повтор {report.retry} "
+            f"за {report.duration:.1f} с"
+        )
+        return report
+
+    async def _deliver(self, reminders: List[Reminder], report: ReminderReport) -> List[int]:
+        """
+        Отправляет захваченные напоминания
+
+        Returns:
+            Интервалы напоминаний, которые нужно повторить
+        """
+        from app.services.sender_service import get_sender_service
+
+        tasks = {task.task_id: task for task in await self.task_repo.get_tasks_by_ids(
+            list({reminder.task_id for reminder in reminders})
+        )}
+        sender = await get_sender_service()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # Все напоминания пакета захвачены одновременно: отправка укладывается в аренду
+        deadline = asyncio.get_running_loop().time() + config.REMINDER_SEND_TIMEOUT
+
+        done: List[Reminder] = []
+        retry: List[Reminder] = []
+
+        async def deliver(reminder: Reminder) -> None:
+            task = tasks.get(reminder.task_id)
+            if not self._is_actual(reminder, task):
+                report.skipped += 1
+                done.append(reminder)
+                return
+
+            async with semaphore:
+                try:
+                    timeout = deadline - asyncio.get_running_loop().time()
+                    if timeout <= 0:
+                        raise asyncio.TimeoutError()
+                    # Отмена по таймауту снимает сообщение с очереди SenderService
+                    await asyncio.wait_for(
+                        sender.send(
+                            task.assignee_id,
+                            self._format(task),
+                            task.priority,
+                            reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
+                                InlineKeyboardButton(text="📋 Открыть задачу", callback_data=f"task_details:{task.task_id}")
+                            ]])
+                        ),
+                        timeout
+                    )
+                except asyncio.TimeoutError:
+                    report.retry += 1
+                    report.errors[reminder.task_id] = f"Не отправлено за {config.REMINDER_SEND_TIMEOUT} с"
+                    retry.append(reminder)
+                    return
+                except Exception as e:
+                    if _is_undeliverable(e):
+                        # Пользователь заблокировал бота или чата нет — повтор не поможет
+                        report.failed += 1
+                        report.errors[reminder.task_id] = str(e)
+                        done.append(reminder)
+                        return
+                    report.retry += 1
+                    report.errors[reminder.task_id] = str(e)
+                    retry.append(reminder)
+                    return
+
+            report.sent += 1
+            done.append(reminder)
+
+        await asyncio.gather(*(deliver(reminder) for reminder in reminders))
+
+        # Не отмеченные напоминания снова захватятся после истечения аренды
+        await self.reminder_repo.mark_sent(done)
+        return [reminder.bucket for reminder in retry]
+
+    def _is_actual(self, reminder: Reminder, task: Optional[Task]) -> bool:
+        """Напоминание не нужно, если задача закрыта, срок перенесен или у задачи нет исполнителя"""
+        return (
+            task is not None
+            and task.assignee_id is not None
+            and task.status not in CLOSED_STATUSES
+            and task.deadline == reminder.deadline
+        )
+
+    def _format(self, task: Task) -> str:
+        left = task.deadline - datetime.utcnow()
+        hours = max(0, int(left.total_seconds() // 3600))
+        minutes = max(0, int(left.total_seconds() % 3600 // 60))
+        return (
+            f"⏰ Напоминание о сроке задачи\n\n"
+            f"{task.priority_emoji} {html.quote(task.title)}\n"
+            f"Срок: {task.deadline.strftime('%d.%m.%Y в %H:%M')} UTC (осталось {hours} ч {minutes} мин)"
+        )
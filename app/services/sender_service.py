@@ -0,0 +1,305 @@
+"""
+Сервис исходящих сообщений с учетом лимитов Telegram
+
+Telegram ограничивает рассылку примерно 30 сообщениями в секунду на бота и
+1 сообщением в секунду в один чат. Сообщения ставятся в очередь с приоритетом:
+сначала срочные (порядок config.TASK_PRIORITIES), и отправляются несколькими
+воркерами с общим token bucket и token bucket на чат. При TelegramRetryAfter
+отправка приостанавливается на retry_after и сообщение повторяется.
+
+Обработчики, отвечающие на действие пользователя, по-прежнему вызывают
+message.answer/edit_text напрямую; сервис предназначен для уведомлений
+и рассылок, инициированных ботом.
+"""
+import asyncio
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramBadRequest, TelegramForbiddenError, TelegramNetworkError, TelegramRetryAfter, TelegramServerError
+)
+from aiogram.types import Message
+
+from app.utils import metrics
+from app.utils.token_bucket import KeyedTokenBuckets, TokenBucket
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Чем меньше число, тем раньше отправка
+PRIORITY_RANKS: Dict[str, int] = {priority: rank for rank, priority in enumerate(config.TASK_PRIORITIES)}
+DEFAULT_PRIORITY = 'normal'
+
+
+@dataclass(order=True)
+class OutgoingMessage:
+    """Сообщение в очереди отправки"""
+
+    sort_key: Tuple[int, int]
+    chat_id: int = field(compare=False)
+    text: str = field(compare=False)
+    kwargs: Dict[str, Any] = field(compare=False, default_factory=dict)
+    future: Optional[asyncio.Future] = field(compare=False, default=None)
+    attempts: int = field(compare=False, default=0)
+
+
+@dataclass
+class BulkSendReport:
+    """Итоги массовой отправки"""
+
+    total: int = 0
+    sent: int = 0
+    failed: int = 0
+    duration: float = 0.0
+    errors: Dict[int, str] = field(default_factory=dict)
+
+    @property
+    def throughput(self) -> float:
+        """Отправлено сообщений в секунду"""
+        return self.sent / self.duration if self.duration else 0.0
+
+
+class SenderService:
+    """Очередь исходящих сообщений с ограничением частоты"""
+
+    def __init__(
+        self,
+        bot: Bot,
+        global_rate: float = None,
+        per_chat_rate: float = None,
+        workers: int = None,
+        max_retries: int = None
+    ):
+        """
+        Args:
+            bot: Экземпляр бота
+            global_rate: Сообщений в секунду на бота
+            per_chat_rate: Сообщений в секунду в один чат
+            workers: Количество одновременных отправок
+            max_retries: Повторов при сетевых ошибках и ошибках сервера Telegram
+        """
+        self.bot = bot
+        global_rate = global_rate or config.SENDER_GLOBAL_RATE
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        per_chat_rate = per_chat_rate or config.SENDER_PER_CHAT_RATE
+        self.chat_buckets: KeyedTokenBuckets[int] = KeyedTokenBuckets(per_chat_rate, 1)
+        self.workers = workers or config.SENDER_WORKERS
+        self.max_retries = config.SENDER_MAX_RETRIES if max_retries is None else max_retries
+
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+        # Сообщения, ожидающие повторной постановки в очередь
+        self._delayed: Dict[int, Tuple[asyncio.TimerHandle, OutgoingMessage]] = {}
+
+    def _ensure_started(self) -> None:
+        """Запускает воркеры в текущем цикле событий при первой отправке"""
+        if self._tasks:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    def enqueue(self, chat_id: int, text: str, priority: str = DEFAULT_PRIORITY, **kwargs: Any) -> asyncio.Future:
+        """
+        Ставит сообщение в очередь
+
+        Args:
+            chat_id: ID чата
+            text: Текст сообщения
+            priority: Приоритет из config.TASK_PRIORITIES
+            **kwargs: Дополнительные параметры bot.send_message (reply_markup и т.п.)
+
+        Returns:
+            Future с отправленным сообщением
+        """
+        self._ensure_started()
+
+        rank = PRIORITY_RANKS.get(priority, PRIORITY_RANKS.get(DEFAULT_PRIORITY, 0))
+        message = OutgoingMessage(
+            sort_key=(rank, next(self._sequence)),
+            chat_id=chat_id,
+            text=text,
+            kwargs=kwargs,
+            future=asyncio.get_running_loop().create_future()
+        )
+        self._queue.put_nowait(message)
+        metrics.set_gauge('sender.queued', self._queue.qsize())
+        return message.future
+
+    async def send(self, chat_id: int, text: str, priority: str = DEFAULT_PRIORITY, **kwargs: Any) -> Message:
+        """Отправляет сообщение через очередь и ждет результат"""
+        return await self.enqueue(chat_id, text, priority, **kwargs)
+
+    async def send_bulk(
+        self,
+        chat_ids: Iterable[int],
+        text: str,
+        priority: str = DEFAULT_PRIORITY,
+        **kwargs: Any
+    ) -> BulkSendReport:
+        """
+        Отправляет одно сообщение во множество чатов
+
+        Args:
+            chat_ids: ID чатов
+            text: Текст сообщения
+            priority: Приоритет из config.TASK_PRIORITIES
+
+        Returns:
+            Отчет с количеством отправленных, ошибками и скоростью отправки
+        """
+        chat_ids = list(dict.fromkeys(chat_ids))
+        report = BulkSendReport(total=len(chat_ids))
+        started = time.perf_counter()
+
+        futures = [self.enqueue(chat_id, text, priority, **kwargs) for chat_id in chat_ids]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+
+        for chat_id, result in zip(chat_ids, results):
+            if isinstance(result, Exception):
+                report.failed += 1
+                report.errors[chat_id] = str(result)
+            else:
+                report.sent += 1
+
+        report.duration = time.perf_counter() - started
+        logger.info(
+            f"Рассылка: отправлено {report.sent} из {report.total} за {report.duration:.1f} с "
+            f"({report.throughput:.1f} сообщ./с), ошибок {report.failed}"
+        )
+        return report
+
+    async def notify_role(self, role: str, text: str, priority: str = DEFAULT_PRIORITY, **kwargs: Any) -> BulkSendReport:
+        """Отправляет сообщение всем активным пользователям с ролью (например, sysadmin)"""
+        from app.services.auth_service import AuthService
+
+        users = await AuthService().get_users_by_role(role)
+        return await self.send_bulk((user.user_id for user in users), text, priority, **kwargs)
+
+    async def _worker(self) -> None:
+        while True:
+            message: OutgoingMessage = await self._queue.get()
+            try:
+                await self._process(message)
+            except Exception as e:
+                # Ошибка одного сообщения не должна останавливать воркер
+                logger.error(f"Ошибка отправки в чат {message.chat_id}: {e}")
+                if not message.future.done():
+                    message.future.set_exception(e)
+            finally:
+                self._queue.task_done()
+                metrics.set_gauge('sender.queued', self._queue.qsize())
+
+    async def _process(self, message: OutgoingMessage) -> None:
+        if message.future.done():
+            return
+
+        chat_wait = self.chat_buckets.get(message.chat_id).time_until()
+        if chat_wait > 0:
+            # Чат исчерпал лимит: возвращаем сообщение позже, не задерживая другие чаты
+            self._requeue_later(message, chat_wait)
+            return
+
+        await self._wait_for_global_slot()
+        # Пока ждали общий лимит, в этот чат мог уйти другой воркер
+        if not self.chat_buckets.get(message.chat_id).try_consume():
+            self._requeue_later(message, self.chat_buckets.get(message.chat_id).time_until())
+            return
+
+        message.attempts += 1
+        try:
+            result = await self.bot.send_message(message.chat_id, message.text, **message.kwargs)
+        except TelegramRetryAfter as e:
+            # Telegram не сообщает, какой лимит превышен, поэтому останавливаем всю отправку
+            metrics.increment('sender.retry_after')
+            logger.warning(f"Лимит Telegram превышен, пауза {e.retry_after} с")
+            self._paused_until = max(self._paused_until, time.monotonic() + e.retry_after)
+            self._requeue_later(message, e.retry_after)
+            return
+        except (TelegramNetworkError, TelegramServerError) as e:
+            if message.attempts <= self.max_retries:
+                metrics.increment('sender.retries')
+                self._requeue_later(message, min(2 ** message.attempts, 30))
+                return
+            metrics.increment('sender.failed')
+            if not message.future.done():
+                message.future.set_exception(e)
+            return
+        except (TelegramForbiddenError, TelegramBadRequest) as e:
+            # Пользователь заблокировал бота или запрос некорректен — повтор не поможет
+            metrics.increment('sender.failed')
+            if not message.future.done():
+                message.future.set_exception(e)
+            return
+
+        metrics.increment('sender.sent')
+        # Отправитель мог перестать ждать (таймаут) уже после начала отправки
+        if not message.future.done():
+            message.future.set_result(result)
+
+    async def _wait_for_global_slot(self) -> None:
+        """Ждет паузы после RetryAfter и свободного места в общем лимите"""
+        while True:
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            if self.global_bucket.try_consume():
+                return
+            await asyncio.sleep(self.global_bucket.time_until())
+
+    def _requeue_later(self, message: OutgoingMessage, delay: float) -> None:
+        """Возвращает сообщение в очередь через delay секунд с прежним приоритетом"""
+        def put() -> None:
+            self._delayed.pop(id(message), None)
+            self._queue.put_nowait(message)
+
+        handle = asyncio.get_running_loop().call_later(delay, put)
+        self._delayed[id(message)] = (handle, message)
+
+    async def stop(self) -> None:
+        """Останавливает воркеры; неотправленные сообщения завершаются ошибкой"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        pending = [message for _, message in self._delayed.values()]
+        for handle, _ in self._delayed.values():
+            handle.cancel()
+        self._delayed.clear()
+
+        if self._queue is not None:
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+
+        for message in pending:
+            if not message.future.done():
+                message.future.set_exception(RuntimeError("Отправка остановлена"))
+
+
+_sender: Optional[SenderService] = None
+
+
+async def get_sender_service() -> SenderService:
+    """Возвращает сервис отправки процесса"""
+    global _sender
+    if _sender is None:
+        from app.bot.startup import init_application
+
+        bot, _ = await init_application()
+        _sender = SenderService(bot)
+    return _sender
+
+
+async def stop_sender_service() -> None:
+    """Останавливает сервис отправки процесса (при завершении приложения)"""
+    global _sender
+    if _sender is not None:
+        await _sender.stop()
+        _sender = None
@@ -0,0 +1,267 @@
+"""
+Сервис для работы с задачами
+"""
+import calendar
+import logging
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from app.database.repositories.task_repository import TaskRepository
+from app.database.models.task_model import Task, TaskListItem
+from app.services.inbox_service import invalidate_inbox
+from app.services.reminder_service import build_reminder_rows, build_reminder_keys
+
+logger = logging.getLogger(__name__)
+
+# Области списков задач
+SCOPE_MY = 'my'
+SCOPE_ACTIVE = 'active'
+SCOPE_ALL = 'all'
+SCOPE_COMPANY = 'company'
+SCOPE_OVERDUE = 'overdue'
+
+# Порядок статусов в списках: сначала то, что требует внимания
+ACTIVE_STATUSES = ('overdue', 'in_progress', 'new')
+ALL_STATUSES = ACTIVE_STATUSES + ('completed', 'not_completed')
+
+SCOPE_STATUSES = {
+    SCOPE_MY: ALL_STATUSES,
+    SCOPE_ACTIVE: ACTIVE_STATUSES,
+    SCOPE_ALL: ALL_STATUSES,
+    SCOPE_COMPANY: ALL_STATUSES,
+    SCOPE_OVERDUE: ('overdue',),
+}
+
+PAGE_SIZE = 8
+
+
+class TaskConflictError(Exception):
+    """Задача изменена параллельно: изменение посчитано от устаревшего статуса"""
+
+
+@dataclass(frozen=True)
+class TaskCursor:
+    """
+    Позиция в списке задач: статус (индекс в порядке статусов области)
+    и ключ сортировки последней показанной задачи
+    """
+
+    status_index: int = 0
+    sort_value: Optional[datetime] = None
+    task_id: Optional[int] = None
+
+    def encode(self) -> str:
+        """Кодирует курсор для callback_data (секунды UTC, '-' вместо пустых значений)"""
+        sort_value = calendar.timegm(self.sort_value.utctimetuple()) if self.sort_value else '-'
+        task_id = self.task_id if self.task_id is not None else '-'
+        return f"{self.status_index}:{sort_value}:{task_id}"
+
+    @classmethod
+    def decode(cls, value: str) -> 'TaskCursor':
+        """
+        Восстанавливает курсор из callback_data
+
+        Raises:
+            ValueError: Некорректный курсор
+        """
+        status_index, sort_value, task_id = value.split(":")
+        return cls(
+            status_index=int(status_index),
+            sort_value=datetime.utcfromtimestamp(int(sort_value)) if sort_value != '-' else None,
+            task_id=int(task_id) if task_id != '-' else None
+        )
+
+
+@dataclass
+class TaskPage:
+    """Страница списка задач"""
+
+    items: List[TaskListItem]
+    next_cursor: Optional[TaskCursor] = None
+
+
+class TaskService:
+    """Сервис для работы с задачами"""
+
+    def __init__(self):
+        self.task_repo = TaskRepository()
+
+    async def get_task_by_id(self, task_id: int) -> Optional[Task]:
+        """
+        Получает задачу по ID
+
+        Args:
+            task_id: ID задачи
+
+        Returns:
+            Задача или None
+        """
+        try:
+            return await self.task_repo.get_task_by_id(task_id)
+        except Exception as e:
+            logger.error(f"Ошибка получения задачи {task_id}: {e}")
+            return None
+
+    async def create_task(self, task_data: dict) -> Task:
+        """
+        Создает задачу и напоминания исполнителю о ее сроке
+
+        Args:
+            task_data: Данные задачи (title, company_id, creator_id, initiator_name,
+                       initiator_phone и необязательные description, assignee_id,
+                       priority, deadline)
+
+        Returns:
+            Созданная задача
+        """
+        try:
+            now = datetime.utcnow()
+            task_data = dict(task_data)
+            # Задача со сроком в прошлом сразу просрочена, не дожидаясь проверки по таймеру
+            if task_data.get('deadline') and task_data['deadline'] <= now:
+                task_data['status'] = 'overdue'
+
+            reminders = build_reminder_rows(task_data.get('assignee_id'), task_data.get('deadline'), now)
+            task = await self.task_repo.create_task(task_data, reminders)
+            invalidate_inbox(task.assignee_id)
+            logger.info(f"Создана задача {task.task_id}, напоминаний: {len(reminders)}")
+
+            return task
+
+        except Exception as e:
+            logger.error(f"Ошибка создания задачи: {e}")
+            raise
+
+    async def reschedule_task(self, task: Task, deadline: datetime) -> Task:
+        """
+        Переносит срок задачи и пересоздает напоминания
+
+        Args:
+            task: Задача
+            deadline: Новый срок
+
+        Returns:
+            Задача с новым сроком
+
+        Raises:
+            TaskConflictError: Статус задачи изменен другим пользователем
+        """
+        try:
+            now = datetime.utcnow()
+            status = task.status
+            if status == 'overdue' and deadline > now:
+                status = 'in_progress'
+            elif status in ('new', 'in_progress') and deadline <= now:
+                status = 'overdue'
+
+            updated = await self.task_repo.reschedule_task(
+                task,
+                deadline,
+                status,
+                build_reminder_keys(task.deadline),
+                build_reminder_rows(task.assignee_id, deadline, now)
+            )
+            if not updated:
+                raise TaskConflictError(f"Статус задачи {task.task_id} изменен, обновите задачу")
+            if status != task.status:
+                invalidate_inbox(task.assignee_id)
+            logger.info(f"Срок задачи {task.task_id} перенесен на {deadline.isoformat()}")
+
+            task.deadline = deadline
+            task.status = status
+            task.update_timestamp()
+            return task
+
+        except Exception as e:
+            logger.error(f"Ошибка переноса срока задачи {task.task_id}: {e}")
+            raise
+
+    async def set_task_status(self, task: Task, status: str) -> Task:
+        """
+        Меняет статус задачи
+
+        Args:
+            task: Задача
+            status: Новый статус
+
+        Returns:
+            Задача с новым статусом
+
+        Raises:
+            TaskConflictError: Статус задачи изменен другим пользователем
+        """
+        try:
+            updated_task = replace(task)
+            updated_task.set_status(status)
+
+            if not await self.task_repo.set_status(task, status, updated_task.completed_at):
+                raise TaskConflictError(f"Статус задачи {task.task_id} изменен, обновите задачу")
+            invalidate_inbox(task.assignee_id)
+            logger.info(f"Статус задачи {task.task_id}: {task.status} -> {status}")
+
+            return updated_task
+
+        except Exception as e:
+            logger.error(f"Ошибка изменения статуса задачи {task.task_id}: {e}")
+            raise
+
+    async def get_task_page(
+        self,
+        scope: str,
+        owner_id: Optional[int] = None,
+        cursor: Optional[TaskCursor] = None,
+        page_size: int = PAGE_SIZE
+    ) -> TaskPage:
+        """
+        Получает страницу списка задач
+
+        Страница читается одним запросом: статусы области (начиная со статуса
+        курсора) — отдельными диапазонами индекса по порядку, вместе с
+        названием компании и именем исполнителя каждой задачи.
+        Читается на одну задачу больше страницы, чтобы узнать, есть ли продолжение.
+
+        Args:
+            scope: Область списка (SCOPE_MY, SCOPE_ACTIVE, SCOPE_ALL, SCOPE_COMPANY, SCOPE_OVERDUE)
+            owner_id: ID исполнителя (my, active) или компании (company)
+            cursor: Позиция после предыдущей страницы (None — первая страница)
+            page_size: Задач на странице
+
+        Returns:
+            Страница задач с курсором следующей страницы
+        """
+        statuses = SCOPE_STATUSES[scope]
+        cursor = cursor or TaskCursor()
+
+        items = await self._fetch(
+            scope, owner_id, statuses[cursor.status_index:], page_size + 1, (cursor.sort_value, cursor.task_id)
+        )
+
+        if len(items) <= page_size:
+            return TaskPage(items=items)
+
+        items = items[:page_size]
+        last = items[-1]
+        next_cursor = TaskCursor(
+            status_index=statuses.index(last.status),
+            sort_value=last.created_at if scope == SCOPE_COMPANY else last.deadline,
+            task_id=last.task_id
+        )
+        return TaskPage(items=items, next_cursor=next_cursor)
+
+    async def _fetch(
+        self,
+        scope: str,
+        owner_id: Optional[int],
+        statuses: Sequence[str],
+        limit: int,
+        after: Tuple[Optional[datetime], Optional[int]]
+    ) -> List[TaskListItem]:
+        """Читает задачи статусов из индекса области"""
+        after_value, after_task_id = after
+
+        if scope in (SCOPE_MY, SCOPE_ACTIVE):
+            return await self.task_repo.list_by_assignee(owner_id, statuses, limit, after_value, after_task_id)
+        if scope == SCOPE_COMPANY:
+            return await self.task_repo.list_by_company(owner_id, statuses, limit, after_value, after_task_id)
+        return await self.task_repo.list_by_status(statuses, limit, after_value, after_task_id)
@@ -0,0 +1,127 @@
+"""
+Локальная очередь update для тестов пакетной обработки
+
+Повторяет поведение Message Queue, важное для index.queue_handler:
+полученное сообщение скрывается на время visibility timeout и, если его
+не удалили, снова становится доступным. Как и триггер, пакет удаляется
+целиком, только если обработчик завершился без исключения; иначе весь
+пакет доставляется повторно.
+"""
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueuedMessage:
+    """Сообщение очереди"""
+
+    message_id: str
+    body: str
+    receive_count: int = 0
+    visible_at: float = 0.0
+
+
+class LocalUpdateQueue:
+    """Очередь сообщений в памяти процесса"""
+
+    def __init__(self, visibility_timeout: float = 30.0):
+        """
+        Args:
+            visibility_timeout: Время в секундах, на которое полученное сообщение скрывается
+        """
+        self.visibility_timeout = visibility_timeout
+        self._messages: Dict[str, QueuedMessage] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def send(self, update_data: Dict[str, Any]) -> str:
+        """Кладет update в очередь и возвращает ID сообщения"""
+        message = QueuedMessage(message_id=uuid.uuid4().hex, body=json.dumps(update_data, ensure_ascii=False))
+        with self._lock:
+            self._messages[message.message_id] = message
+        return message.message_id
+
+    def receive(self, max_messages: int = 10) -> List[QueuedMessage]:
+        """Возвращает до max_messages видимых сообщений в порядке поступления"""
+        now = time.monotonic()
+        received = []
+        with self._lock:
+            for message in self._messages.values():
+                if len(received) >= max_messages:
+                    break
+                if message.visible_at <= now:
+                    message.visible_at = now + self.visibility_timeout
+                    message.receive_count += 1
+                    received.append(message)
+        return received
+
+    def delete(self, message_id: str) -> None:
+        """Удаляет обработанное сообщение"""
+        with self._lock:
+            self._messages.pop(message_id, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._messages)
+
+
+def to_trigger_event(messages: List[QueuedMessage]) -> Dict[str, Any]:
+    """Формирует событие в формате триггера Message Queue"""
+    return {
+        'messages': [
+            {
+                'event_metadata': {
+                    'event_id': message.message_id,
+                    'event_type': 'yandex.cloud.events.messagequeue.QueueMessage',
+                },
+                'details': {
+                    'message': {
+                        'message_id': message.message_id,
+                        'body': message.body,
+                        'attributes': {'ApproximateReceiveCount': str(message.receive_count)},
+                    }
+                }
+            }
+            for message in messages
+        ]
+    }
+
+
+def consume_batch(
+    queue: LocalUpdateQueue,
+    handler: Callable[[Dict[str, Any], Any], Dict[str, Any]],
+    max_messages: int = 10
+) -> Dict[str, Any]:
+    """
+    Получает пакет из очереди, передает его обработчику и удаляет пакет, если обработчик завершился успешно
+
+    Args:
+        queue: Очередь
+        handler: Обработчик пакета (index.queue_handler)
+        max_messages: Размер пакета
+
+    Returns:
+        Ответ обработчика (пустой словарь, если очередь пуста; {"error": ...}, если пакет не подтвержден)
+    """
+    messages = queue.receive(max_messages)
+    if not messages:
+        return {}
+
+    try:
+        response = handler(to_trigger_event(messages), None)
+    except Exception as e:
+        # Весь пакет будет доставлен повторно после visibility timeout
+        logger.info(f"Пакет из {len(messages)} сообщений не подтвержден: {e}")
+        return {'error': str(e)}
+
+    for message in messages:
+        queue.delete(message.message_id)
+
+    return response
@@ -0,0 +1,10 @@
+"""
+Состояния для работы с комментариями
+"""
+from aiogram.fsm.state import State, StatesGroup
+
+
+class CommentStates(StatesGroup):
+    """Состояния для добавления комментария"""
+    
+    waiting_for_text = State()
@@ -0,0 +1,10 @@
+"""
+Состояния для работы с файлами
+"""
+from aiogram.fsm.state import State, StatesGroup
+
+
+class FileStates(StatesGroup):
+    """Состояния для прикрепления файла к задаче"""
+    
+    waiting_for_file = State()
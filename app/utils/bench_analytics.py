@@ -0,0 +1,103 @@
+"""
+Скорость аналитики сроков на синтетическом снимке задач
+
+Снимок заполняется случайными задачами без обращения к БД, затем
+замеряются инкрементальное применение изменений и отчеты
+analytics_service: сроки по компаниям, по исполнителям, общие и по неделям.
+
+Запуск:
+    python -m app.utils.bench_analytics --tasks 1000000
+    python -m app.utils.bench_analytics --tasks 200000 --companies 50 --executors 20 --repeat 10
+"""
+import argparse
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from app.services.analytics_service import (
+    TaskSnapshot, COLUMN_TYPES, STATUS_CODES, PRIORITY_CODES, COMPLETED, HOUR, WEEK,
+    GROUP_COMPANY, GROUP_ASSIGNEE, to_epoch
+)
+from app.utils.replay_load import percentile
+
+
+def generate_tasks(count: int, companies: int, executors: int, first_id: int, now: int, seed: int) -> Dict[str, np.ndarray]:
+    """Случайные задачи за последний год"""
+    rng = np.random.default_rng(seed)
+
+    created_at = now - rng.integers(0, 52 * WEEK, count)
+    lead_time = rng.gamma(2.0, 24 * HOUR, count).astype(np.int64)
+    status = rng.integers(0, len(STATUS_CODES), count).astype(np.int8)
+    completed_at = np.where(status == COMPLETED, np.minimum(created_at + lead_time, now), 0)
+    deadline = np.where(rng.random(count) < 0.8, created_at + rng.integers(HOUR, 14 * 24 * HOUR, count), 0)
+
+    columns = {
+        'task_id': np.arange(first_id, first_id + count, dtype=np.int64),
+        'company_id': rng.integers(1, companies + 1, count),
+        'assignee_id': np.where(rng.random(count) < 0.9, rng.integers(1, executors + 1, count), 0),
+        'status': status,
+        'priority': rng.integers(0, len(PRIORITY_CODES), count).astype(np.int8),
+        'deadline': deadline,
+        'completed_at': completed_at,
+        'created_at': created_at,
+        'updated_at': np.maximum(created_at, completed_at),
+    }
+    return {name: column.astype(COLUMN_TYPES[name]) for name, column in columns.items()}
+
+
+def measure(repeat: int, action: Callable[[], object]) -> List[float]:
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        action()
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def report(name: str, durations: List[float]) -> None:
+    print(
+        f"{name:<28} p50 {percentile(durations, 0.5) * 1000:8.1f} мс   "
+        f"p95 {percentile(durations, 0.95) * 1000:8.1f} мс"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Скорость аналитики сроков на синтетическом снимке")
+    parser.add_argument("--tasks", type=int, default=1000000, help="Задач в снимке")
+    parser.add_argument("--companies", type=int, default=500, help="Компаний")
+    parser.add_argument("--executors", type=int, default=200, help="Исполнителей")
+    parser.add_argument("--changes", type=int, default=1000, help="Измененных задач в одном обновлении")
+    parser.add_argument("--repeat", type=int, default=5, help="Повторов каждого замера")
+    args = parser.parse_args()
+
+    now = to_epoch(datetime.utcnow())
+    snapshot = TaskSnapshot()
+
+    started = time.perf_counter()
+    snapshot.merge(generate_tasks(args.tasks, args.companies, args.executors, 1, now, seed=0))
+    print(f"Первое заполнение: {args.tasks} задач за {time.perf_counter() - started:.2f} с")
+    memory = sum(column.nbytes for column in snapshot.columns.values())
+    print(f"Память снимка: {memory / 1024 / 1024:.1f} МБ\n")
+
+    next_id = args.tasks + 1
+    rng = np.random.default_rng(1)
+
+    def apply_changes() -> None:
+        # Половина — новые задачи, половина — изменения существующих
+        nonlocal next_id
+        changes = generate_tasks(args.changes, args.companies, args.executors, next_id, now, seed=next_id)
+        changes['task_id'][: args.changes // 2] = rng.integers(1, next_id, args.changes // 2)
+        next_id += args.changes
+        snapshot.merge(changes)
+
+    report("Обновление снимка", measure(args.repeat, apply_changes))
+    report("Сроки по компаниям", measure(args.repeat, lambda: snapshot.sla(GROUP_COMPANY)))
+    report("Сроки по исполнителям", measure(args.repeat, lambda: snapshot.sla(GROUP_ASSIGNEE)))
+    report("Сроки по всем задачам", measure(args.repeat, lambda: snapshot.sla()))
+    report("Тренд за 12 недель", measure(args.repeat, lambda: snapshot.weekly_trend(12)))
+
+
+if __name__ == "__main__":
+    main()
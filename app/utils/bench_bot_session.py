@@ -0,0 +1,86 @@
+"""
+Сравнение задержки вызовов Bot API с холодным и прогретым пулом соединений
+
+Режимы:
+    cold — новая сессия на каждый вызов (как при asyncio.run на каждый вызов функции):
+           каждый раз DNS, TCP и TLS заново;
+    warm — одна сессия на все вызовы (как в app/bot/runtime.py): соединение переиспользуется.
+
+Запуск:
+    python -m app.utils.bench_bot_session --calls 50
+    python -m app.utils.bench_bot_session --calls 200 --stub-bot-api
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+from app.bot.bot_instance import BotSessionConfig, create_bot
+from app.utils.replay_load import percentile, start_stub_bot_api
+from config import config
+
+
+async def _call(bot) -> float:
+    started = time.perf_counter()
+    await bot.get_me()
+    return time.perf_counter() - started
+
+
+async def bench_cold(calls: int, session_config: BotSessionConfig) -> List[float]:
+    """Новая сессия (и соединение) на каждый вызов"""
+    latencies = []
+    for _ in range(calls):
+        bot = create_bot(session_config)
+        try:
+            latencies.append(await _call(bot))
+        finally:
+            await bot.session.close()
+    return latencies
+
+
+async def bench_warm(calls: int, session_config: BotSessionConfig) -> List[float]:
+    """Одна сессия на все вызовы; первый вызов открывает соединение и в статистику не входит"""
+    bot = create_bot(session_config)
+    try:
+        await _call(bot)
+        return [await _call(bot) for _ in range(calls)]
+    finally:
+        await bot.session.close()
+
+
+def _format(name: str, latencies: List[float]) -> str:
+    values = [latency * 1000 for latency in latencies]
+    return (
+        f"{name:<5} p50={percentile(values, 0.5):.1f} p90={percentile(values, 0.9):.1f} "
+        f"p99={percentile(values, 0.99):.1f} max={max(values, default=0):.1f} мс"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Задержка Bot API с холодным и прогретым пулом соединений")
+    parser.add_argument('--calls', type=int, default=50, help="Вызовов getMe в каждом режиме")
+    parser.add_argument('--stub-bot-api', action='store_true', help="Использовать локальную заглушку Bot API")
+    parser.add_argument('--stub-port', type=int, default=8081, help="Порт заглушки Bot API")
+    args = parser.parse_args()
+
+    if args.stub_bot_api:
+        config.TELEGRAM_API_URL = start_stub_bot_api(args.stub_port)
+
+    session_config = BotSessionConfig.from_config()
+
+    async def run() -> None:
+        cold = await bench_cold(args.calls, session_config)
+        warm = await bench_warm(args.calls, session_config)
+        print(f"Вызовов в каждом режиме: {args.calls}")
+        print(_format('cold', cold))
+        print(_format('warm', warm))
+        cold_p50 = percentile(cold, 0.5)
+        warm_p50 = percentile(warm, 0.5)
+        if warm_p50:
+            print(f"Прогретый пул быстрее по p50 в {cold_p50 / warm_p50:.1f} раза")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Проверка потоковой загрузки файлов в Object Storage на FakeS3Client
+
+Содержимое подается в FileService._stream_to_s3 кусками, как из Bot API;
+вместо Object Storage — FakeS3Client (app/utils/fake_s3.py). Проверяется:
+- файл больше части уходит multipart-загрузкой, части собираются по
+  порядку, даже если завершаются в обратном, одновременно загружается
+  не больше S3_UPLOAD_CONCURRENCY частей;
+- поток больше допустимого размера отклоняется, multipart-загрузка
+  отменяется и объект не создается;
+- файл меньше части уходит одним put_object.
+
+Запуск:
+    python -m app.utils.check_file_upload
+"""
+import asyncio
+import os
+import sys
+from typing import AsyncGenerator, List
+
+from app.services import file_service
+from app.services.file_service import DOWNLOAD_CHUNK_SIZE, FileRejected, FileService
+from app.utils.fake_s3 import FakeS3Client
+from config import config
+
+PART_SIZE = 5 * 1024 * 1024
+CONCURRENCY = 2
+
+
+async def _chunks(data: bytes) -> AsyncGenerator[bytes, None]:
+    for offset in range(0, len(data), DOWNLOAD_CHUNK_SIZE):
+        yield data[offset:offset + DOWNLOAD_CHUNK_SIZE]
+
+
+async def check_multipart(service: FileService) -> List[str]:
+    """Несколько частей, завершающихся в обратном порядке"""
+    # Первые части загружаются дольше последних
+    client = FakeS3Client(part_delay=lambda number: 0.05 / number)
+    file_service.set_s3_client(client)
+    data = os.urandom(3 * PART_SIZE + 12345)
+
+    size = await service._stream_to_s3(_chunks(data), 'check/multipart.bin', 'application/pdf')
+
+    problems = []
+    stored = client.objects.get((config.S3_BUCKET, 'check/multipart.bin'))
+    if size != len(data) or stored != data:
+        problems.append("multipart: содержимое объекта не совпадает с потоком")
+    if client.completed != 1 or client.uploads:
+        problems.append(f"multipart: завершено загрузок {client.completed}, незавершенных {len(client.uploads)}")
+    if not 1 < client.max_parts_in_flight <= CONCURRENCY:
+        problems.append(f"multipart: одновременно загружалось {client.max_parts_in_flight} частей, ожидалось до {CONCURRENCY}")
+    return problems
+
+
+async def check_oversize(service: FileService) -> List[str]:
+    """Поток больше допустимого размера при неизвестном размере в метаданных"""
+    client = FakeS3Client()
+    file_service.set_s3_client(client)
+    config.MAX_FILE_SIZE = 2 * PART_SIZE + PART_SIZE // 2
+    data = os.urandom(config.MAX_FILE_SIZE + 1)
+
+    problems = []
+    try:
+        await service._stream_to_s3(_chunks(data), 'check/oversize.bin', None)
+        problems.append("oversize: поток больше MAX_FILE_SIZE принят")
+    except FileRejected:
+        pass
+
+    if client.aborted != 1 or client.uploads:
+        problems.append(f"oversize: отменено загрузок {client.aborted}, незавершенных {len(client.uploads)}")
+    if client.objects:
+        problems.append("oversize: объект создан")
+    return problems
+
+
+async def check_single_put(service: FileService) -> List[str]:
+    """Файл меньше части"""
+    client = FakeS3Client()
+    file_service.set_s3_client(client)
+    data = os.urandom(PART_SIZE - 1)
+
+    size = await service._stream_to_s3(_chunks(data), 'check/small.jpg', 'image/jpeg')
+
+    problems = []
+    key = (config.S3_BUCKET, 'check/small.jpg')
+    if size != len(data) or client.objects.get(key) != data:
+        problems.append("put_object: содержимое объекта не совпадает с потоком")
+    if client.content_types.get(key) != 'image/jpeg':
+        problems.append("put_object: MIME-тип не передан")
+    if client.completed or client.uploads:
+        problems.append("put_object: для маленького файла начата multipart-загрузка")
+    return problems
+
+
+async def run_checks() -> List[str]:
+    """Выполняет проверки с настройками загрузки для FakeS3Client"""
+    config.S3_BUCKET = config.S3_BUCKET or 'check'
+    config.S3_PART_SIZE = PART_SIZE
+    config.S3_UPLOAD_CONCURRENCY = CONCURRENCY
+    config.TELEGRAM_API_URL = None
+
+    # Репозиторий подключается к БД при первом запросе, здесь запросов нет
+    service = FileService()
+    problems = []
+    for check in (check_multipart, check_single_put, check_oversize):
+        try:
+            problems.extend(await check(service))
+        except Exception as e:
+            problems.append(f"{check.__name__}: {type(e).__name__}: {e}")
+    return problems
+
+
+def main() -> int:
+    problems = asyncio.run(run_checks())
+
+    for problem in problems:
+        print(f"FAIL  {problem}")
+    if not problems:
+        print("OK    multipart, отклонение по размеру и put_object работают")
+
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Проверка маршрутизации сообщений через роутеры диспетчера
+
+Роутеры подключаются так же, как в setup_dispatcher (include_routers),
+но без middleware авторизации и учета запросов: обработчик не вызывается,
+записывается только то, какой обработчик выбран для сообщения. Так
+проверяется, что сообщение в состоянии FSM доходит до обработчика этого
+состояния, а не до общего handle_unknown_message.
+
+Запуск:
+    python -m app.utils.check_routing
+"""
+import asyncio
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from aiogram import BaseMiddleware, Bot, Dispatcher
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import TelegramObject, Update
+
+from app.bot.dispatcher import include_routers
+from app.database.models.user_model import User
+from app.handlers.comment import add_comment_handler
+from app.handlers.common import error_handler
+from app.handlers.company import create_company_handler
+from app.handlers.file import upload_file_handler
+from app.states.comment_states import CommentStates
+from app.states.company_states import CompanyCreationStates
+from app.states.file_states import FileStates
+
+CHAT_ID = 100001
+
+
+@dataclass
+class RouteCase:
+    """Сообщение, состояние FSM отправителя и ожидаемый обработчик"""
+
+    name: str
+    message: Dict[str, Any]
+    state: Optional[State]
+    expected: Callable
+
+
+def _text(text: str) -> Dict[str, Any]:
+    return {'text': text}
+
+
+CASES = [
+    RouteCase("сообщение без состояния", _text("привет"), None, error_handler.handle_unknown_message),
+    RouteCase(
+        "текст комментария",
+        _text("Готово, проверьте"),
+        CommentStates.waiting_for_text,
+        add_comment_handler.process_comment_text
+    ),
+    RouteCase(
+        "название компании",
+        _text("ООО Ромашка"),
+        CompanyCreationStates.waiting_for_name,
+        create_company_handler.process_company_name
+    ),
+    RouteCase(
+        "документ к задаче",
+        {'document': {'file_id': "check", 'file_unique_id': "check", 'file_name': "act.pdf", 'file_size': 1024}},
+        FileStates.waiting_for_file,
+        upload_file_handler.process_file
+    ),
+    RouteCase(
+        "фото к задаче",
+        {'photo': [{'file_id': "check", 'file_unique_id': "check", 'width': 800, 'height': 600}]},
+        FileStates.waiting_for_file,
+        upload_file_handler.process_file
+    ),
+]
+
+
+class _RouteRecorder(BaseMiddleware):
+    """Запоминает выбранный обработчик и не вызывает его"""
+
+    def __init__(self):
+        self.callback: Optional[Callable] = None
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        self.callback = data['handler'].callback
+        return None
+
+
+def _build_update(update_id: int, message: Dict[str, Any]) -> Update:
+    return Update.model_validate({
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': CHAT_ID, 'type': 'private'},
+            'from': {'id': CHAT_ID, 'is_bot': False, 'first_name': "Check"},
+            **message
+        }
+    })
+
+
+async def check_routes(cases: List[RouteCase]) -> List[str]:
+    """
+    Пропускает сообщения через роутеры и сравнивает выбранные обработчики
+
+    Returns:
+        Список найденных проблем
+    """
+    dp = Dispatcher(storage=MemoryStorage())
+    recorder = _RouteRecorder()
+    dp.message.middleware(recorder)
+    include_routers(dp)
+
+    # Токен в формате Bot API; сеть не используется — обработчики не вызываются
+    bot = Bot(token="42:CHECK")
+    current_user = User(
+        user_id=CHAT_ID, username=None, first_name="Check", last_name=None, role="main_admin", phone=None,
+        created_at=None, updated_at=None
+    )
+    problems = []
+
+    try:
+        for update_id, case in enumerate(cases, start=1):
+            context = dp.fsm.get_context(bot, chat_id=CHAT_ID, user_id=CHAT_ID)
+            await context.set_state(case.state)
+            recorder.callback = None
+
+            await dp.feed_update(bot, _build_update(update_id, case.message), current_user=current_user)
+
+            if recorder.callback is not case.expected:
+                got = recorder.callback.__name__ if recorder.callback else "никто"
+                problems.append(f"{case.name}: ожидался {case.expected.__name__}, обработал {got}")
+    finally:
+        await bot.session.close()
+
+    return problems
+
+
+def main() -> int:
+    problems = asyncio.run(check_routes(CASES))
+
+    for problem in problems:
+        print(f"FAIL  {problem}")
+    if not problems:
+        print(f"OK    {len(CASES)} сообщений дошли до своих обработчиков")
+
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
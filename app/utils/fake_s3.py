@@ -0,0 +1,137 @@
+"""
+Локальная замена Object Storage для проверок FileService без сети
+
+FakeS3Client повторяет методы клиента boto3 s3, которые вызывает
+app/services/file_service.py, и ошибки S3 для них (ClientError с тем же
+кодом): части multipart-загрузки меньше 5 МБ (кроме последней), неверный
+ETag или порядок частей при завершении, загрузка после отмены.
+Объекты хранятся в памяти. Клиент потокобезопасен, как и настоящий:
+FileService вызывает его через asyncio.to_thread.
+
+Подключение:
+    from app.services import file_service
+    file_service.set_s3_client(FakeS3Client())
+"""
+import hashlib
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+from botocore.exceptions import ClientError
+
+# Минимальный размер части multipart-загрузки, кроме последней
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+@dataclass
+class _MultipartUpload:
+    """Незавершенная multipart-загрузка"""
+
+    bucket: str
+    key: str
+    content_type: Optional[str]
+    parts: Dict[int, bytes] = field(default_factory=dict)
+
+
+class FakeS3Client:
+    """S3-клиент в памяти процесса"""
+
+    def __init__(self, part_delay: Optional[Callable[[int], float]] = None):
+        """
+        Args:
+            part_delay: Задержка upload_part в секундах по номеру части —
+                чтобы части завершались не по порядку
+        """
+        self.objects: Dict[tuple, bytes] = {}
+        self.content_types: Dict[tuple, Optional[str]] = {}
+        self.uploads: Dict[str, _MultipartUpload] = {}
+        self.aborted = 0
+        self.completed = 0
+        self.max_parts_in_flight = 0
+        self._part_delay = part_delay
+        self._parts_in_flight = 0
+        self._lock = threading.Lock()
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes, ContentType: Optional[str] = None, **kwargs) -> dict:
+        with self._lock:
+            self.objects[(Bucket, Key)] = bytes(Body)
+            self.content_types[(Bucket, Key)] = ContentType
+        return {'ETag': self._etag(Body)}
+
+    def create_multipart_upload(self, Bucket: str, Key: str, ContentType: Optional[str] = None, **kwargs) -> dict:
+        upload_id = uuid.uuid4().hex
+        with self._lock:
+            self.uploads[upload_id] = _MultipartUpload(Bucket, Key, ContentType)
+        return {'Bucket': Bucket, 'Key': Key, 'UploadId': upload_id}
+
+    def upload_part(self, Bucket: str, Key: str, UploadId: str, PartNumber: int, Body: bytes, **kwargs) -> dict:
+        with self._lock:
+            self._parts_in_flight += 1
+            self.max_parts_in_flight = max(self.max_parts_in_flight, self._parts_in_flight)
+        try:
+            if self._part_delay:
+                time.sleep(self._part_delay(PartNumber))
+            if not 1 <= PartNumber <= 10000:
+                self._error('InvalidArgument', 'UploadPart', f"Номер части {PartNumber} вне 1..10000")
+            with self._lock:
+                upload = self._get_upload(UploadId, Bucket, Key, 'UploadPart')
+                upload.parts[PartNumber] = bytes(Body)
+            return {'ETag': self._etag(Body)}
+        finally:
+            with self._lock:
+                self._parts_in_flight -= 1
+
+    def complete_multipart_upload(
+        self, Bucket: str, Key: str, UploadId: str, MultipartUpload: dict, **kwargs
+    ) -> dict:
+        with self._lock:
+            upload = self._get_upload(UploadId, Bucket, Key, 'CompleteMultipartUpload')
+            parts = MultipartUpload.get('Parts') or []
+            numbers = [part['PartNumber'] for part in parts]
+            if not numbers or numbers != sorted(set(numbers)):
+                self._error('InvalidPartOrder', 'CompleteMultipartUpload', f"Части не по возрастанию: {numbers}")
+
+            for index, part in enumerate(parts):
+                data = upload.parts.get(part['PartNumber'])
+                if data is None or part['ETag'] != self._etag(data):
+                    self._error('InvalidPart', 'CompleteMultipartUpload', f"Часть {part['PartNumber']} не найдена")
+                if index < len(parts) - 1 and len(data) < MIN_PART_SIZE:
+                    self._error('EntityTooSmall', 'CompleteMultipartUpload', f"Часть {part['PartNumber']} меньше 5 МБ")
+
+            self.objects[(Bucket, Key)] = b''.join(upload.parts[number] for number in numbers)
+            self.content_types[(Bucket, Key)] = upload.content_type
+            del self.uploads[UploadId]
+            self.completed += 1
+        return {'Bucket': Bucket, 'Key': Key}
+
+    def abort_multipart_upload(self, Bucket: str, Key: str, UploadId: str, **kwargs) -> dict:
+        with self._lock:
+            self._get_upload(UploadId, Bucket, Key, 'AbortMultipartUpload')
+            del self.uploads[UploadId]
+            self.aborted += 1
+        return {}
+
+    def delete_object(self, Bucket: str, Key: str, **kwargs) -> dict:
+        with self._lock:
+            self.objects.pop((Bucket, Key), None)
+            self.content_types.pop((Bucket, Key), None)
+        return {}
+
+    def generate_presigned_url(self, ClientMethod: str, Params: dict, ExpiresIn: int = 3600, **kwargs) -> str:
+        return f"memory://{Params['Bucket']}/{Params['Key']}?method={ClientMethod}&expires={ExpiresIn}"
+
+    def _get_upload(self, upload_id: str, bucket: str, key: str, operation: str) -> _MultipartUpload:
+        upload = self.uploads.get(upload_id)
+        if upload is None or (upload.bucket, upload.key) != (bucket, key):
+            self._error('NoSuchUpload', operation, f"Загрузка {upload_id} не найдена")
+        return upload
+
+    @staticmethod
+    def _etag(data: bytes) -> str:
+        return f'"{hashlib.md5(data).hexdigest()}"'
+
+    @staticmethod
+    def _error(code: str, operation: str, message: str):
+        raise ClientError({'Error': {'Code': code, 'Message': message}}, operation)
@@ -0,0 +1,77 @@
+"""
+Метрики процесса: счетчики, текущие значения и длительности
+
+Значения хранятся в памяти процесса и отдаются в health check / /metrics.
+"""
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict
+
+
+@dataclass
+class TimingSummary:
+    """Сводка по длительностям (в секундах)"""
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            'max_ms': round(self.max * 1000, 2),
+        }
+
+
+_lock = threading.Lock()
+_counters: Dict[str, int] = {}
+_gauges: Dict[str, float] = {}
+_timings: Dict[str, TimingSummary] = {}
+
+
+def increment(name: str, value: int = 1) -> None:
+    """Увеличивает счетчик"""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def set_gauge(name: str, value: float) -> None:
+    """Устанавливает текущее значение"""
+    with _lock:
+        _gauges[name] = value
+
+
+def add_gauge(name: str, delta: float) -> None:
+    """Изменяет текущее значение на delta"""
+    with _lock:
+        _gauges[name] = _gauges.get(name, 0) + delta
+
+
+def observe(name: str, seconds: float) -> None:
+    """Учитывает длительность"""
+    with _lock:
+        _timings.setdefault(name, TimingSummary()).observe(seconds)
+
+
+def get_metrics_snapshot() -> Dict[str, Any]:
+    """Возвращает копию всех метрик"""
+    with _lock:
+        return {
+            'counters': dict(_counters),
+            'gauges': dict(_gauges),
+            'timings': {name: summary.as_dict() for name, summary in _timings.items()},
+        }
+
+
+def reset_metrics() -> None:
+    """Сбрасывает все метрики (для нагрузочных прогонов)"""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _timings.clear()
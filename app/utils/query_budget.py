@@ -0,0 +1,104 @@
+"""
+Бюджет запросов к БД для обработчиков и обнаружение N+1
+"""
+import logging
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from app.utils.request_stats import HandlerQueryStats
+from config import config
+
+logger = logging.getLogger(__name__)
+
+BUDGET_ATTRIBUTE = '__query_budget__'
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Обработчик превысил бюджет запросов к БД (только в строгом режиме)"""
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    """Допустимое количество запросов к БД для обработчика"""
+
+    max_queries: int
+    max_rows: Optional[int] = None
+    max_repeats: Optional[int] = None  # Сколько раз допустим один и тот же запрос
+
+
+def query_budget(max_queries: int, max_rows: Optional[int] = None, max_repeats: Optional[int] = None) -> Callable:
+    """
+    Декоратор для объявления бюджета запросов обработчика
+
+    Ставится под декоратором роутера:
+
+        @router.callback_query(F.data.startswith("company_details:"))
+        @query_budget(max_queries=2)
+        async def show_company_details(...):
+
+    Args:
+        max_queries: Максимум запросов к БД
+        max_rows: Максимум прочитанных строк
+        max_repeats: Максимум повторов запроса одной формы
+    """
+    budget = QueryBudget(max_queries=max_queries, max_rows=max_rows, max_repeats=max_repeats)
+
+    def decorator(func: Callable) -> Callable:
+        setattr(func, BUDGET_ATTRIBUTE, budget)
+        return func
+
+    return decorator
+
+
+def get_handler_budget(callback: Optional[Callable]) -> QueryBudget:
+    """Возвращает бюджет обработчика или бюджет по умолчанию из конфигурации"""
+    budget = getattr(callback, BUDGET_ATTRIBUTE, None)
+    if budget is not None:
+        return budget
+    return QueryBudget(max_queries=config.QUERY_BUDGET_MAX_QUERIES)
+
+
+def find_budget_violations(stats: HandlerQueryStats, budget: QueryBudget) -> List[str]:
+    """
+    Сравнивает статистику обработчика с бюджетом
+
+    Returns:
+        Список описаний нарушений (пустой, если бюджет соблюден)
+    """
+    violations = []
+
+    if stats.queries > budget.max_queries:
+        violations.append(f"запросов к БД {stats.queries} при бюджете {budget.max_queries}")
+
+    if budget.max_rows is not None and stats.rows > budget.max_rows:
+        violations.append(f"прочитано строк {stats.rows} при бюджете {budget.max_rows}")
+
+    max_repeats = budget.max_repeats if budget.max_repeats is not None else config.QUERY_BUDGET_MAX_REPEATS
+    for shape, count in stats.shapes.items():
+        if count > max_repeats:
+            violations.append(
+                f"запрос повторен {count} раз (возможен N+1): {stats.shape_samples.get(shape, shape)}"
+            )
+
+    return violations
+
+
+def enforce_budget(stats: HandlerQueryStats, budget: QueryBudget, strict: Optional[bool] = None) -> None:
+    """
+    Проверяет бюджет: в строгом режиме бросает исключение, иначе пишет предупреждение
+
+    Args:
+        stats: Статистика обработчика
+        budget: Бюджет обработчика
+        strict: Строгий режим (по умолчанию из QUERY_BUDGET_STRICT)
+    """
+    violations = find_budget_violations(stats, budget)
+    if not violations:
+        return
+
+    message = f"Обработчик {stats.handler_name} превысил бюджет запросов: {'; '.join(violations)}"
+
+    if config.QUERY_BUDGET_STRICT if strict is None else strict:
+        raise QueryBudgetExceeded(message)
+
+    logger.warning(message)
@@ -0,0 +1,143 @@
+"""
+Кеш отрисовки экранов меню и пропуск повторных edit_text
+
+Клавиатуры экранов меню зависят только от экрана, роли и счетчиков задач
+исполнителя в главном меню, поэтому строятся один раз на процесс для
+каждого сочетания. Для каждого сообщения (чат, message_id) запоминается
+хеш последнего показанного содержимого и edit_date после изменения: если
+пользователь повторно нажал кнопку того же экрана, а сообщение с тех пор
+никто не менял (edit_date в callback совпадает), edit_text не вызывается —
+Telegram все равно ответил бы "message is not modified", но только после
+полного запроса.
+
+Возвращаемые клавиатуры общие для всех вызовов и не должны изменяться.
+"""
+import hashlib
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Tuple
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import CallbackQuery, InlineKeyboardMarkup, Message
+
+from app.keyboards.main_menu import (
+    get_main_menu_keyboard,
+    get_companies_menu_keyboard,
+    get_tasks_menu_keyboard,
+    get_analytics_menu_keyboard,
+    get_roles_menu_keyboard
+)
+from app.database.models.inbox_model import InboxCounts
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+# Построители клавиатур экранов по роли и счетчикам задач исполнителя
+SCREEN_KEYBOARDS: Dict[str, Callable[[Optional[str], Optional[InboxCounts]], InlineKeyboardMarkup]] = {
+    'main': get_main_menu_keyboard,
+    'companies': lambda role, inbox: get_companies_menu_keyboard(),
+    'tasks': lambda role, inbox: get_tasks_menu_keyboard(role),
+    'analytics': lambda role, inbox: get_analytics_menu_keyboard(),
+    'roles': lambda role, inbox: get_roles_menu_keyboard(),
+}
+
+# Сколько клавиатур помнить (сочетаний экрана, роли и счетчиков)
+MAX_CACHED_KEYBOARDS = 4096
+
+# Сколько сообщений помнить
+MAX_TRACKED_MESSAGES = 10000
+
+# (чат, message_id) -> (хеш содержимого, edit_date после отрисовки)
+_last_rendered: "OrderedDict[Tuple[int, int], Tuple[str, Optional[datetime]]]" = OrderedDict()
+
+
+@lru_cache(maxsize=MAX_CACHED_KEYBOARDS)
+def get_screen_keyboard(
+    screen: str,
+    role: Optional[str],
+    inbox: Optional[InboxCounts] = None
+) -> Tuple[InlineKeyboardMarkup, str]:
+    """
+    Возвращает клавиатуру экрана для роли и ее хеш
+
+    Args:
+        screen: Экран из SCREEN_KEYBOARDS
+        role: Роль пользователя
+        inbox: Счетчики задач исполнителя (только для главного меню)
+
+    Returns:
+        Клавиатура (общая, не изменять) и хеш ее содержимого
+    """
+    keyboard = SCREEN_KEYBOARDS[screen](role, inbox)
+    return keyboard, _hash(keyboard.model_dump_json(exclude_none=True))
+
+
+def _hash(value: str) -> str:
+    return hashlib.blake2b(value.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _remember(key: Tuple[int, int], content_hash: str, edit_date: Optional[datetime]) -> None:
+    _last_rendered[key] = (content_hash, edit_date)
+    _last_rendered.move_to_end(key)
+    while len(_last_rendered) > MAX_TRACKED_MESSAGES:
+        _last_rendered.popitem(last=False)
+
+
+def _is_shown(callback: CallbackQuery, text: str, keyboard: InlineKeyboardMarkup) -> bool:
+    """
+    Проверяет по снимку сообщения из callback, что на экране уже это содержимое
+
+    Помогает, когда сообщение отрисовал другой экземпляр функции.
+    Текст сравнивается только без HTML: Telegram возвращает его без разметки.
+    """
+    message = callback.message
+    if message is None or '<' in text or '&' in text:
+        return False
+    return message.text == text and message.reply_markup == keyboard
+
+
+async def render_screen(
+    callback: CallbackQuery,
+    text: str,
+    screen: str,
+    role: Optional[str],
+    inbox: Optional[InboxCounts] = None
+) -> bool:
+    """
+    Показывает экран меню в сообщении callback, если он еще не показан
+
+    Args:
+        callback: Callback query нажатой кнопки
+        text: Текст экрана
+        screen: Экран из SCREEN_KEYBOARDS (определяет клавиатуру)
+        role: Роль пользователя
+        inbox: Счетчики задач исполнителя для главного меню
+
+    Returns:
+        True, если сообщение изменено; False, если изменение не требовалось
+    """
+    # Счетчики меняют только главное меню: остальные экраны не размножаются в кеше
+    keyboard, keyboard_hash = get_screen_keyboard(screen, role, inbox if screen == 'main' else None)
+    content_hash = _hash(f"{keyboard_hash}:{text}")
+    key = (callback.message.chat.id, callback.message.message_id)
+
+    # edit_date из callback отличается, если сообщение меняли в обход render_screen
+    if _last_rendered.get(key) == (content_hash, callback.message.edit_date) or _is_shown(callback, text, keyboard):
+        metrics.increment('render.skipped')
+        _remember(key, content_hash, callback.message.edit_date)
+        return False
+
+    try:
+        result = await callback.message.edit_text(text, reply_markup=keyboard)
+    except TelegramBadRequest as e:
+        if 'message is not modified' not in str(e):
+            raise
+        metrics.increment('render.not_modified')
+        _remember(key, content_hash, callback.message.edit_date)
+        return False
+
+    metrics.increment('render.edited')
+    _remember(key, content_hash, result.edit_date if isinstance(result, Message) else None)
+    return True
@@ -0,0 +1,287 @@
+"""
+Нагрузочное воспроизведение записанного трафика webhook против index.handler
+
+Запуск:
+    python -m app.utils.replay_load /tmp/captured_updates.jsonl --rate 20 --concurrency 8 --stub-bot-api
+
+Файл трафика пишется хуком в process_telegram_update при CAPTURE_UPDATES=true.
+Порядок update одного пользователя сохраняется, разные пользователи
+обрабатываются параллельно в пределах --concurrency.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from config import config
+from app.utils.request_stats import UpdateStats, add_stats_listener, remove_stats_listener
+
+logger = logging.getLogger(__name__)
+
+# Типы update, из которых берется отправитель
+USER_UPDATE_TYPES = (
+    'message', 'edited_message', 'callback_query', 'inline_query',
+    'my_chat_member', 'chat_member', 'channel_post'
+)
+
+
+@dataclass
+class ReplayResult:
+    """Результат воспроизведения одного update"""
+
+    update_id: Optional[int]
+    latency: float
+    status_code: int
+    error: Optional[str] = None
+
+    @property
+    def is_error(self) -> bool:
+        return self.error is not None or self.status_code >= 400
+
+
+def load_records(path: str) -> List[Dict[str, Any]]:
+    """Загружает записанные update из JSONL файла"""
+    records = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line)['update'])
+    return records
+
+
+def get_update_user_key(update: Dict[str, Any]) -> str:
+    """Возвращает ключ пользователя для сохранения порядка update"""
+    for update_type in USER_UPDATE_TYPES:
+        obj = update.get(update_type)
+        if obj:
+            sender = obj.get('from') or obj.get('chat') or {}
+            if sender.get('id') is not None:
+                return f"user:{sender['id']}"
+    return f"update:{update.get('update_id')}"
+
+
+def group_by_user(records: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Группирует update по пользователям с сохранением исходного порядка"""
+    groups: Dict[str, List[Dict[str, Any]]] = OrderedDict()
+    for update in records:
+        groups.setdefault(get_update_user_key(update), []).append(update)
+    return groups
+
+
+class RateLimiter:
+    """Равномерно распределяет старты запросов с заданной частотой"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.perf_counter()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        await asyncio.sleep(slot - now)
+
+
+async def replay(
+    records: List[Dict[str, Any]],
+    handler: Callable[[Dict[str, Any], Any], Dict[str, Any]],
+    rate: float,
+    concurrency: int
+) -> List[ReplayResult]:
+    """
+    Воспроизводит update против синхронного обработчика Cloud Function
+
+    Args:
+        records: Список update
+        handler: Обработчик (index.handler)
+        rate: Частота запусков в секунду (0 - без ограничения)
+        concurrency: Максимум одновременных вызовов
+
+    Returns:
+        Результаты по каждому update
+    """
+    limiter = RateLimiter(rate)
+    results: List[ReplayResult] = []
+    loop = asyncio.get_running_loop()
+
+    def invoke(update: Dict[str, Any]) -> ReplayResult:
+        event = {'httpMethod': 'POST', 'headers': {}, 'body': json.dumps(update, ensure_ascii=False)}
+        started = time.perf_counter()
+        try:
+            response = handler(event, None)
+            status_code = response.get('statusCode', 500)
+            error = None
+            if status_code >= 400:
+                error = response.get('body')
+        except Exception as e:
+            status_code = 500
+            error = str(e)
+        return ReplayResult(
+            update_id=update.get('update_id'),
+            latency=time.perf_counter() - started,
+            status_code=status_code,
+            error=error
+        )
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+
+        async def replay_user(updates: List[Dict[str, Any]]) -> None:
+            # Update одного пользователя идут строго последовательно
+            for update in updates:
+                await limiter.wait()
+                results.append(await loop.run_in_executor(executor, invoke, update))
+
+        await asyncio.gather(*(replay_user(updates) for updates in group_by_user(records).values()))
+
+    return results
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Перцентиль с линейной интерполяцией"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def format_report(results: List[ReplayResult], stats: Dict[int, UpdateStats], elapsed: float) -> str:
+    """Формирует текстовый отчет по результатам воспроизведения"""
+    total = len(results)
+    errors = sum(1 for result in results if result.is_error)
+    latencies = [result.latency * 1000 for result in results]
+    db_queries = [s.db_queries for s in stats.values()]
+    db_rows = [s.db_rows for s in stats.values()]
+    api_calls = [s.bot_api_calls for s in stats.values()]
+
+    methods: Dict[str, int] = {}
+    for s in stats.values():
+        for method, count in s.bot_api_methods.items():
+            methods[method] = methods.get(method, 0) + count
+
+    lines = [
+        f"Update: {total}, ошибок: {errors} ({errors / total * 100 if total else 0:.1f}%)",
+        f"Время: {elapsed:.1f} с, пропускная способность: {total / elapsed if elapsed else 0:.1f} update/с",
+        "Задержка, мс: "
+        f"p50={percentile(latencies, 0.5):.1f} p90={percentile(latencies, 0.9):.1f} "
+        f"p95={percentile(latencies, 0.95):.1f} p99={percentile(latencies, 0.99):.1f} "
+        f"max={max(latencies, default=0):.1f}",
+        "Запросов к БД на update: "
+        f"avg={sum(db_queries) / len(db_queries) if db_queries else 0:.2f} "
+        f"p95={percentile(db_queries, 0.95):.0f} max={max(db_queries, default=0)}",
+        f"Строк прочитано из БД: всего={sum(db_rows)} max на update={max(db_rows, default=0)}",
+        f"Вызовов Bot API: всего={sum(api_calls)} avg на update={sum(api_calls) / len(api_calls) if api_calls else 0:.2f}",
+    ]
+
+    for method, count in sorted(methods.items(), key=lambda item: -item[1]):
+        lines.append(f"  {method}: {count}")
+
+    error_samples = [result for result in results if result.is_error][:5]
+    if error_samples:
+        lines.append("Примеры ошибок:")
+        for result in error_samples:
+            lines.append(f"  update {result.update_id}: {result.status_code} {result.error}")
+
+    return "\n".join(lines)
+
+
+def start_stub_bot_api(port: int) -> str:
+    """
+    Запускает в фоновом потоке заглушку Bot API, отвечающую успехом на любой метод
+
+    Returns:
+        Базовый URL заглушки для TELEGRAM_API_URL
+    """
+    from aiohttp import web
+
+    async def handle_method(request: web.Request) -> web.Response:
+        method = request.match_info['method']
+        data = await request.post()
+
+        if method.startswith(('send', 'edit')) and data.get('chat_id'):
+            result: Any = {
+                'message_id': int(data.get('message_id', 1)),
+                'date': int(time.time()),
+                'chat': {'id': int(data['chat_id']), 'type': 'private'},
+                'text': data.get('text', '')
+            }
+        elif method == 'getMe':
+            result = {'id': 1, 'is_bot': True, 'first_name': 'stub'}
+        else:
+            result = True
+
+        return web.json_response({'ok': True, 'result': result})
+
+    started = threading.Event()
+
+    def run() -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        app = web.Application()
+        app.router.add_post('/bot{token}/{method}', handle_method)
+        runner = web.AppRunner(app)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, '127.0.0.1', port).start())
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, name='stub-bot-api', daemon=True).start()
+    started.wait(timeout=10)
+
+    return f"http://127.0.0.1:{port}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Воспроизведение записанного трафика против index.handler")
+    parser.add_argument('path', help="JSONL файл с записанными update")
+    parser.add_argument('--rate', type=float, default=10.0, help="Update в секунду (0 - без ограничения)")
+    parser.add_argument('--concurrency', type=int, default=1, help="Одновременных вызовов handler")
+    parser.add_argument('--stub-bot-api', action='store_true', help="Отвечать на вызовы Bot API локальной заглушкой")
+    parser.add_argument('--stub-port', type=int, default=8081, help="Порт заглушки Bot API")
+    parser.add_argument('--dedup', action='store_true', help="Не отключать защиту от повторной обработки update")
+    args = parser.parse_args()
+
+    # Один и тот же update_id воспроизводится многократно — иначе все повторы будут пропущены
+    config.IDEMPOTENCY_ENABLED = args.dedup
+
+    if args.stub_bot_api:
+        config.TELEGRAM_API_URL = start_stub_bot_api(args.stub_port)
+
+    # Импортируем после настройки config, чтобы бот создался с нужным сервером API
+    import index
+
+    records = load_records(args.path)
+
+    stats: Dict[int, UpdateStats] = {}
+    stats_lock = threading.Lock()
+
+    def collect(update_stats: UpdateStats) -> None:
+        with stats_lock:
+            stats[update_stats.update_id] = update_stats
+
+    add_stats_listener(collect)
+    try:
+        started = time.perf_counter()
+        results = asyncio.run(replay(records, index.handler, args.rate, args.concurrency))
+        elapsed = time.perf_counter() - started
+    finally:
+        remove_stats_listener(collect)
+
+    print(format_report(results, stats, elapsed))
+
+
+if __name__ == "__main__":
+    main()
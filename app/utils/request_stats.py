@@ -0,0 +1,154 @@
+"""
+Статистика обработки одного update (запросы к БД, вызовы Bot API)
+"""
+import hashlib
+import logging
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class UpdateStats:
+    """Счетчики, собранные за время обработки одного update"""
+
+    update_id: Optional[int] = None
+    db_queries: int = 0
+    db_rows: int = 0
+    bot_api_calls: int = 0
+    bot_api_methods: Dict[str, int] = field(default_factory=dict)
+    bot_api_chats: Set[int] = field(default_factory=set)  # Чаты, которым адресованы вызовы Bot API
+    started_at: float = field(default_factory=time.perf_counter)
+    duration: float = 0.0
+    handler_error: Optional[str] = None  # Исключение обработчика, перехваченное error_handler
+
+
+@dataclass
+class HandlerQueryStats:
+    """Запросы к БД, выполненные одним обработчиком"""
+
+    handler_name: str
+    queries: int = 0
+    rows: int = 0
+    shapes: Dict[str, int] = field(default_factory=dict)
+    shape_samples: Dict[str, str] = field(default_factory=dict)
+
+
+_current_stats: ContextVar[Optional[UpdateStats]] = ContextVar('update_stats', default=None)
+_current_handler: ContextVar[Optional[HandlerQueryStats]] = ContextVar('handler_query_stats', default=None)
+_listeners: List[Callable[[UpdateStats], None]] = []
+
+
+def start_update_stats(update_id: Optional[int] = None) -> Token:
+    """
+    Начинает сбор статистики для update в текущем контексте
+
+    Args:
+        update_id: ID update от Telegram
+
+    Returns:
+        Токен для завершения сбора статистики
+    """
+    return _current_stats.set(UpdateStats(update_id=update_id))
+
+
+def finish_update_stats(token: Token) -> Optional[UpdateStats]:
+    """
+    Завершает сбор статистики и передает ее подписчикам
+
+    Args:
+        token: Токен из start_update_stats
+
+    Returns:
+        Собранная статистика
+    """
+    stats = _current_stats.get()
+    _current_stats.reset(token)
+
+    if stats is None:
+        return None
+
+    stats.duration = time.perf_counter() - stats.started_at
+    logger.debug(
+        f"Update {stats.update_id}: {stats.db_queries} запросов к БД, "
+        f"{stats.db_rows} строк, {stats.bot_api_calls} вызовов Bot API за {stats.duration * 1000:.1f} мс"
+    )
+
+    for listener in list(_listeners):
+        try:
+            listener(stats)
+        except Exception as e:
+            logger.error(f"Ошибка в подписчике статистики update: {e}")
+
+    return stats
+
+
+def get_update_stats() -> Optional[UpdateStats]:
+    """Возвращает статистику текущего update или None"""
+    return _current_stats.get()
+
+
+def get_query_shape(query: str) -> str:
+    """Возвращает короткий идентификатор формы запроса (без учета пробелов)"""
+    normalized = " ".join(query.split())
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:12]
+
+
+def record_db_query(rows: int = 0, query: Optional[str] = None) -> None:
+    """Учитывает запрос к БД в статистике текущего update и обработчика"""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_rows += rows
+
+    handler_stats = _current_handler.get()
+    if handler_stats is not None:
+        handler_stats.queries += 1
+        handler_stats.rows += rows
+        if query:
+            shape = get_query_shape(query)
+            handler_stats.shapes[shape] = handler_stats.shapes.get(shape, 0) + 1
+            handler_stats.shape_samples.setdefault(shape, " ".join(query.split())[:120])
+
+
+def begin_handler_stats(handler_name: str) -> Token:
+    """Начинает учет запросов к БД для обработчика"""
+    return _current_handler.set(HandlerQueryStats(handler_name=handler_name))
+
+
+def end_handler_stats(token: Token) -> Optional[HandlerQueryStats]:
+    """Завершает учет запросов обработчика и возвращает собранные данные"""
+    handler_stats = _current_handler.get()
+    _current_handler.reset(token)
+    return handler_stats
+
+
+def record_bot_api_call(method_name: str, chat_id: Optional[int] = None) -> None:
+    """Учитывает вызов Bot API (и чат, которому он адресован) в статистике текущего update"""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.bot_api_calls += 1
+        stats.bot_api_methods[method_name] = stats.bot_api_methods.get(method_name, 0) + 1
+        if isinstance(chat_id, int):
+            stats.bot_api_chats.add(chat_id)
+
+
+def record_handler_error(error: BaseException) -> None:
+    """Учитывает исключение обработчика, которое перехватил глобальный error_handler"""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.handler_error = f"{type(error).__name__}: {error}"
+
+
+def add_stats_listener(listener: Callable[[UpdateStats], None]) -> None:
+    """Подписывает функцию на получение статистики по каждому update"""
+    _listeners.append(listener)
+
+
+def remove_stats_listener(listener: Callable[[UpdateStats], None]) -> None:
+    """Отписывает функцию от получения статистики"""
+    if listener in _listeners:
+        _listeners.remove(listener)
@@ -0,0 +1,217 @@
+"""
+Стресс-тест одновременных вызовов index.handler в одном процессе
+
+Имитирует экземпляр Cloud Function с concurrency > 1: первая волна из
+--concurrency вызовов стартует одновременно (гонка холодного старта),
+остальные идут через пул потоков.
+
+Проверяется:
+- все вызовы завершились успешно;
+- цикл событий и бот созданы один раз на процесс;
+- статистика каждого update собрана отдельно: у каждого update есть
+  метка — его чат, и все вызовы Bot API в его статистике адресованы этому
+  чату. Если контекст статистики перепутался между одновременными update,
+  в ней окажутся вызовы чужого чата. Число запросов не сравнивается: оно
+  законно различается у одинаковых команд (кеши, прогрев, состояния FSM).
+  Для записанного трафика (--path) проверка чатов не выполняется —
+  обработчики могут писать другим пользователям (уведомления).
+
+Запуск:
+    python -m app.utils.stress_handler --invocations 500 --concurrency 32 --stub-bot-api
+    python -m app.utils.stress_handler --path /tmp/captured_updates.jsonl --concurrency 16
+"""
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from config import config
+from app.utils.replay_load import ReplayResult, format_report, load_records, start_stub_bot_api
+from app.utils.request_stats import UpdateStats, add_stats_listener, remove_stats_listener
+
+logger = logging.getLogger(__name__)
+
+# Команды синтетической нагрузки
+COMMANDS = ('/start', '/help')
+
+
+def build_updates(invocations: int, users: int) -> List[Dict[str, Any]]:
+    """Формирует синтетические update с командами от нескольких пользователей"""
+    updates = []
+    for i in range(invocations):
+        user_id = 100000 + i % users
+        updates.append({
+            'update_id': i + 1,
+            'message': {
+                'message_id': i + 1,
+                'date': int(time.time()),
+                'chat': {'id': user_id, 'type': 'private'},
+                'from': {'id': user_id, 'is_bot': False, 'first_name': f"Stress{user_id}"},
+                'text': COMMANDS[i % len(COMMANDS)]
+            }
+        })
+    return updates
+
+
+def fire(
+    updates: List[Dict[str, Any]],
+    handler: Callable[[Dict[str, Any], Any], Dict[str, Any]],
+    concurrency: int
+) -> List[ReplayResult]:
+    """
+    Вызывает handler для всех update из нескольких потоков одновременно
+
+    Args:
+        updates: Список update
+        handler: Обработчик (index.handler)
+        concurrency: Число одновременных вызовов
+
+    Returns:
+        Результаты по каждому update
+    """
+    barrier = threading.Barrier(min(concurrency, len(updates)))
+
+    def invoke(position: int, update: Dict[str, Any]) -> ReplayResult:
+        if position < barrier.parties:
+            # Первая волна стартует одновременно, чтобы проверить гонку инициализации
+            barrier.wait()
+        event = {'httpMethod': 'POST', 'headers': {}, 'body': json.dumps(update, ensure_ascii=False)}
+        started = time.perf_counter()
+        try:
+            response = handler(event, None)
+            status_code = response.get('statusCode', 500)
+            error = response.get('body') if status_code >= 400 else None
+        except Exception as e:
+            status_code = 500
+            error = str(e)
+        return ReplayResult(
+            update_id=update.get('update_id'),
+            latency=time.perf_counter() - started,
+            status_code=status_code,
+            error=error
+        )
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(invoke, position, update) for position, update in enumerate(updates)]
+        return [future.result() for future in futures]
+
+
+def _update_chat(update: Dict[str, Any]) -> Optional[int]:
+    """Чат update — метка, по которой видно, чьи вызовы Bot API попали в статистику"""
+    message = update.get('message') or (update.get('callback_query') or {}).get('message') or {}
+    return (message.get('chat') or {}).get('id')
+
+
+def check_isolation(
+    updates: List[Dict[str, Any]],
+    stats: Dict[int, UpdateStats],
+    own_chat_only: bool = True
+) -> List[str]:
+    """
+    Проверяет, что статистика не смешивалась между одновременными update
+
+    Args:
+        updates: Отправленные update
+        stats: Статистика по ID update
+        own_chat_only: Обработчики отвечают только в чат update (синтетическая нагрузка)
+
+    Returns:
+        Список найденных проблем
+    """
+    problems = []
+
+    missing = [update['update_id'] for update in updates if update['update_id'] not in stats]
+    if missing:
+        problems.append(f"нет статистики для {len(missing)} update (например, {missing[:5]})")
+
+    if not own_chat_only:
+        return problems
+
+    mixed = []
+    for update in updates:
+        update_stats = stats.get(update['update_id'])
+        chat_id = _update_chat(update)
+        if update_stats is None or chat_id is None:
+            continue
+        foreign = update_stats.bot_api_chats - {chat_id}
+        if foreign:
+            mixed.append(f"{update['update_id']} (чат {chat_id}, чужие {sorted(foreign)[:3]})")
+
+    if mixed:
+        problems.append(
+            f"в статистике {len(mixed)} update есть вызовы Bot API других чатов: {', '.join(mixed[:5])}"
+        )
+
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Одновременные вызовы index.handler в одном процессе")
+    parser.add_argument('--path', help="JSONL файл с записанными update (по умолчанию синтетические)")
+    parser.add_argument('--invocations', type=int, default=200, help="Число синтетических вызовов")
+    parser.add_argument('--users', type=int, default=20, help="Число синтетических пользователей")
+    parser.add_argument('--concurrency', type=int, default=32, help="Одновременных вызовов handler")
+    parser.add_argument('--stub-bot-api', action='store_true', help="Отвечать на вызовы Bot API локальной заглушкой")
+    parser.add_argument('--stub-port', type=int, default=8081, help="Порт заглушки Bot API")
+    parser.add_argument('--dedup', action='store_true', help="Не отключать защиту от повторной обработки update")
+    args = parser.parse_args()
+
+    # Один и тот же update_id воспроизводится многократно — иначе все повторы будут пропущены
+    config.IDEMPOTENCY_ENABLED = args.dedup
+
+    if args.stub_bot_api:
+        config.TELEGRAM_API_URL = start_stub_bot_api(args.stub_port)
+
+    # Импортируем после настройки config, чтобы бот создался с нужным сервером API
+    import index
+
+    updates = load_records(args.path) if args.path else build_updates(args.invocations, args.users)
+
+    stats: Dict[int, UpdateStats] = {}
+    stats_lock = threading.Lock()
+
+    def collect(update_stats: UpdateStats) -> None:
+        with stats_lock:
+            stats[update_stats.update_id] = update_stats
+
+    add_stats_listener(collect)
+    try:
+        started = time.perf_counter()
+        results = fire(updates, index.handler, args.concurrency)
+        elapsed = time.perf_counter() - started
+    finally:
+        remove_stats_listener(collect)
+
+    print(format_report(results, stats, elapsed))
+
+    problems = check_isolation(updates, stats, own_chat_only=not args.path)
+
+    loop_threads = [thread for thread in threading.enumerate() if thread.name == 'bot-event-loop']
+    if len(loop_threads) != 1:
+        problems.append(f"запущено циклов событий: {len(loop_threads)}")
+
+    from app.bot.startup import get_startup_report
+    report = get_startup_report()
+    if report is None:
+        problems.append("инициализация не выполнена")
+    else:
+        print(f"Холодный старт: {report.format()}")
+
+    errors = sum(1 for result in results if result.is_error)
+    if errors:
+        problems.append(f"неуспешных вызовов: {errors}")
+
+    for problem in problems:
+        print(f"FAIL  {problem}")
+    if not problems:
+        print("OK    одновременные вызовы обработаны корректно")
+
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
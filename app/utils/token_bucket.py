@@ -0,0 +1,99 @@
+"""
+Token bucket для ограничения частоты событий
+"""
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar('K', bound=Hashable)
+
+
+class TokenBucket:
+    """
+    Ведро токенов: пополняется со скоростью rate в секунду до capacity.
+    Событие разрешено, если в ведре есть нужное количество токенов.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            rate: Скорость пополнения (токенов в секунду)
+            capacity: Максимальный запас токенов (допустимый всплеск)
+            clock: Источник времени
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated_at = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def try_consume(self, tokens: float = 1.0) -> bool:
+        """Забирает токены, если их достаточно"""
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    def time_until(self, tokens: float = 1.0) -> float:
+        """Через сколько секунд будет доступно tokens токенов"""
+        self._refill()
+        if self._tokens >= tokens:
+            return 0.0
+        if self.rate <= 0:
+            return float('inf')
+        return (tokens - self._tokens) / self.rate
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Забирает токены в долг и возвращает время ожидания до момента,
+        когда событие можно выполнить (0 — сразу)
+        """
+        wait = self.time_until(tokens)
+        self._tokens -= tokens
+        return wait
+
+    @property
+    def is_full(self) -> bool:
+        self._refill()
+        return self._tokens >= self.capacity
+
+
+class KeyedTokenBuckets(Generic[K]):
+    """Ведра по ключу (пользователь, чат) с ограничением количества в памяти"""
+
+    def __init__(self, rate: float, capacity: float, max_keys: int = 10000):
+        """
+        Args:
+            rate: Скорость пополнения каждого ведра
+            capacity: Запас каждого ведра
+            max_keys: Максимум хранимых ведер; давно не использованные удаляются
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[K, TokenBucket]" = OrderedDict()
+
+    def get(self, key: K) -> TokenBucket:
+        """Возвращает ведро для ключа, создавая полное при первом обращении"""
+        bucket: Optional[TokenBucket] = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.capacity)
+            self._buckets[key] = bucket
+            self._evict()
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def _evict(self) -> None:
+        # Удаляется самое старое ведро: если оно не полное, лимит ключа временно сбросится
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
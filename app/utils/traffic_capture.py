@@ -0,0 +1,91 @@
+"""
+Запись входящих webhook update в обезличенном JSONL формате
+"""
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Строковые поля с персональными данными, которые маскируются целиком
+REDACTED_FIELDS = {
+    'first_name', 'last_name', 'username', 'phone_number', 'title',
+    'caption', 'bio', 'email', 'vcard', 'address', 'description'
+}
+
+# Поля с текстом сообщения: команда сохраняется, аргументы маскируются
+REDACTED_TEXT_FIELDS = {'text'}
+
+_write_lock = threading.Lock()
+
+
+def _mask(value: str) -> str:
+    """Заменяет строку маской той же длины (длина важна для валидации)"""
+    return 'x' * len(value)
+
+
+def _redact_text(value: str) -> str:
+    """Маскирует текст сообщения, сохраняя команду бота"""
+    if value.startswith('/'):
+        command, _, rest = value.partition(' ')
+        return f"{command} {_mask(rest)}" if rest else command
+    return _mask(value)
+
+
+def redact_update(data: Any) -> Any:
+    """
+    Рекурсивно обезличивает данные update
+
+    ID пользователей и чатов, callback_data и служебные поля сохраняются,
+    чтобы при воспроизведении сработали те же обработчики.
+
+    Args:
+        data: Данные update (dict/list/значение)
+
+    Returns:
+        Обезличенная копия данных
+    """
+    if isinstance(data, dict):
+        result = {}
+        for key, value in data.items():
+            if isinstance(value, str) and key in REDACTED_FIELDS:
+                result[key] = _mask(value)
+            elif isinstance(value, str) and key in REDACTED_TEXT_FIELDS:
+                result[key] = _redact_text(value)
+            else:
+                result[key] = redact_update(value)
+        return result
+
+    if isinstance(data, list):
+        return [redact_update(item) for item in data]
+
+    return data
+
+
+def capture_update(update_data: Dict[str, Any]) -> None:
+    """
+    Дописывает update в файл записи трафика, если запись включена
+
+    Args:
+        update_data: Тело webhook запроса от Telegram
+    """
+    if not config.CAPTURE_UPDATES:
+        return
+
+    try:
+        record = {
+            'captured_at': time.time(),
+            'update': redact_update(update_data)
+        }
+        line = json.dumps(record, ensure_ascii=False)
+
+        with _write_lock:
+            with open(config.CAPTURE_UPDATES_PATH, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+    except Exception as e:
+        logger.error(f"Ошибка записи update в файл трафика: {e}")
@@ -13,6 +13,12 @@ class Config:
     BOT_TOKEN: str = os.getenv("BOT_TOKEN", "")
     WEBHOOK_URL: Optional[str] = os.getenv("WEBHOOK_URL")
     WEBHOOK_SECRET: Optional[str] = os.getenv("WEBHOOK_SECRET")
+    TELEGRAM_API_URL: Optional[str] = os.getenv("TELEGRAM_API_URL")  # Альтернативный сервер Bot API
+    BOT_SESSION_LIMIT: int = int(os.getenv("BOT_SESSION_LIMIT", "100"))  # Соединений с Bot API
+    BOT_SESSION_KEEPALIVE: float = float(os.getenv("BOT_SESSION_KEEPALIVE", "60"))  # Секунды
+    BOT_SESSION_DNS_TTL: int = int(os.getenv("BOT_SESSION_DNS_TTL", "3600"))  # Секунды
+    BOT_SESSION_TIMEOUT: float = float(os.getenv("BOT_SESSION_TIMEOUT", "30"))  # Таймаут запроса, секунды
+    BOT_SESSION_PREWARM: bool = os.getenv("BOT_SESSION_PREWARM", "True").lower() == "true"  # getMe при старте
     
     # YDB настройки
     YDB_ENDPOINT: str = os.getenv("YDB_ENDPOINT", "")
@@ -20,16 +26,118 @@ class Config:
     YDB_CREDENTIALS_TYPE: str = os.getenv("YDB_CREDENTIALS_TYPE", "metadata")  # metadata, sa_key, token
     YDB_SERVICE_ACCOUNT_KEY: Optional[str] = os.getenv("YDB_SERVICE_ACCOUNT_KEY")
     YDB_TOKEN: Optional[str] = os.getenv("YDB_TOKEN")
+    YDB_POOL_SIZE: int = int(os.getenv("YDB_POOL_SIZE", "10"))
+    YDB_PREWARM_SESSIONS: int = int(os.getenv("YDB_PREWARM_SESSIONS", "2"))  # Сессии, создаваемые при старте
+    YDB_DISCOVERY_TIMEOUT: int = int(os.getenv("YDB_DISCOVERY_TIMEOUT", "10"))
+    
+    # Одновременно обрабатываемые update (update одного чата всегда по очереди)
+    UPDATE_MAX_CONCURRENCY: int = int(os.getenv("UPDATE_MAX_CONCURRENCY", "32"))
+    
+    # Защита от повторной обработки update при повторной доставке
+    IDEMPOTENCY_ENABLED: bool = os.getenv("IDEMPOTENCY_ENABLED", "True").lower() == "true"
+    IDEMPOTENCY_LRU_SIZE: int = int(os.getenv("IDEMPOTENCY_LRU_SIZE", "10000"))
+    # Сколько update считается захваченным обработчиком; дольше таймаута функции
+    IDEMPOTENCY_LEASE_SECONDS: int = int(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "600"))
+    
+    # Ограничение частоты запросов пользователей
+    THROTTLE_ENABLED: bool = os.getenv("THROTTLE_ENABLED", "True").lower() == "true"
+    THROTTLE_MODE: str = os.getenv("THROTTLE_MODE", "notice")  # drop, delay, notice
+    THROTTLE_USER_RATE: float = float(os.getenv("THROTTLE_USER_RATE", "1"))  # Событий в секунду
+    THROTTLE_USER_BURST: int = int(os.getenv("THROTTLE_USER_BURST", "5"))
+    THROTTLE_GLOBAL_RATE: float = float(os.getenv("THROTTLE_GLOBAL_RATE", "50"))
+    THROTTLE_GLOBAL_BURST: int = int(os.getenv("THROTTLE_GLOBAL_BURST", "100"))
+    THROTTLE_MAX_DELAY: float = float(os.getenv("THROTTLE_MAX_DELAY", "2"))  # Для режима delay
+    THROTTLE_NOTICE_COOLDOWN: float = float(os.getenv("THROTTLE_NOTICE_COOLDOWN", "10"))
+    # Общий для всех экземпляров лимит пользователя в YDB (дополнительный запрос на событие)
+    THROTTLE_SHARED: bool = os.getenv("THROTTLE_SHARED", "False").lower() == "true"
+    THROTTLE_SHARED_WINDOW: int = int(os.getenv("THROTTLE_SHARED_WINDOW", "60"))  # Секунды
+    THROTTLE_SHARED_LIMIT: int = int(os.getenv("THROTTLE_SHARED_LIMIT", "60"))  # Событий за окно
+    
+    # Исходящие уведомления и рассылки (лимиты Telegram)
+    SENDER_GLOBAL_RATE: float = float(os.getenv("SENDER_GLOBAL_RATE", "30"))  # Сообщений в секунду на бота
+    SENDER_PER_CHAT_RATE: float = float(os.getenv("SENDER_PER_CHAT_RATE", "1"))  # Сообщений в секунду в чат
+    SENDER_WORKERS: int = int(os.getenv("SENDER_WORKERS", "8"))
+    SENDER_MAX_RETRIES: int = int(os.getenv("SENDER_MAX_RETRIES", "3"))
+    
+    # Режим долгоживущего webhook сервера (server.py)
+    SERVER_HOST: str = os.getenv("SERVER_HOST", "0.0.0.0")
+    SERVER_PORT: int = int(os.getenv("SERVER_PORT", "8080"))
+    SERVER_WORKERS: int = int(os.getenv("SERVER_WORKERS", "1"))
+    SERVER_WEBHOOK_PATH: str = os.getenv("SERVER_WEBHOOK_PATH", "/webhook")
+    SERVER_SHUTDOWN_TIMEOUT: float = float(os.getenv("SERVER_SHUTDOWN_TIMEOUT", "25"))  # Секунды на завершение update
+    SERVER_DRAIN_GRACE: float = float(os.getenv("SERVER_DRAIN_GRACE", "10"))  # Секунды ответа 503 на /health до закрытия сокетов
+    
+    # Потоки для синхронных вызовов YDB из общего цикла событий
+    RUNTIME_MAX_THREADS: int = int(os.getenv("RUNTIME_MAX_THREADS", "16"))
+    
+    # Перевод задач с истекшим сроком в статус overdue (sweeper_handler)
+    OVERDUE_SWEEP_BATCH_SIZE: int = int(os.getenv("OVERDUE_SWEEP_BATCH_SIZE", "200"))
+    OVERDUE_SWEEP_MAX_BATCHES: int = int(os.getenv("OVERDUE_SWEEP_MAX_BATCHES", "50"))  # За один запуск
+    OVERDUE_SWEEP_INTERVAL: int = int(os.getenv("OVERDUE_SWEEP_INTERVAL", "60"))  # Секунды, режим server.py
+    
+    # Напоминания исполнителям о сроках (reminder_handler)
+    REMINDER_OFFSETS: tuple = tuple(
+        int(minutes) for minutes in os.getenv("REMINDER_OFFSETS", "1440,60").split(",") if minutes.strip()
+    )  # За сколько минут до срока
+    REMINDER_BUCKET_SECONDS: int = int(os.getenv("REMINDER_BUCKET_SECONDS", "300"))
+    REMINDER_TICK_SECONDS: int = int(os.getenv("REMINDER_TICK_SECONDS", "60"))  # Режим server.py
+    REMINDER_BATCH_SIZE: int = int(os.getenv("REMINDER_BATCH_SIZE", "200"))
+    REMINDER_CONCURRENCY: int = int(os.getenv("REMINDER_CONCURRENCY", "16"))  # Одновременных отправок
+    REMINDER_LEASE_SECONDS: int = int(os.getenv("REMINDER_LEASE_SECONDS", "300"))  # До повтора неотправленного
+    # Сколько пакет напоминаний ждет очередь отправки; меньше аренды, иначе напоминание захватят повторно
+    REMINDER_SEND_TIMEOUT: int = int(os.getenv("REMINDER_SEND_TIMEOUT", "240"))
+    REMINDER_MAX_LAG: int = int(os.getenv("REMINDER_MAX_LAG", "3600"))  # Старше — не отправляются
+    
+    # Счетчики задач для панели директора
+    COUNTER_SHARDS: int = int(os.getenv("COUNTER_SHARDS", "8"))  # Строк на (компания|исполнитель, статус)
+    COUNTER_RECONCILE_INTERVAL: int = int(os.getenv("COUNTER_RECONCILE_INTERVAL", "3600"))  # Секунды, server.py
+    
+    # Счетчики задач исполнителя в главном меню (inbox_service)
+    INBOX_CACHE_TTL: int = int(os.getenv("INBOX_CACHE_TTL", "60"))  # Секунды
+    INBOX_CACHE_SIZE: int = int(os.getenv("INBOX_CACHE_SIZE", "10000"))  # Исполнителей в кеше
+    
+    # Снимок задач для аналитики сроков (analytics_service)
+    ANALYTICS_PAGE_SIZE: int = int(os.getenv("ANALYTICS_PAGE_SIZE", "1000"))  # Не больше лимита строк YDB
+    ANALYTICS_REFRESH_MAX_PAGES: int = int(os.getenv("ANALYTICS_REFRESH_MAX_PAGES", "20"))  # При открытии отчета
+    ANALYTICS_REFRESH_OVERLAP: int = int(os.getenv("ANALYTICS_REFRESH_OVERLAP", "60"))  # Секунды перечитывания
+    ANALYTICS_REFRESH_INTERVAL: int = int(os.getenv("ANALYTICS_REFRESH_INTERVAL", "300"))  # Секунды, server.py
+    
+    # Выгрузка задач в CSV/XLSX (export_service)
+    EXPORT_CHUNK_SIZE: int = int(os.getenv("EXPORT_CHUNK_SIZE", "500"))  # Задач в одном запросе
+    EXPORT_MAX_ROWS: int = int(os.getenv("EXPORT_MAX_ROWS", "100000"))
+    EXPORT_SPOOL_SIZE: int = int(os.getenv("EXPORT_SPOOL_SIZE", "1048576"))  # Байт в памяти до записи на диск
+    EXPORT_PROGRESS_INTERVAL: float = float(os.getenv("EXPORT_PROGRESS_INTERVAL", "3"))  # Секунды между правками
+    
+    # Комментарии к задачам (comment_service)
+    COMMENTS_PAGE_SIZE: int = int(os.getenv("COMMENTS_PAGE_SIZE", "10"))
+    COMMENT_MAX_LENGTH: int = int(os.getenv("COMMENT_MAX_LENGTH", "2000"))  # Символов
+    
+    # Задания по таймеру в процессах server.py (в Cloud Functions — триггеры-таймеры)
+    SERVER_TIMER_JOBS: bool = os.getenv("SERVER_TIMER_JOBS", "True").lower() == "true"
     
     # Логирование
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
     
+    # Запись входящего трафика для нагрузочного тестирования
+    CAPTURE_UPDATES: bool = os.getenv("CAPTURE_UPDATES", "False").lower() == "true"
+    CAPTURE_UPDATES_PATH: str = os.getenv("CAPTURE_UPDATES_PATH", "/tmp/captured_updates.jsonl")
+    
+    # Бюджет запросов к БД на обработчик (обнаружение N+1)
+    QUERY_BUDGET_MAX_QUERIES: int = int(os.getenv("QUERY_BUDGET_MAX_QUERIES", "5"))
+    QUERY_BUDGET_MAX_REPEATS: int = int(os.getenv("QUERY_BUDGET_MAX_REPEATS", "2"))
+    QUERY_BUDGET_STRICT: bool = os.getenv("QUERY_BUDGET_STRICT", "False").lower() == "true"  # Для тестов
+    
     # Файловое хранилище (Object Storage)
     S3_ENDPOINT: Optional[str] = os.getenv("S3_ENDPOINT")
     S3_ACCESS_KEY: Optional[str] = os.getenv("S3_ACCESS_KEY")
     S3_SECRET_KEY: Optional[str] = os.getenv("S3_SECRET_KEY")
     S3_BUCKET: Optional[str] = os.getenv("S3_BUCKET")
+    S3_REGION: str = os.getenv("S3_REGION", "ru-central1")
+    S3_PART_SIZE: int = int(os.getenv("S3_PART_SIZE", "8388608"))  # Байт в части multipart-загрузки, от 5 МБ
+    S3_UPLOAD_CONCURRENCY: int = int(os.getenv("S3_UPLOAD_CONCURRENCY", "3"))  # Частей в загрузке одновременно
+    S3_LINK_TTL: int = int(os.getenv("S3_LINK_TTL", "3600"))  # Секунды действия ссылки на файл
+    FILE_DOWNLOAD_TIMEOUT: int = int(os.getenv("FILE_DOWNLOAD_TIMEOUT", "300"))  # Секунды чтения файла из Telegram
     
     # Настройки приложения
     MAX_FILE_SIZE: int = int(os.getenv("MAX_FILE_SIZE", "52428800"))  # 50MB
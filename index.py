@@ -3,12 +3,14 @@ Entry point для Yandex Cloud Function
 """
 import json
 import logging
-import asyncio
-from typing import Dict, Any
+from dataclasses import asdict
+from typing import Dict, Any, List, Tuple
 
 from config import config
-from app.bot.bot_instance import create_bot
-from app.bot.dispatcher import setup_dispatcher
+from app.bot.runtime import run_coroutine
+from app.bot.update_processor import BatchFailed, dispatch_update, process_batch
+from app.bot.startup import init_application
+from app.utils.metrics import get_metrics_snapshot
 
 # Настройка логирования
 logging.basicConfig(
@@ -17,40 +19,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Глобальные переменные для переиспользования
-bot = None
-dp = None
-
-
-async def init_bot():
-    """Инициализация бота и диспетчера"""
-    global bot, dp
-    
-    if bot is None:
-        try:
-            config.validate_required()
-            bot = create_bot()
-            dp = await setup_dispatcher()
-            logger.info("Бот успешно инициализирован")
-        except Exception as e:
-            logger.error(f"Ошибка инициализации бота: {e}")
-            raise
-
 
 async def process_telegram_update(event: Dict[str, Any]) -> Dict[str, Any]:
     """Обработка Telegram update"""
     try:
-        # Инициализируем бота если не инициализирован
-        await init_bot()
-        
         # Получаем update из тела запроса
         update_data = json.loads(event.get('body', '{}'))
         
-        # Обрабатываем update
-        from aiogram.types import Update
-        update = Update(**update_data)
-        
-        await dp.feed_update(bot, update)
+        await dispatch_update(update_data)
         
         return {
             'statusCode': 200,
@@ -85,10 +61,16 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         http_method = event.get('httpMethod', '').upper()
         
         if http_method == 'POST':
-            # Обрабатываем Telegram webhook
-            return asyncio.run(process_telegram_update(event))
+            # Обрабатываем Telegram webhook в общем цикле событий процесса
+            return run_coroutine(process_telegram_update(event))
         
         elif http_method == 'GET':
+            if event.get('path', '').endswith('/metrics'):
+                return {
+                    'statusCode': 200,
+                    'body': json.dumps(get_metrics_snapshot())
+                }
+            
             # Health check
             return {
                 'statusCode': 200,
@@ -113,6 +95,193 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         }
 
 
+def _extract_queue_messages(event: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """Извлекает (ID сообщения, тело) из события триггера Message Queue"""
+    messages = []
+    for message in event.get('messages', []):
+        details = message.get('details', {}).get('message', {})
+        message_id = details.get('message_id') or message.get('event_metadata', {}).get('event_id', '')
+        messages.append((message_id, details.get('body', '{}')))
+    return messages
+
+
+def queue_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Обработчик Cloud Function для триггера Message Queue
+    
+    Принимает пакет сообщений с update и обрабатывает их параллельно
+    с сохранением порядка внутри чата.
+    
+    Триггер Message Queue не поддерживает частичное подтверждение пакета
+    (batchItemFailures): сообщения удаляются из очереди, только если вызов
+    завершился успешно. Поэтому при ошибке хотя бы одного сообщения вызов
+    завершается исключением и после visibility timeout повторно доставляется
+    весь пакет. Успешные сообщения пакета при повторе не обрабатываются
+    заново, потому что защита от повторов (IDEMPOTENCY_ENABLED) атомарно
+    захватывает update_id в processed_updates до обработки и отмечает его
+    done после нее (app/services/idempotency_service.py). Гарантия держится
+    на этом захвате: сообщение, которое еще обрабатывает другой вызов, не
+    подтверждается, а возвращается в очередь. Без защиты от повторов или
+    при недоступной таблице processed_updates успешные сообщения пакета
+    будут обработаны еще раз.
+    
+    Исключения обработчиков перехватывает error_handler, такие сообщения
+    считаются обработанными — см. process_batch и поле handler_error.
+    
+    Args:
+        event: Событие триггера с пакетом сообщений
+        context: Контекст выполнения функции
+        
+    Returns:
+        Результат по каждому сообщению, если обработаны все
+        
+    Raises:
+        BatchFailed: Часть сообщений не обработана, пакет будет доставлен повторно
+    """
+    try:
+        messages = _extract_queue_messages(event)
+        results = run_coroutine(process_batch(messages))
+    except Exception as e:
+        logger.error(f"Критическая ошибка в queue_handler: {e}")
+        raise
+    
+    failed = [result for result in results if not result.ok]
+    if failed:
+        if not config.IDEMPOTENCY_ENABLED:
+            logger.warning("Защита от повторов отключена: успешные сообщения пакета будут обработаны повторно")
+        logger.error(f"Пакет из {len(results)} сообщений: {len(failed)} с ошибкой, пакет будет доставлен повторно")
+        raise BatchFailed(results)
+    
+    handler_errors = sum(1 for result in results if result.handler_error)
+    if handler_errors:
+        logger.warning(f"Пакет из {len(results)} сообщений: {handler_errors} с ошибкой обработчика")
+    
+    return {
+        'statusCode': 200,
+        'body': json.dumps({
+            'processed': len(results),
+            'handler_errors': handler_errors,
+            'results': [asdict(result) for result in results]
+        }, ensure_ascii=False)
+    }
+
+
+async def run_overdue_sweep() -> Dict[str, Any]:
+    """Переводит задачи с истекшим сроком в overdue"""
+    from app.services.overdue_service import OverdueSweeper
+    
+    await init_application()
+    report = await OverdueSweeper().sweep()
+    
+    result = asdict(report)
+    result['cutoff'] = report.cutoff.isoformat()
+    result['watermark'] = report.watermark.isoformat() if report.watermark else None
+    return result
+
+
+def sweeper_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Обработчик Cloud Function для триггера-таймера проверки просрочки
+    
+    Args:
+        event: Событие таймера
+        context: Контекст выполнения функции
+        
+    Returns:
+        Количество переведенных в overdue задач; complete=false, если
+        остаток будет обработан следующим запуском
+    """
+    try:
+        result = run_coroutine(run_overdue_sweep())
+        
+        return {
+            'statusCode': 200,
+            'body': json.dumps(result, ensure_ascii=False)
+        }
+        
+    except Exception as e:
+        logger.error(f"Критическая ошибка в sweeper_handler: {e}")
+        return {
+            'statusCode': 500,
+            'body': json.dumps({'error': 'Internal server error'})
+        }
+
+
+async def run_reminders() -> Dict[str, Any]:
+    """Отправляет наступившие напоминания о сроках"""
+    from app.services.reminder_service import ReminderScheduler
+    
+    await init_application()
+    report = await ReminderScheduler().tick()
+    
+    result = asdict(report)
+    result['watermark'] = report.watermark.isoformat() if report.watermark else None
+    return result
+
+
+def reminder_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Обработчик Cloud Function для триггера-таймера напоминаний
+    
+    Args:
+        event: Событие таймера
+        context: Контекст выполнения функции
+        
+    Returns:
+        Количество отправленных, пропущенных и отложенных напоминаний
+    """
+    try:
+        result = run_coroutine(run_reminders())
+        
+        return {
+            'statusCode': 200,
+            'body': json.dumps(result, ensure_ascii=False)
+        }
+        
+    except Exception as e:
+        logger.error(f"Критическая ошибка в reminder_handler: {e}")
+        return {
+            'statusCode': 500,
+            'body': json.dumps({'error': 'Internal server error'})
+        }
+
+
+async def run_counter_reconcile() -> Dict[str, Any]:
+    """Сверяет счетчики задач с пересчетом по индексам"""
+    from app.services.counter_service import CounterService
+    
+    await init_application()
+    report = await CounterService().reconcile()
+    return asdict(report)
+
+
+def reconcile_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Обработчик Cloud Function для триггера-таймера сверки счетчиков
+    
+    Args:
+        event: Событие таймера
+        context: Контекст выполнения функции
+        
+    Returns:
+        Количество сверенных компаний и пользователей и исправленных расхождений
+    """
+    try:
+        result = run_coroutine(run_counter_reconcile())
+        
+        return {
+            'statusCode': 200,
+            'body': json.dumps(result, ensure_ascii=False)
+        }
+        
+    except Exception as e:
+        logger.error(f"Критическая ошибка в reconcile_handler: {e}")
+        return {
+            'statusCode': 500,
+            'body': json.dumps({'error': 'Internal server error'})
+        }
+
+
 # Для локального тестирования
 if __name__ == "__main__":
     # Тестовый запрос
@@ -0,0 +1,189 @@
+"""
+Долгоживущий webhook сервер (альтернатива Cloud Function)
+
+Запускает несколько процессов-воркеров на одном порту (SO_REUSEPORT).
+В каждом процессе свои бот, диспетчер и пул сессий YDB, созданные теми же
+create_bot/setup_dispatcher, что и в index.py. При SIGTERM/SIGINT воркер
+SERVER_DRAIN_GRACE секунд продолжает работать, но отвечает 503 на /health,
+чтобы балансировщик снял с него трафик (повторный сигнал завершает ожидание
+сразу). Затем воркер перестает принимать соединения и дожидается обработки
+текущих update (не дольше SERVER_SHUTDOWN_TIMEOUT). Задания по таймеру (напоминания,
+просрочка) выполняются циклом в каждом воркере (app/bot/timer_jobs.py).
+
+Состояния FSM хранятся в памяти процесса, как и в Cloud Function, поэтому
+при нескольких воркерах сценарии из нескольких шагов рассчитаны на то, что
+балансировщик направляет пользователя в один и тот же процесс.
+
+Запуск:
+    python server.py [--workers 4] [--port 8080]
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import signal
+import sys
+from dataclasses import dataclass
+from typing import List
+
+from aiohttp import web
+
+from config import config
+from app.bot.startup import init_application, shutdown_application
+from app.bot.timer_jobs import start_timer_jobs, stop_timer_jobs
+from app.bot.update_processor import dispatch_update
+from app.utils.metrics import get_metrics_snapshot
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+
+@dataclass
+class ServerState:
+    """Изменяемое состояние воркера (приложение после запуска заморожено)"""
+
+    draining: bool = False
+
+
+async def handle_webhook(request: web.Request) -> web.Response:
+    """Принимает update от Telegram"""
+    if config.WEBHOOK_SECRET and request.headers.get(SECRET_HEADER) != config.WEBHOOK_SECRET:
+        return web.json_response({'error': 'Forbidden'}, status=403)
+
+    try:
+        update_data = await request.json()
+    except ValueError:
+        return web.json_response({'error': 'Invalid JSON'}, status=400)
+
+    try:
+        await dispatch_update(update_data)
+    except Exception as e:
+        logger.error(f"Ошибка обработки update: {e}")
+        return web.json_response({'error': str(e)}, status=500)
+
+    return web.json_response({'status': 'ok'})
+
+
+async def handle_health(request: web.Request) -> web.Response:
+    """Health check; во время завершения отвечает 503, чтобы балансировщик снял трафик"""
+    if request.app['state'].draining:
+        return web.json_response({'status': 'draining'}, status=503)
+    return web.json_response({'status': 'healthy', 'service': 'telegram-task-bot'})
+
+
+async def handle_metrics(request: web.Request) -> web.Response:
+    """Метрики процесса-воркера"""
+    return web.json_response(get_metrics_snapshot())
+
+
+async def on_startup(app: web.Application) -> None:
+    await init_application()
+    if config.SERVER_TIMER_JOBS:
+        app['timer_jobs'] = start_timer_jobs()
+
+
+async def on_cleanup(app: web.Application) -> None:
+    await stop_timer_jobs(app.get('timer_jobs', []))
+    await shutdown_application()
+
+
+def create_app() -> web.Application:
+    """Создает aiohttp приложение webhook сервера"""
+    app = web.Application()
+    app['state'] = ServerState()
+    app.router.add_post(config.SERVER_WEBHOOK_PATH, handle_webhook)
+    app.router.add_get('/health', handle_health)
+    app.router.add_get('/metrics', handle_metrics)
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+async def serve(host: str, port: int, reuse_port: bool) -> None:
+    """Запускает сервер и работает до сигнала завершения"""
+    app = create_app()
+    runner = web.AppRunner(app, handle_signals=False, shutdown_timeout=config.SERVER_SHUTDOWN_TIMEOUT)
+    await runner.setup()
+
+    site = web.TCPSite(runner, host, port, reuse_port=reuse_port)
+    await site.start()
+    logger.info(f"Воркер слушает {host}:{port}{config.SERVER_WEBHOOK_PATH}")
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    await stop_event.wait()
+
+    logger.info(f"Завершение: {config.SERVER_DRAIN_GRACE:g} с отвечаем 503 на /health, чтобы снять трафик")
+    app['state'].draining = True
+    stop_event.clear()
+    try:
+        await asyncio.wait_for(stop_event.wait(), timeout=config.SERVER_DRAIN_GRACE)
+    except asyncio.TimeoutError:
+        pass
+
+    logger.info("Завершение: перестаем принимать соединения и ждем текущие update")
+    # cleanup закрывает сокеты, ждет активные обработчики и вызывает on_cleanup
+    await runner.cleanup()
+    logger.info("Воркер остановлен")
+
+
+def run_worker(host: str, port: int, reuse_port: bool) -> None:
+    """Точка входа процесса-воркера"""
+    logging.basicConfig(
+        level=getattr(logging, config.LOG_LEVEL),
+        format='%(asctime)s - %(process)d - %(name)s - %(levelname)s - %(message)s'
+    )
+    asyncio.run(serve(host, port, reuse_port))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Webhook сервер Telegram бота")
+    parser.add_argument('--host', default=config.SERVER_HOST)
+    parser.add_argument('--port', type=int, default=config.SERVER_PORT)
+    parser.add_argument('--workers', type=int, default=config.SERVER_WORKERS)
+    args = parser.parse_args()
+
+    if args.workers <= 1:
+        run_worker(args.host, args.port, reuse_port=False)
+        return 0
+
+    logging.basicConfig(
+        level=getattr(logging, config.LOG_LEVEL),
+        format='%(asctime)s - %(process)d - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    # spawn: воркеры не наследуют состояние gRPC и цикла событий родителя
+    context = multiprocessing.get_context('spawn')
+    workers: List[multiprocessing.Process] = [
+        context.Process(target=run_worker, args=(args.host, args.port, True), name=f"worker-{i}")
+        for i in range(args.workers)
+    ]
+
+    def forward_signal(signum, frame) -> None:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()  # SIGTERM: воркер завершает текущие update
+
+    signal.signal(signal.SIGTERM, forward_signal)
+    signal.signal(signal.SIGINT, forward_signal)
+
+    for worker in workers:
+        worker.start()
+    logger.info(f"Запущено воркеров: {len(workers)}")
+
+    for worker in workers:
+        worker.join()
+
+    failed = [worker.name for worker in workers if worker.exitcode not in (0, -signal.SIGTERM)]
+    if failed:
+        logger.error(f"Воркеры завершились с ошибкой: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())